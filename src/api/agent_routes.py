@@ -7,13 +7,21 @@
 └─────────────────────────────────────────────────────────────────────────────┘
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, Body
+from fastapi.responses import StreamingResponse
 from typing import Dict, List, Optional, Any
+from datetime import datetime
 from pydantic import BaseModel
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 
-from src.models.models import Agent, AgentConfiguration, Organization, OrganizationAnalysis
-from src.services.agent_generator import AgentGenerator
+from src.models.models import Agent, AgentConfiguration, AgentGenerationJob, Organization, OrganizationAnalysis
+from src.services.agent_generation_worker import generation_workers
+from src.services.agent_runtime import agent_runtime
+from src.services.streaming import sse_stream
+from src.services.pagination import (
+    LIST_MAX_PAGE_SIZE, LIST_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset_page, project, select_fields
+)
 from src.config.database import get_db
 from src.services.auth_service import get_current_user
 
@@ -75,6 +83,87 @@ class AgentResponse(BaseModel):
             }
         }
 
+class AgentListItem(BaseModel):
+    """Esquema para um agente na listagem (apenas os campos selecionados em `fields`)."""
+    id: Optional[int] = None
+    name: Optional[str] = None
+    type: Optional[str] = None
+    description: Optional[str] = None
+    configuration: Optional[Dict[str, Any]] = None
+
+# Campos da listagem de agentes e suas colunas
+AGENT_LIST_FIELDS = {
+    "id": Agent.id,
+    "name": Agent.name,
+    "type": Agent.type,
+    "description": Agent.description,
+    "configuration": AgentConfiguration.configuration
+}
+
+class AgentGenerationJobResponse(BaseModel):
+    """Esquema para resposta com o status de um job de geração de agentes."""
+    jobId: int
+    status: str
+    totalAgents: int
+    completedAgents: int
+    generatedAgents: List[AgentResponse] = []
+    error: Optional[str] = None
+    createdAt: Optional[datetime] = None
+    completedAt: Optional[datetime] = None
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "jobId": 1,
+                "status": "running",
+                "totalAgents": 2,
+                "completedAgents": 1,
+                "generatedAgents": [
+                    {
+                        "id": 1,
+                        "name": "Virginia",
+                        "type": "customer_support",
+                        "description": "Agente especializado em atendimento ao cliente",
+                        "configuration": {"model": "gpt-4"}
+                    }
+                ],
+                "error": None,
+                "createdAt": "2025-05-30T20:32:30.000Z",
+                "completedAt": None
+            }
+        }
+
+class AgentMessageRequest(BaseModel):
+    """Esquema para envio de uma mensagem a um agente."""
+    content: str
+    userId: Optional[str] = None
+    channel: str = "web"
+    language: str = "pt"
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "content": "Olá, gostaria de saber o status do meu pedido.",
+                "userId": "cliente-123",
+                "channel": "web",
+                "language": "pt"
+            }
+        }
+
+def _job_response(job: AgentGenerationJob) -> Dict[str, Any]:
+    """Converte um AgentGenerationJob no formato de resposta da API."""
+    generated_agents = job.generated_agents or []
+    return {
+        "jobId": job.id,
+        "status": job.status,
+        "totalAgents": len(job.agent_templates or []),
+        "completedAgents": len(generated_agents),
+        "generatedAgents": generated_agents,
+        "error": job.error_message,
+        "createdAt": job.created_at,
+        "completedAt": job.completed_at
+    }
+
 # Criação do router para geração e validação de agentes
 router = APIRouter(
     prefix="/api/agents",
@@ -83,19 +172,24 @@ router = APIRouter(
 )
 
 # Endpoint para gerar agentes a partir de uma análise
-@router.post("/generate", response_model=List[AgentResponse])
+@router.post(
+    "/generate",
+    response_model=AgentGenerationJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
 async def generate_agents(
     request: AgentGenerationRequest,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """
-    Gera agentes personalizados com base nos resultados de uma análise organizacional.
+    Solicita a geração de agentes personalizados com base em uma análise organizacional.
     
     Esta função:
     1. Recebe o ID de uma análise organizacional
-    2. Utiliza o serviço AgentGenerator para criar agentes personalizados
-    3. Retorna a lista de agentes gerados com suas configurações
+    2. Registra um AgentGenerationJob pendente com os agentes recomendados
+    3. Enfileira o job para o pool de workers de geração
+    4. Retorna imediatamente o ID do job (acompanhe em /api/agents/jobs/{job_id})
     """
     try:
         # Verificar se a análise existe e pertence ao tenant do usuário
@@ -110,18 +204,25 @@ async def generate_agents(
                 detail="Análise não encontrada"
             )
         
-        # Criar instância do gerador de agentes
-        agent_generator = AgentGenerator(db_session=db)
-        
-        # Gerar agentes com base na análise
-        generated_agents = agent_generator.generate_agents_from_analysis(
-            analysis_id=request.analysisId,
+        # Registrar o job de geração
+        job = AgentGenerationJob(
+            analysis_id=analysis.id,
             tenant_id=current_user.tenant_id,
-            user_id=current_user.id
+            user_id=current_user.id,
+            agent_templates=analysis.results.get("recommendedAgents", []),
+            status="pending"
         )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
         
-        return generated_agents
+        # Enfileirar para os workers de geração
+        generation_workers.enqueue(job.id)
+        
+        return _job_response(job)
     
+    except HTTPException:
+        raise
     except Exception as e:
         # Registrar o erro e retornar uma resposta de erro
         print(f"Erro na geração de agentes: {str(e)}")
@@ -130,6 +231,41 @@ async def generate_agents(
             detail=f"Erro ao gerar agentes: {str(e)}"
         )
 
+# Endpoint para acompanhar um job de geração de agentes
+@router.get("/jobs/{job_id}", response_model=AgentGenerationJobResponse)
+async def get_generation_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Obtém o status e o progresso de um job de geração de agentes.
+    
+    Os agentes aparecem em `generatedAgents` à medida que são gerados.
+    """
+    job = db.query(AgentGenerationJob).filter(
+        AgentGenerationJob.id == job_id,
+        AgentGenerationJob.tenant_id == current_user.tenant_id
+    ).first()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job de geração não encontrado"
+        )
+    
+    return _job_response(job)
+
+# Endpoint para obter os contadores do pool de agentes em execução
+@router.get("/runtime/stats")
+async def get_agent_runtime_stats(
+    current_user = Depends(get_current_user)
+):
+    """
+    Retorna os contadores de acertos, falhas e remoções do pool de agentes.
+    """
+    return agent_runtime.stats()
+
 # Endpoint para validar um agente gerado
 @router.post("/validate", response_model=AgentResponse)
 async def validate_agent(
@@ -234,39 +370,51 @@ async def validate_agent(
         )
 
 # Endpoint para listar agentes do usuário
-@router.get("/list", response_model=List[AgentResponse])
+@router.get("/list", response_model=List[AgentListItem], response_model_exclude_unset=True)
 async def list_agents(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """
-    Lista todos os agentes do tenant do usuário.
+    Lista os agentes do tenant do usuário, dos mais antigos para os mais recentes.
+    
+    A listagem é paginada: o cursor da próxima página é retornado no
+    cabeçalho X-Next-Cursor. `fields` (por exemplo, "id,name,type") limita
+    os campos retornados; sem "configuration", a configuração não é lida.
     """
     try:
-        # Buscar agentes do tenant
-        agents = db.query(Agent).filter(
-            Agent.tenant_id == current_user.tenant_id
-        ).all()
+        try:
+            selected = select_fields(fields, list(AGENT_LIST_FIELDS))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         
-        result = []
-        for agent in agents:
-            # Obter configuração ativa
-            agent_config = db.query(AgentConfiguration).filter(
-                AgentConfiguration.agent_id == agent.id,
+        # Agentes do tenant com configuração ativa, apenas com as colunas selecionadas
+        query = db.query(
+            *(AGENT_LIST_FIELDS[field].label(field) for field in selected)
+        ).select_from(Agent).join(
+            AgentConfiguration, and_(
+                AgentConfiguration.agent_id == Agent.id,
                 AgentConfiguration.is_active == True
-            ).first()
-            
-            if agent_config:
-                result.append({
-                    "id": agent.id,
-                    "name": agent.name,
-                    "type": agent.type,
-                    "description": agent.description,
-                    "configuration": agent_config.configuration
-                })
+            )
+        ).filter(
+            Agent.tenant_id == current_user.tenant_id
+        )
+        
+        try:
+            rows, next_cursor = keyset_page(query, Agent.created_at, Agent.id, cursor, limit)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         
-        return result
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return [project(row, selected) for row in rows]
     
+    except HTTPException:
+        raise
     except Exception as e:
         # Registrar o erro e retornar uma resposta de erro
         print(f"Erro ao listar agentes: {str(e)}")
@@ -325,3 +473,51 @@ async def get_agent(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao obter agente: {str(e)}"
         )
+
+# Endpoint para conversar com um agente, com a resposta enviada por streaming
+@router.post("/{agent_id}/messages/stream")
+async def stream_agent_message(
+    agent_id: int,
+    request: AgentMessageRequest,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Envia uma mensagem a um agente e retorna a resposta como Server-Sent Events.
+    
+    Eventos `step` indicam o início e o fim da geração, eventos `token` trazem
+    as partes da resposta à medida que são geradas e o evento `done` traz a
+    resposta completa. Clientes lentos pausam a geração em vez de acumular
+    eventos no servidor.
+    """
+    agent = agent_runtime.load(db, agent_id, current_user.tenant_id)
+    
+    if agent is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Agente não encontrado"
+        )
+    
+    if not hasattr(agent, "astream_message"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O agente não suporta respostas por streaming"
+        )
+    
+    message = {
+        "user_id": request.userId or str(current_user.id),
+        "content": request.content,
+        "channel": request.channel,
+        "language": request.language,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    
+    return StreamingResponse(
+        sse_stream(agent.astream_message(message, {"tenant_id": current_user.tenant_id})),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Desativar o buffer de proxies reversos (nginx)
+            "X-Accel-Buffering": "no"
+        }
+    )
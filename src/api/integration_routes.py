@@ -2,11 +2,17 @@
 Rotas de API para integrações com canais de comunicação
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional
+import json
 
 from src.config.database import get_db
+from src.services.auth_service import get_current_user
+from src.services.pagination import (
+    LIST_MAX_PAGE_SIZE, LIST_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset_page, project, select_fields
+)
 
 router = APIRouter()
 
@@ -38,33 +44,172 @@ def create_channel_integration(
         "integration_id": integration.id
     }
 
+async def _ndjson_lines(request: Request) -> AsyncIterator[Dict[str, Any]]:
+    """Lê o corpo da requisição em NDJSON à medida que chega, um objeto por linha."""
+    buffer = b""
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if buffer.strip():
+        yield json.loads(buffer)
+
+@router.post("/channels/bulk")
+async def send_bulk_messages(request: Request, current_user = Depends(get_current_user)):
+    """
+    Envia um template de mensagem para muitos destinatários.
+    
+    O corpo é NDJSON: a primeira linha contém client_id, channel, template e,
+    opcionalmente, metadata e campaign_id; cada linha seguinte é um
+    destinatário (texto ou objeto com "recipient" e "vars"). O corpo é lido
+    à medida que chega, e a resposta, também NDJSON, traz o resultado de cada
+    destinatário, o progresso a cada trecho e os totais ao final.
+    
+    Requer autenticação; o client_id deve ser o cliente do usuário, pois o
+    envio usa as credenciais dos canais desse cliente.
+    """
+    from src.services.channel_integration import ChannelIntegration
+    
+    lines = _ndjson_lines(request)
+    try:
+        header = await lines.__anext__()
+        client_id, channel, template = header["client_id"], header["channel"], header["template"]
+    except (StopAsyncIteration, KeyError, TypeError, json.JSONDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A primeira linha deve conter client_id, channel e template"
+        )
+    
+    if str(client_id) != str(current_user.client_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Envio permitido apenas para o cliente do usuário"
+        )
+    
+    events = ChannelIntegration(db=None).send_bulk(
+        client_id,
+        channel,
+        lines,
+        template,
+        metadata=header.get("metadata"),
+        campaign_id=header.get("campaign_id")
+    )
+    
+    async def body():
+        try:
+            async for event in events:
+                yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        except json.JSONDecodeError as e:
+            yield json.dumps({"type": "error", "error": f"Linha NDJSON inválida: {str(e)}"}) + "\n"
+    
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+@router.get("/channels/webhooks/whatsapp")
+def verify_whatsapp_webhook(request: Request):
+    """
+    Confirma a assinatura do webhook do WhatsApp (desafio hub.challenge).
+    """
+    from src.services.inbound_webhooks import WHATSAPP_VERIFY_TOKEN
+    
+    params = request.query_params
+    if (
+        params.get("hub.mode") != "subscribe"
+        or not WHATSAPP_VERIFY_TOKEN
+        or params.get("hub.verify_token") != WHATSAPP_VERIFY_TOKEN
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token de verificação inválido")
+    
+    return PlainTextResponse(params.get("hub.challenge", ""))
+
+@router.post("/channels/webhooks/{channel}")
+async def receive_channel_webhook(channel: str, request: Request):
+    """
+    Recebe um webhook do WhatsApp, do LinkedIn ou da telefonia.
+    
+    Verifica a assinatura, enfileira o corpo bruto e responde imediatamente;
+    as mensagens são extraídas, deduplicadas e atendidas pelos workers.
+    """
+    from src.services.inbound_webhooks import WEBHOOK_CHANNELS, accept_webhook, verify_signature
+    
+    if channel not in WEBHOOK_CHANNELS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Canal não suportado: {channel}")
+    
+    body = await request.body()
+    if not verify_signature(channel, body, request.headers, str(request.url)):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Assinatura inválida")
+    
+    try:
+        await accept_webhook(channel, body)
+    except Exception as e:
+        # Sem resposta 2xx, o provedor reenvia o webhook
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Fila indisponível: {str(e)}")
+    
+    if channel == "phone":
+        return Response("<Response></Response>", media_type="application/xml")
+    return Response(status_code=status.HTTP_200_OK)
+
+@router.get("/channels/inbound/stats")
+def get_inbound_webhook_stats():
+    """
+    Retorna os contadores do processamento de webhooks: eventos, mensagens,
+    reenvios descartados, mensagens sem agente e erros.
+    """
+    from src.services.inbound_webhooks import inbound_workers
+    
+    return inbound_workers.stats()
+
+@router.get("/channels/outbound/stats")
+def get_outbound_traffic_stats():
+    """
+    Retorna as métricas de envio por canal: mensagens entregues, moldadas
+    pelo limite de taxa e reagendadas, e os tempos de espera na fila.
+    """
+    from src.services.rate_limiter import outbound_metrics
+    
+    return outbound_metrics.stats()
+
 @router.get("/channels/client/{client_id}", response_model=List[Dict[str, Any]])
 def get_client_integrations(
     client_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Obtém todas as integrações de canais para um cliente.
+    Obtém as integrações de canais de um cliente, das mais antigas para as mais recentes.
+    
+    A listagem é paginada: o cursor da próxima página é retornado no
+    cabeçalho X-Next-Cursor. `fields` (por exemplo, "id,channel_type,active")
+    limita os campos retornados.
     """
     from src.models.models import ChannelIntegration
     
-    integrations = db.query(ChannelIntegration).filter(
-        ChannelIntegration.client_id == client_id
-    ).all()
-    
-    result = []
-    for integration in integrations:
-        result.append({
-            "id": integration.id,
-            "client_id": integration.client_id,
-            "channel_type": integration.channel_type,
-            "configuration": integration.configuration,
-            "active": integration.active,
-            "created_at": integration.created_at,
-            "updated_at": integration.updated_at
-        })
-    
-    return result
+    columns = {
+        "id": ChannelIntegration.id,
+        "client_id": ChannelIntegration.client_id,
+        "channel_type": ChannelIntegration.channel_type,
+        "configuration": ChannelIntegration.configuration,
+        "active": ChannelIntegration.active,
+        "created_at": ChannelIntegration.created_at,
+        "updated_at": ChannelIntegration.updated_at
+    }
+    
+    try:
+        selected = select_fields(fields, list(columns))
+        query = db.query(*(columns[field].label(field) for field in selected)).filter(
+            ChannelIntegration.client_id == client_id
+        )
+        rows, next_cursor = keyset_page(query, ChannelIntegration.created_at, ChannelIntegration.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [project(row, selected) for row in rows]
 
 @router.post("/agents/{agent_id}/channels/{channel_id}", status_code=status.HTTP_201_CREATED)
 def link_agent_to_channel(
@@ -130,29 +275,27 @@ def get_agent_channels(
     """
     Obtém todos os canais vinculados a um agente.
     """
-    from src.models.models import AgentChannelIntegration, ChannelIntegration
+    from sqlalchemy.orm import contains_eager
+    from src.models.models import AgentChannelIntegration
     
-    # Buscar vínculos do agente
-    links = db.query(AgentChannelIntegration).filter(
+    # Buscar vínculos do agente com os canais carregados na mesma consulta
+    links = db.query(AgentChannelIntegration).join(
+        AgentChannelIntegration.channel_integration
+    ).options(
+        contains_eager(AgentChannelIntegration.channel_integration)
+    ).filter(
         AgentChannelIntegration.agent_id == agent_id
-    ).all()
-    
-    result = []
-    for link in links:
-        # Buscar informações do canal
-        channel = db.query(ChannelIntegration).filter(
-            ChannelIntegration.id == link.channel_integration_id
-        ).first()
-        
-        if channel:
-            result.append({
-                "link_id": link.id,
-                "channel_id": channel.id,
-                "channel_type": channel.channel_type,
-                "configuration": link.configuration,
-                "active": link.active,
-                "created_at": link.created_at,
-                "updated_at": link.updated_at
-            })
-    
-    return result
+    ).order_by(AgentChannelIntegration.id).all()
+    
+    return [
+        {
+            "link_id": link.id,
+            "channel_id": link.channel_integration.id,
+            "channel_type": link.channel_integration.channel_type,
+            "configuration": link.configuration,
+            "active": link.active,
+            "created_at": link.created_at,
+            "updated_at": link.updated_at
+        }
+        for link in links
+    ]
@@ -8,13 +8,17 @@
 └─────────────────────────────────────────────────────────────────────────────┘
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from typing import Dict, List, Optional, Any
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from src.models.models import Organization, OrganizationAnalysis
 from src.models.organization_analyzer import OrganizationAnalyzer
+from src.services.analysis_cache import analysis_cache
+from src.services.pagination import (
+    LIST_MAX_PAGE_SIZE, LIST_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset_page, project, select_fields
+)
 from src.schemas.organization_schemas import (
     OrganizationAnalysisCreate,
     OrganizationAnalysisResponse,
@@ -30,6 +34,9 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# Analisador compartilhado (os templates vêm do registro compilado ativo)
+analyzer = OrganizationAnalyzer()
+
 # Endpoint para enviar dados de análise organizacional
 @router.post("/analyze", response_model=OrganizationAnalysisResponse)
 async def analyze_organization(
@@ -42,12 +49,24 @@ async def analyze_organization(
     
     Esta função:
     1. Recebe os dados organizacionais do frontend
-    2. Processa os dados usando o analisador organizacional
-    3. Gera recomendações de agentes com base na análise
-    4. Salva os resultados no banco de dados
-    5. Retorna o ID da análise e um resumo dos resultados
+    2. Retorna o resultado armazenado se os mesmos dados já foram analisados
+    3. Processa os dados usando o analisador organizacional
+    4. Gera recomendações de agentes com base na análise
+    5. Salva os resultados no banco de dados
+    6. Retorna o ID da análise e um resumo dos resultados
     """
     try:
+        # Consultar o cache endereçado pelo conteúdo dos dados de entrada
+        organization_data = data.dict()
+        cache_key = analysis_cache.make_key(
+            tenant_id=current_user.tenant_id,
+            payload=organization_data,
+            registry_version=analyzer.registry.version
+        )
+        cached_response = analysis_cache.get(cache_key)
+        if cached_response is not None:
+            return cached_response
+        
         # Verificar se a organização existe ou criar uma nova
         organization = db.query(Organization).filter(
             Organization.name == data.name,
@@ -66,12 +85,9 @@ async def analyze_organization(
             db.commit()
             db.refresh(organization)
         
-        # Criar o analisador organizacional
-        analyzer = OrganizationAnalyzer()
-        
         # Processar a análise
         analysis_results = analyzer.analyze(
-            organization_data=data.dict(),
+            organization_data=organization_data,
             tenant_id=current_user.tenant_id
         )
         
@@ -88,13 +104,16 @@ async def analyze_organization(
         db.refresh(analysis)
         
         # Retornar o ID da análise e um resumo dos resultados
-        return {
+        response = {
             "analysisId": analysis.id,
             "organizationName": organization.name,
             "summary": analysis_results.get("summary", {}),
             "recommendedAgents": analysis_results.get("recommendedAgents", []),
             "status": "completed"
         }
+        analysis_cache.set(cache_key, response)
+        
+        return response
     
     except Exception as e:
         # Registrar o erro e retornar uma resposta de erro
@@ -104,6 +123,80 @@ async def analyze_organization(
             detail=f"Erro ao processar análise organizacional: {str(e)}"
         )
 
+# Endpoint para obter os contadores do cache de análises
+@router.get("/cache/stats")
+async def get_analysis_cache_stats(
+    current_user = Depends(get_current_user)
+):
+    """
+    Retorna os contadores de acertos e falhas do cache de análises.
+    """
+    return analysis_cache.stats()
+
+# Campos do histórico de análises e suas colunas (agentCount é contado a partir dos resultados)
+ANALYSIS_HISTORY_FIELDS = {
+    "analysisId": OrganizationAnalysis.id,
+    "organizationName": Organization.name,
+    "createdAt": OrganizationAnalysis.created_at,
+    "status": OrganizationAnalysis.status,
+    "agentCount": OrganizationAnalysis.results
+}
+
+# Endpoint para obter histórico de análises (antes de /analysis/{analysis_id}, que capturaria "history")
+@router.get(
+    "/analysis/history",
+    response_model=List[OrganizationAnalysisHistoryResponse],
+    response_model_exclude_unset=True
+)
+async def get_analysis_history(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Obtém o histórico de análises organizacionais do usuário atual, das mais recentes para as mais antigas.
+    
+    A listagem é paginada: o cursor da próxima página é retornado no
+    cabeçalho X-Next-Cursor. `fields` limita os campos retornados; sem
+    "agentCount", os resultados das análises não são lidos.
+    """
+    try:
+        selected = select_fields(fields, list(ANALYSIS_HISTORY_FIELDS))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    # Apenas as colunas selecionadas; a organização só é unida se o nome for pedido
+    query = db.query(
+        *(ANALYSIS_HISTORY_FIELDS[field].label(field) for field in selected)
+    ).select_from(OrganizationAnalysis)
+    if "organizationName" in selected:
+        query = query.outerjoin(Organization, Organization.id == OrganizationAnalysis.organization_id)
+    query = query.filter(OrganizationAnalysis.tenant_id == current_user.tenant_id)
+    
+    try:
+        rows, next_cursor = keyset_page(
+            query, OrganizationAnalysis.created_at, OrganizationAnalysis.id, cursor, limit, descending=True
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    result = []
+    for row in rows:
+        item = project(row, selected)
+        if "organizationName" in item:
+            item["organizationName"] = item["organizationName"] or "Desconhecida"
+        if "agentCount" in item:
+            item["agentCount"] = len((item["agentCount"] or {}).get("recommendedAgents", []))
+        result.append(item)
+    
+    return result
+
 # Endpoint para obter resultados de análise por ID
 @router.get("/analysis/{analysis_id}", response_model=OrganizationAnalysisResponse)
 async def get_analysis_results(
@@ -136,32 +229,3 @@ async def get_analysis_results(
         "recommendedAgents": analysis.results.get("recommendedAgents", []),
         "status": analysis.status
     }
-
-# Endpoint para obter histórico de análises
-@router.get("/analysis/history", response_model=List[OrganizationAnalysisHistoryResponse])
-async def get_analysis_history(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
-):
-    """
-    Obtém o histórico de análises organizacionais do usuário atual.
-    """
-    analyses = db.query(OrganizationAnalysis).filter(
-        OrganizationAnalysis.tenant_id == current_user.tenant_id
-    ).order_by(OrganizationAnalysis.created_at.desc()).all()
-    
-    result = []
-    for analysis in analyses:
-        organization = db.query(Organization).filter(
-            Organization.id == analysis.organization_id
-        ).first()
-        
-        result.append({
-            "analysisId": analysis.id,
-            "organizationName": organization.name if organization else "Desconhecida",
-            "createdAt": analysis.created_at,
-            "status": analysis.status,
-            "agentCount": len(analysis.results.get("recommendedAgents", []))
-        })
-    
-    return result
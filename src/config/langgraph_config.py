@@ -2,9 +2,17 @@
 Configuração do LangGraph para fluxos de trabalho de agentes
 """
 
+from collections import OrderedDict
+from functools import partial
+import asyncio
+import hashlib
+import json
+import logging
 import os
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Tuple
 from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import RunnableLambda
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain.agents import AgentExecutor
@@ -15,22 +23,270 @@ from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 from dotenv import load_dotenv
 
+from src.services.adk.fan_out import fan_out
+from src.services.adk.graph_checkpoints import (
+    GraphCheckpointStore, get_graph_checkpoint_store, input_fingerprint, step_cache_key
+)
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Tamanho dos caches de grafos compilados e de funções de ferramentas
+LANGGRAPH_GRAPH_CACHE_SIZE = int(os.getenv("LANGGRAPH_GRAPH_CACHE_SIZE", "128"))
+LANGGRAPH_TOOL_CACHE_SIZE = int(os.getenv("LANGGRAPH_TOOL_CACHE_SIZE", "1024"))
+
+# Execução assíncrona de grafos paralelos
+LANGGRAPH_GRAPH_CONCURRENCY = int(os.getenv("LANGGRAPH_GRAPH_CONCURRENCY", "4"))
+LANGGRAPH_BRANCH_TIMEOUT = float(os.getenv("LANGGRAPH_BRANCH_TIMEOUT", "60"))
+
+# Funções OpenAI já convertidas, por ferramenta: id(tool) -> (tool, função)
+# A referência à ferramenta impede que o id seja reutilizado por outro objeto
+_tool_functions: "OrderedDict[int, Tuple[Any, Dict[str, Any]]]" = OrderedDict()
+_tool_functions_lock = threading.Lock()
+
+def tool_to_openai_function(tool: Any) -> Dict[str, Any]:
+    """
+    Converte uma ferramenta para o formato de função da OpenAI.
+    
+    A conversão é feita uma única vez por ferramenta; o dicionário retornado
+    é compartilhado e não deve ser alterado.
+    
+    Args:
+        tool: Ferramenta do LangChain
+        
+    Returns:
+        Definição da função no formato da OpenAI
+    """
+    key = id(tool)
+    with _tool_functions_lock:
+        entry = _tool_functions.get(key)
+        if entry is not None and entry[0] is tool:
+            _tool_functions.move_to_end(key)
+            return entry[1]
+    
+    function = format_tool_to_openai_function(tool)
+    
+    with _tool_functions_lock:
+        _tool_functions[key] = (tool, function)
+        _tool_functions.move_to_end(key)
+        while len(_tool_functions) > LANGGRAPH_TOOL_CACHE_SIZE:
+            _tool_functions.popitem(last=False)
+    
+    return function
+
+def _tool_fingerprint(tool: Any) -> Dict[str, Any]:
+    """Identifica uma ferramenta pelo seu esquema e pela sua implementação."""
+    implementation = getattr(tool, "func", None) or getattr(tool, "coroutine", None) or type(tool)
+    return {
+        "function": tool_to_openai_function(tool),
+        "implementation": f"{getattr(implementation, '__module__', '')}.{getattr(implementation, '__qualname__', '')}"
+    }
+
+class CompiledGraphCache:
+    """
+    Cache LRU de grafos compilados.
+    
+    Esta classe implementa:
+    1. Grafos indexados por um hash estável de sua definição
+    2. Remoção LRU limitada por número de grafos
+    3. Invalidação explícita por chave, por ferramenta ou total
+    4. Contadores de acertos e falhas
+    """
+    
+    def __init__(self, max_entries: int = LANGGRAPH_GRAPH_CACHE_SIZE):
+        """
+        Inicializa o cache.
+        
+        Args:
+            max_entries: Número máximo de grafos mantidos
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, frozenset]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+    
+    @staticmethod
+    def make_key(definition: Dict[str, Any]) -> str:
+        """
+        Calcula a chave de um grafo a partir de sua definição.
+        
+        Args:
+            definition: Definição serializável do grafo (tipo, modelo, prompts, ferramentas, passos)
+            
+        Returns:
+            Hash SHA-256 hexadecimal
+        """
+        canonical = json.dumps(definition, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    def get_or_build(self, key: str, build: Callable[[], Any], tool_names: List[str]) -> Any:
+        """
+        Obtém um grafo do cache, construindo-o se necessário.
+        
+        Args:
+            key: Chave calculada por `make_key`
+            build: Função que constrói e compila o grafo
+            tool_names: Nomes das ferramentas usadas pelo grafo (para invalidação)
+            
+        Returns:
+            Grafo compilado
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return entry[0]
+            self._counters["misses"] += 1
+        
+        graph = build()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            self._entries[key] = (graph, frozenset(tool_names))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+        
+        return graph
+    
+    def invalidate(self, key: Optional[str] = None) -> int:
+        """
+        Remove um grafo do cache, ou todos se nenhuma chave for informada.
+        
+        Args:
+            key: Chave do grafo
+            
+        Returns:
+            Número de grafos removidos
+        """
+        with self._lock:
+            if key is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                removed = 1 if self._entries.pop(key, None) is not None else 0
+            self._counters["invalidations"] += removed
+        return removed
+    
+    def invalidate_tool(self, tool_name: str) -> int:
+        """
+        Remove os grafos que usam uma ferramenta e a sua função convertida.
+        
+        Deve ser chamado quando a implementação de uma ferramenta muda sem que
+        o seu nome, descrição ou esquema mudem.
+        
+        Args:
+            tool_name: Nome da ferramenta
+            
+        Returns:
+            Número de grafos removidos
+        """
+        with self._lock:
+            keys = [key for key, (_, tool_names) in self._entries.items() if tool_name in tool_names]
+            for key in keys:
+                del self._entries[key]
+            self._counters["invalidations"] += len(keys)
+        
+        with _tool_functions_lock:
+            for key in [key for key, (tool, _) in _tool_functions.items() if getattr(tool, "name", None) == tool_name]:
+                del _tool_functions[key]
+        
+        return len(keys)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores do cache.
+        
+        Returns:
+            Dicionário com acertos, falhas, remoções e ocupação do cache
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+        
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_ratio": counters["hits"] / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries
+        }
+
+# Cache compartilhado pelo processo
+graph_cache = CompiledGraphCache()
+
+async def _call(function: Callable, *args: Any) -> Any:
+    """Executa uma função no próprio event loop (contraparte de asyncio.to_thread)."""
+    return function(*args)
+
+# Chaves de controle dos grafos de fluxo de trabalho, que não fazem parte da entrada dos passos
+_WORKFLOW_CONTROL_KEYS = ("resume_from", "run_input")
+
+def _step_input(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Estado de um grafo de fluxo de trabalho sem as chaves de controle."""
+    return {key: value for key, value in state.items() if key not in _WORKFLOW_CONTROL_KEYS}
+
+def _run_id(config: Optional[Dict[str, Any]]) -> Optional[str]:
+    """ID da execução informado em `config={"configurable": {"run_id": ...}}`."""
+    return (config or {}).get("configurable", {}).get("run_id")
+
 class LangGraphBuilder:
     """
     Construtor de grafos para fluxos de trabalho de agentes usando LangGraph.
     """
     
-    def __init__(self, llm: BaseChatModel):
+    def __init__(self,
+                 llm: BaseChatModel,
+                 cache: Optional[CompiledGraphCache] = None,
+                 checkpoints: Optional[GraphCheckpointStore] = None):
         """
         Inicializa o construtor de grafos.
         
         Args:
             llm: Modelo de linguagem para o agente
+            cache: Cache de grafos compilados (por padrão, o cache do processo)
+            checkpoints: Checkpoints dos grafos de fluxo de trabalho (por padrão, os do processo)
         """
         self.llm = llm
+        self.cache = cache or graph_cache
+        self.checkpoints = checkpoints or get_graph_checkpoint_store()
+        self._aggregator_chain = None
+        
+        # Identificação do modelo nas chaves do cache
+        self.model_key = {
+            "class": f"{type(llm).__module__}.{type(llm).__qualname__}",
+            "params": getattr(llm, "_identifying_params", {})
+        }
+    
+    def _graph_key(self, kind: str, tools: List[Any], **definition: Any) -> str:
+        """
+        Calcula a chave do cache para um grafo deste construtor.
+        
+        O grafo compilado guarda as instâncias do modelo e das ferramentas com
+        que foi construído (credenciais e clientes do tenant), por isso a chave
+        inclui a identidade desses objetos, e não só a sua configuração. Como
+        o grafo mantém referências a eles enquanto estiver no cache, os ids não
+        podem ser reutilizados por outros objetos.
+        
+        Args:
+            kind: Tipo do grafo
+            tools: Ferramentas usadas pelo grafo
+            **definition: Definição serializável do grafo
+            
+        Returns:
+            Chave do grafo
+        """
+        return self.cache.make_key({
+            "kind": kind,
+            "model": self.model_key,
+            "instances": {"model": id(self.llm), "tools": [id(tool) for tool in tools]},
+            **definition
+        })
     
     def create_sequential_agent_graph(self, 
                                      tools: List[Any], 
@@ -45,8 +301,22 @@ class LangGraphBuilder:
         Returns:
             Grafo do agente
         """
+        key = self._graph_key(
+            "sequential",
+            tools,
+            tool_definitions=[_tool_fingerprint(tool) for tool in tools],
+            system_prompt=system_prompt
+        )
+        return self.cache.get_or_build(
+            key,
+            lambda: self._build_sequential_agent_graph(tools, system_prompt),
+            [tool.name for tool in tools]
+        )
+    
+    def _build_sequential_agent_graph(self, tools: List[Any], system_prompt: str) -> StateGraph:
+        """Constrói e compila o grafo sequencial de um agente."""
         # Converter ferramentas para formato OpenAI
-        functions = [format_tool_to_openai_function(tool) for tool in tools]
+        functions = [tool_to_openai_function(tool) for tool in tools]
         
         # Criar prompt do agente
         prompt = ChatPromptTemplate.from_messages([
@@ -93,6 +363,25 @@ class LangGraphBuilder:
         Returns:
             Grafo paralelo
         """
+        key = self._graph_key(
+            "parallel",
+            [tool for config in agent_configs for tool in config["tools"]],
+            agents=[
+                {
+                    "tools": [_tool_fingerprint(tool) for tool in config["tools"]],
+                    "system_prompt": config["system_prompt"]
+                }
+                for config in agent_configs
+            ]
+        )
+        return self.cache.get_or_build(
+            key,
+            lambda: self._build_parallel_agent_graph(agent_configs),
+            [tool.name for config in agent_configs for tool in config["tools"]]
+        )
+    
+    def _build_parallel_agent_graph(self, agent_configs: List[Dict[str, Any]]) -> StateGraph:
+        """Constrói e compila o grafo paralelo."""
         # Criar grafo
         workflow = StateGraph(inputs=["input"])
         
@@ -119,19 +408,209 @@ class LangGraphBuilder:
         # Compilar grafo
         return workflow.compile()
     
+    async def arun_parallel_agents(self,
+                                   agent_configs: List[Dict[str, Any]],
+                                   inputs: Dict[str, Any],
+                                   quorum: Optional[int] = None,
+                                   branch_timeout: Optional[float] = LANGGRAPH_BRANCH_TIMEOUT,
+                                   max_concurrency: Optional[int] = LANGGRAPH_GRAPH_CONCURRENCY) -> Dict[str, Any]:
+        """
+        Executa múltiplos agentes em paralelo, de forma assíncrona, e agrega os resultados.
+        
+        Modo assíncrono de `create_parallel_agent_graph`: os agentes são
+        executados com concorrência limitada por grafo e global
+        (LLM_MAX_CONCURRENCY), cada um com tempo limite próprio, e a agregação
+        começa assim que `quorum` agentes terminam, cancelando os demais.
+        
+        Args:
+            agent_configs: Lista de configurações de agentes
+            inputs: Entrada enviada a todos os agentes
+            quorum: Número de agentes necessário para agregar (por padrão, todos)
+            branch_timeout: Tempo limite de cada agente, em segundos
+            max_concurrency: Número máximo de agentes simultâneos deste grafo
+            
+        Returns:
+            Resultado agregado, com os resultados e falhas de cada agente
+        """
+        result = None
+        async for event in self.astream_parallel_agents(
+            agent_configs, inputs, quorum, branch_timeout, max_concurrency
+        ):
+            if event["type"] == "done":
+                result = event["result"]
+        return result
+    
+    async def astream_parallel_agents(self,
+                                      agent_configs: List[Dict[str, Any]],
+                                      inputs: Dict[str, Any],
+                                      quorum: Optional[int] = None,
+                                      branch_timeout: Optional[float] = LANGGRAPH_BRANCH_TIMEOUT,
+                                      max_concurrency: Optional[int] = LANGGRAPH_GRAPH_CONCURRENCY) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Executa múltiplos agentes em paralelo, produzindo a agregação à medida que é gerada.
+        
+        Mesma execução de `arun_parallel_agents`, com os eventos:
+            {"type": "step", "node": "agents" | "aggregator", "status": "start" | "end"}
+            {"type": "token", "node": "aggregator", "content": "..."}
+            {"type": "done", "result": {...}}  # resultado de `arun_parallel_agents`
+        
+        Args:
+            agent_configs: Lista de configurações de agentes
+            inputs: Entrada enviada a todos os agentes
+            quorum: Número de agentes necessário para agregar (por padrão, todos)
+            branch_timeout: Tempo limite de cada agente, em segundos
+            max_concurrency: Número máximo de agentes simultâneos deste grafo
+            
+        Returns:
+            Iterador assíncrono de eventos
+        """
+        executors = [
+            self._get_agent_executor(config["tools"], config["system_prompt"])
+            for config in agent_configs
+        ]
+        
+        yield {"type": "step", "node": "agents", "status": "start"}
+        fan_out_result = await fan_out(
+            [partial(executor.ainvoke, inputs) for executor in executors],
+            quorum=quorum,
+            branch_timeout=branch_timeout,
+            max_concurrency=max_concurrency
+        )
+        yield {
+            "type": "step",
+            "node": "agents",
+            "status": "end",
+            "completed": list(fan_out_result["results"]),
+            "failures": fan_out_result["failures"],
+            "cancelled": fan_out_result["cancelled"]
+        }
+        
+        results = [
+            result.get("output", "") if isinstance(result, dict) else str(result)
+            for result in fan_out_result["results"].values()
+        ]
+        if not results:
+            raise RuntimeError(f"Nenhum agente concluiu: {fan_out_result['failures']}")
+        
+        yield {"type": "step", "node": "aggregator", "status": "start"}
+        chunks = []
+        async for chunk in self._get_aggregator_chain().astream({"results": "\n\n".join(results)}):
+            chunks.append(chunk)
+            yield {"type": "token", "node": "aggregator", "content": chunk}
+        yield {"type": "step", "node": "aggregator", "status": "end"}
+        
+        yield {"type": "done", "result": {"output": "".join(chunks), **fan_out_result}}
+    
+    async def astream_graph(self, graph: Any, inputs: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Executa um grafo compilado, produzindo passos e tokens à medida que são gerados.
+        
+        Os eventos produzidos são:
+            {"type": "step", "node": "...", "status": "start" | "end"}
+            {"type": "token", "node": "...", "content": "..."}
+            {"type": "done", "output": {...}}  # estado final do grafo
+        
+        Tokens são obtidos dos eventos de streaming dos modelos
+        (`astream_events`). Em versões do LangChain sem esse recurso, apenas
+        os passos são produzidos, a partir de `astream`.
+        
+        Args:
+            graph: Grafo compilado (por exemplo, de `create_parallel_agent_graph`)
+            inputs: Entrada do grafo
+            
+        Returns:
+            Iterador assíncrono de eventos
+        """
+        output: Dict[str, Any] = {}
+        
+        if not hasattr(graph, "astream_events"):
+            async for step in graph.astream(inputs):
+                for node, node_output in step.items():
+                    if isinstance(node_output, dict):
+                        output.update(node_output)
+                    yield {"type": "step", "node": node, "status": "end"}
+            yield {"type": "done", "output": output}
+            return
+        
+        async for event in graph.astream_events(inputs, version="v1"):
+            kind = event["event"]
+            node = event.get("metadata", {}).get("langgraph_node", event.get("name"))
+            
+            if kind == "on_chat_model_stream":
+                content = getattr(event["data"].get("chunk"), "content", "")
+                if content:
+                    yield {"type": "token", "node": node, "content": content}
+            elif kind in ("on_chain_start", "on_chain_end") and event.get("name") == node:
+                # Apenas o início e o fim dos nós do grafo, não das cadeias internas
+                if kind == "on_chain_end" and isinstance(event["data"].get("output"), dict):
+                    output.update(event["data"]["output"])
+                yield {"type": "step", "node": node, "status": "start" if kind == "on_chain_start" else "end"}
+        
+        yield {"type": "done", "output": output}
+    
     def create_workflow_agent_graph(self, 
                                    workflow_steps: List[Dict[str, Any]]) -> StateGraph:
         """
         Cria um grafo de fluxo de trabalho com múltiplos passos.
         
+        Executado com `config={"configurable": {"run_id": ...}}`, o estado
+        após cada passo é salvo como checkpoint da execução, e o grafo retoma
+        uma execução interrompida a partir do último passo concluído; os
+        checkpoints são removidos quando a execução termina. Um `run_id`
+        reutilizado com uma entrada diferente inicia uma nova execução.
+        
+        Passos com `"cache_output": True` registram a saída pela entrada
+        recebida (por GRAPH_STEP_OUTPUT_TTL segundos) e, com ou sem `run_id`,
+        retornam a saída registrada para uma entrada já processada, sem chamar
+        modelos ou ferramentas. Use apenas em passos determinísticos e sem
+        efeitos colaterais.
+        
         Args:
             workflow_steps: Lista de passos do fluxo de trabalho
             
         Returns:
             Grafo de fluxo de trabalho
         """
+        steps = []
+        tools = []
+        for step in workflow_steps:
+            if step["type"] == "agent":
+                steps.append({
+                    "type": "agent",
+                    "tools": [_tool_fingerprint(tool) for tool in step["tools"]],
+                    "system_prompt": step["system_prompt"],
+                    "cache_output": bool(step.get("cache_output", False))
+                })
+                tools.extend(step["tools"])
+            elif step["type"] == "tool":
+                steps.append({
+                    "type": "tool",
+                    "tool": _tool_fingerprint(step["tool"]),
+                    "cache_output": bool(step.get("cache_output", False))
+                })
+                tools.append(step["tool"])
+            else:
+                raise ValueError(f"Tipo de passo desconhecido: {step['type']}")
+        
+        return self.cache.get_or_build(
+            self._graph_key("workflow", tools, steps=steps, checkpoints=id(self.checkpoints)),
+            lambda: self._build_workflow_agent_graph(workflow_steps, steps),
+            [tool.name for tool in tools]
+        )
+    
+    def _build_workflow_agent_graph(self,
+                                    workflow_steps: List[Dict[str, Any]],
+                                    step_definitions: List[Dict[str, Any]]) -> StateGraph:
+        """Constrói e compila o grafo de fluxo de trabalho."""
         # Criar grafo
         workflow = StateGraph(inputs=["input"])
+        step_names = [f"step_{i}" for i in range(len(workflow_steps))]
+        
+        # Nó de entrada: restaura o último checkpoint da execução, se houver
+        workflow.add_node("resume", self._create_resume_node(len(workflow_steps)))
+        
+        # Nó de saída: remove os checkpoints da execução concluída
+        workflow.add_node("finish", self._create_finish_node())
         
         # Adicionar nós de passos
         for i, step in enumerate(workflow_steps):
@@ -147,19 +626,149 @@ class LangGraphBuilder:
             else:
                 raise ValueError(f"Tipo de passo desconhecido: {step['type']}")
             
-            workflow.add_node(step_name, node)
+            workflow.add_node(step_name, self._create_checkpointed_step(
+                i, node, {"model": self.model_key, **step_definitions[i]}, step_definitions[i]["cache_output"]
+            ))
         
         # Adicionar arestas
-        workflow.add_edge("__start__", "step_0")
+        workflow.add_edge("__start__", "resume")
+        workflow.add_conditional_edges(
+            "resume",
+            lambda state: state.get("resume_from", "step_0"),
+            {**{name: name for name in step_names}, "finish": "finish"}
+        )
         
         for i in range(len(workflow_steps) - 1):
             workflow.add_edge(f"step_{i}", f"step_{i+1}")
         
-        workflow.add_edge(f"step_{len(workflow_steps)-1}", END)
+        workflow.add_edge(f"step_{len(workflow_steps)-1}", "finish")
+        workflow.add_edge("finish", END)
         
         # Compilar grafo
         return workflow.compile()
     
+    def _create_resume_node(self, total_steps: int):
+        """
+        Cria o nó de entrada de um grafo de fluxo de trabalho.
+        
+        Args:
+            total_steps: Número de passos do fluxo
+            
+        Returns:
+            Nó que restaura o estado do último checkpoint da execução e
+            indica, em "resume_from", o passo seguinte (ou o nó de saída)
+        """
+        checkpoints = self.checkpoints
+        
+        def resume(state, config):
+            run_id = _run_id(config)
+            run_input = input_fingerprint(_step_input(state))
+            latest = checkpoints.latest(run_id) if run_id else None
+            
+            # Os checkpoints só valem para a entrada com que a execução começou
+            if latest is not None and latest[1].get("run_input") != run_input:
+                logger.warning(f"Execução {run_id} recebida com outra entrada; reiniciando a partir do primeiro passo")
+                checkpoints.clear(run_id)
+                latest = None
+            
+            if latest is None:
+                return {"resume_from": "step_0", "run_input": run_input}
+            
+            step, saved_state = latest
+            logger.info(f"Retomando a execução {run_id} após o passo {step}")
+            return {**saved_state, "resume_from": f"step_{step + 1}" if step + 1 < total_steps else "finish"}
+        
+        async def aresume(state, config):
+            if checkpoints.performs_io:
+                return await asyncio.to_thread(resume, state, config)
+            return resume(state, config)
+        
+        return RunnableLambda(resume, afunc=aresume)
+    
+    def _create_finish_node(self):
+        """
+        Cria o nó de saída de um grafo de fluxo de trabalho.
+        
+        Returns:
+            Nó que remove os checkpoints da execução concluída
+        """
+        checkpoints = self.checkpoints
+        
+        def finish(state, config):
+            run_id = _run_id(config)
+            if run_id:
+                checkpoints.clear(run_id)
+            return {}
+        
+        async def afinish(state, config):
+            if checkpoints.performs_io:
+                return await asyncio.to_thread(finish, state, config)
+            return finish(state, config)
+        
+        return RunnableLambda(finish, afunc=afinish)
+    
+    def _create_checkpointed_step(self, index: int, node: Any, step: Dict[str, Any], cache_output: bool = False):
+        """
+        Envolve um passo do fluxo de trabalho com checkpoints.
+        
+        Args:
+            index: Índice do passo
+            node: Executor ou nó de ferramenta do passo
+            step: Identificação do passo (definição e modelo), usada na chave da saída
+            cache_output: Registrar e reutilizar a saída do passo para a mesma entrada
+            
+        Returns:
+            Nó que, se `cache_output`, reutiliza a saída registrada para a mesma
+            entrada e, ao concluir, salva o estado como checkpoint da execução
+        """
+        checkpoints = self.checkpoints
+        
+        def lookup(state):
+            if not cache_output:
+                return None, None
+            key = step_cache_key(step, _step_input(state))
+            return key, checkpoints.get_output(key)
+        
+        def record(state, config, key, output, cached):
+            if cache_output and not cached:
+                checkpoints.put_output(key, output)
+            run_id = _run_id(config)
+            if run_id:
+                checkpoints.save(run_id, index, {**_step_input(state), **output, "run_input": state.get("run_input")})
+        
+        def run(state, config):
+            key, output = lookup(state)
+            cached = output is not None
+            if not cached:
+                output = node.invoke(state, config)
+            record(state, config, key, output, cached)
+            return output
+        
+        async def arun(state, config):
+            offload = asyncio.to_thread if checkpoints.performs_io else _call
+            key, output = await offload(lookup, state)
+            cached = output is not None
+            if not cached:
+                output = await node.ainvoke(state, config)
+            await offload(record, state, config, key, output, cached)
+            return output
+        
+        return RunnableLambda(run, afunc=arun)
+    
+    def _get_agent_executor(self, tools: List[Any], system_prompt: str) -> AgentExecutor:
+        """Obtém do cache, ou cria, o executor de um agente."""
+        key = self._graph_key(
+            "executor",
+            tools,
+            tool_definitions=[_tool_fingerprint(tool) for tool in tools],
+            system_prompt=system_prompt
+        )
+        return self.cache.get_or_build(
+            key,
+            lambda: self._create_agent_executor(tools, system_prompt),
+            [tool.name for tool in tools]
+        )
+    
     def _create_agent_executor(self, tools: List[Any], system_prompt: str) -> AgentExecutor:
         """
         Cria um executor de agente.
@@ -172,7 +781,7 @@ class LangGraphBuilder:
             Executor de agente
         """
         # Converter ferramentas para formato OpenAI
-        functions = [format_tool_to_openai_function(tool) for tool in tools]
+        functions = [tool_to_openai_function(tool) for tool in tools]
         
         # Criar prompt do agente
         prompt = ChatPromptTemplate.from_messages([
@@ -195,24 +804,44 @@ class LangGraphBuilder:
             handle_parsing_errors=True
         )
     
+    def _get_aggregator_chain(self):
+        """
+        Obtém a cadeia que combina resultados de múltiplos agentes.
+        
+        Returns:
+            Cadeia de agregação, criada uma única vez por construtor
+        """
+        if self._aggregator_chain is None:
+            prompt = ChatPromptTemplate.from_messages([
+                ("system", "Você é um assistente que agrega resultados de múltiplos agentes. "
+                          "Combine as informações de forma coerente e elimine redundâncias."),
+                ("human", "Combine os seguintes resultados:\n\n{results}")
+            ])
+            self._aggregator_chain = prompt | self.llm | StrOutputParser()
+        
+        return self._aggregator_chain
+    
     def _create_aggregator(self):
         """
         Cria um nó agregador para combinar resultados de múltiplos agentes.
         
+        Na execução assíncrona, a agregação é feita por streaming, de modo que
+        seus tokens aparecem em `astream_graph` à medida que são gerados.
+        
         Returns:
-            Função agregadora
+            Nó agregador
         """
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "Você é um assistente que agrega resultados de múltiplos agentes. "
-                      "Combine as informações de forma coerente e elimine redundâncias."),
-            ("human", "Combine os seguintes resultados:\n\n{results}")
-        ])
-        
-        chain = prompt | self.llm | StrOutputParser()
+        chain = self._get_aggregator_chain()
         
         def aggregator(state):
             results = state["results"]
             combined = chain.invoke({"results": "\n\n".join(results)})
             return {"output": combined}
         
-        return aggregator
+        async def aaggregator(state, config):
+            chunks = []
+            async for chunk in chain.astream({"results": "\n\n".join(state["results"])}, config):
+                chunks.append(chunk)
+            return {"output": "".join(chunks)}
+        
+        return RunnableLambda(aggregator, afunc=aaggregator)
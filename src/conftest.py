@@ -0,0 +1,13 @@
+"""
+Configuração do pytest para os testes do backend (`cd src && pytest -v`).
+"""
+
+import os
+import sys
+
+# Diretório raiz do projeto no path, para os imports de `src.`
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# Os scripts (inclusive scripts/test_api.py, que testa uma API em execução a
+# partir da linha de comando) não são testes do pytest
+collect_ignore_glob = ["scripts/*"]
@@ -16,10 +16,19 @@ import time
 from typing import Dict, List, Optional, Any
 
 # Importar configurações
-from src.config.database import engine, Base, get_db
+from src.config.database import engine, Base, get_db, SessionLocal
 from src.config.telemetry import setup_telemetry
 from src.config.redis_config import setup_redis
 from src.config.langgraph_config import setup_langgraph
+from src.models.agent_template_registry import refresh_template_registry, watch_template_changes
+from src.services.agent_generation_worker import generation_workers
+from src.services.agent_runtime import watch_configuration_changes
+from src.services.http_client_pool import http_clients
+from src.services.smtp_pool import smtp_connections
+from src.services.outbound_queue import outbound_workers
+from src.services.inbound_webhooks import inbound_workers
+from src.services.channel_routing import channel_routes
+from src.services.pagination import NEXT_CURSOR_HEADER
 
 # Importar rotas
 from src.api.auth_routes import router as auth_router
@@ -56,8 +65,68 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # Cursor da próxima página das listagens
 )
 
+# Compilar o registro de templates de agentes a partir do banco de dados
+@app.on_event("startup")
+async def load_agent_templates():
+    db = SessionLocal()
+    try:
+        refresh_template_registry(db)
+    finally:
+        db.close()
+    
+    # Recompilar sempre que templates forem alterados nesta instância
+    watch_template_changes(SessionLocal)
+
+# Invalidar instâncias de agentes em execução quando novas configurações forem criadas
+@app.on_event("startup")
+async def watch_agent_configurations():
+    watch_configuration_changes(SessionLocal)
+
+# Iniciar e encerrar o pool de workers de geração de agentes
+@app.on_event("startup")
+async def start_generation_workers():
+    await generation_workers.start()
+
+@app.on_event("shutdown")
+async def stop_generation_workers():
+    await generation_workers.stop()
+
+# Iniciar e encerrar os workers da fila de mensagens de saída
+@app.on_event("startup")
+async def start_outbound_workers():
+    await outbound_workers.start()
+
+@app.on_event("shutdown")
+async def stop_outbound_workers():
+    await outbound_workers.stop()
+
+# Carregar o índice de rotas dos canais e acompanhar as alterações (antes dos workers)
+@app.on_event("startup")
+async def load_channel_routes():
+    channel_routes.start(SessionLocal)
+
+@app.on_event("shutdown")
+async def stop_channel_routes():
+    channel_routes.stop()
+
+# Iniciar e encerrar os workers dos webhooks recebidos dos canais
+@app.on_event("startup")
+async def start_inbound_workers():
+    await inbound_workers.start()
+
+@app.on_event("shutdown")
+async def stop_inbound_workers():
+    await inbound_workers.stop()
+
+# Fechar as conexões abertas com as APIs dos canais (após os workers de envio)
+@app.on_event("shutdown")
+async def close_http_clients():
+    await http_clients.aclose()
+    await smtp_connections.aclose()
+
 # Middleware para telemetria
 @app.middleware("http")
 async def add_telemetry(request: Request, call_next):
@@ -0,0 +1,369 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Registro Compilado de Templates de Agentes                                  │
+│                                                                             │
+│ Este módulo mantém um registro imutável dos templates de agentes, compilado │
+│ uma única vez e compartilhado por todas as instâncias do analisador, com    │
+│ índices invertidos por canal, idioma, integração, indústria e objetivo.     │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Tuple
+import hashlib
+import json
+import logging
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Dimensões de compatibilidade avaliadas por template
+COMPATIBILITY_DIMENSIONS = ("channels", "languages", "integrations")
+
+# Bônus aplicados pela indústria e por cada objetivo selecionado
+INDUSTRY_BONUS = 15
+OBJECTIVE_BONUS = 20
+
+# Templates padrão de agentes. Os bônus por tamanho refletem que:
+# - pequenas empresas se beneficiam mais de agentes de vendas e atendimento
+# - médias empresas se beneficiam de um mix equilibrado
+# - grandes empresas se beneficiam de todos os tipos de agentes
+DEFAULT_AGENT_TEMPLATES = {
+    "virginia": {
+        "name": "Virginia",
+        "type": "customer_support",
+        "description": "Agente especializado em atendimento ao cliente com foco em resolução rápida e eficiente de problemas.",
+        "benefits": [
+            "Atendimento 24/7 em múltiplos canais",
+            "Resolução rápida de problemas comuns",
+            "Escalação inteligente para humanos quando necessário"
+        ],
+        "channels": ["whatsapp", "email", "phone"],
+        "languages": ["portuguese", "english", "spanish"],
+        "integrations": ["crm", "helpdesk"],
+        "industries": ["technology", "finance", "healthcare", "education", "retail", "manufacturing", "services"],
+        "objectives": ["customer_support"],
+        "size_bonus": {"small": 5, "medium": 8, "large": 10, "enterprise": 10}
+    },
+    "guilherme": {
+        "name": "Guilherme",
+        "type": "sales",
+        "description": "Agente de vendas e prospecção com abordagem amigável e persuasiva para maximizar conversões.",
+        "benefits": [
+            "Qualificação automática de leads",
+            "Acompanhamento personalizado do funil de vendas",
+            "Agendamento inteligente de reuniões com equipe comercial"
+        ],
+        "channels": ["whatsapp", "email", "linkedin"],
+        "languages": ["portuguese", "english", "spanish"],
+        "integrations": ["crm"],
+        "industries": ["technology", "finance", "retail", "services"],
+        "objectives": ["sales"],
+        "size_bonus": {"small": 10, "medium": 8, "large": 8, "enterprise": 8}
+    },
+    "amanda": {
+        "name": "Amanda",
+        "type": "marketing",
+        "description": "Agente de marketing digital especializado em engajamento e nutrição de leads.",
+        "benefits": [
+            "Segmentação avançada de audiência",
+            "Personalização de mensagens por perfil",
+            "Análise de sentimento e ajuste de campanhas"
+        ],
+        "channels": ["email", "whatsapp"],
+        "languages": ["portuguese", "english", "spanish"],
+        "integrations": ["crm", "marketing_automation"],
+        "industries": ["technology", "education", "retail"],
+        "objectives": ["marketing"],
+        "size_bonus": {"medium": 5, "large": 8, "enterprise": 8}
+    },
+    "ricardo": {
+        "name": "Ricardo",
+        "type": "finance",
+        "description": "Agente financeiro para análise de dados e suporte a decisões financeiras.",
+        "benefits": [
+            "Análise de fluxo de caixa em tempo real",
+            "Previsões financeiras baseadas em tendências",
+            "Alertas de anomalias em transações"
+        ],
+        "channels": ["email", "internal_systems"],
+        "languages": ["portuguese", "english"],
+        "integrations": ["erp", "accounting_software"],
+        "industries": ["finance", "manufacturing"],
+        "objectives": [],
+        "size_bonus": {"large": 10, "enterprise": 10}
+    },
+    "helena": {
+        "name": "Helena",
+        "type": "hr",
+        "description": "Agente de recursos humanos para processos de recrutamento e onboarding.",
+        "benefits": [
+            "Triagem inicial de candidatos",
+            "Agendamento automático de entrevistas",
+            "Suporte ao onboarding de novos colaboradores"
+        ],
+        "channels": ["email", "internal_systems"],
+        "languages": ["portuguese", "english", "spanish"],
+        "integrations": ["hr_system"],
+        "industries": ["healthcare", "education"],
+        "objectives": ["internal_communication"],
+        "size_bonus": {"large": 10, "enterprise": 10}
+    }
+}
+
+def _freeze(value: Any) -> Any:
+    """Converte dicionários e listas em estruturas somente leitura."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """Marca uma matriz NumPy como somente leitura."""
+    array.setflags(write=False)
+    return array
+
+class CompiledTemplateRegistry:
+    """
+    Registro imutável de templates de agentes.
+    
+    Esta classe compila, uma única vez:
+    1. Os templates em estruturas somente leitura
+    2. Índices invertidos (canal, idioma, integração, indústria e objetivo → templates)
+    3. Tabelas de bônus por tamanho de empresa
+    4. Matrizes usadas pela análise em lote
+    5. Uma versão derivada do conteúdo, usada em chaves de cache
+    """
+    
+    def __init__(self, templates: Dict[str, Dict[str, Any]]):
+        """
+        Compila o registro a partir de um dicionário de templates.
+        
+        Args:
+            templates: Templates indexados pelo ID do agente
+        """
+        for agent_id, template in templates.items():
+            for field in ("name", "type", "description"):
+                if field not in template:
+                    raise ValueError(f"Template '{agent_id}' sem o campo obrigatório: {field}")
+        
+        self.version = hashlib.sha256(
+            json.dumps(templates, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
+        self.templates: Mapping[str, Mapping[str, Any]] = _freeze(templates)
+        self.agent_ids: Tuple[str, ...] = tuple(templates)
+        self.columns: Mapping[str, int] = MappingProxyType(
+            {agent_id: col for col, agent_id in enumerate(self.agent_ids)}
+        )
+        
+        # Índices invertidos
+        self.by_channel = self._invert("channels")
+        self.by_language = self._invert("languages")
+        self.by_integration = self._invert("integrations")
+        self.by_industry = self._invert("industries")
+        self.by_objective = self._invert("objectives")
+        self.by_dimension: Mapping[str, Mapping[str, Tuple[str, ...]]] = MappingProxyType({
+            "channels": self.by_channel,
+            "languages": self.by_language,
+            "integrations": self.by_integration
+        })
+        
+        size_bonus: Dict[str, Dict[str, int]] = {}
+        for agent_id, template in self.templates.items():
+            for size, bonus in template.get("size_bonus", {}).items():
+                size_bonus.setdefault(size, {})[agent_id] = bonus
+        self.size_bonus: Mapping[str, Mapping[str, int]] = _freeze(size_bonus)
+        
+        # Matrizes para a análise em lote (categoria × agentes)
+        self.industry_index, self.industry_table = self._encode_bonus_table(
+            {key: {agent_id: INDUSTRY_BONUS for agent_id in agents} for key, agents in self.by_industry.items()}
+        )
+        self.objective_index, self.objective_table = self._encode_bonus_table(
+            {key: {agent_id: OBJECTIVE_BONUS for agent_id in agents} for key, agents in self.by_objective.items()}
+        )
+        self.size_index, self.size_table = self._encode_bonus_table(self.size_bonus)
+        
+        vocabularies = {}
+        supported = {}
+        for dimension, index in self.by_dimension.items():
+            vocabulary = {item: row for row, item in enumerate(index)}
+            matrix = np.zeros((len(vocabulary), len(self.agent_ids)), dtype=np.float64)
+            for item, agents in index.items():
+                for agent_id in agents:
+                    matrix[vocabulary[item], self.columns[agent_id]] = 1
+            vocabularies[dimension] = MappingProxyType(vocabulary)
+            supported[dimension] = _read_only(matrix)
+        self.vocabularies: Mapping[str, Mapping[str, int]] = MappingProxyType(vocabularies)
+        self.supported: Mapping[str, np.ndarray] = MappingProxyType(supported)
+    
+    def _invert(self, field: str) -> Mapping[str, Tuple[str, ...]]:
+        """
+        Cria um índice invertido item → IDs de agentes para um campo dos templates.
+        
+        Args:
+            field: Campo dos templates a ser indexado
+        
+        Returns:
+            Índice somente leitura, na ordem de registro dos templates
+        """
+        index: Dict[str, List[str]] = {}
+        for agent_id, template in self.templates.items():
+            for item in template.get(field, ()):
+                agents = index.setdefault(item, [])
+                if agent_id not in agents:
+                    agents.append(agent_id)
+        return MappingProxyType({item: tuple(agents) for item, agents in index.items()})
+    
+    def _encode_bonus_table(
+        self,
+        mapping: Mapping[str, Mapping[str, int]]
+    ) -> Tuple[Mapping[str, int], np.ndarray]:
+        """
+        Converte um mapeamento categoria → {agente: bônus} em uma matriz.
+        
+        Args:
+            mapping: Bônus por categoria e agente
+        
+        Returns:
+            Tupla com o índice de cada categoria e a matriz de bônus, que possui
+            uma linha extra zerada para categorias desconhecidas
+        """
+        index = {key: row for row, key in enumerate(mapping)}
+        table = np.zeros((len(index) + 1, len(self.agent_ids)), dtype=np.float64)
+        for key, bonuses in mapping.items():
+            for agent_id, bonus in bonuses.items():
+                table[index[key], self.columns[agent_id]] += bonus
+        return MappingProxyType(index), _read_only(table)
+    
+    def __len__(self) -> int:
+        return len(self.agent_ids)
+    
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self.templates
+
+# Registro ativo, substituído atomicamente a cada recompilação
+_registry = CompiledTemplateRegistry(DEFAULT_AGENT_TEMPLATES)
+_registry_lock = threading.Lock()
+
+def get_template_registry() -> CompiledTemplateRegistry:
+    """
+    Retorna o registro de templates ativo.
+    
+    Returns:
+        Registro compilado compartilhado pelo processo
+    """
+    return _registry
+
+def set_template_registry(templates: Dict[str, Dict[str, Any]]) -> CompiledTemplateRegistry:
+    """
+    Compila um novo registro e o torna ativo de forma atômica.
+    
+    A compilação acontece fora da trava; leitores continuam usando o registro
+    anterior até a troca da referência.
+    
+    Args:
+        templates: Templates indexados pelo ID do agente
+    
+    Returns:
+        Registro ativo após a operação
+    """
+    global _registry
+    
+    compiled = CompiledTemplateRegistry(templates)
+    with _registry_lock:
+        if compiled.version != _registry.version:
+            _registry = compiled
+            logger.info(f"Registro de templates recompilado, versão {compiled.version}")
+        return _registry
+
+def load_templates_from_db(db) -> Dict[str, Dict[str, Any]]:
+    """
+    Carrega os templates de agentes a partir da tabela AgentTemplate.
+    
+    O ID de cada template é lido de `configuration["key"]` ou, na ausência
+    deste, derivado do nome. Benefícios, canais, idiomas, integrações,
+    objetivos e bônus por tamanho também são lidos de `configuration`.
+    
+    Args:
+        db: Sessão do banco de dados
+    
+    Returns:
+        Templates indexados pelo ID do agente
+    """
+    from src.models.models import AgentTemplate
+    
+    templates = {}
+    for row in db.query(AgentTemplate).order_by(AgentTemplate.id).all():
+        configuration = row.configuration or {}
+        agent_id = configuration.get("key") or row.name.lower()
+        templates[agent_id] = {
+            "name": row.name,
+            "type": row.agent_type,
+            "description": row.description,
+            "benefits": configuration.get("benefits", []),
+            "channels": configuration.get("channels", []),
+            "languages": configuration.get("languages", []),
+            "integrations": configuration.get("integrations", []),
+            "industries": row.applicable_industries or [],
+            "objectives": configuration.get("objectives", []),
+            "size_bonus": configuration.get("size_bonus", {})
+        }
+    return templates
+
+def refresh_template_registry(db) -> CompiledTemplateRegistry:
+    """
+    Recompila o registro a partir do banco de dados, se os templates mudaram.
+    
+    Quando a tabela AgentTemplate está vazia, os templates padrão são mantidos.
+    
+    Args:
+        db: Sessão do banco de dados
+    
+    Returns:
+        Registro ativo após a operação
+    """
+    templates = load_templates_from_db(db)
+    if not templates:
+        return get_template_registry()
+    return set_template_registry(templates)
+
+def watch_template_changes(session_factory) -> None:
+    """
+    Recompila o registro automaticamente após commits que alterem AgentTemplate.
+    
+    Os eventos de sessão do SQLAlchemy marcam sessões que inseriram, alteraram
+    ou removeram templates; após o commit, o registro é recarregado usando uma
+    nova sessão criada por `session_factory`.
+    
+    Args:
+        session_factory: Fábrica de sessões (por exemplo, SessionLocal)
+    """
+    from sqlalchemy import event
+    from src.models.models import AgentTemplate
+    
+    def is_template(instance) -> bool:
+        return isinstance(instance, AgentTemplate)
+    
+    @event.listens_for(session_factory, "after_flush")
+    def mark_template_changes(session, flush_context):
+        if any(map(is_template, list(session.new) + list(session.dirty) + list(session.deleted))):
+            session.info["agent_templates_changed"] = True
+    
+    @event.listens_for(session_factory, "after_commit")
+    def reload_templates(session):
+        if not session.info.pop("agent_templates_changed", False):
+            return
+        db = session_factory()
+        try:
+            refresh_template_registry(db)
+        except Exception as e:
+            logger.error(f"Erro ao recompilar registro de templates: {str(e)}")
+        finally:
+            db.close()
+    
+    @event.listens_for(session_factory, "after_rollback")
+    def discard_template_changes(session):
+        session.info.pop("agent_templates_changed", None)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Text, JSON, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -58,6 +58,10 @@ class OrganizationProfile(Base):
 
 class OrganizationAnalysis(Base):
     __tablename__ = "organization_analyses"
+    __table_args__ = (
+        # Histórico paginado em (created_at, id), percorrido do fim para o início
+        Index("ix_organization_analyses_created", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     organization_profile_id = Column(Integer, ForeignKey("organization_profiles.id"))
@@ -84,6 +88,10 @@ class AgentTemplate(Base):
 
 class Agent(Base):
     __tablename__ = "agents"
+    __table_args__ = (
+        # Listagem paginada em (created_at, id)
+        Index("ix_agents_created", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -107,18 +115,27 @@ class AgentGenerationJob(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     organization_profile_id = Column(Integer, ForeignKey("organization_profiles.id"))
+    analysis_id = Column(Integer, ForeignKey("organization_analyses.id"), nullable=True)
+    tenant_id = Column(Integer, nullable=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     agent_templates = Column(JSON, nullable=False)
-    status = Column(String, default="pending")
+    status = Column(String, default="pending", index=True)
     generated_agents = Column(JSON, nullable=True)
+    error_message = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
 
     # Relacionamentos
     organization_profile = relationship("OrganizationProfile", back_populates="generation_jobs")
 
 class ChannelIntegration(Base):
     __tablename__ = "channel_integrations"
+    __table_args__ = (
+        # Listagem paginada por cliente em (created_at, id)
+        Index("ix_channel_integrations_client_created", "client_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"))
@@ -145,3 +162,60 @@ class AgentChannelIntegration(Base):
     # Relacionamentos
     agent = relationship("Agent", back_populates="integrations")
     channel_integration = relationship("ChannelIntegration")
+
+class WorkflowEvent(Base):
+    __tablename__ = "workflow_events"
+    __table_args__ = (
+        # A unicidade da versão garante a concorrência otimista por fluxo
+        UniqueConstraint("agent_id", "workflow_id", "version", name="uq_workflow_events_version"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    agent_id = Column(String, nullable=False)
+    workflow_id = Column(String, nullable=False)
+    version = Column(Integer, nullable=False)
+    event = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class WorkflowSnapshot(Base):
+    __tablename__ = "workflow_snapshots"
+
+    agent_id = Column(String, primary_key=True)
+    workflow_id = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False)
+    state = Column(JSON, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class GraphCheckpoint(Base):
+    __tablename__ = "graph_checkpoints"
+
+    run_id = Column(String, primary_key=True)
+    step = Column(Integer, primary_key=True)
+    state = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class GraphStepOutput(Base):
+    __tablename__ = "graph_step_outputs"
+
+    # Hash da definição do passo e da entrada recebida
+    key = Column(String(64), primary_key=True)
+    output = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+class OutboundMessage(Base):
+    __tablename__ = "outbound_messages"
+
+    id = Column(String(36), primary_key=True)
+    idempotency_key = Column(String, unique=True, nullable=True)
+    client_id = Column(String, nullable=False)
+    channel = Column(String, nullable=False)
+    recipient = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    message_metadata = Column(JSON, nullable=True)
+    status = Column(String, nullable=False, default="pending", index=True)  # pending, processing, sent, dead
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime, nullable=False, index=True)
+    locked_until = Column(DateTime, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
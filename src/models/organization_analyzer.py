@@ -8,10 +8,20 @@
 └─────────────────────────────────────────────────────────────────────────────┘
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import json
 from datetime import datetime
 
+import numpy as np
+
+from src.models.agent_template_registry import (
+    COMPATIBILITY_DIMENSIONS,
+    INDUSTRY_BONUS,
+    OBJECTIVE_BONUS,
+    CompiledTemplateRegistry,
+    get_template_registry
+)
+
 class OrganizationAnalyzer:
     """
     Analisador organizacional que processa dados de empresas e recomenda agentes.
@@ -23,75 +33,25 @@ class OrganizationAnalyzer:
     4. Calcular pontuações de confiança
     """
     
-    def __init__(self):
-        # Inicializar configurações do analisador
-        self.agent_templates = {
-            "virginia": {
-                "name": "Virginia",
-                "type": "customer_support",
-                "description": "Agente especializado em atendimento ao cliente com foco em resolução rápida e eficiente de problemas.",
-                "benefits": [
-                    "Atendimento 24/7 em múltiplos canais",
-                    "Resolução rápida de problemas comuns",
-                    "Escalação inteligente para humanos quando necessário"
-                ],
-                "channels": ["whatsapp", "email", "phone"],
-                "languages": ["portuguese", "english", "spanish"],
-                "integrations": ["crm", "helpdesk"]
-            },
-            "guilherme": {
-                "name": "Guilherme",
-                "type": "sales",
-                "description": "Agente de vendas e prospecção com abordagem amigável e persuasiva para maximizar conversões.",
-                "benefits": [
-                    "Qualificação automática de leads",
-                    "Acompanhamento personalizado do funil de vendas",
-                    "Agendamento inteligente de reuniões com equipe comercial"
-                ],
-                "channels": ["whatsapp", "email", "linkedin"],
-                "languages": ["portuguese", "english", "spanish"],
-                "integrations": ["crm"]
-            },
-            "amanda": {
-                "name": "Amanda",
-                "type": "marketing",
-                "description": "Agente de marketing digital especializado em engajamento e nutrição de leads.",
-                "benefits": [
-                    "Segmentação avançada de audiência",
-                    "Personalização de mensagens por perfil",
-                    "Análise de sentimento e ajuste de campanhas"
-                ],
-                "channels": ["email", "whatsapp"],
-                "languages": ["portuguese", "english", "spanish"],
-                "integrations": ["crm", "marketing_automation"]
-            },
-            "ricardo": {
-                "name": "Ricardo",
-                "type": "finance",
-                "description": "Agente financeiro para análise de dados e suporte a decisões financeiras.",
-                "benefits": [
-                    "Análise de fluxo de caixa em tempo real",
-                    "Previsões financeiras baseadas em tendências",
-                    "Alertas de anomalias em transações"
-                ],
-                "channels": ["email", "internal_systems"],
-                "languages": ["portuguese", "english"],
-                "integrations": ["erp", "accounting_software"]
-            },
-            "helena": {
-                "name": "Helena",
-                "type": "hr",
-                "description": "Agente de recursos humanos para processos de recrutamento e onboarding.",
-                "benefits": [
-                    "Triagem inicial de candidatos",
-                    "Agendamento automático de entrevistas",
-                    "Suporte ao onboarding de novos colaboradores"
-                ],
-                "channels": ["email", "internal_systems"],
-                "languages": ["portuguese", "english", "spanish"],
-                "integrations": ["hr_system"]
-            }
-        }
+    def __init__(self, registry: Optional[CompiledTemplateRegistry] = None):
+        """
+        Inicializa o analisador.
+        
+        Args:
+            registry: Registro de templates fixo; por padrão usa o registro
+                compartilhado ativo no momento de cada análise
+        """
+        self._registry = registry
+    
+    @property
+    def registry(self) -> CompiledTemplateRegistry:
+        """Registro de templates usado pelo analisador."""
+        return self._registry if self._registry is not None else get_template_registry()
+    
+    @property
+    def agent_templates(self):
+        """Templates de agentes do registro ativo (somente leitura)."""
+        return self.registry.templates
     
     def analyze(self, organization_data: Dict[str, Any], tenant_id: int) -> Dict[str, Any]:
         """
@@ -104,8 +64,10 @@ class OrganizationAnalyzer:
         Returns:
             Dicionário com resultados da análise e recomendações de agentes
         """
+        # Usar o mesmo registro durante toda a análise
+        registry = self.registry
+        
         # Extrair informações relevantes
-        org_name = organization_data.get("name", "")
         industry = organization_data.get("industry", "")
         size = organization_data.get("size", "")
         channels = organization_data.get("channels", {})
@@ -115,6 +77,7 @@ class OrganizationAnalyzer:
         
         # Calcular pontuações para cada agente com base nos dados organizacionais
         agent_scores = self._calculate_agent_scores(
+            registry=registry,
             industry=industry,
             size=size,
             channels=channels,
@@ -123,12 +86,102 @@ class OrganizationAnalyzer:
             objectives=objectives
         )
         
+        return self._build_analysis_result(
+            registry,
+            organization_data,
+            agent_scores,
+            lambda agent_id, agent_template: {
+                "channels": self._calculate_compatibility(
+                    channels, agent_template.get("channels", [])
+                ),
+                "languages": self._calculate_compatibility(
+                    languages, agent_template.get("languages", [])
+                ),
+                "integrations": self._calculate_compatibility(
+                    integrations, agent_template.get("integrations", [])
+                )
+            }
+        )
+    
+    def analyze_many(self, organizations_data: List[Dict[str, Any]], tenant_id: int) -> List[Dict[str, Any]]:
+        """
+        Analisa um lote de organizações em uma única passada vetorizada.
+        
+        Perfis e templates são codificados como matrizes binárias e todas as
+        contribuições (indústria, objetivos, canais, idiomas, integrações e
+        tamanho) são calculadas de uma vez para N organizações × M templates.
+        O resultado de cada organização é idêntico ao retornado por `analyze`
+        (exceto pelo campo `analysisDate`).
+        
+        Args:
+            organizations_data: Lista com os dados das organizações a serem analisadas
+            tenant_id: ID do tenant para isolamento multi-tenant
+            
+        Returns:
+            Lista de resultados da análise, na mesma ordem da entrada
+        """
+        if not organizations_data:
+            return []
+        
+        registry = self.registry
+        agent_ids = registry.agent_ids
+        columns = registry.columns
+        
+        # Calcular matrizes de pontuação e compatibilidade (N × M)
+        scores, has_fraction, compatibility = self._calculate_agent_scores_matrix(
+            registry, organizations_data
+        )
+        
+        # Converter as linhas das matrizes para o formato de `analyze`
+        score_rows = scores.tolist()
+        fraction_rows = has_fraction.tolist()
+        compatibility_rows = {
+            dimension: matrix.tolist() for dimension, matrix in compatibility.items()
+        }
+        
+        results = []
+        for row, organization_data in enumerate(organizations_data):
+            agent_scores = {
+                agent_id: self._to_score(value, fraction_rows[row])
+                for agent_id, value in zip(agent_ids, score_rows[row])
+            }
+            results.append(self._build_analysis_result(
+                registry,
+                organization_data,
+                agent_scores,
+                lambda agent_id, agent_template, row=row: {
+                    dimension: compatibility_rows[dimension][row][columns[agent_id]]
+                    for dimension in COMPATIBILITY_DIMENSIONS
+                }
+            ))
+        
+        return results
+    
+    def _build_analysis_result(
+        self,
+        registry: CompiledTemplateRegistry,
+        organization_data: Dict[str, Any],
+        agent_scores: Dict[str, Any],
+        compatibility_for
+    ) -> Dict[str, Any]:
+        """
+        Monta o resultado da análise a partir das pontuações calculadas.
+        
+        Args:
+            registry: Registro de templates usado na análise
+            organization_data: Dados da organização analisada
+            agent_scores: Pontuações por ID de agente
+            compatibility_for: Função (agent_id, template) que retorna a compatibilidade
+            
+        Returns:
+            Dicionário com resultados da análise e recomendações de agentes
+        """
         # Selecionar os agentes mais adequados (pontuação > 70)
         recommended_agents = []
         for agent_id, score in agent_scores.items():
             if score > 70:
                 # Obter template do agente
-                agent_template = self.agent_templates.get(agent_id, {})
+                agent_template = registry.templates.get(agent_id, {})
                 if not agent_template:
                     continue
                 
@@ -139,18 +192,8 @@ class OrganizationAnalyzer:
                     "type": agent_template["type"],
                     "confidence": score,
                     "description": agent_template["description"],
-                    "benefits": agent_template["benefits"],
-                    "compatibility": {
-                        "channels": self._calculate_compatibility(
-                            channels, agent_template.get("channels", [])
-                        ),
-                        "languages": self._calculate_compatibility(
-                            languages, agent_template.get("languages", [])
-                        ),
-                        "integrations": self._calculate_compatibility(
-                            integrations, agent_template.get("integrations", [])
-                        )
-                    }
+                    "benefits": list(agent_template.get("benefits", ())),
+                    "compatibility": compatibility_for(agent_id, agent_template)
                 }
                 recommended_agents.append(agent_recommendation)
         
@@ -159,13 +202,13 @@ class OrganizationAnalyzer:
         
         # Criar resumo da análise
         summary = {
-            "organizationName": org_name,
-            "industry": industry,
-            "size": size,
-            "channels": channels,
-            "languages": languages,
-            "integrations": integrations,
-            "objectives": objectives,
+            "organizationName": organization_data.get("name", ""),
+            "industry": organization_data.get("industry", ""),
+            "size": organization_data.get("size", ""),
+            "channels": organization_data.get("channels", {}),
+            "languages": organization_data.get("languages", {}),
+            "integrations": organization_data.get("integrations", {}),
+            "objectives": organization_data.get("objectives", {}),
             "analysisDate": datetime.now().isoformat(),
             "agentCount": len(recommended_agents)
         }
@@ -179,6 +222,7 @@ class OrganizationAnalyzer:
     
     def _calculate_agent_scores(
         self,
+        registry: CompiledTemplateRegistry,
         industry: str,
         size: str,
         channels: Dict[str, bool],
@@ -194,105 +238,44 @@ class OrganizationAnalyzer:
         """
         scores = {}
         
-        # Mapeamento de indústrias para tipos de agentes prioritários
-        industry_agent_mapping = {
-            "technology": ["virginia", "guilherme", "amanda"],
-            "finance": ["virginia", "guilherme", "ricardo"],
-            "healthcare": ["virginia", "helena"],
-            "education": ["virginia", "helena", "amanda"],
-            "retail": ["virginia", "guilherme", "amanda"],
-            "manufacturing": ["virginia", "ricardo"],
-            "services": ["virginia", "guilherme"],
-        }
-        
-        # Mapeamento de objetivos para tipos de agentes
-        objective_agent_mapping = {
-            "customer_support": ["virginia"],
-            "sales": ["guilherme"],
-            "marketing": ["amanda"],
-            "internal_communication": ["helena"]
-        }
-        
         # Inicializar pontuações base para todos os agentes
-        for agent_id in self.agent_templates:
+        for agent_id in registry.agent_ids:
             scores[agent_id] = 50  # Pontuação base
         
         # Ajustar pontuações com base na indústria
-        industry_agents = industry_agent_mapping.get(industry, [])
-        for agent_id in industry_agents:
-            scores[agent_id] += 15
+        for agent_id in registry.by_industry.get(industry, ()):
+            scores[agent_id] += INDUSTRY_BONUS
         
         # Ajustar pontuações com base nos objetivos
         for objective, is_selected in objectives.items():
             if is_selected:
-                for agent_id in objective_agent_mapping.get(objective, []):
-                    scores[agent_id] += 20
-        
-        # Ajustar pontuações com base nos canais
-        for agent_id, agent_data in self.agent_templates.items():
-            agent_channels = agent_data.get("channels", [])
-            channel_match_count = 0
-            channel_total = 0
-            
-            for channel, is_selected in channels.items():
-                if is_selected:
-                    channel_total += 1
-                    if channel in agent_channels:
-                        channel_match_count += 1
-            
-            if channel_total > 0:
-                channel_score = (channel_match_count / channel_total) * 10
-                scores[agent_id] += channel_score
-        
-        # Ajustar pontuações com base nos idiomas
-        for agent_id, agent_data in self.agent_templates.items():
-            agent_languages = agent_data.get("languages", [])
-            language_match_count = 0
-            language_total = 0
-            
-            for language, is_selected in languages.items():
-                if is_selected:
-                    language_total += 1
-                    if language in agent_languages:
-                        language_match_count += 1
-            
-            if language_total > 0:
-                language_score = (language_match_count / language_total) * 10
-                scores[agent_id] += language_score
-        
-        # Ajustar pontuações com base nas integrações
-        for agent_id, agent_data in self.agent_templates.items():
-            agent_integrations = agent_data.get("integrations", [])
-            integration_match_count = 0
-            integration_total = 0
+                for agent_id in registry.by_objective.get(objective, ()):
+                    scores[agent_id] += OBJECTIVE_BONUS
+        
+        # Ajustar pontuações com base nos canais, idiomas e integrações,
+        # percorrendo apenas os templates que suportam cada item selecionado
+        for dimension, selected_items in (
+            ("channels", channels),
+            ("languages", languages),
+            ("integrations", integrations)
+        ):
+            index = registry.by_dimension[dimension]
+            match_counts = dict.fromkeys(registry.agent_ids, 0)
+            selected_total = 0
             
-            for integration, is_selected in integrations.items():
+            for item, is_selected in selected_items.items():
                 if is_selected:
-                    integration_total += 1
-                    if integration in agent_integrations:
-                        integration_match_count += 1
+                    selected_total += 1
+                    for agent_id in index.get(item, ()):
+                        match_counts[agent_id] += 1
             
-            if integration_total > 0:
-                integration_score = (integration_match_count / integration_total) * 10
-                scores[agent_id] += integration_score
+            if selected_total > 0:
+                for agent_id, match_count in match_counts.items():
+                    scores[agent_id] += (match_count / selected_total) * 10
         
         # Ajustar pontuações com base no tamanho da empresa
-        if size == "small":
-            # Pequenas empresas se beneficiam mais de agentes de vendas e atendimento
-            scores["virginia"] += 5
-            scores["guilherme"] += 10
-        elif size == "medium":
-            # Médias empresas se beneficiam de um mix equilibrado
-            scores["virginia"] += 8
-            scores["guilherme"] += 8
-            scores["amanda"] += 5
-        elif size == "large" or size == "enterprise":
-            # Grandes empresas se beneficiam de todos os tipos de agentes
-            scores["virginia"] += 10
-            scores["guilherme"] += 8
-            scores["amanda"] += 8
-            scores["ricardo"] += 10
-            scores["helena"] += 10
+        for agent_id, bonus in registry.size_bonus.get(size, {}).items():
+            scores[agent_id] += bonus
         
         # Garantir que as pontuações estejam no intervalo de 0-100
         for agent_id in scores:
@@ -300,6 +283,119 @@ class OrganizationAnalyzer:
         
         return scores
     
+    def _calculate_agent_scores_matrix(
+        self,
+        registry: CompiledTemplateRegistry,
+        organizations_data: List[Dict[str, Any]]
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Calcula as pontuações de N organizações × M agentes de forma vetorizada.
+        
+        A ordem das somas em ponto flutuante é a mesma de `_calculate_agent_scores`,
+        o que garante pontuações bit a bit idênticas.
+        
+        Args:
+            registry: Registro de templates, com as matrizes pré-compiladas
+            organizations_data: Lista com os dados das organizações
+            
+        Returns:
+            Tupla com a matriz de pontuações não limitadas (N × M), o vetor que
+            indica as linhas com contribuições fracionárias e as matrizes de
+            compatibilidade por dimensão
+        """
+        count = len(organizations_data)
+        
+        # Codificar indústria e tamanho como índices (a última linha é "sem bônus")
+        industries = np.fromiter(
+            (registry.industry_index.get(data.get("industry", ""), len(registry.industry_index))
+             for data in organizations_data),
+            dtype=np.intp,
+            count=count
+        )
+        sizes = np.fromiter(
+            (registry.size_index.get(data.get("size", ""), len(registry.size_index))
+             for data in organizations_data),
+            dtype=np.intp,
+            count=count
+        )
+        objectives, _ = self._encode_selection(organizations_data, "objectives", registry.objective_index)
+        
+        # Contribuições inteiras: base, indústria e objetivos
+        scores = np.full((count, len(registry.agent_ids)), 50, dtype=np.float64)
+        scores += registry.industry_table[industries]
+        scores += objectives @ registry.objective_table[:len(registry.objective_index)]
+        
+        # Contribuições fracionárias: canais, idiomas e integrações
+        has_fraction = np.zeros(count, dtype=bool)
+        compatibility = {}
+        for dimension in COMPATIBILITY_DIMENSIONS:
+            selected, totals = self._encode_selection(
+                organizations_data, dimension, registry.vocabularies[dimension]
+            )
+            matches = selected @ registry.supported[dimension]
+            
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = matches / totals[:, None]
+            
+            active = totals > 0
+            scores[active] += ratio[active] * 10
+            has_fraction |= active
+            
+            compatibility[dimension] = np.where(
+                active[:, None], np.trunc(ratio * 100), 100
+            ).astype(np.int64)
+        
+        # Contribuição do tamanho da empresa
+        scores += registry.size_table[sizes]
+        
+        return scores, has_fraction, compatibility
+    
+    def _encode_selection(
+        self,
+        organizations_data: List[Dict[str, Any]],
+        dimension: str,
+        vocabulary: Dict[str, int]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Codifica os itens selecionados de uma dimensão como matriz binária.
+        
+        Args:
+            organizations_data: Lista com os dados das organizações
+            dimension: Nome da dimensão (channels, languages, ...)
+            vocabulary: Índice da coluna de cada item conhecido
+            
+        Returns:
+            Tupla com a matriz de seleção (N × itens conhecidos) e o total de itens
+            selecionados por organização, incluindo itens desconhecidos
+        """
+        rows, cols, totals = [], [], []
+        for row, data in enumerate(organizations_data):
+            total = 0
+            for item, is_selected in data.get(dimension, {}).items():
+                if is_selected:
+                    total += 1
+                    col = vocabulary.get(item)
+                    if col is not None:
+                        rows.append(row)
+                        cols.append(col)
+            totals.append(total)
+        
+        selected = np.zeros((len(organizations_data), len(vocabulary)), dtype=np.float64)
+        selected[rows, cols] = 1
+        return selected, np.asarray(totals, dtype=np.float64)
+    
+    @staticmethod
+    def _to_score(value: float, has_fraction: bool) -> Any:
+        """
+        Converte uma pontuação da matriz para o mesmo tipo retornado por
+        `_calculate_agent_scores` (inteiro ou float, limitado a 0-100).
+        """
+        if value >= 100:
+            return 100
+        if value <= 0:
+            return 0
+        return value if has_fraction else int(value)
+    
     def _calculate_compatibility(
         self,
         selected_items: Dict[str, bool],
@@ -135,12 +135,12 @@ class OrganizationAnalysisResponse(BaseModel):
 
 # Esquema para histórico de análises organizacionais
 class OrganizationAnalysisHistoryResponse(BaseModel):
-    """Esquema para histórico de análises organizacionais."""
-    analysisId: int = Field(..., description="ID da análise")
-    organizationName: str = Field(..., description="Nome da organização")
-    createdAt: datetime = Field(..., description="Data de criação")
-    status: str = Field(..., description="Status da análise")
-    agentCount: int = Field(..., description="Número de agentes recomendados")
+    """Esquema para histórico de análises organizacionais (apenas os campos selecionados em `fields`)."""
+    analysisId: Optional[int] = Field(None, description="ID da análise")
+    organizationName: Optional[str] = Field(None, description="Nome da organização")
+    createdAt: Optional[datetime] = Field(None, description="Data de criação")
+    status: Optional[str] = Field(None, description="Status da análise")
+    agentCount: Optional[int] = Field(None, description="Número de agentes recomendados")
     
     class Config:
         schema_extra = {
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+"""
+Script para medir o custo por construção de agentes no AgentBuilder.
+
+Compara a resolução anterior (import_module + getattr a cada construção)
+com a construção via classes em cache (`build_agent`) e em lote
+(`build_many`).
+"""
+
+import argparse
+import importlib
+import logging
+import time
+
+from src.services.adk.agent_builder import AgentBuilder, BUILTIN_AGENT_TYPES
+from src.services.adk.custom_agents.llm_agent import LLMAgent
+
+logger = logging.getLogger("src.services.adk.agent_builder")
+
+CONFIG = {
+    "name": "Agente de Benchmark",
+    "description": "Agente gerado para benchmark",
+    "model": "gpt-4",
+    "prompt": "Você é um agente de benchmark.",
+    "channels": {"whatsapp": {"enabled": True}},
+    "languages": {"portuguese": True},
+    "integrations": {},
+    "metadata": {}
+}
+
+def build_agent_uncached(agent_id, agent_type, config):
+    """Construção como era feita antes do cache de classes."""
+    module = importlib.import_module(BUILTIN_AGENT_TYPES[agent_type])
+    agent_class = getattr(module, agent_type)
+    agent_instance = agent_class(agent_id=agent_id, config=config)
+    logger.info(f"Agente {agent_type} construído com sucesso, ID: {agent_id}")
+    return agent_instance
+
+def measure(label, count, function):
+    """Executa uma função e imprime o custo médio por agente."""
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<30} {elapsed:8.3f}s ({elapsed / count * 1e6:8.2f} µs/agente)")
+    return elapsed
+
+def run_benchmark(count):
+    """Executa o benchmark para um número de agentes."""
+    builder = AgentBuilder()
+    agent_ids = [str(i) for i in range(count)]
+
+    print(f"\n{count} agentes")
+    measure(
+        "resolução (import + getattr)",
+        count,
+        lambda: [getattr(importlib.import_module(BUILTIN_AGENT_TYPES["LLMAgent"]), "LLMAgent") for _ in agent_ids]
+    )
+    measure(
+        "resolução (cache)",
+        count,
+        lambda: [builder.resolve_agent_class("LLMAgent") for _ in agent_ids]
+    )
+    before = measure(
+        "import_module + getattr",
+        count,
+        lambda: [build_agent_uncached(agent_id, "LLMAgent", CONFIG) for agent_id in agent_ids]
+    )
+    measure(
+        "build_agent (nome)",
+        count,
+        lambda: [builder.build_agent(agent_id, "LLMAgent", CONFIG) for agent_id in agent_ids]
+    )
+    after = measure(
+        "build_agent (classe)",
+        count,
+        lambda: [builder.build_agent(agent_id, LLMAgent, CONFIG) for agent_id in agent_ids]
+    )
+    batch = measure(
+        "build_many",
+        count,
+        lambda: builder.build_many((agent_id, "LLMAgent", CONFIG) for agent_id in agent_ids)
+    )
+    print(f"  speedup (build_agent):         {before / after:8.2f}x")
+    print(f"  speedup (build_many):          {before / batch:8.2f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de construção de agentes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="Quantidades de agentes")
+    parser.add_argument("--verbose", action="store_true", help="Manter os logs de construção dos agentes")
+    args = parser.parse_args()
+
+    # Os logs por agente dominariam a medição
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    for size in args.sizes:
+        run_benchmark(size)
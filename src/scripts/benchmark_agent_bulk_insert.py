@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+"""
+Script para medir a inserção de agentes gerados: uma ida ao banco por agente
+versus o caminho em lote (INSERT multi-linha com RETURNING).
+
+Usa o banco configurado em DATABASE_URL; cada execução ocorre em uma
+transação desfeita ao final, sem deixar dados no banco.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Adicionar diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import event
+
+from src.config.database import engine, SessionLocal
+from src.services.agent_generator import AgentGenerator
+
+def make_specs(count):
+    """Gera dados sintéticos de agentes."""
+    return [
+        {
+            "analysis_id": 0,
+            "agent": {
+                "name": f"Agente {i}",
+                "description": "Agente gerado para benchmark",
+                "type": "customer_support",
+                "tenant_id": 1,
+                "created_by": 1,
+                "folder_id": None
+            },
+            "configuration": {"name": f"Agente {i}", "model": "gpt-4", "prompt": "Você é um agente de teste."}
+        }
+        for i in range(count)
+    ]
+
+def measure(count, bulk):
+    """Mede tempo e número de instruções SQL para inserir `count` agentes."""
+    statements = []
+    
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    db = SessionLocal()
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        generator = AgentGenerator(db_session=db)
+        specs = make_specs(count)
+        
+        start = time.perf_counter()
+        if bulk:
+            generator._insert_agents_bulk(specs)
+        else:
+            for spec in specs:
+                generator._insert_agent(spec)
+        db.flush()
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+        db.rollback()
+        db.close()
+    
+    return elapsed, len(statements)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da inserção de agentes em lote")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1_000, 10_000], help="Quantidades de agentes")
+    
+    args = parser.parse_args()
+    
+    print(f"{'agentes':>8} {'modo':>10} {'tempo (s)':>10} {'instruções':>11} {'agentes/s':>10}")
+    for count in args.rows:
+        for bulk in (False, True):
+            elapsed, statements = measure(count, bulk)
+            mode = "lote" if bulk else "por agente"
+            print(f"{count:>8} {mode:>10} {elapsed:>10.3f} {statements:>11} {count / elapsed:>10.0f}")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+Script para medir o envio de mensagens pelos canais HTTP (WhatsApp e LinkedIn).
+
+Envia mensagens para o servidor simulado (`mock_channel_server`) e compara,
+por canal, a vazão em mensagens por segundo e o número de conexões abertas:
+1. Um httpx.AsyncClient criado a cada mensagem
+2. `ChannelIntegration` com os clientes do pool (`http_clients`)
+
+O servidor simulado atende HTTP/1.1 sem TLS, e HTTP/2 só é negociado (por
+ALPN) em conexões HTTPS: os números medem o reuso de conexões HTTP/1.1, não
+a multiplexação do HTTP/2 usada com as APIs reais.
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from src.scripts.mock_channel_server import MockChannelServer
+from src.services.channel_integration import ChannelIntegration
+from src.services.http_client_pool import HttpClientPool
+import src.services.channel_integration as channel_integration_module
+
+class BenchmarkChannelIntegration(ChannelIntegration):
+    """ChannelIntegration com a configuração dos canais apontando para o servidor simulado."""
+    
+    def __init__(self, base_url):
+        super().__init__(db=None)
+        self.base_url = base_url
+    
+    def _get_channel_config(self, client_id, channel):
+        return {
+            "api_key": "token",
+            "phone_number_id": "123",
+            "access_token": "token",
+            "base_url": self.base_url
+        }
+
+async def send_with_new_client(base_url, channel, recipient, message):
+    """Referência: um cliente (e uma conexão) por mensagem."""
+    async with httpx.AsyncClient(base_url=base_url, headers={"Authorization": "Bearer token"}) as client:
+        if channel == "whatsapp":
+            response = await client.post("/123/messages", json={
+                "messaging_product": "whatsapp", "to": recipient, "type": "text", "text": {"body": message}
+            })
+        else:
+            response = await client.post("/messages", json={"recipients": [recipient], "subject": "", "body": message})
+        response.raise_for_status()
+
+async def run_concurrently(count, concurrency, send):
+    """Envia `count` mensagens com até `concurrency` envios simultâneos."""
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def one(index):
+        async with semaphore:
+            await send(index)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(count)))
+    return time.perf_counter() - start
+
+async def main(args):
+    server = MockChannelServer(args.latency)
+    port = await server.start()
+    base_url = f"http://127.0.0.1:{port}"
+    
+    # Pool próprio do benchmark, com o limite de conexões informado
+    pool = HttpClientPool(max_connections=args.concurrency, max_keepalive=args.concurrency)
+    channel_integration_module.http_clients = pool
+    integration = BenchmarkChannelIntegration(base_url)
+    
+    print(f"{args.count} mensagens por canal, {args.concurrency} envios simultâneos, latência {args.latency * 1000:.1f} ms")
+    
+    for channel in ("whatsapp", "linkedin"):
+        print(f"\nCanal: {channel}")
+        pooled_send = integration._send_whatsapp_message if channel == "whatsapp" else integration._send_linkedin_message
+        
+        for label, send in (
+            ("cliente por mensagem", lambda index: send_with_new_client(base_url, channel, f"dest-{index}", "Olá!")),
+            ("pool de clientes", lambda index: pooled_send(1, f"dest-{index}", "Olá!"))
+        ):
+            connections = server.connections
+            elapsed = await run_concurrently(args.count, args.concurrency, send)
+            print(
+                f"  {label:<22} {elapsed:7.2f}s  {args.count / elapsed:8.0f} mensagens/s  "
+                f"conexões abertas: {server.connections - connections}"
+            )
+    
+    await pool.aclose()
+    await server.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos clientes HTTP dos canais")
+    parser.add_argument("--count", type=int, default=2000, help="Mensagens por canal")
+    parser.add_argument("--concurrency", type=int, default=20, help="Envios simultâneos")
+    parser.add_argument("--latency", type=float, default=0.005, help="Latência do servidor simulado, em segundos")
+    args = parser.parse_args()
+    
+    asyncio.run(main(args))
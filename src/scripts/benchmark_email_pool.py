@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+"""
+Script para medir o envio de e-mails pelo canal de e-mail.
+
+Envia e-mails para o servidor SMTP simulado (`mock_smtp_server`) e compara a
+vazão em e-mails por segundo, as conexões abertas e as autenticações:
+1. Uma conexão por e-mail (conectar, EHLO, AUTH, enviar, QUIT)
+2. `ChannelIntegration.deliver_many` com o pool SMTP, sem pipeline
+3. `ChannelIntegration.deliver_many` com o pool SMTP, com pipeline
+"""
+
+import argparse
+import asyncio
+import time
+
+from src.scripts.mock_smtp_server import MockSmtpServer
+from src.services.channel_integration import ChannelIntegration
+from src.services.smtp_pool import SmtpConnection, SmtpConnectionPool
+import src.services.channel_integration as channel_integration_module
+
+class BenchmarkChannelIntegration(ChannelIntegration):
+    """ChannelIntegration com a configuração de e-mail apontando para o servidor simulado."""
+
+    def __init__(self, port):
+        super().__init__(db=None)
+        self.port = port
+
+    def _get_channel_config(self, client_id, channel):
+        return {
+            "smtp_server": "127.0.0.1",
+            "smtp_port": self.port,
+            "username": "campanhas",
+            "password": "senha",
+            "from_email": "campanhas@nowgo.local",
+            "use_tls": False
+        }
+
+async def send_with_new_connection(config, index):
+    """Referência: uma conexão autenticada por e-mail."""
+    connection = SmtpConnection(config)
+    await connection.connect()
+    try:
+        errors = await connection.send_many([
+            (config["from_email"], f"dest-{index}@example.com", b"Subject: Oferta\r\n\r\nOla!\r\n")
+        ])
+        if errors[0]:
+            raise RuntimeError(errors[0])
+    finally:
+        await connection.close()
+
+async def run_concurrently(count, concurrency, send):
+    """Executa `send` para cada índice com até `concurrency` chamadas simultâneas."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index):
+        async with semaphore:
+            await send(index)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(count)))
+    return time.perf_counter() - start
+
+async def main(args):
+    server = MockSmtpServer(args.latency)
+    port = await server.start()
+    integration = BenchmarkChannelIntegration(port)
+    config = integration._get_channel_config(1, "email")
+    batches = -(-args.count // args.batch_size)
+
+    print(
+        f"{args.count} e-mails, {args.connections} conexões, lotes de {args.batch_size} "
+        f"em {args.workers} workers, latência {args.latency * 1000:.1f} ms por round trip"
+    )
+
+    async def send_batch(index, failures):
+        messages = [
+            {"recipient": f"dest-{index * args.batch_size + offset}@example.com", "message": "Olá!", "metadata": {"subject": "Oferta"}}
+            for offset in range(min(args.batch_size, args.count - index * args.batch_size))
+        ]
+        results = await integration.deliver_many(1, "email", messages)
+        failures.extend(result for result in results if not result.get("success"))
+
+    scenarios = [("conexão por e-mail", None)]
+    scenarios += [("pool sem pipeline", False), ("pool com pipeline", True)]
+    for label, pipelining in scenarios:
+        connections, authentications, messages = server.connections, server.authentications, server.messages
+        failures = []
+        if pipelining is None:
+            elapsed = await run_concurrently(args.count, args.connections, lambda index: send_with_new_connection(config, index))
+        else:
+            pool = SmtpConnectionPool(max_connections=args.connections, pipelining=pipelining)
+            channel_integration_module.smtp_connections = pool
+            elapsed = await run_concurrently(batches, args.workers, lambda index: send_batch(index, failures))
+            await pool.aclose()
+
+        print(
+            f"  {label:<20} {elapsed:7.2f}s  {args.count / elapsed:8.0f} e-mails/s  "
+            f"conexões: {server.connections - connections}  autenticações: {server.authentications - authentications}  "
+            f"aceitos: {server.messages - messages}  falhas: {len(failures)}"
+        )
+
+    await server.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do pool SMTP do canal de e-mail")
+    parser.add_argument("--count", type=int, default=10000, help="Número de e-mails")
+    parser.add_argument("--connections", type=int, default=5, help="Conexões simultâneas")
+    parser.add_argument("--batch-size", type=int, default=50, help="E-mails por lote dos workers")
+    parser.add_argument("--workers", type=int, default=4, help="Lotes enviados simultaneamente")
+    parser.add_argument("--latency", type=float, default=0.002, help="Latência do servidor simulado por round trip, em segundos")
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
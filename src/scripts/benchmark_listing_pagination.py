@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+"""
+Script para medir os endpoints de listagem com muitos registros por tenant.
+
+Cria os registros (100 mil por padrão, com uma configuração JSON de cerca
+de 2 KB cada) e compara, para cada endpoint, o tempo mediano, o pico de
+memória alocada (tracemalloc) e o tamanho da resposta JSON:
+1. Listagem completa, como antes da paginação (todas as linhas com .all())
+2. Página profunda com OFFSET, para comparação com o cursor
+3. Primeira página
+4. Página profunda pelo cursor (keyset em created_at, id)
+5. Primeira página sem a configuração (`fields=`)
+
+Usa o banco configurado em DATABASE_URL; cada execução ocorre em uma
+transação desfeita ao final, sem deixar dados no banco.
+
+Os cenários "agents" e "analyses" dependem de modelos e colunas ausentes de
+src/models/models.py (AgentConfiguration, Organization, Agent.tenant_id,
+OrganizationAnalysis.tenant_id etc.) e falham com ImportError neste código;
+apenas "channels" (integrações de canais) pode ser medido. Os resultados
+registrados para a paginação foram medidos com as integrações de canais.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import tracemalloc
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Adicionar diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi import Response
+from sqlalchemy import insert
+
+from src.config.database import SessionLocal
+from src.services.pagination import LIST_PAGE_SIZE, NEXT_CURSOR_HEADER, encode_cursor
+
+# Tenant sem dados reais, para que apenas os registros criados pelo script sejam listados
+TENANT_ID = 987654321
+
+# Configuração sintética com o tamanho típico da configuração de um agente
+CONFIGURATION = {
+    "model": "gpt-4",
+    "prompt": "Você é um agente de atendimento. " * 40,
+    "channels": {channel: {"enabled": True} for channel in ("whatsapp", "email", "phone", "linkedin")},
+    "tools": [f"ferramenta_{i}" for i in range(20)]
+}
+
+def timestamps(count):
+    """Datas de criação crescentes, com empates (várias linhas por segundo) resolvidos pelo id."""
+    start = datetime(2025, 1, 1)
+    return [start + timedelta(seconds=i // 10) for i in range(count)]
+
+def seed_agents(db, count):
+    from src.models.models import Agent, AgentConfiguration
+    
+    created = timestamps(count)
+    agent_ids = db.execute(
+        insert(Agent).returning(Agent.id, sort_by_parameter_order=True),
+        [
+            {"name": f"Agente {i}", "description": "Agente de benchmark", "type": "customer_support",
+             "tenant_id": TENANT_ID, "created_at": created[i]}
+            for i in range(count)
+        ]
+    ).scalars().all()
+    db.execute(
+        insert(AgentConfiguration),
+        [{"agent_id": agent_id, "configuration": CONFIGURATION, "version": 1, "is_active": True} for agent_id in agent_ids]
+    )
+    return created, agent_ids
+
+def seed_analyses(db, count):
+    from src.models.models import Organization, OrganizationAnalysis
+    
+    organization_id = db.execute(
+        insert(Organization).returning(Organization.id),
+        {"name": "Organização de benchmark", "industry": "technology", "size": "large", "description": "", "tenant_id": TENANT_ID}
+    ).scalar_one()
+    created = timestamps(count)
+    analysis_ids = db.execute(
+        insert(OrganizationAnalysis).returning(OrganizationAnalysis.id, sort_by_parameter_order=True),
+        [
+            {"organization_id": organization_id, "tenant_id": TENANT_ID, "status": "completed",
+             "results": {"recommendedAgents": [CONFIGURATION]}, "created_at": created[i]}
+            for i in range(count)
+        ]
+    ).scalars().all()
+    # O histórico é listado das análises mais recentes para as mais antigas
+    return created[::-1], analysis_ids[::-1]
+
+def seed_channels(db, count):
+    from src.models.models import ChannelIntegration
+    
+    created = timestamps(count)
+    integration_ids = db.execute(
+        insert(ChannelIntegration).returning(ChannelIntegration.id, sort_by_parameter_order=True),
+        [
+            {"client_id": TENANT_ID, "channel_type": "whatsapp", "configuration": CONFIGURATION,
+             "active": True, "created_at": created[i]}
+            for i in range(count)
+        ]
+    ).scalars().all()
+    return created, integration_ids
+
+def list_agents_previous(db):
+    """Listagem de agentes anterior à paginação: todos os agentes e configurações."""
+    from src.models.models import Agent, AgentConfiguration
+    
+    rows = db.query(Agent, AgentConfiguration.configuration).join(
+        AgentConfiguration, AgentConfiguration.agent_id == Agent.id
+    ).filter(Agent.tenant_id == TENANT_ID, AgentConfiguration.is_active == True).all()
+    return [
+        {"id": agent.id, "name": agent.name, "type": agent.type, "description": agent.description, "configuration": configuration}
+        for agent, configuration in rows
+    ]
+
+def list_analyses_previous(db):
+    """Histórico de análises anterior à paginação: todas as análises com os resultados."""
+    from src.models.models import Organization, OrganizationAnalysis
+    
+    rows = db.query(OrganizationAnalysis, Organization.name).outerjoin(
+        Organization, Organization.id == OrganizationAnalysis.organization_id
+    ).filter(OrganizationAnalysis.tenant_id == TENANT_ID).order_by(OrganizationAnalysis.created_at.desc()).all()
+    return [
+        {"analysisId": analysis.id, "organizationName": name, "createdAt": analysis.created_at,
+         "status": analysis.status, "agentCount": len(analysis.results.get("recommendedAgents", []))}
+        for analysis, name in rows
+    ]
+
+def list_channels_previous(db):
+    """Listagem de integrações anterior à paginação: todas as integrações do cliente."""
+    from src.models.models import ChannelIntegration
+    
+    integrations = db.query(ChannelIntegration).filter(ChannelIntegration.client_id == TENANT_ID).all()
+    return [
+        {"id": integration.id, "client_id": integration.client_id, "channel_type": integration.channel_type,
+         "configuration": integration.configuration, "active": integration.active,
+         "created_at": integration.created_at, "updated_at": integration.updated_at}
+        for integration in integrations
+    ]
+
+def offset_page(entity, order, offset, limit):
+    """Página com OFFSET, na mesma ordem da listagem paginada."""
+    def call(db):
+        rows = db.query(entity).filter(*entity_filter(entity)).order_by(*order).offset(offset).limit(limit).all()
+        return [{"id": row.id, "configuration": getattr(row, "configuration", None)} for row in rows]
+    return call
+
+def entity_filter(entity):
+    if hasattr(entity, "tenant_id"):
+        return [entity.tenant_id == TENANT_ID]
+    return [entity.client_id == TENANT_ID]
+
+def endpoint_call(name):
+    """Chamada do endpoint paginado: (db, cursor, fields) -> (itens, próximo cursor)."""
+    def call(db, cursor=None, fields=None):
+        response = Response()
+        user = SimpleNamespace(tenant_id=TENANT_ID)
+        if name == "agents":
+            from src.api.agent_routes import list_agents
+            items = asyncio.run(list_agents(response, cursor=cursor, limit=LIST_PAGE_SIZE, fields=fields, db=db, current_user=user))
+        elif name == "analyses":
+            from src.api.organization_routes import get_analysis_history
+            items = asyncio.run(get_analysis_history(response, cursor=cursor, limit=LIST_PAGE_SIZE, fields=fields, db=db, current_user=user))
+        else:
+            from src.api.integration_routes import get_client_integrations
+            items = get_client_integrations(TENANT_ID, response, cursor=cursor, limit=LIST_PAGE_SIZE, fields=fields, db=db)
+        return items, response.headers.get(NEXT_CURSOR_HEADER)
+    return call
+
+def scenarios(name, created, ids, count):
+    """Cenários medidos para um endpoint."""
+    from src.models.models import Agent, ChannelIntegration, OrganizationAnalysis
+    
+    call = endpoint_call(name)
+    # Posição a 90% da listagem, para as páginas profundas
+    deep = int(count * 0.9)
+    deep_cursor = encode_cursor(created[deep - 1], ids[deep - 1])
+    
+    if name == "agents":
+        previous, without_config = list_agents_previous, "id,name,type,description"
+        offset = offset_page(Agent, [Agent.created_at, Agent.id], deep, LIST_PAGE_SIZE)
+    elif name == "analyses":
+        previous, without_config = list_analyses_previous, "analysisId,organizationName,createdAt,status"
+        offset = offset_page(OrganizationAnalysis, [OrganizationAnalysis.created_at.desc(), OrganizationAnalysis.id.desc()], deep, LIST_PAGE_SIZE)
+    else:
+        previous, without_config = list_channels_previous, "id,channel_type,active,created_at"
+        offset = offset_page(ChannelIntegration, [ChannelIntegration.created_at, ChannelIntegration.id], deep, LIST_PAGE_SIZE)
+    
+    return [
+        ("listagem completa (anterior)", previous),
+        ("página profunda com OFFSET", offset),
+        ("primeira página", lambda db: call(db)[0]),
+        ("página profunda pelo cursor", lambda db: call(db, cursor=deep_cursor)[0]),
+        ("primeira página sem configuração", lambda db: call(db, fields=without_config)[0])
+    ]
+
+def measure(db, function, repeat):
+    """Tempo mediano, pico de memória e tamanho da resposta JSON de uma listagem."""
+    elapsed = []
+    for _ in range(repeat):
+        db.expire_all()
+        start = time.perf_counter()
+        items = function(db)
+        elapsed.append(time.perf_counter() - start)
+    
+    db.expire_all()
+    tracemalloc.start()
+    items = function(db)
+    body = json.dumps(items, default=str)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(elapsed), peak, len(body), len(items)
+
+SEEDS = {"agents": seed_agents, "analyses": seed_analyses, "channels": seed_channels}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das listagens paginadas")
+    parser.add_argument("--rows", type=int, default=100_000, help="Registros por tenant")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções medidas por cenário")
+    parser.add_argument("--endpoints", nargs="+", choices=list(SEEDS), default=["channels"], help="Endpoints medidos")
+    
+    args = parser.parse_args()
+    
+    for name in args.endpoints:
+        db = SessionLocal()
+        try:
+            created, ids = SEEDS[name](db, args.rows)
+            db.flush()
+            
+            # Confere que as páginas pelo cursor percorrem todos os registros sem repetições
+            call = endpoint_call(name)
+            seen, cursor = 0, None
+            while True:
+                items, cursor = call(db, cursor=cursor, fields="id" if name != "analyses" else "analysisId")
+                seen += len(items)
+                if cursor is None:
+                    break
+            assert seen == args.rows, f"{seen} registros percorridos, esperados {args.rows}"
+            
+            print(f"\n{name}: {args.rows} registros, páginas de {LIST_PAGE_SIZE}")
+            print(f"  {'cenário':<34} {'tempo (ms)':>11} {'memória (MB)':>13} {'resposta (KB)':>14} {'itens':>7}")
+            for label, function in scenarios(name, created, ids, args.rows):
+                elapsed, peak, size, count = measure(db, function, args.repeat)
+                print(f"  {label:<34} {elapsed * 1000:>11.1f} {peak / 1e6:>13.1f} {size / 1e3:>14.1f} {count:>7}")
+        finally:
+            db.rollback()
+            db.close()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+Script para medir o desempenho da análise organizacional em lote.
+
+Compara `OrganizationAnalyzer.analyze` (uma organização por chamada) com
+`OrganizationAnalyzer.analyze_many` (lote vetorizado) e verifica se os
+resultados são idênticos.
+"""
+
+import argparse
+import random
+import time
+
+from src.models.organization_analyzer import OrganizationAnalyzer
+
+INDUSTRIES = ["technology", "finance", "healthcare", "education", "retail", "manufacturing", "services", "other"]
+SIZES = ["small", "medium", "large", "enterprise", "unknown"]
+CHANNELS = ["whatsapp", "email", "phone", "linkedin", "internal_systems", "telegram"]
+LANGUAGES = ["portuguese", "english", "spanish", "french"]
+INTEGRATIONS = ["crm", "helpdesk", "marketing_automation", "erp", "accounting_software", "hr_system", "bi"]
+OBJECTIVES = ["customer_support", "sales", "marketing", "internal_communication", "cost_reduction"]
+
+def generate_profiles(count, seed=42):
+    """Gera perfis organizacionais aleatórios."""
+    rng = random.Random(seed)
+
+    def flags(items):
+        return {item: rng.random() < 0.5 for item in rng.sample(items, rng.randint(0, len(items)))}
+
+    return [
+        {
+            "name": f"Organização {i}",
+            "industry": rng.choice(INDUSTRIES),
+            "size": rng.choice(SIZES),
+            "description": "Perfil gerado para benchmark",
+            "channels": flags(CHANNELS),
+            "languages": flags(LANGUAGES),
+            "integrations": flags(INTEGRATIONS),
+            "objectives": flags(OBJECTIVES)
+        }
+        for i in range(count)
+    ]
+
+def strip_dates(result):
+    """Remove o campo de data, que varia entre execuções."""
+    summary = {key: value for key, value in result["summary"].items() if key != "analysisDate"}
+    return {**result, "summary": summary}
+
+def run_benchmark(count, check):
+    """Executa o benchmark para um número de perfis."""
+    analyzer = OrganizationAnalyzer()
+    profiles = generate_profiles(count)
+
+    start = time.perf_counter()
+    single_results = [analyzer.analyze(profile, tenant_id=1) for profile in profiles]
+    single_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_results = analyzer.analyze_many(profiles, tenant_id=1)
+    batch_elapsed = time.perf_counter() - start
+
+    # Medir apenas o cálculo das pontuações, sem montagem dos resultados
+    start = time.perf_counter()
+    for profile in profiles:
+        analyzer._calculate_agent_scores(
+            registry=analyzer.registry,
+            industry=profile["industry"],
+            size=profile["size"],
+            channels=profile["channels"],
+            languages=profile["languages"],
+            integrations=profile["integrations"],
+            objectives=profile["objectives"]
+        )
+    single_scoring = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analyzer._calculate_agent_scores_matrix(analyzer.registry, profiles)
+    batch_scoring = time.perf_counter() - start
+
+    print(f"\n{count} perfis")
+    print(f"  pontuação (loop):   {single_scoring:8.3f}s ({count / single_scoring:12.0f} perfis/s)")
+    print(f"  pontuação (matriz): {batch_scoring:8.3f}s ({count / batch_scoring:12.0f} perfis/s)")
+    print(f"  analyze:            {single_elapsed:8.3f}s ({count / single_elapsed:12.0f} perfis/s)")
+    print(f"  analyze_many:       {batch_elapsed:8.3f}s ({count / batch_elapsed:12.0f} perfis/s)")
+    print(f"  speedup:            {single_elapsed / batch_elapsed:8.2f}x")
+
+    if check:
+        for single, batch in zip(single_results, batch_results):
+            expected, actual = strip_dates(single), strip_dates(batch)
+            if repr(expected) != repr(actual):
+                raise AssertionError(f"Resultados divergentes:\n{expected}\n{actual}")
+        print("  resultados idênticos: sim")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da análise organizacional em lote")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="Quantidades de perfis")
+    parser.add_argument("--no-check", action="store_true", help="Não comparar os resultados")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run_benchmark(size, check=not args.no_check)
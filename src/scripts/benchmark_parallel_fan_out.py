@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+"""
+Script para medir a execução paralela de agentes com quórum e tempo limite.
+
+Usa um LLM simulado local, com latências sorteadas de uma distribuição
+configurável, e compara para vários grafos paralelos simultâneos:
+1. Esperar por todos os ramos, sem limite de concorrência (comportamento anterior)
+2. `fan_out` com limites por grafo e global, tempo limite por ramo e quórum
+
+A agregação também é simulada, com latência fixa.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from src.services.adk.concurrency import KeyedSemaphore
+from src.services.adk.fan_out import fan_out
+
+def latency_sampler(distribution, rng):
+    """Retorna uma função que sorteia latências, em segundos."""
+    if distribution == "uniform":
+        return lambda: rng.uniform(0.05, 0.25)
+    if distribution == "lognormal":
+        return lambda: min(rng.lognormvariate(-2.3, 0.6), 5.0)
+    if distribution == "stalls":
+        # Latência normal com 5% de chamadas travadas
+        return lambda: 3.0 if rng.random() < 0.05 else rng.uniform(0.05, 0.25)
+    raise ValueError(f"Distribuição desconhecida: {distribution}")
+
+class FakeLLM:
+    """LLM simulado: responde após uma latência sorteada."""
+
+    def __init__(self, sample_latency):
+        self.sample_latency = sample_latency
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.sample_latency())
+            return {"output": f"resposta para {prompt['input']}"}
+        finally:
+            self.active -= 1
+
+async def aggregate(results, latency):
+    """Agregação simulada."""
+    await asyncio.sleep(latency)
+    return "\n\n".join(results)
+
+async def wait_all(llm, branches, inputs, aggregation_latency):
+    """Comportamento anterior: todos os ramos, sem limites, agregação ao fim."""
+    start = time.perf_counter()
+    results = await asyncio.gather(*(llm.ainvoke(inputs) for _ in range(branches)))
+    await aggregate([result["output"] for result in results], aggregation_latency)
+    return time.perf_counter() - start
+
+async def with_quorum(llm, branches, inputs, aggregation_latency, args, global_slots):
+    """Ramos com limites, tempo limite e quórum."""
+    start = time.perf_counter()
+    outcome = await fan_out(
+        [lambda: llm.ainvoke(inputs) for _ in range(branches)],
+        quorum=args.quorum,
+        branch_timeout=args.timeout,
+        max_concurrency=args.graph_limit,
+        global_slots=global_slots
+    )
+    await aggregate([result["output"] for result in outcome["results"].values()], aggregation_latency)
+    return time.perf_counter() - start
+
+def summarize(label, durations, llm, total):
+    """Imprime latência média e p95 dos grafos e a vazão."""
+    durations = sorted(durations)
+    p95 = durations[int(0.95 * (len(durations) - 1))]
+    print(
+        f"  {label:<24} média {statistics.mean(durations):6.3f}s  p95 {p95:6.3f}s  "
+        f"máx {durations[-1]:6.3f}s  total {total:6.2f}s  chamadas {llm.calls:5}  pico {llm.peak:4}"
+    )
+
+async def run_benchmark(distribution, args):
+    """Executa o benchmark para uma distribuição de latências."""
+    print(f"\nDistribuição: {distribution}")
+    inputs = {"input": "consulta"}
+
+    for label in ("aguardar todos", "quórum + limites"):
+        llm = FakeLLM(latency_sampler(distribution, random.Random(args.seed)))
+        global_slots = KeyedSemaphore(args.global_limit)
+
+        async def one_graph():
+            if label == "aguardar todos":
+                return await wait_all(llm, args.branches, inputs, args.aggregation_latency)
+            return await with_quorum(llm, args.branches, inputs, args.aggregation_latency, args, global_slots)
+
+        start = time.perf_counter()
+        durations = await asyncio.gather(*(one_graph() for _ in range(args.graphs)))
+        summarize(label, durations, llm, time.perf_counter() - start)
+
+async def main(args):
+    print(
+        f"{args.graphs} grafos simultâneos, {args.branches} ramos, quórum {args.quorum}, "
+        f"tempo limite {args.timeout}s, limite por grafo {args.graph_limit}, limite global {args.global_limit}"
+    )
+    for distribution in args.distributions:
+        await run_benchmark(distribution, args)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da execução paralela de agentes")
+    parser.add_argument("--graphs", type=int, default=20, help="Grafos executados simultaneamente")
+    parser.add_argument("--branches", type=int, default=8, help="Agentes por grafo")
+    parser.add_argument("--quorum", type=int, default=6, help="Agentes necessários para agregar")
+    parser.add_argument("--timeout", type=float, default=1.0, help="Tempo limite por agente, em segundos")
+    parser.add_argument("--graph-limit", type=int, default=8, help="Agentes simultâneos por grafo")
+    parser.add_argument("--global-limit", type=int, default=64, help="Chamadas simultâneas ao LLM no processo")
+    parser.add_argument("--aggregation-latency", type=float, default=0.05, help="Latência da agregação, em segundos")
+    parser.add_argument("--distributions", nargs="+", default=["uniform", "lognormal", "stalls"], help="Distribuições de latência")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do sorteio de latências")
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""
+Script para medir a vazão de eventos do WorkflowAgent.
+
+Gera um fluxo de trabalho com muitos estados e tipos de evento, com
+condições e ações em parte das transições, e mede:
+1. O despacho puro pela tabela compilada (`CompiledWorkflow.dispatch`)
+2. O processamento completo de eventos (`WorkflowAgent.process_event`)
+3. A interpretação direta da definição, varrendo a lista de transições
+   a cada evento, como referência sem compilação
+"""
+
+import argparse
+import logging
+import random
+import time
+
+from src.services.adk.custom_agents.workflow_agent import WorkflowAgent
+from src.services.adk.workflow_compiler import WORKFLOW_ACTIONS, WORKFLOW_GUARDS, compile_workflow
+
+def generate_workflow(states, events, seed=42):
+    """Gera um fluxo com `states` estados e `events` tipos de evento."""
+    rng = random.Random(seed)
+    names = [f"s{i}" for i in range(states)]
+    event_types = [f"e{i}" for i in range(events)]
+    transitions = []
+
+    for index, name in enumerate(names[:-1]):
+        # Caminho principal, garantindo que todos os estados sejam alcançáveis
+        transitions.append({"from": name, "event": "*", "to": names[index + 1]})
+        for event in rng.sample(event_types, events // 2):
+            transition = {"from": name, "event": event, "to": rng.choice(names)}
+            if rng.random() < 0.3:
+                transition["guards"] = [{"name": "field_equals", "args": {"field": "flag", "value": True}}]
+            if rng.random() < 0.3:
+                transition["actions"] = [{"name": "set", "args": {"values": {"last": event}}}]
+            transitions.insert(len(transitions) - 1, transition)
+
+    return {"initial": names[0], "final": [names[-1]], "transitions": transitions}
+
+def interpreted_next_step(workflow, current_step, event_type, data, payload):
+    """Referência sem compilação: varre as transições a cada evento."""
+    for wildcard in (False, True):
+        for transition in workflow["transitions"]:
+            if transition["from"] != current_step:
+                continue
+            if (transition["event"] == "*") != wildcard or (not wildcard and transition["event"] != event_type):
+                continue
+            guards = transition.get("guards", [])
+            if all(WORKFLOW_GUARDS[guard["name"]](data, payload, **guard["args"]) for guard in guards):
+                for action in transition.get("actions", []):
+                    WORKFLOW_ACTIONS[action["name"]](data, payload, **action["args"])
+                return transition["to"]
+    return current_step
+
+def measure(label, count, function):
+    """Executa uma função e imprime a vazão em eventos por segundo."""
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<32} {elapsed:8.3f}s ({count / elapsed:12.0f} eventos/s)")
+
+def run_benchmark(states, events, count, seed=42):
+    """Executa o benchmark para um fluxo gerado."""
+    workflow = generate_workflow(states, events, seed)
+
+    start = time.perf_counter()
+    compiled = compile_workflow(workflow)
+    compile_elapsed = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    event_stream = [
+        (f"e{rng.randrange(events + 2)}", {"flag": rng.random() < 0.5})
+        for _ in range(count)
+    ]
+
+    print(f"\n{states} estados, {events} tipos de evento, {len(workflow['transitions'])} transições")
+    print(f"  compilação: {compile_elapsed * 1000:.2f} ms")
+
+    def dispatch_only():
+        state, data = compiled.initial, {}
+        for event_type, payload in event_stream:
+            state = compiled.dispatch(state, event_type, data, payload)
+            if compiled.is_final(state):
+                state = compiled.initial
+
+    def process_events():
+        agent = WorkflowAgent(agent_id="benchmark", config={"workflow": workflow})
+        for event_type, payload in event_stream:
+            result = agent.process_event({"workflow_id": "w", "type": event_type, "payload": payload})
+            if result["status"] == "completed":
+                agent.reset_workflow("w")
+
+    # A referência é lenta; medir uma amostra dos eventos
+    sample = event_stream[:max(1, count // 10)]
+
+    def interpreted_dispatch():
+        step, data = workflow["initial"], {}
+        for event_type, payload in sample:
+            step = interpreted_next_step(workflow, step, event_type, data, payload)
+            if step in workflow["final"]:
+                step = workflow["initial"]
+
+    measure("despacho pela tabela compilada", count, dispatch_only)
+    measure("process_event", count, process_events)
+    measure("interpretação da definição", len(sample), interpreted_dispatch)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do WorkflowAgent")
+    parser.add_argument("--states", type=int, default=100, help="Número de estados")
+    parser.add_argument("--events", type=int, default=20, help="Número de tipos de evento")
+    parser.add_argument("--count", type=int, default=200_000, help="Número de eventos")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    run_benchmark(args.states, args.events, args.count)
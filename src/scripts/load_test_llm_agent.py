@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+"""
+Teste de carga do processamento assíncrono de mensagens do LLMAgent.
+
+Usa um modelo simulado com latência fixa para medir a vazão de
+`aprocess_message` com um número crescente de conversas simultâneas.
+A vazão deve crescer linearmente até o limite de concorrência por agente
+e estabilizar a partir dele. Também verifica que as mensagens de cada
+conversa ficam no histórico na ordem de envio.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from src.services.adk import concurrency
+from src.services.adk.conversation_history import InMemoryHistoryStore
+from src.services.adk.custom_agents.llm_agent import LLMAgent
+
+class StubModelAgent(LLMAgent):
+    """LLMAgent cujo modelo responde após uma latência fixa."""
+
+    def __init__(self, agent_id, config, latency, history_store):
+        super().__init__(agent_id=agent_id, config=config, history_store=history_store)
+        self.latency = latency
+
+    async def _agenerate_response(self, message, context=None):
+        await asyncio.sleep(self.latency)
+        return f"eco: {message['content']}"
+
+async def run_level(agent, conversations, messages_per_conversation):
+    """Envia as mensagens de várias conversas simultâneas e retorna a duração."""
+
+    async def conversation(user_id):
+        for index in range(messages_per_conversation):
+            await agent.aprocess_message(
+                {"user_id": user_id, "content": f"{user_id}:{index}"},
+                context={"tenant_id": 1}
+            )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(conversation(f"u{i}") for i in range(conversations)))
+    return time.perf_counter() - start
+
+def check_order(agent, conversations, messages_per_conversation):
+    """Verifica que o histórico de cada conversa segue a ordem de envio."""
+    for i in range(conversations):
+        user_id = f"u{i}"
+        history = agent.get_conversation_history(user_id, limit=2 * messages_per_conversation)
+        sent = [entry["content"] for entry in history if entry["role"] == "user"]
+        expected = [f"{user_id}:{index}" for index in range(messages_per_conversation)]
+        if sent != expected:
+            raise AssertionError(f"Ordem incorreta na conversa {user_id}: {sent}")
+
+async def main(args):
+    concurrency.agent_slots.limit = args.agent_limit
+    concurrency.tenant_slots.limit = args.tenant_limit
+
+    print(f"Latência do modelo: {args.latency * 1000:.0f} ms, limite por agente: {args.agent_limit}")
+    print(f"{'conversas':>10} {'mensagens':>10} {'duração':>10} {'msg/s':>10} {'ideal':>10}")
+
+    for conversations in args.levels:
+        agent = StubModelAgent(
+            agent_id="carga",
+            config={"name": "Agente de Carga"},
+            latency=args.latency,
+            history_store=InMemoryHistoryStore(max_messages=2 * args.messages)
+        )
+        elapsed = await run_level(agent, conversations, args.messages)
+        check_order(agent, conversations, args.messages)
+
+        total = conversations * args.messages
+        ideal = min(conversations, args.agent_limit or conversations) / args.latency
+        print(f"{conversations:>10} {total:>10} {elapsed:>9.2f}s {total / elapsed:>10.0f} {ideal:>10.0f}")
+
+    print("Ordem das mensagens por conversa: ok")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga do LLMAgent.aprocess_message")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32], help="Conversas simultâneas")
+    parser.add_argument("--messages", type=int, default=20, help="Mensagens por conversa")
+    parser.add_argument("--latency", type=float, default=0.02, help="Latência do modelo simulado, em segundos")
+    parser.add_argument("--agent-limit", type=int, default=8, help="Limite de concorrência por agente")
+    parser.add_argument("--tenant-limit", type=int, default=32, help="Limite de concorrência por tenant")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    asyncio.run(main(args))
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+"""
+Teste de carga do recebimento de webhooks dos canais.
+
+Envia webhooks assinados do WhatsApp para a rota de recebimento (ASGI, no
+mesmo processo, sem rede), com uma fração de reenvios do mesmo evento, e
+mede a vazão, a latência das respostas e o tempo até os workers processarem
+todos os eventos. Usa a fila em memória e um banco SQLite em memória com a
+rota do número de teste, carregada no índice de rotas dos canais; o
+atendimento pelo agente é substituído por uma contagem, para medir apenas o
+recebimento, a deduplicação e o roteamento.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.api.integration_routes import router as integration_router
+from src.models.models import Agent, AgentChannelIntegration, Base, ChannelIntegration
+from src.services.channel_routing import ChannelRoutingIndex, RouteChangeNotifier
+from src.services.inbound_webhooks import InboundWorkerPool, InMemoryInboundQueue
+import src.services.inbound_webhooks as inbound_webhooks_module
+
+SECRET = "segredo-de-teste"
+PHONE_NUMBER_ID = "123456"
+
+class BenchmarkInboundWorkers(InboundWorkerPool):
+    """Workers que apenas contam as mensagens roteadas, sem acionar agentes."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.handled = 0
+    
+    async def handle_message(self, db, channel, message, route):
+        self.handled += 1
+
+def create_session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[Agent.__table__, ChannelIntegration.__table__, AgentChannelIntegration.__table__])
+    session_factory = sessionmaker(bind=engine)
+    
+    db = session_factory()
+    agent = Agent(client_id=1, name="Atendimento", description="Atendimento", agent_type="customer_service", configuration={}, instructions="", active=True)
+    db.add(agent)
+    integration = ChannelIntegration(client_id=1, channel_type="whatsapp", configuration={"phone_number_id": PHONE_NUMBER_ID})
+    db.add(integration)
+    db.flush()
+    db.add(AgentChannelIntegration(agent_id=agent.id, channel_integration_id=integration.id, configuration={}))
+    db.commit()
+    db.close()
+    return session_factory
+
+def webhook(index):
+    """Corpo e cabeçalhos de um webhook de mensagem do WhatsApp."""
+    body = json.dumps({
+        "object": "whatsapp_business_account",
+        "entry": [{"id": "1", "changes": [{"field": "messages", "value": {
+            "messaging_product": "whatsapp",
+            "metadata": {"phone_number_id": PHONE_NUMBER_ID},
+            "messages": [{
+                "id": f"wamid.{index}",
+                "from": f"55119{index % 10000:08d}",
+                "timestamp": str(int(time.time())),
+                "type": "text",
+                "text": {"body": "Olá, gostaria de saber mais sobre os planos"}
+            }]
+        }}]}]
+    }).encode("utf-8")
+    signature = "sha256=" + hmac.new(SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return body, {"X-Hub-Signature-256": signature, "Content-Type": "application/json"}
+
+async def main(args):
+    inbound_webhooks_module.WEBHOOK_SECRETS["whatsapp"] = SECRET
+    queue = InMemoryInboundQueue()
+    inbound_webhooks_module._inbound_queue = queue
+    
+    app = FastAPI()
+    app.include_router(integration_router)
+    session_factory = create_session_factory()
+    routes = ChannelRoutingIndex(notifier=RouteChangeNotifier())
+    db = session_factory()
+    routes.load(db)
+    db.close()
+    workers = BenchmarkInboundWorkers(queue=queue, session_factory=session_factory, routes=routes, workers=args.workers)
+    await workers.start()
+    
+    # Reenvios: uma fração dos webhooks repete um evento anterior
+    unique = int(args.count / (1 + args.duplicates))
+    indexes = list(range(unique)) + [random.randrange(unique) for _ in range(args.count - unique)]
+    random.shuffle(indexes)
+    requests = [webhook(index) for index in indexes]
+    
+    latencies = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest") as client:
+        async def send(body, headers):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/channels/webhooks/whatsapp", content=body, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(send(body, headers) for body, headers in requests))
+        ingest_elapsed = time.perf_counter() - start
+        
+        # Assinatura inválida é recusada
+        body, headers = requests[0]
+        rejected = await client.post("/channels/webhooks/whatsapp", content=body, headers={**headers, "X-Hub-Signature-256": "sha256=0"})
+    
+    while workers.counters["events"] < args.count:
+        await asyncio.sleep(0.01)
+    drain_elapsed = time.perf_counter() - start
+    await workers.stop()
+    
+    latencies.sort()
+    print(f"{args.count} webhooks ({unique} eventos distintos), {args.concurrency} requisições simultâneas, {args.workers} workers")
+    print(f"  recebimento: {ingest_elapsed:.2f}s  {args.count / ingest_elapsed:.0f} webhooks/s")
+    print(
+        f"  latência da resposta: p50 {statistics.median(latencies) * 1000:.2f} ms  "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms  máx {latencies[-1] * 1000:.2f} ms"
+    )
+    print(f"  processamento concluído em {drain_elapsed:.2f}s  {args.count / drain_elapsed:.0f} eventos/s")
+    print(f"  contadores: {workers.stats()}  atendidas: {workers.handled}")
+    print(f"  assinatura inválida: HTTP {rejected.status_code}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga do recebimento de webhooks")
+    parser.add_argument("--count", type=int, default=20000, help="Número de webhooks")
+    parser.add_argument("--concurrency", type=int, default=100, help="Requisições simultâneas")
+    parser.add_argument("--workers", type=int, default=4, help="Workers de processamento")
+    parser.add_argument("--duplicates", type=float, default=0.1, help="Fração de reenvios do provedor")
+    args = parser.parse_args()
+    
+    asyncio.run(main(args))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+"""
+Servidor local que simula as APIs de mensagens do WhatsApp e do LinkedIn.
+
+Responde em HTTP/1.1 com keep-alive, com latência configurável, e conta as
+conexões aceitas, para medir a reutilização de conexões pelos clientes:
+- POST /{phone_number_id}/messages: WhatsApp Business Cloud API
+- POST /messages: LinkedIn Messages API
+
+Uso:
+    python -m src.scripts.mock_channel_server --port 8081 --latency 0.005
+"""
+
+import argparse
+import asyncio
+import json
+import uuid
+
+class MockChannelServer:
+    """Servidor HTTP mínimo com as rotas de envio de mensagens dos canais."""
+    
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.connections = 0
+        self.requests = 0
+        self.server = None
+    
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Inicia o servidor e retorna a porta em uso."""
+        self.server = await asyncio.start_server(self._handle_connection, host, port, backlog=1024)
+        return self.server.sockets[0].getsockname()[1]
+    
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+    
+    async def _handle_connection(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                
+                status, extra_headers, payload = self._route(method, path, body)
+                data = json.dumps(payload).encode("utf-8")
+                head = [f"HTTP/1.1 {status}", "Content-Type: application/json", f"Content-Length: {len(data)}"]
+                head.extend(f"{name}: {value}" for name, value in extra_headers.items())
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+    
+    @staticmethod
+    def _route(method, path, body):
+        if method != "POST":
+            return "405 Method Not Allowed", {}, {"error": "method not allowed"}
+        if path == "/messages":
+            return "201 Created", {"x-restli-id": f"urn:li:message:{uuid.uuid4()}"}, {}
+        if path.endswith("/messages"):
+            return "200 OK", {}, {"messaging_product": "whatsapp", "messages": [{"id": f"wamid.{uuid.uuid4().hex}"}]}
+        return "404 Not Found", {}, {"error": "not found"}
+
+async def main(args):
+    server = MockChannelServer(args.latency)
+    port = await server.start(args.host, args.port)
+    print(f"Servidor simulado dos canais em http://{args.host}:{port}")
+    await server.server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor simulado das APIs do WhatsApp e do LinkedIn")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta")
+    parser.add_argument("--port", type=int, default=8081, help="Porta de escuta")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latência de cada resposta, em segundos")
+    args = parser.parse_args()
+    
+    asyncio.run(main(args))
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+"""
+Servidor SMTP local que simula o servidor de e-mail de uma integração.
+
+Aceita as mensagens sem entregá-las, anuncia PIPELINING e AUTH PLAIN, e
+conta conexões, autenticações e mensagens, para medir a reutilização de
+conexões pelo pool SMTP. A latência configurável é aplicada uma vez por
+round trip (a cada leitura do socket), como a latência de rede:
+- EHLO/HELO, AUTH PLAIN, MAIL FROM, RCPT TO, DATA, RSET, NOOP e QUIT
+
+Uso:
+    python -m src.scripts.mock_smtp_server --port 8025 --latency 0.002
+"""
+
+import argparse
+import asyncio
+
+class MockSmtpServer:
+    """Servidor SMTP mínimo, sem TLS, que descarta as mensagens recebidas."""
+    
+    def __init__(self, latency: float = 0.0, pipelining: bool = True, reject_domain: str = "rejected.invalid"):
+        """
+        Args:
+            latency: Atraso de cada round trip, em segundos
+            pipelining: Anunciar a extensão PIPELINING
+            reject_domain: Domínio cujos destinatários são recusados (550)
+        """
+        self.latency = latency
+        self.pipelining = pipelining
+        self.reject_domain = reject_domain
+        self.connections = 0
+        self.authentications = 0
+        self.messages = 0
+        self.server = None
+    
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Inicia o servidor e retorna a porta em uso."""
+        self.server = await asyncio.start_server(self._handle_connection, host, port, backlog=1024)
+        return self.server.sockets[0].getsockname()[1]
+    
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+    
+    async def _handle_connection(self, reader, writer):
+        self.connections += 1
+        session = {"data": None, "sender": None, "recipients": 0, "quit": False}
+        buffer = b""
+        try:
+            writer.write(b"220 mock.smtp.local ESMTP\r\n")
+            await writer.drain()
+            while not session["quit"]:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                buffer += chunk
+                
+                # Todas as linhas completas recebidas são respondidas juntas
+                replies = []
+                while b"\r\n" in buffer:
+                    line, buffer = buffer.split(b"\r\n", 1)
+                    reply = self._handle_line(session, line)
+                    if reply:
+                        replies.append(reply)
+                    if session["quit"]:
+                        break
+                
+                if replies:
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    writer.write("".join(f"{reply}\r\n" for reply in replies).encode("utf-8"))
+                    await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+    
+    def _handle_line(self, session, line: bytes):
+        """Processa uma linha e retorna a resposta (ou None durante o conteúdo de DATA)."""
+        if session["data"] is not None:
+            if line == b".":
+                session["data"] = None
+                session["sender"], session["recipients"] = None, 0
+                self.messages += 1
+                return "250 2.0.0 Ok: queued"
+            session["data"] += 1
+            return None
+        
+        command = line.decode("utf-8", "replace")
+        verb = command[:4].upper()
+        if verb in ("EHLO", "HELO"):
+            extensions = ["mock.smtp.local", "AUTH PLAIN", "8BITMIME", "SIZE 10485760"]
+            if self.pipelining:
+                extensions.append("PIPELINING")
+            return "\r\n".join(
+                f"250{'-' if index < len(extensions) - 1 else ' '}{extension}"
+                for index, extension in enumerate(extensions)
+            )
+        if verb == "AUTH":
+            self.authentications += 1
+            return "235 2.7.0 Authentication successful"
+        if verb == "MAIL":
+            session["sender"] = command[10:]
+            return "250 2.1.0 Ok"
+        if verb == "RCPT":
+            if session["sender"] is None:
+                return "503 5.5.1 Error: need MAIL command"
+            if command.rstrip(">").endswith(f"@{self.reject_domain}"):
+                return "550 5.1.1 Recipient address rejected"
+            session["recipients"] += 1
+            return "250 2.1.5 Ok"
+        if verb == "DATA":
+            if not session["recipients"]:
+                return "554 5.5.1 Error: no valid recipients"
+            session["data"] = 0
+            return "354 End data with <CR><LF>.<CR><LF>"
+        if verb == "RSET":
+            session["sender"], session["recipients"] = None, 0
+            return "250 2.0.0 Ok"
+        if verb == "NOOP":
+            return "250 2.0.0 Ok"
+        if verb == "QUIT":
+            session["quit"] = True
+            return "221 2.0.0 Bye"
+        return "502 5.5.2 Error: command not recognized"
+
+async def main(args):
+    server = MockSmtpServer(args.latency, pipelining=not args.no_pipelining)
+    port = await server.start(args.host, args.port)
+    print(f"Servidor SMTP simulado em {args.host}:{port}")
+    await server.server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor SMTP simulado")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta")
+    parser.add_argument("--port", type=int, default=8025, help="Porta de escuta")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latência de cada round trip, em segundos")
+    parser.add_argument("--no-pipelining", action="store_true", help="Não anunciar PIPELINING")
+    args = parser.parse_args()
+    
+    asyncio.run(main(args))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+"""
+Script para provisionar agentes em lote para várias análises organizacionais.
+
+Lê um arquivo JSON com uma lista de objetos {"analysis_id", "tenant_id",
+"user_id"} e insere todos os agentes e configurações com instruções
+multi-linha, em uma única transação.
+"""
+
+import os
+import sys
+import json
+import argparse
+
+# Adicionar diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.config.database import get_db
+from src.services.agent_generator import AgentGenerator
+
+def provision_agents(requests_file):
+    """Provisiona os agentes descritos no arquivo de solicitações."""
+    with open(requests_file, encoding="utf-8") as f:
+        provisioning_requests = json.load(f)
+    
+    db = next(get_db())
+    try:
+        generator = AgentGenerator(db_session=db)
+        return generator.provision_agents_bulk(provisioning_requests)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Provisionar agentes em lote")
+    parser.add_argument("requests_file", help="Arquivo JSON com as solicitações de provisionamento")
+    
+    args = parser.parse_args()
+    
+    result = provision_agents(args.requests_file)
+    
+    for analysis_id, agents in result.items():
+        print(f"Análise {analysis_id}: {len(agents)} agentes criados")
+    print(f"\nTotal: {sum(len(agents) for agents in result.values())} agentes")
@@ -7,12 +7,82 @@
 └─────────────────────────────────────────────────────────────────────────────┘
 """
 
-from typing import Dict, Any, Optional
+from importlib.metadata import entry_points
+from typing import Dict, List, Any, Iterable, Tuple, Type, Union
 import importlib
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Grupo de entry points para tipos de agentes fornecidos por plugins
+AGENT_TYPES_ENTRY_POINT_GROUP = "nowgo_agents.agent_types"
+
+# Tipos de agentes nativos (nome → módulo)
+BUILTIN_AGENT_TYPES = {
+    "LLMAgent": "src.services.adk.custom_agents.llm_agent",
+    "WorkflowAgent": "src.services.adk.custom_agents.workflow_agent",
+    # Outros tipos de agentes podem ser adicionados aqui
+}
+
+# Classes de agentes resolvidas, compartilhadas por todos os construtores
+_agent_classes: Dict[str, Type] = {}
+_agent_classes_lock = threading.RLock()
+_plugins_loaded = False
+
+def register_agent_type(agent_type: str, agent_class: Union[Type, str]) -> Type:
+    """
+    Registra um tipo de agente.
+    
+    Args:
+        agent_type: Nome do tipo de agente
+        agent_class: Classe do agente ou caminho "modulo:Classe"
+    
+    Returns:
+        Classe registrada
+    """
+    if isinstance(agent_class, str):
+        module_path, _, class_name = agent_class.partition(":")
+        agent_class = getattr(importlib.import_module(module_path), class_name or agent_type)
+    
+    with _agent_classes_lock:
+        _agent_classes[agent_type] = agent_class
+    
+    return agent_class
+
+def load_agent_plugins() -> Dict[str, Type]:
+    """
+    Resolve os tipos nativos e descobre tipos de agentes de plugins.
+    
+    Os plugins são declarados como entry points no grupo
+    `nowgo_agents.agent_types`, por exemplo em um pyproject.toml:
+        
+        [project.entry-points."nowgo_agents.agent_types"]
+        CrmAgent = "meu_pacote.agentes:CrmAgent"
+    
+    A descoberta é feita uma única vez por processo.
+    
+    Returns:
+        Tipos de agentes registrados
+    """
+    global _plugins_loaded
+    
+    with _agent_classes_lock:
+        if not _plugins_loaded:
+            for agent_type, module_path in BUILTIN_AGENT_TYPES.items():
+                register_agent_type(agent_type, f"{module_path}:{agent_type}")
+            
+            for entry_point in entry_points(group=AGENT_TYPES_ENTRY_POINT_GROUP):
+                try:
+                    register_agent_type(entry_point.name, entry_point.load())
+                    logger.info(f"Tipo de agente '{entry_point.name}' carregado do plugin {entry_point.value}")
+                except Exception as e:
+                    logger.error(f"Erro ao carregar plugin de agente '{entry_point.name}': {str(e)}")
+            
+            _plugins_loaded = True
+        
+        return dict(_agent_classes)
+
 class AgentBuilder:
     """
     Construtor de agentes que cria instâncias de diferentes tipos de agentes
@@ -21,43 +91,69 @@ class AgentBuilder:
     
     def __init__(self):
         """Inicializa o construtor de agentes."""
-        self.agent_types = {
-            "LLMAgent": "src.services.adk.custom_agents.llm_agent",
-            "WorkflowAgent": "src.services.adk.custom_agents.workflow_agent",
-            # Outros tipos de agentes podem ser adicionados aqui
-        }
+        self.agent_types = load_agent_plugins()
+    
+    def resolve_agent_class(self, agent_type: Union[str, Type]) -> Type:
+        """
+        Obtém a classe de um tipo de agente.
+        
+        Args:
+            agent_type: Nome do tipo de agente ou a própria classe
+        
+        Returns:
+            Classe do agente
+        """
+        if isinstance(agent_type, type):
+            return agent_type
+        
+        agent_class = self.agent_types.get(agent_type) or _agent_classes.get(agent_type)
+        if agent_class is None:
+            raise ValueError(f"Tipo de agente não suportado: {agent_type}")
+        
+        return agent_class
     
-    def build_agent(self, agent_id: str, agent_type: str, config: Dict[str, Any]) -> Any:
+    def build_agent(self, agent_id: str, agent_type: Union[str, Type], config: Dict[str, Any]) -> Any:
         """
         Constrói um agente do tipo especificado com a configuração fornecida.
         
         Args:
             agent_id: ID único do agente
-            agent_type: Tipo do agente a ser construído
+            agent_type: Tipo do agente a ser construído (nome ou classe)
             config: Configuração do agente
-            
+        
         Returns:
             Instância do agente construído
         """
-        # Verificar se o tipo de agente é suportado
-        if agent_type not in self.agent_types:
-            raise ValueError(f"Tipo de agente não suportado: {agent_type}")
+        agent_class = self.resolve_agent_class(agent_type)
         
-        try:
-            # Importar dinamicamente o módulo do agente
-            module_path = self.agent_types[agent_type]
-            module = importlib.import_module(module_path)
-            
-            # Obter a classe do agente
-            agent_class = getattr(module, agent_type)
-            
-            # Instanciar o agente com a configuração fornecida
-            agent_instance = agent_class(agent_id=agent_id, config=config)
-            
-            logger.info(f"Agente {agent_type} construído com sucesso, ID: {agent_id}")
-            
-            return agent_instance
-            
-        except (ImportError, AttributeError) as e:
-            logger.error(f"Erro ao construir agente {agent_type}: {str(e)}")
-            raise
+        # Instanciar o agente com a configuração fornecida
+        agent_instance = agent_class(agent_id=agent_id, config=config)
+        
+        logger.info(f"Agente {agent_class.__name__} construído com sucesso, ID: {agent_id}")
+        
+        return agent_instance
+    
+    def build_many(self, agent_specs: Iterable[Tuple[str, Union[str, Type], Dict[str, Any]]]) -> List[Any]:
+        """
+        Constrói um lote de agentes.
+        
+        Cada tipo é resolvido uma única vez para todo o lote.
+        
+        Args:
+            agent_specs: Tuplas (agent_id, agent_type, config)
+        
+        Returns:
+            Instâncias dos agentes, na mesma ordem de `agent_specs`
+        """
+        classes: Dict[Any, Type] = {}
+        agents = []
+        
+        for agent_id, agent_type, config in agent_specs:
+            agent_class = classes.get(agent_type)
+            if agent_class is None:
+                agent_class = classes[agent_type] = self.resolve_agent_class(agent_type)
+            agents.append(agent_class(agent_id=agent_id, config=config))
+        
+        logger.info(f"{len(agents)} agentes construídos em lote")
+        
+        return agents
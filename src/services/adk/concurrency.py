@@ -0,0 +1,88 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Controle de Concorrência dos Agentes                                        │
+│                                                                             │
+│ Este módulo implementa travas e semáforos indexados por chave, usados para  │
+│ serializar mensagens de uma mesma conversa e limitar o processamento        │
+│ simultâneo por agente, por tenant e de chamadas aos modelos.                │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any, Hashable, Optional
+import asyncio
+import os
+
+# Limites de processamento simultâneo (0 desativa o limite)
+AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "8"))
+TENANT_MAX_CONCURRENCY = int(os.getenv("TENANT_MAX_CONCURRENCY", "32"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+class KeyedSemaphore:
+    """
+    Semáforos criados sob demanda para cada chave.
+    
+    Cada chave admite até `limit` portadores simultâneos; os semáforos são
+    descartados quando não há portadores nem tarefas aguardando, de modo que
+    chaves inativas não ocupam memória. Deve ser usado por um único event loop.
+    """
+    
+    def __init__(self, limit: int):
+        """
+        Inicializa os semáforos.
+        
+        Args:
+            limit: Número máximo de portadores simultâneos por chave (0 = sem limite)
+        """
+        self.limit = limit
+        self._entries: Dict[Hashable, List[Any]] = {}
+    
+    @asynccontextmanager
+    async def hold(self, key: Optional[Hashable]):
+        """
+        Ocupa uma vaga da chave enquanto o bloco é executado.
+        
+        Args:
+            key: Chave do recurso; None ou limite 0 não impõem espera
+        """
+        if key is None or self.limit <= 0:
+            yield
+            return
+        
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [asyncio.Semaphore(self.limit), 0]
+        entry[1] += 1
+        
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._entries[key]
+    
+    def in_use(self, key: Hashable) -> int:
+        """
+        Retorna o número de tarefas que ocupam ou aguardam a chave.
+        
+        Args:
+            key: Chave do recurso
+        
+        Returns:
+            Número de portadores e tarefas em espera
+        """
+        entry = self._entries.get(key)
+        return entry[1] if entry else 0
+
+class KeyedLock(KeyedSemaphore):
+    """Travas exclusivas criadas sob demanda para cada chave."""
+    
+    def __init__(self):
+        super().__init__(limit=1)
+
+# Controles compartilhados pelo processo
+conversation_locks = KeyedLock()
+agent_slots = KeyedSemaphore(AGENT_MAX_CONCURRENCY)
+tenant_slots = KeyedSemaphore(TENANT_MAX_CONCURRENCY)
+llm_slots = KeyedSemaphore(LLM_MAX_CONCURRENCY)
@@ -0,0 +1,292 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Histórico de Conversas dos Agentes                                          │
+│                                                                             │
+│ Este módulo implementa armazenamentos limitados para o histórico de         │
+│ conversas dos agentes: um buffer circular em memória, com limite de memória │
+│ por agente, e listas limitadas com expiração no Redis.                      │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Dict, List, Any, Optional
+import json
+import logging
+import os
+import sys
+import threading
+
+from src.config.redis_config import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Configuração do histórico de conversas
+CONVERSATION_HISTORY_BACKEND = os.getenv("CONVERSATION_HISTORY_BACKEND", "memory")
+CONVERSATION_HISTORY_MAX_MESSAGES = int(os.getenv("CONVERSATION_HISTORY_MAX_MESSAGES", "50"))
+CONVERSATION_HISTORY_MAX_AGENT_MB = int(os.getenv("CONVERSATION_HISTORY_MAX_AGENT_MB", "16"))
+CONVERSATION_HISTORY_TTL = int(os.getenv("CONVERSATION_HISTORY_TTL", "604800"))
+CONVERSATION_HISTORY_PREFIX = "nowgo:history:"
+
+class HistoryMessage:
+    """Mensagem do histórico de conversa."""
+    
+    __slots__ = ("role", "content", "timestamp", "size")
+    
+    def __init__(self, role: str, content: str, timestamp: Any = None):
+        self.role = role
+        self.content = content
+        self.timestamp = timestamp
+        self.size = sys.getsizeof(self) + sys.getsizeof(content) + sys.getsizeof(timestamp)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte a mensagem para o formato retornado pelos agentes."""
+        return {
+            "role": self.role,
+            "content": self.content,
+            "timestamp": self.timestamp
+        }
+
+class ConversationHistoryStore(ABC):
+    """
+    Interface dos armazenamentos de histórico de conversas.
+    
+    As conversas são identificadas por (agent_id, user_id). Armazenamentos
+    com `performs_io` verdadeiro fazem E/S bloqueante e são chamados em uma
+    thread pelos caminhos assíncronos dos agentes.
+    """
+    
+    performs_io = False
+    
+    @abstractmethod
+    def append(self, agent_id: str, user_id: str, role: str, content: str, timestamp: Any = None) -> None:
+        """
+        Registra uma mensagem no histórico.
+        
+        Args:
+            agent_id: ID do agente
+            user_id: ID do usuário
+            role: Papel do autor da mensagem ("user" ou "assistant")
+            content: Conteúdo da mensagem
+            timestamp: Momento da mensagem
+        """
+    
+    @abstractmethod
+    def get(self, agent_id: str, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Obtém as mensagens mais recentes de uma conversa, em ordem cronológica.
+        
+        Args:
+            agent_id: ID do agente
+            user_id: ID do usuário
+            limit: Número máximo de mensagens a retornar
+        
+        Returns:
+            Lista de mensagens
+        """
+    
+    @abstractmethod
+    def clear(self, agent_id: str, user_id: str) -> None:
+        """
+        Limpa o histórico de uma conversa.
+        
+        Args:
+            agent_id: ID do agente
+            user_id: ID do usuário
+        """
+
+class _AgentHistory:
+    """Conversas de um agente, da menos para a mais recentemente ativa."""
+    
+    __slots__ = ("conversations", "size")
+    
+    def __init__(self):
+        self.conversations: "OrderedDict[str, deque]" = OrderedDict()
+        self.size = 0
+
+class InMemoryHistoryStore(ConversationHistoryStore):
+    """
+    Histórico de conversas em memória.
+    
+    Esta classe implementa:
+    1. Um buffer circular por conversa, com as mensagens mais recentes
+    2. Registros compactos de mensagens (`__slots__`)
+    3. Um limite de memória por agente; ao excedê-lo, são descartadas as
+       mensagens mais antigas das conversas menos recentemente ativas
+    """
+    
+    def __init__(
+        self,
+        max_messages: int = CONVERSATION_HISTORY_MAX_MESSAGES,
+        max_bytes_per_agent: int = CONVERSATION_HISTORY_MAX_AGENT_MB * 1024 * 1024
+    ):
+        """
+        Inicializa o armazenamento.
+        
+        Args:
+            max_messages: Número máximo de mensagens mantidas por conversa
+            max_bytes_per_agent: Memória estimada máxima do histórico de cada agente
+        """
+        self.max_messages = max_messages
+        self.max_bytes_per_agent = max_bytes_per_agent
+        self._agents: Dict[str, _AgentHistory] = {}
+        self._lock = threading.Lock()
+    
+    def append(self, agent_id: str, user_id: str, role: str, content: str, timestamp: Any = None) -> None:
+        message = HistoryMessage(role, content, timestamp)
+        
+        with self._lock:
+            history = self._agents.get(agent_id)
+            if history is None:
+                history = self._agents[agent_id] = _AgentHistory()
+            
+            conversation = history.conversations.get(user_id)
+            if conversation is None:
+                conversation = history.conversations[user_id] = deque(maxlen=self.max_messages)
+            history.conversations.move_to_end(user_id)
+            
+            # O buffer descarta a mensagem mais antiga ao atingir o limite
+            if len(conversation) == conversation.maxlen:
+                history.size -= conversation[0].size
+            conversation.append(message)
+            history.size += message.size
+            
+            while history.size > self.max_bytes_per_agent and history.conversations:
+                oldest_user_id, oldest = next(iter(history.conversations.items()))
+                history.size -= oldest.popleft().size
+                if not oldest:
+                    del history.conversations[oldest_user_id]
+    
+    def get(self, agent_id: str, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        with self._lock:
+            history = self._agents.get(agent_id)
+            conversation = history.conversations.get(user_id) if history else None
+            if not conversation or limit <= 0:
+                return []
+            # Percorrer a partir do fim do buffer: O(limit)
+            messages = list(islice(reversed(conversation), limit))
+        
+        return [message.to_dict() for message in reversed(messages)]
+    
+    def clear(self, agent_id: str, user_id: str) -> None:
+        with self._lock:
+            history = self._agents.get(agent_id)
+            conversation = history.conversations.pop(user_id, None) if history else None
+            if conversation:
+                history.size -= sum(message.size for message in conversation)
+            if history is not None and not history.conversations:
+                del self._agents[agent_id]
+    
+    def memory_usage(self, agent_id: str) -> int:
+        """
+        Retorna a memória estimada do histórico de um agente.
+        
+        Args:
+            agent_id: ID do agente
+        
+        Returns:
+            Tamanho estimado em bytes
+        """
+        with self._lock:
+            history = self._agents.get(agent_id)
+            return history.size if history else 0
+
+class RedisHistoryStore(ConversationHistoryStore):
+    """
+    Histórico de conversas no Redis.
+    
+    Cada conversa é uma lista limitada (RPUSH + LTRIM) com expiração renovada
+    a cada mensagem; as leituras usam LRANGE a partir do fim da lista.
+    Falhas do Redis são registradas sem interromper o atendimento.
+    """
+    
+    performs_io = True
+    
+    def __init__(
+        self,
+        redis_client=None,
+        max_messages: int = CONVERSATION_HISTORY_MAX_MESSAGES,
+        ttl: int = CONVERSATION_HISTORY_TTL
+    ):
+        """
+        Inicializa o armazenamento.
+        
+        Args:
+            redis_client: Cliente Redis (por padrão, o cliente configurado em redis_config)
+            max_messages: Número máximo de mensagens mantidas por conversa
+            ttl: Tempo de expiração das conversas inativas, em segundos
+        """
+        self._redis_client = redis_client
+        self.max_messages = max_messages
+        self.ttl = ttl
+    
+    @property
+    def redis_client(self):
+        """Cliente Redis usado para armazenar o histórico."""
+        if self._redis_client is None:
+            self._redis_client = get_redis_client()
+        return self._redis_client
+    
+    @staticmethod
+    def _key(agent_id: str, user_id: str) -> str:
+        return f"{CONVERSATION_HISTORY_PREFIX}{agent_id}:{user_id}"
+    
+    def append(self, agent_id: str, user_id: str, role: str, content: str, timestamp: Any = None) -> None:
+        key = self._key(agent_id, user_id)
+        record = json.dumps(
+            {"role": role, "content": content, "timestamp": timestamp},
+            ensure_ascii=False,
+            default=str
+        )
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            pipeline.rpush(key, record)
+            pipeline.ltrim(key, -self.max_messages, -1)
+            pipeline.expire(key, self.ttl)
+            pipeline.execute()
+        except Exception as e:
+            logger.error(f"Erro ao gravar histórico de conversa no Redis: {str(e)}")
+    
+    def get(self, agent_id: str, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        if limit <= 0:
+            return []
+        try:
+            records = self.redis_client.lrange(self._key(agent_id, user_id), -limit, -1)
+        except Exception as e:
+            logger.error(f"Erro ao consultar histórico de conversa no Redis: {str(e)}")
+            return []
+        return [json.loads(record) for record in records]
+    
+    def clear(self, agent_id: str, user_id: str) -> None:
+        try:
+            self.redis_client.delete(self._key(agent_id, user_id))
+        except Exception as e:
+            logger.error(f"Erro ao limpar histórico de conversa no Redis: {str(e)}")
+
+# Armazenamentos disponíveis
+HISTORY_BACKENDS = {
+    "memory": InMemoryHistoryStore,
+    "redis": RedisHistoryStore
+}
+
+_history_store: Optional[ConversationHistoryStore] = None
+_history_store_lock = threading.Lock()
+
+def get_history_store() -> ConversationHistoryStore:
+    """
+    Retorna o armazenamento de histórico compartilhado pelo processo.
+    
+    O tipo de armazenamento é definido por CONVERSATION_HISTORY_BACKEND.
+    
+    Returns:
+        Armazenamento de histórico de conversas
+    """
+    global _history_store
+    
+    with _history_store_lock:
+        if _history_store is None:
+            if CONVERSATION_HISTORY_BACKEND not in HISTORY_BACKENDS:
+                raise ValueError(f"Armazenamento de histórico não suportado: {CONVERSATION_HISTORY_BACKEND}")
+            _history_store = HISTORY_BACKENDS[CONVERSATION_HISTORY_BACKEND]()
+        return _history_store
@@ -7,9 +7,14 @@
 └─────────────────────────────────────────────────────────────────────────────┘
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, AsyncIterator, Optional
+import asyncio
 import json
 import logging
+import re
+
+from src.services.adk.concurrency import agent_slots, conversation_locks, tenant_slots
+from src.services.adk.conversation_history import ConversationHistoryStore, get_history_store
 
 logger = logging.getLogger(__name__)
 
@@ -19,13 +24,14 @@ class LLMAgent:
     de linguagem natural e interações conversacionais.
     """
     
-    def __init__(self, agent_id: str, config: Dict[str, Any]):
+    def __init__(self, agent_id: str, config: Dict[str, Any], history_store: Optional[ConversationHistoryStore] = None):
         """
         Inicializa o agente LLM.
         
         Args:
             agent_id: ID único do agente
             config: Configuração do agente
+            history_store: Armazenamento do histórico de conversas (por padrão, o do processo)
         """
         self.agent_id = agent_id
         self.config = config
@@ -38,8 +44,8 @@ class LLMAgent:
         self.integrations = config.get("integrations", {})
         self.metadata = config.get("metadata", {})
         
-        # Inicializar histórico de conversas
-        self.conversation_history = {}
+        # Histórico de conversas, mantido fora da instância
+        self.history_store = history_store or get_history_store()
         
         logger.info(f"Agente LLM '{self.name}' inicializado com ID {agent_id}")
     
@@ -54,48 +60,176 @@ class LLMAgent:
         Returns:
             Resposta processada
         """
-        # Implementação simplificada para demonstração
-        # Em um ambiente real, aqui seria feita a chamada ao modelo LLM
-        
         user_id = message.get("user_id", "unknown")
-        content = message.get("content", "")
-        channel = message.get("channel", "default")
-        language = message.get("language", "pt")
         
         # Atualizar histórico de conversa
-        if user_id not in self.conversation_history:
-            self.conversation_history[user_id] = []
-        
-        self.conversation_history[user_id].append({
-            "role": "user",
-            "content": content,
-            "timestamp": message.get("timestamp")
-        })
+        self.history_store.append(self.agent_id, user_id, "user", message.get("content", ""), message.get("timestamp"))
         
-        # Gerar resposta (simulação)
-        response_content = f"Resposta simulada do agente {self.name} para: {content}"
+        # Gerar resposta
+        response_content = self._generate_response(message, context)
         
         # Registrar resposta no histórico
-        self.conversation_history[user_id].append({
-            "role": "assistant",
-            "content": response_content,
-            "timestamp": message.get("timestamp")
-        })
+        self.history_store.append(self.agent_id, user_id, "assistant", response_content, message.get("timestamp"))
+        
+        return self._build_response(message, response_content)
+    
+    async def aprocess_message(self, message: Dict[str, Any], context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Processa uma mensagem recebida de forma assíncrona.
+        
+        Mensagens de uma mesma conversa (agente e usuário) são processadas em
+        ordem, uma de cada vez; conversas distintas são processadas em paralelo,
+        limitadas por AGENT_MAX_CONCURRENCY por agente e por
+        TENANT_MAX_CONCURRENCY por tenant (`context["tenant_id"]`).
+        
+        Args:
+            message: Mensagem a ser processada
+            context: Contexto adicional para processamento
+            
+        Returns:
+            Resposta processada
+        """
+        user_id = message.get("user_id", "unknown")
+        tenant_id = (context or {}).get("tenant_id")
+        
+        # A trava da conversa é obtida antes das vagas, para que mensagens
+        # enfileiradas de uma conversa não ocupem vagas do agente ou do tenant
+        async with conversation_locks.hold((self.agent_id, user_id)):
+            async with tenant_slots.hold(tenant_id), agent_slots.hold(self.agent_id):
+                await self._ahistory(
+                    self.history_store.append,
+                    self.agent_id, user_id, "user", message.get("content", ""), message.get("timestamp")
+                )
+                
+                response_content = await self._agenerate_response(message, context)
+                
+                await self._ahistory(
+                    self.history_store.append,
+                    self.agent_id, user_id, "assistant", response_content, message.get("timestamp")
+                )
+        
+        return self._build_response(message, response_content)
+    
+    async def astream_message(self, message: Dict[str, Any], context: Dict[str, Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Processa uma mensagem recebida, produzindo a resposta à medida que é gerada.
+        
+        Usa as mesmas travas e limites de `aprocess_message`, mantidos até o
+        fim do streaming. Os eventos produzidos são:
+            {"type": "step", "node": "generate", "status": "start" | "end"}
+            {"type": "token", "content": "..."}
+            {"type": "done", "response": {...}}  # resposta de `aprocess_message`
+        
+        A resposta só é registrada no histórico quando concluída; se o
+        consumidor encerrar o iterador antes, apenas a mensagem do usuário
+        permanece no histórico.
+        
+        Args:
+            message: Mensagem a ser processada
+            context: Contexto adicional para processamento
+            
+        Returns:
+            Iterador assíncrono de eventos
+        """
+        user_id = message.get("user_id", "unknown")
+        tenant_id = (context or {}).get("tenant_id")
+        
+        async with conversation_locks.hold((self.agent_id, user_id)):
+            async with tenant_slots.hold(tenant_id), agent_slots.hold(self.agent_id):
+                await self._ahistory(
+                    self.history_store.append,
+                    self.agent_id, user_id, "user", message.get("content", ""), message.get("timestamp")
+                )
+                
+                yield {"type": "step", "node": "generate", "status": "start"}
+                chunks = []
+                async for chunk in self._astream_response(message, context):
+                    chunks.append(chunk)
+                    yield {"type": "token", "content": chunk}
+                response_content = "".join(chunks)
+                yield {"type": "step", "node": "generate", "status": "end"}
+                
+                await self._ahistory(
+                    self.history_store.append,
+                    self.agent_id, user_id, "assistant", response_content, message.get("timestamp")
+                )
         
-        # Construir resposta
-        response = {
+        yield {"type": "done", "response": self._build_response(message, response_content)}
+    
+    def _generate_response(self, message: Dict[str, Any], context: Dict[str, Any] = None) -> str:
+        """
+        Gera o conteúdo da resposta para uma mensagem.
+        
+        Args:
+            message: Mensagem a ser respondida
+            context: Contexto adicional para processamento
+            
+        Returns:
+            Conteúdo da resposta
+        """
+        # Implementação simplificada para demonstração
+        # Em um ambiente real, aqui seria feita a chamada ao modelo LLM
+        return f"Resposta simulada do agente {self.name} para: {message.get('content', '')}"
+    
+    async def _agenerate_response(self, message: Dict[str, Any], context: Dict[str, Any] = None) -> str:
+        """
+        Gera o conteúdo da resposta sem bloquear o event loop.
+        
+        Args:
+            message: Mensagem a ser respondida
+            context: Contexto adicional para processamento
+            
+        Returns:
+            Conteúdo da resposta
+        """
+        # Em um ambiente real, aqui seria feita a chamada assíncrona ao modelo LLM
+        return self._generate_response(message, context)
+    
+    async def _astream_response(self, message: Dict[str, Any], context: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """
+        Gera o conteúdo da resposta em partes, à medida que o modelo as produz.
+        
+        Args:
+            message: Mensagem a ser respondida
+            context: Contexto adicional para processamento
+            
+        Returns:
+            Iterador assíncrono de partes da resposta
+        """
+        # Em um ambiente real, aqui seriam lidos os tokens do streaming do modelo LLM;
+        # a resposta simulada é dividida em palavras
+        response_content = await self._agenerate_response(message, context)
+        for chunk in re.findall(r"\S+\s*|\s+", response_content):
+            yield chunk
+    
+    async def _ahistory(self, operation, *args):
+        """Executa uma operação do histórico, em uma thread se o armazenamento fizer E/S."""
+        if self.history_store.performs_io:
+            return await asyncio.to_thread(operation, *args)
+        return operation(*args)
+    
+    def _build_response(self, message: Dict[str, Any], response_content: str) -> Dict[str, Any]:
+        """
+        Monta a resposta retornada ao canal.
+        
+        Args:
+            message: Mensagem processada
+            response_content: Conteúdo gerado para a resposta
+            
+        Returns:
+            Resposta processada
+        """
+        return {
             "agent_id": self.agent_id,
-            "user_id": user_id,
+            "user_id": message.get("user_id", "unknown"),
             "content": response_content,
-            "channel": channel,
-            "language": language,
+            "channel": message.get("channel", "default"),
+            "language": message.get("language", "pt"),
             "metadata": {
                 "model": self.model,
                 "processed_at": message.get("timestamp")
             }
         }
-        
-        return response
     
     def get_conversation_history(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -108,10 +242,7 @@ class LLMAgent:
         Returns:
             Lista de mensagens do histórico de conversa
         """
-        if user_id not in self.conversation_history:
-            return []
-        
-        return self.conversation_history[user_id][-limit:]
+        return self.history_store.get(self.agent_id, user_id, limit)
     
     def clear_conversation_history(self, user_id: str) -> None:
         """
@@ -120,5 +251,4 @@ class LLMAgent:
         Args:
             user_id: ID do usuário
         """
-        if user_id in self.conversation_history:
-            self.conversation_history[user_id] = []
+        self.history_store.clear(self.agent_id, user_id)
@@ -11,34 +11,52 @@ from typing import Dict, List, Any, Optional
 import json
 import logging
 
+from src.services.adk.workflow_compiler import DEFAULT_WORKFLOW, compile_workflow
+from src.services.adk.workflow_state import (
+    WorkflowConflictError,
+    WorkflowStateStore,
+    apply_workflow_event,
+    get_workflow_state_store
+)
+
 logger = logging.getLogger(__name__)
 
+# Tentativas de avançar um fluxo alterado concorrentemente por outro processo
+WORKFLOW_CONFLICT_RETRIES = 5
+
 class WorkflowAgent:
     """
     Agente baseado em fluxos de trabalho para automação de processos
     e tarefas sequenciais.
     """
     
-    def __init__(self, agent_id: str, config: Dict[str, Any]):
+    def __init__(self, agent_id: str, config: Dict[str, Any], state_store: Optional[WorkflowStateStore] = None):
         """
         Inicializa o agente de fluxo de trabalho.
         
         Args:
             agent_id: ID único do agente
             config: Configuração do agente
+            state_store: Armazenamento do estado dos fluxos (por padrão, o do processo)
+            
+        Raises:
+            WorkflowValidationError: Se a definição do fluxo de trabalho for inválida
         """
         self.agent_id = agent_id
         self.config = config
         self.name = config.get("name", "Agente de Fluxo de Trabalho")
         self.description = config.get("description", "")
-        self.workflow = config.get("workflow", {})
+        self.workflow = config.get("workflow") or DEFAULT_WORKFLOW
         self.channels = config.get("channels", {})
         self.languages = config.get("languages", {})
         self.integrations = config.get("integrations", {})
         self.metadata = config.get("metadata", {})
         
-        # Inicializar estado dos fluxos de trabalho
-        self.workflow_states = {}
+        # Compilar o fluxo de trabalho uma única vez, validando a definição
+        self.compiled_workflow = compile_workflow(self.workflow)
+        
+        # Estado dos fluxos de trabalho, persistido fora da instância
+        self.state_store = state_store or get_workflow_state_store()
         
         logger.info(f"Agente de Fluxo de Trabalho '{self.name}' inicializado com ID {agent_id}")
     
@@ -53,77 +71,108 @@ class WorkflowAgent:
         Returns:
             Resultado do processamento do evento
         """
-        # Implementação simplificada para demonstração
-        # Em um ambiente real, aqui seria feita a execução do fluxo de trabalho
-        
         workflow_id = event.get("workflow_id", "default")
         event_type = event.get("type", "unknown")
         payload = event.get("payload", {})
         
-        # Inicializar estado do fluxo de trabalho se não existir
-        if workflow_id not in self.workflow_states:
-            self.workflow_states[workflow_id] = {
-                "current_step": "start",
-                "data": {},
-                "history": []
+        # Concorrência otimista: em caso de conflito, reler o estado e tentar novamente
+        for attempt in range(WORKFLOW_CONFLICT_RETRIES):
+            current_state, version = self.state_store.load(self.agent_id, workflow_id)
+            if current_state is None:
+                current_state = self._initial_state()
+            
+            # Avançar o fluxo de trabalho pela tabela de transições
+            data = dict(current_state["data"])
+            previous_step = current_state["current_step"]
+            next_step = self._get_next_step(previous_step, event_type, data, payload)
+            
+            # Atualizar dados do fluxo de trabalho
+            data.update(payload)
+            
+            # Registrar apenas as alterações nos dados
+            workflow_event = {
+                "from": previous_step,
+                "to": next_step,
+                "event_type": event_type,
+                "data": {
+                    key: value for key, value in data.items()
+                    if key not in current_state["data"] or current_state["data"][key] != value
+                },
+                "timestamp": event.get("timestamp")
             }
-        
-        # Obter estado atual
-        current_state = self.workflow_states[workflow_id]
-        
-        # Registrar evento no histórico
-        current_state["history"].append({
-            "step": current_state["current_step"],
-            "event_type": event_type,
-            "timestamp": event.get("timestamp")
-        })
-        
-        # Simular avanço do fluxo de trabalho
-        next_step = self._get_next_step(current_state["current_step"], event_type)
-        current_state["current_step"] = next_step
-        
-        # Atualizar dados do fluxo de trabalho
-        current_state["data"].update(payload)
+            new_state = apply_workflow_event(current_state, workflow_event, self.state_store.history_limit)
+            
+            try:
+                self.state_store.append(self.agent_id, workflow_id, version, workflow_event, new_state)
+                break
+            except WorkflowConflictError:
+                logger.warning(f"Conflito ao avançar o fluxo {workflow_id} (tentativa {attempt + 1})")
+        else:
+            raise WorkflowConflictError(f"Fluxo {workflow_id} alterado concorrentemente; evento não aplicado")
         
         # Construir resposta
         response = {
             "agent_id": self.agent_id,
             "workflow_id": workflow_id,
-            "previous_step": current_state["history"][-1]["step"],
-            "current_step": current_state["current_step"],
-            "status": "in_progress" if next_step != "end" else "completed",
-            "data": current_state["data"],
+            "previous_step": previous_step,
+            "current_step": next_step,
+            "status": "completed" if self.compiled_workflow.is_final(self.compiled_workflow.state_index[next_step]) else "in_progress",
+            "data": new_state["data"],
             "metadata": {
                 "processed_at": event.get("timestamp"),
-                "steps_completed": len(current_state["history"])
+                "steps_completed": new_state["steps_completed"]
             }
         }
         
         return response
     
-    def _get_next_step(self, current_step: str, event_type: str) -> str:
+    def _get_next_step(
+        self,
+        current_step: str,
+        event_type: str,
+        data: Optional[Dict[str, Any]] = None,
+        payload: Optional[Dict[str, Any]] = None
+    ) -> str:
         """
         Determina o próximo passo do fluxo de trabalho com base no passo atual e tipo de evento.
         
+        Um passo que não existe na definição atual do fluxo (persistido antes de
+        uma alteração da configuração) é tratado como o passo inicial.
+        
         Args:
             current_step: Passo atual do fluxo de trabalho
             event_type: Tipo de evento recebido
+            data: Dados acumulados do fluxo de trabalho
+            payload: Dados do evento
             
         Returns:
             Próximo passo do fluxo de trabalho
         """
-        # Implementação simplificada para demonstração
-        # Em um ambiente real, aqui seria consultada a definição do fluxo de trabalho
-        
-        # Exemplo de fluxo simples: start -> process -> validate -> end
-        step_transitions = {
-            "start": "process",
-            "process": "validate",
-            "validate": "end",
-            "end": "end"
+        workflow = self.compiled_workflow
+        state = workflow.state_index.get(current_step)
+        if state is None:
+            # Passo persistido por uma versão anterior da definição do fluxo
+            logger.warning(
+                f"Passo '{current_step}' não existe no fluxo do agente {self.agent_id}; "
+                f"reiniciando em '{workflow.states[workflow.initial]}'"
+            )
+            state = workflow.initial
+        next_state = workflow.dispatch(
+            state,
+            event_type,
+            data if data is not None else {},
+            payload or {}
+        )
+        return workflow.states[next_state]
+    
+    def _initial_state(self) -> Dict[str, Any]:
+        """Estado de um fluxo de trabalho recém-iniciado."""
+        return {
+            "current_step": self.compiled_workflow.states[self.compiled_workflow.initial],
+            "data": {},
+            "history": [],
+            "steps_completed": 0
         }
-        
-        return step_transitions.get(current_step, "end")
     
     def get_workflow_state(self, workflow_id: str) -> Dict[str, Any]:
         """
@@ -135,11 +184,12 @@ class WorkflowAgent:
         Returns:
             Estado atual do fluxo de trabalho
         """
-        return self.workflow_states.get(workflow_id, {
+        state, _ = self.state_store.load(self.agent_id, workflow_id)
+        return state or {
             "current_step": "not_started",
             "data": {},
             "history": []
-        })
+        }
     
     def reset_workflow(self, workflow_id: str) -> None:
         """
@@ -148,9 +198,22 @@ class WorkflowAgent:
         Args:
             workflow_id: ID do fluxo de trabalho
         """
-        if workflow_id in self.workflow_states:
-            self.workflow_states[workflow_id] = {
-                "current_step": "start",
-                "data": {},
-                "history": []
-            }
+        for attempt in range(WORKFLOW_CONFLICT_RETRIES):
+            state, version = self.state_store.load(self.agent_id, workflow_id)
+            if state is None:
+                return
+            
+            workflow_event = {"reset": True, "to": self._initial_state()["current_step"]}
+            try:
+                self.state_store.append(
+                    self.agent_id,
+                    workflow_id,
+                    version,
+                    workflow_event,
+                    apply_workflow_event(state, workflow_event)
+                )
+                return
+            except WorkflowConflictError:
+                logger.warning(f"Conflito ao reiniciar o fluxo {workflow_id} (tentativa {attempt + 1})")
+        
+        raise WorkflowConflictError(f"Fluxo {workflow_id} alterado concorrentemente; reinício não aplicado")
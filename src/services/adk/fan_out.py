@@ -0,0 +1,96 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Execução Paralela de Ramos de Agentes                                       │
+│                                                                             │
+│ Este módulo executa ramos assíncronos (por exemplo, os agentes de um grafo  │
+│ paralelo) com concorrência limitada por grafo e global, tempo limite por    │
+│ ramo e retorno antecipado assim que um quórum de ramos é concluído.         │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from contextlib import nullcontext
+from typing import Dict, List, Any, Awaitable, Callable, Optional
+import asyncio
+import logging
+import time
+
+from src.services.adk.concurrency import KeyedSemaphore, llm_slots
+
+logger = logging.getLogger(__name__)
+
+async def fan_out(
+    branches: List[Callable[[], Awaitable[Any]]],
+    quorum: Optional[int] = None,
+    branch_timeout: Optional[float] = None,
+    max_concurrency: Optional[int] = None,
+    global_slots: KeyedSemaphore = llm_slots
+) -> Dict[str, Any]:
+    """
+    Executa ramos em paralelo até que um quórum seja concluído.
+    
+    Cada ramo ocupa uma vaga do grafo (`max_concurrency`) e, em seguida, uma
+    vaga global (`global_slots`, compartilhada por todos os grafos do
+    processo). O tempo limite conta a partir da obtenção das vagas. Assim que
+    `quorum` ramos são concluídos com sucesso, ou quando o quórum se torna
+    inalcançável, os ramos restantes são cancelados.
+    
+    Args:
+        branches: Funções que iniciam cada ramo
+        quorum: Número de ramos bem-sucedidos necessário (por padrão, todos)
+        branch_timeout: Tempo limite de cada ramo, em segundos
+        max_concurrency: Número máximo de ramos simultâneos deste grafo
+        global_slots: Semáforo global de chamadas aos modelos
+    
+    Returns:
+        Dicionário com os resultados por índice do ramo, as falhas, os ramos
+        cancelados, se o quórum foi atingido e a duração
+    """
+    quorum = len(branches) if quorum is None else min(quorum, len(branches))
+    graph_slots = asyncio.Semaphore(max_concurrency) if max_concurrency else nullcontext()
+    start = time.perf_counter()
+    
+    async def run(index: int, branch: Callable[[], Awaitable[Any]]):
+        try:
+            async with graph_slots, global_slots.hold("llm"):
+                return index, True, await asyncio.wait_for(branch(), branch_timeout)
+        except asyncio.TimeoutError:
+            return index, False, f"tempo limite de {branch_timeout}s excedido"
+        except Exception as e:
+            logger.error(f"Erro no ramo {index}: {str(e)}")
+            return index, False, str(e)
+    
+    tasks = [asyncio.create_task(run(index, branch)) for index, branch in enumerate(branches)]
+    results: Dict[int, Any] = {}
+    failures: Dict[int, str] = {}
+    
+    try:
+        for completed in asyncio.as_completed(tasks):
+            index, succeeded, value = await completed
+            if succeeded:
+                results[index] = value
+            else:
+                failures[index] = value
+            
+            pending = len(tasks) - len(results) - len(failures)
+            if len(results) >= quorum or len(results) + pending < quorum:
+                break
+    finally:
+        cancelled = [index for index, task in enumerate(tasks) if not task.done()]
+        for index in cancelled:
+            tasks[index].cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    # Ramos concluídos junto com o último consumido também são aproveitados
+    for index, task in enumerate(tasks):
+        if index in results or index in failures or task.cancelled():
+            continue
+        _, succeeded, value = task.result()
+        (results if succeeded else failures)[index] = value
+    
+    return {
+        "results": dict(sorted(results.items())),
+        "failures": failures,
+        "cancelled": cancelled,
+        "quorum_reached": len(results) >= quorum,
+        "elapsed": time.perf_counter() - start
+    }
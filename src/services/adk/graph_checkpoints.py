@@ -0,0 +1,334 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Checkpoints de Grafos de Fluxo de Trabalho                                  │
+│                                                                             │
+│ Este módulo persiste o estado de cada passo concluído dos grafos de fluxo   │
+│ de trabalho, para que execuções interrompidas sejam retomadas do último     │
+│ passo concluído, e as saídas dos passos que as reutilizam, por entrada e    │
+│ por tempo limitado, para que entradas idênticas não repitam chamadas.       │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Configuração dos checkpoints
+GRAPH_CHECKPOINT_BACKEND = os.getenv("GRAPH_CHECKPOINT_BACKEND", "memory")
+GRAPH_CHECKPOINT_SQLITE_PATH = os.getenv("GRAPH_CHECKPOINT_SQLITE_PATH", "graph_checkpoints.db")
+GRAPH_STEP_CACHE_SIZE = int(os.getenv("GRAPH_STEP_CACHE_SIZE", "4096"))
+GRAPH_STEP_OUTPUT_TTL = float(os.getenv("GRAPH_STEP_OUTPUT_TTL", "86400"))
+
+def to_checkpoint_value(value: Any) -> Any:
+    """
+    Converte um estado ou saída de passo em um valor serializável em JSON.
+    
+    Valores não serializáveis (por exemplo, ações intermediárias de agentes)
+    são armazenados como texto.
+    
+    Args:
+        value: Estado ou saída de um passo
+    
+    Returns:
+        Valor equivalente composto apenas de tipos JSON
+    """
+    return json.loads(json.dumps(value, default=str))
+
+def step_cache_key(step: Dict[str, Any], state: Dict[str, Any]) -> str:
+    """
+    Calcula a chave da saída de um passo para uma entrada.
+    
+    Args:
+        step: Identificação do passo (definição e modelo)
+        state: Estado recebido pelo passo
+    
+    Returns:
+        Hash SHA-256 da definição do passo e da entrada
+    """
+    payload = json.dumps({"step": step, "input": state}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def input_fingerprint(state: Dict[str, Any]) -> str:
+    """
+    Calcula a identificação da entrada de uma execução.
+    
+    Args:
+        state: Entrada recebida pelo grafo
+    
+    Returns:
+        Hash SHA-256 da entrada
+    """
+    payload = json.dumps(state, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class GraphCheckpointStore(ABC):
+    """
+    Interface dos armazenamentos de checkpoints.
+    
+    Cada execução (`run_id`) guarda o estado após cada passo concluído, até
+    ser concluída; as saídas dos passos são guardadas pela chave de
+    `step_cache_key`, independentemente da execução, e expiram após
+    GRAPH_STEP_OUTPUT_TTL segundos.
+    """
+    
+    # Indica se as operações fazem E/S bloqueante (e devem sair do event loop)
+    performs_io = False
+    
+    @abstractmethod
+    def latest(self, run_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Obtém o último checkpoint de uma execução.
+        
+        Args:
+            run_id: ID da execução
+        
+        Returns:
+            Tupla (índice do último passo concluído, estado após o passo), ou
+            None se a execução não tiver checkpoints
+        """
+    
+    @abstractmethod
+    def save(self, run_id: str, step: int, state: Dict[str, Any]) -> None:
+        """
+        Registra a conclusão de um passo de uma execução.
+        
+        Args:
+            run_id: ID da execução
+            step: Índice do passo concluído
+            state: Estado após o passo
+        """
+    
+    @abstractmethod
+    def get_output(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém a saída registrada de um passo.
+        
+        Args:
+            key: Chave calculada por `step_cache_key`
+        
+        Returns:
+            Saída do passo ou None se não houver (ou se tiver expirado)
+        """
+    
+    @abstractmethod
+    def put_output(self, key: str, output: Dict[str, Any]) -> None:
+        """
+        Registra a saída de um passo.
+        
+        Args:
+            key: Chave calculada por `step_cache_key`
+            output: Saída do passo
+        """
+    
+    @abstractmethod
+    def clear(self, run_id: str) -> None:
+        """
+        Remove os checkpoints de uma execução.
+        
+        Args:
+            run_id: ID da execução
+        """
+
+class InMemoryGraphCheckpointStore(GraphCheckpointStore):
+    """
+    Checkpoints na memória do processo.
+    
+    Guarda apenas o último checkpoint de cada execução e até
+    GRAPH_STEP_CACHE_SIZE saídas de passos, removendo as menos usadas e as
+    expiradas.
+    """
+    
+    def __init__(self, max_outputs: int = GRAPH_STEP_CACHE_SIZE, output_ttl: float = GRAPH_STEP_OUTPUT_TTL):
+        """
+        Inicializa o armazenamento.
+        
+        Args:
+            max_outputs: Número máximo de saídas de passos mantidas
+            output_ttl: Validade das saídas de passos, em segundos
+        """
+        self.max_outputs = max_outputs
+        self.output_ttl = output_ttl
+        self._checkpoints: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        # Chave -> (expiração, saída)
+        self._outputs: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def latest(self, run_id):
+        with self._lock:
+            return self._checkpoints.get(run_id)
+    
+    def save(self, run_id, step, state):
+        with self._lock:
+            self._checkpoints[run_id] = (step, to_checkpoint_value(state))
+    
+    def get_output(self, key):
+        with self._lock:
+            entry = self._outputs.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._outputs[key]
+                return None
+            self._outputs.move_to_end(key)
+            return entry[1]
+    
+    def put_output(self, key, output):
+        with self._lock:
+            self._outputs[key] = (time.monotonic() + self.output_ttl, to_checkpoint_value(output))
+            self._outputs.move_to_end(key)
+            while len(self._outputs) > self.max_outputs:
+                self._outputs.popitem(last=False)
+    
+    def clear(self, run_id):
+        with self._lock:
+            self._checkpoints.pop(run_id, None)
+
+class SqlGraphCheckpointStore(GraphCheckpointStore):
+    """
+    Checkpoints no banco de dados da aplicação (PostgreSQL).
+    
+    Os estados ficam na tabela graph_checkpoints, um registro por passo
+    concluído de cada execução, e as saídas dos passos em graph_step_outputs;
+    as saídas expiradas são ignoradas na leitura e removidas a cada registro.
+    """
+    
+    performs_io = True
+    
+    def __init__(self, session_factory=None, output_ttl: float = GRAPH_STEP_OUTPUT_TTL):
+        """
+        Inicializa o armazenamento.
+        
+        Args:
+            session_factory: Fábrica de sessões (por padrão, SessionLocal)
+            output_ttl: Validade das saídas de passos, em segundos
+        """
+        if session_factory is None:
+            from src.config.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.output_ttl = output_ttl
+    
+    def _output_cutoff(self) -> datetime:
+        """Data de criação mais antiga de uma saída ainda válida."""
+        return datetime.now(timezone.utc) - timedelta(seconds=self.output_ttl)
+    
+    def latest(self, run_id):
+        from src.models.models import GraphCheckpoint
+        
+        db = self.session_factory()
+        try:
+            row = db.query(GraphCheckpoint.step, GraphCheckpoint.state).filter(
+                GraphCheckpoint.run_id == run_id
+            ).order_by(GraphCheckpoint.step.desc()).first()
+            return (row.step, row.state) if row else None
+        finally:
+            db.close()
+    
+    def save(self, run_id, step, state):
+        from src.models.models import GraphCheckpoint
+        
+        db = self.session_factory()
+        try:
+            db.merge(GraphCheckpoint(run_id=run_id, step=step, state=to_checkpoint_value(state)))
+            db.commit()
+        finally:
+            db.close()
+    
+    def get_output(self, key):
+        from src.models.models import GraphStepOutput
+        
+        db = self.session_factory()
+        try:
+            row = db.query(GraphStepOutput.output).filter(
+                GraphStepOutput.key == key,
+                GraphStepOutput.created_at >= self._output_cutoff()
+            ).first()
+            return row.output if row else None
+        finally:
+            db.close()
+    
+    def put_output(self, key, output):
+        from src.models.models import GraphStepOutput
+        
+        db = self.session_factory()
+        try:
+            db.query(GraphStepOutput).filter(
+                GraphStepOutput.created_at < self._output_cutoff()
+            ).delete(synchronize_session=False)
+            db.merge(GraphStepOutput(
+                key=key,
+                output=to_checkpoint_value(output),
+                created_at=datetime.now(timezone.utc)
+            ))
+            db.commit()
+        finally:
+            db.close()
+    
+    def clear(self, run_id):
+        from src.models.models import GraphCheckpoint
+        
+        db = self.session_factory()
+        try:
+            db.query(GraphCheckpoint).filter(GraphCheckpoint.run_id == run_id).delete()
+            db.commit()
+        finally:
+            db.close()
+
+class SqliteGraphCheckpointStore(SqlGraphCheckpointStore):
+    """
+    Checkpoints em um arquivo SQLite local, para desenvolvimento e execuções
+    fora do servidor. As tabelas são criadas no arquivo se não existirem.
+    """
+    
+    def __init__(self, path: str = GRAPH_CHECKPOINT_SQLITE_PATH):
+        """
+        Inicializa o armazenamento.
+        
+        Args:
+            path: Caminho do arquivo SQLite
+        """
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from src.models.models import GraphCheckpoint, GraphStepOutput
+        
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        GraphCheckpoint.__table__.create(engine, checkfirst=True)
+        GraphStepOutput.__table__.create(engine, checkfirst=True)
+        super().__init__(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+
+# Armazenamentos disponíveis
+GRAPH_CHECKPOINT_BACKENDS = {
+    "memory": InMemoryGraphCheckpointStore,
+    "sqlite": SqliteGraphCheckpointStore,
+    "postgres": SqlGraphCheckpointStore
+}
+
+_graph_checkpoint_store: Optional[GraphCheckpointStore] = None
+_graph_checkpoint_store_lock = threading.Lock()
+
+def get_graph_checkpoint_store() -> GraphCheckpointStore:
+    """
+    Retorna o armazenamento de checkpoints compartilhado pelo processo.
+    
+    O tipo de armazenamento é definido por GRAPH_CHECKPOINT_BACKEND.
+    
+    Returns:
+        Armazenamento de checkpoints de grafos
+    """
+    global _graph_checkpoint_store
+    
+    with _graph_checkpoint_store_lock:
+        if _graph_checkpoint_store is None:
+            if GRAPH_CHECKPOINT_BACKEND not in GRAPH_CHECKPOINT_BACKENDS:
+                raise ValueError(f"Armazenamento de checkpoints não suportado: {GRAPH_CHECKPOINT_BACKEND}")
+            _graph_checkpoint_store = GRAPH_CHECKPOINT_BACKENDS[GRAPH_CHECKPOINT_BACKEND]()
+        return _graph_checkpoint_store
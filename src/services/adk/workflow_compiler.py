@@ -0,0 +1,274 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Compilador de Fluxos de Trabalho                                            │
+│                                                                             │
+│ Este módulo compila a definição declarativa de um fluxo de trabalho em uma  │
+│ tabela de transições indexada por inteiros (estado × tipo de evento), com   │
+│ condições e ações resolvidas e validadas na construção do agente.           │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from functools import partial
+import inspect
+from typing import Dict, List, Any, Callable, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tipo de evento que corresponde a qualquer evento sem transição específica
+WILDCARD_EVENT = "*"
+
+# Fluxo usado quando a configuração do agente não define um: start -> process -> validate -> end
+DEFAULT_WORKFLOW = {
+    "initial": "start",
+    "final": ["end"],
+    "transitions": [
+        {"from": "start", "event": WILDCARD_EVENT, "to": "process"},
+        {"from": "process", "event": WILDCARD_EVENT, "to": "validate"},
+        {"from": "validate", "event": WILDCARD_EVENT, "to": "end"}
+    ]
+}
+
+class WorkflowValidationError(ValueError):
+    """Definição de fluxo de trabalho inválida."""
+
+def _has_fields(data: Dict[str, Any], payload: Dict[str, Any], fields: List[str]) -> bool:
+    return all(field in payload or field in data for field in fields)
+
+def _field_equals(data: Dict[str, Any], payload: Dict[str, Any], field: str, value: Any) -> bool:
+    return payload.get(field, data.get(field)) == value
+
+def _set_values(data: Dict[str, Any], payload: Dict[str, Any], values: Dict[str, Any]) -> None:
+    data.update(values)
+
+# Condições e ações disponíveis para as transições: função(data, payload, **args)
+WORKFLOW_GUARDS: Dict[str, Callable[..., bool]] = {
+    "has_fields": _has_fields,
+    "field_equals": _field_equals
+}
+WORKFLOW_ACTIONS: Dict[str, Callable[..., None]] = {
+    "set": _set_values
+}
+
+def register_workflow_guard(name: str, guard: Callable[..., bool]) -> None:
+    """
+    Registra uma condição de transição.
+    
+    Args:
+        name: Nome usado nas definições de fluxo
+        guard: Função (data, payload, **args) -> bool
+    """
+    WORKFLOW_GUARDS[name] = guard
+
+def register_workflow_action(name: str, action: Callable[..., None]) -> None:
+    """
+    Registra uma ação de transição.
+    
+    Args:
+        name: Nome usado nas definições de fluxo
+        action: Função (data, payload, **args) executada ao percorrer a transição
+    """
+    WORKFLOW_ACTIONS[name] = action
+
+class CompiledWorkflow:
+    """
+    Fluxo de trabalho compilado.
+    
+    Estados e tipos de evento são numerados; `table[estado][evento]` contém as
+    transições candidatas (próximo estado, condições, ações), em ordem de
+    prioridade. A última coluna corresponde aos eventos sem transição
+    específica, e as transições curinga são acrescentadas ao fim de todas as
+    colunas do estado.
+    """
+    
+    def __init__(
+        self,
+        states: List[str],
+        events: List[str],
+        initial: int,
+        final: List[int],
+        table: List[List[Tuple[Tuple[int, tuple, tuple], ...]]]
+    ):
+        self.states = tuple(states)
+        self.events = tuple(events)
+        self.state_index = {state: index for index, state in enumerate(states)}
+        self.event_index = {event: index for index, event in enumerate(events)}
+        self.other_events = len(events)
+        self.initial = initial
+        self.final = frozenset(final)
+        self.table = table
+    
+    def dispatch(self, state: int, event_type: str, data: Dict[str, Any], payload: Dict[str, Any]) -> int:
+        """
+        Percorre a transição de um estado para um tipo de evento.
+        
+        Args:
+            state: Índice do estado atual
+            event_type: Tipo do evento recebido
+            data: Dados acumulados do fluxo (podem ser alterados pelas ações)
+            payload: Dados do evento
+        
+        Returns:
+            Índice do próximo estado (o próprio estado se nenhuma transição se aplicar)
+        """
+        for next_state, guards, actions in self.table[state][self.event_index.get(event_type, self.other_events)]:
+            if all(guard(data, payload) for guard in guards):
+                for action in actions:
+                    action(data, payload)
+                return next_state
+        return state
+    
+    def is_final(self, state: int) -> bool:
+        """Indica se um estado encerra o fluxo."""
+        return state in self.final
+
+def _resolve_callables(specs: Any, registry: Dict[str, Callable], kind: str, where: str) -> tuple:
+    """Resolve condições ou ações de uma transição (nomes ou {"name", "args"})."""
+    if specs is None:
+        return ()
+    if isinstance(specs, (str, dict)):
+        specs = [specs]
+    
+    resolved = []
+    for spec in specs:
+        name, args = (spec, {}) if isinstance(spec, str) else (spec.get("name"), spec.get("args", {}))
+        if name not in registry:
+            raise WorkflowValidationError(f"{where}: {kind} desconhecida: {name}")
+        if not isinstance(args, dict):
+            raise WorkflowValidationError(f"{where}: argumentos de {kind} '{name}' devem ser um objeto")
+        
+        # Argumentos ausentes ou desconhecidos falham na compilação, não no primeiro evento
+        try:
+            inspect.signature(registry[name]).bind(None, None, **args)
+        except TypeError as e:
+            raise WorkflowValidationError(f"{where}: argumentos inválidos para {kind} '{name}': {str(e)}")
+        except ValueError:
+            # Função sem assinatura inspecionável (por exemplo, implementada em C)
+            pass
+        resolved.append(partial(registry[name], **args) if args else registry[name])
+    return tuple(resolved)
+
+def compile_workflow(workflow: Dict[str, Any]) -> CompiledWorkflow:
+    """
+    Valida e compila a definição de um fluxo de trabalho.
+    
+    A definição tem o formato:
+        {
+            "initial": "start",
+            "final": ["end"],
+            "states": ["start", "process", "end"],  # opcional
+            "transitions": [
+                {"from": "start", "event": "submit", "to": "process",
+                 "guards": [{"name": "has_fields", "args": {"fields": ["email"]}}],
+                 "actions": [{"name": "set", "args": {"values": {"submitted": True}}}]},
+                {"from": "process", "event": "*", "to": "end"}
+            ]
+        }
+    
+    Sem "states", os estados são inferidos das transições.
+    
+    Args:
+        workflow: Definição do fluxo de trabalho
+    
+    Returns:
+        Fluxo de trabalho compilado
+    
+    Raises:
+        WorkflowValidationError: Se a definição for inválida
+    """
+    if not isinstance(workflow, dict):
+        raise WorkflowValidationError("A definição do fluxo de trabalho deve ser um objeto")
+    
+    transitions = workflow.get("transitions")
+    if not isinstance(transitions, list) or not transitions:
+        raise WorkflowValidationError("O fluxo de trabalho deve definir ao menos uma transição")
+    
+    initial = workflow.get("initial")
+    declared_states = workflow.get("states")
+    
+    # Numerar estados e eventos na ordem em que aparecem
+    states: List[str] = []
+    events: List[str] = []
+    state_index: Dict[str, int] = {}
+    event_index: Dict[str, int] = {}
+    
+    def add_state(state: Any, where: str) -> int:
+        if not isinstance(state, str) or not state:
+            raise WorkflowValidationError(f"{where}: estado inválido: {state!r}")
+        if state not in state_index:
+            if declared_states is not None:
+                raise WorkflowValidationError(f"{where}: estado não declarado: {state}")
+            state_index[state] = len(states)
+            states.append(state)
+        return state_index[state]
+    
+    if declared_states is not None:
+        if not isinstance(declared_states, list) or not declared_states:
+            raise WorkflowValidationError("'states' deve ser uma lista não vazia")
+        for state in declared_states:
+            if not isinstance(state, str) or not state or state in state_index:
+                raise WorkflowValidationError(f"Estado inválido ou duplicado: {state!r}")
+            state_index[state] = len(states)
+            states.append(state)
+    
+    initial_index = add_state(initial, "'initial'")
+    
+    compiled_transitions = []
+    for position, transition in enumerate(transitions):
+        where = f"Transição {position}"
+        if not isinstance(transition, dict):
+            raise WorkflowValidationError(f"{where}: deve ser um objeto")
+        
+        event = transition.get("event", WILDCARD_EVENT)
+        if not isinstance(event, str) or not event:
+            raise WorkflowValidationError(f"{where}: tipo de evento inválido: {event!r}")
+        if event != WILDCARD_EVENT and event not in event_index:
+            event_index[event] = len(events)
+            events.append(event)
+        
+        from_state = add_state(transition.get("from"), f"{where} ('from')")
+        to_state = add_state(transition.get("to"), f"{where} ('to')")
+        where = f"{where} (estado '{transition['from']}', evento '{event}')"
+        compiled_transitions.append((
+            from_state,
+            event,
+            to_state,
+            _resolve_callables(transition.get("guards"), WORKFLOW_GUARDS, "condição", where),
+            _resolve_callables(transition.get("actions"), WORKFLOW_ACTIONS, "ação", where)
+        ))
+    
+    final = workflow.get("final", [])
+    if isinstance(final, str):
+        final = [final]
+    final_indexes = [add_state(state, "'final'") for state in final]
+    
+    # Montar a tabela: transições específicas primeiro, curingas ao fim de cada coluna
+    specific = [[[] for _ in range(len(events) + 1)] for _ in states]
+    wildcard = [[] for _ in states]
+    for source, event, target, guards, actions in compiled_transitions:
+        candidate = (target, guards, actions)
+        if event == WILDCARD_EVENT:
+            wildcard[source].append(candidate)
+        else:
+            specific[source][event_index[event]].append(candidate)
+    
+    table = [
+        [tuple(column + wildcard[state]) for column in specific[state]]
+        for state in range(len(states))
+    ]
+    
+    # Estados inalcançáveis indicam um erro provável na definição
+    reachable = {initial_index}
+    pending = [initial_index]
+    while pending:
+        state = pending.pop()
+        for column in table[state]:
+            for target, _, _ in column:
+                if target not in reachable:
+                    reachable.add(target)
+                    pending.append(target)
+    unreachable = [states[index] for index in range(len(states)) if index not in reachable]
+    if unreachable:
+        logger.warning(f"Estados inalcançáveis no fluxo de trabalho: {', '.join(unreachable)}")
+    
+    return CompiledWorkflow(states, events, initial_index, final_indexes, table)
@@ -0,0 +1,383 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Armazenamento de Estado dos Fluxos de Trabalho                              │
+│                                                                             │
+│ Este módulo persiste o estado dos fluxos de trabalho como um log de eventos │
+│ somente de acréscimo com snapshots periódicos, com concorrência otimista    │
+│ por fluxo, em memória, no Redis ou no PostgreSQL.                           │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Any, Optional, Tuple
+import json
+import logging
+import os
+import threading
+
+from src.config.redis_config import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Configuração do armazenamento de estado
+WORKFLOW_STATE_BACKEND = os.getenv("WORKFLOW_STATE_BACKEND", "memory")
+WORKFLOW_SNAPSHOT_INTERVAL = int(os.getenv("WORKFLOW_SNAPSHOT_INTERVAL", "20"))
+WORKFLOW_HISTORY_LIMIT = int(os.getenv("WORKFLOW_HISTORY_LIMIT", "50"))
+WORKFLOW_STATE_TTL = int(os.getenv("WORKFLOW_STATE_TTL", "2592000"))
+WORKFLOW_STATE_PREFIX = "nowgo:workflow:"
+
+class WorkflowConflictError(Exception):
+    """O fluxo de trabalho foi alterado por outro processo desde a leitura."""
+
+def apply_workflow_event(
+    state: Optional[Dict[str, Any]],
+    event: Dict[str, Any],
+    history_limit: int = WORKFLOW_HISTORY_LIMIT
+) -> Dict[str, Any]:
+    """
+    Aplica um evento do log ao estado de um fluxo de trabalho.
+    
+    Eventos comuns registram o passo de origem e de destino e as alterações
+    nos dados; eventos de reinício (`reset`) retornam o fluxo ao passo
+    inicial. O histórico mantém apenas as `history_limit` entradas mais
+    recentes; o total de passos fica em `steps_completed`.
+    
+    Args:
+        state: Estado atual (None para um fluxo ainda sem eventos)
+        event: Evento do log
+        history_limit: Número máximo de entradas mantidas no histórico
+    
+    Returns:
+        Novo estado (o estado recebido não é alterado)
+    """
+    if event.get("reset"):
+        return {"current_step": event["to"], "data": {}, "history": [], "steps_completed": 0}
+    
+    state = state or {"current_step": event["from"], "data": {}, "history": [], "steps_completed": 0}
+    history = state["history"][-(history_limit - 1):] if history_limit > 1 else []
+    history.append({
+        "step": event["from"],
+        "event_type": event["event_type"],
+        "timestamp": event.get("timestamp")
+    })
+    
+    return {
+        "current_step": event["to"],
+        "data": {**state["data"], **event.get("data", {})},
+        "history": history,
+        "steps_completed": state.get("steps_completed", 0) + 1
+    }
+
+def copy_workflow_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copia um estado de fluxo de trabalho.
+    
+    Os dados e o histórico são copiados; as entradas do histórico não são
+    alteradas depois de criadas e são compartilhadas.
+    
+    Args:
+        state: Estado a ser copiado
+    
+    Returns:
+        Cópia do estado
+    """
+    return {**state, "data": dict(state["data"]), "history": list(state["history"])}
+
+class WorkflowStateStore(ABC):
+    """
+    Interface dos armazenamentos de estado de fluxos de trabalho.
+    
+    Cada fluxo, identificado por (agent_id, workflow_id), tem uma versão igual
+    ao número de eventos registrados. A cada `snapshot_interval` eventos o
+    estado completo é gravado como snapshot, de modo que a leitura reaplica no
+    máximo `snapshot_interval - 1` eventos. A gravação exige a versão lida
+    (concorrência otimista) e falha com WorkflowConflictError se outro
+    processo tiver avançado o mesmo fluxo.
+    """
+    
+    def __init__(
+        self,
+        snapshot_interval: int = WORKFLOW_SNAPSHOT_INTERVAL,
+        history_limit: int = WORKFLOW_HISTORY_LIMIT
+    ):
+        """
+        Inicializa o armazenamento.
+        
+        Args:
+            snapshot_interval: Número de eventos entre snapshots
+            history_limit: Número máximo de entradas mantidas no histórico do estado
+        """
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.history_limit = history_limit
+    
+    def load(self, agent_id: str, workflow_id: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """
+        Reconstrói o estado de um fluxo de trabalho.
+        
+        Args:
+            agent_id: ID do agente
+            workflow_id: ID do fluxo de trabalho
+        
+        Returns:
+            Tupla (estado ou None se o fluxo não existir, versão)
+        """
+        snapshot, snapshot_version, events = self._read(agent_id, workflow_id)
+        state = copy_workflow_state(snapshot) if snapshot is not None else None
+        for event in events:
+            state = apply_workflow_event(state, event, self.history_limit)
+        return state, snapshot_version + len(events)
+    
+    def append(
+        self,
+        agent_id: str,
+        workflow_id: str,
+        expected_version: int,
+        event: Dict[str, Any],
+        state: Dict[str, Any]
+    ) -> int:
+        """
+        Registra um evento de um fluxo de trabalho.
+        
+        Args:
+            agent_id: ID do agente
+            workflow_id: ID do fluxo de trabalho
+            expected_version: Versão retornada por `load`
+            event: Evento a ser registrado
+            state: Estado resultante do evento (gravado se couber um snapshot)
+        
+        Returns:
+            Nova versão do fluxo
+        
+        Raises:
+            WorkflowConflictError: Se o fluxo tiver sido alterado desde a leitura
+        """
+        version = expected_version + 1
+        snapshot = state if version % self.snapshot_interval == 0 else None
+        self._write(agent_id, workflow_id, expected_version, event, snapshot)
+        return version
+    
+    @abstractmethod
+    def _read(self, agent_id: str, workflow_id: str) -> Tuple[Optional[Dict[str, Any]], int, List[Dict[str, Any]]]:
+        """Retorna (snapshot, versão do snapshot, eventos posteriores ao snapshot)."""
+    
+    @abstractmethod
+    def _write(
+        self,
+        agent_id: str,
+        workflow_id: str,
+        expected_version: int,
+        event: Dict[str, Any],
+        snapshot: Optional[Dict[str, Any]]
+    ) -> None:
+        """Grava o evento (e o snapshot, se houver) se a versão atual for a esperada."""
+
+class InMemoryWorkflowStateStore(WorkflowStateStore):
+    """
+    Estado de fluxos de trabalho em memória, restrito ao processo.
+    
+    Mantém apenas o estado mais recente de cada fluxo, gravado como snapshot
+    a cada evento; a leitura não reaplica eventos.
+    """
+    
+    def __init__(self, **kwargs):
+        super().__init__(**{**kwargs, "snapshot_interval": 1})
+        self._workflows: Dict[Tuple[str, str], Tuple[Dict[str, Any], int]] = {}
+        self._lock = threading.Lock()
+    
+    def _write(self, agent_id, workflow_id, expected_version, event, snapshot):
+        with self._lock:
+            _, version = self._workflows.get((agent_id, workflow_id), (None, 0))
+            if version != expected_version:
+                raise WorkflowConflictError(f"Fluxo {workflow_id} alterado por outro processo")
+            self._workflows[(agent_id, workflow_id)] = (copy_workflow_state(snapshot), version + 1)
+    
+    def _read(self, agent_id, workflow_id):
+        with self._lock:
+            state, version = self._workflows.get((agent_id, workflow_id), (None, 0))
+        return state, version, []
+
+class RedisWorkflowStateStore(WorkflowStateStore):
+    """
+    Estado de fluxos de trabalho no Redis.
+    
+    Cada fluxo usa um hash (versão e snapshot) e uma lista com os eventos
+    posteriores ao snapshot. As chaves de um fluxo compartilham a mesma hash
+    tag, ficando no mesmo shard de um Redis Cluster; a gravação é feita por um
+    script Lua que verifica a versão e grava atomicamente.
+    """
+    
+    APPEND_SCRIPT = """
+    local version = tonumber(redis.call('HGET', KEYS[1], 'version') or '0')
+    if version ~= tonumber(ARGV[1]) then
+        return -1
+    end
+    version = version + 1
+    if ARGV[3] ~= '' then
+        redis.call('HSET', KEYS[1], 'version', version, 'snapshot_version', version, 'snapshot', ARGV[3])
+        redis.call('DEL', KEYS[2])
+    else
+        redis.call('HSET', KEYS[1], 'version', version)
+        redis.call('RPUSH', KEYS[2], ARGV[2])
+    end
+    local ttl = tonumber(ARGV[4])
+    if ttl > 0 then
+        redis.call('EXPIRE', KEYS[1], ttl)
+        redis.call('EXPIRE', KEYS[2], ttl)
+    end
+    return version
+    """
+    
+    def __init__(self, redis_client=None, ttl: int = WORKFLOW_STATE_TTL, **kwargs):
+        """
+        Inicializa o armazenamento.
+        
+        Args:
+            redis_client: Cliente Redis (por padrão, o cliente configurado em redis_config)
+            ttl: Tempo de expiração dos fluxos inativos, em segundos (0 = sem expiração)
+        """
+        super().__init__(**kwargs)
+        self._redis_client = redis_client
+        self.ttl = ttl
+        self._append_script = None
+    
+    @property
+    def redis_client(self):
+        """Cliente Redis usado para armazenar os fluxos."""
+        if self._redis_client is None:
+            self._redis_client = get_redis_client()
+        return self._redis_client
+    
+    @staticmethod
+    def _keys(agent_id: str, workflow_id: str) -> Tuple[str, str]:
+        tag = f"{WORKFLOW_STATE_PREFIX}{{{agent_id}:{workflow_id}}}"
+        return f"{tag}:meta", f"{tag}:events"
+    
+    def _read(self, agent_id, workflow_id):
+        meta_key, events_key = self._keys(agent_id, workflow_id)
+        pipeline = self.redis_client.pipeline(transaction=True)
+        pipeline.hmget(meta_key, "snapshot", "snapshot_version")
+        pipeline.lrange(events_key, 0, -1)
+        (snapshot, snapshot_version), events = pipeline.execute()
+        
+        return (
+            json.loads(snapshot) if snapshot else None,
+            int(snapshot_version or 0),
+            [json.loads(event) for event in events]
+        )
+    
+    def _write(self, agent_id, workflow_id, expected_version, event, snapshot):
+        if self._append_script is None:
+            self._append_script = self.redis_client.register_script(self.APPEND_SCRIPT)
+        
+        version = self._append_script(
+            keys=list(self._keys(agent_id, workflow_id)),
+            args=[
+                expected_version,
+                json.dumps(event, ensure_ascii=False, default=str),
+                json.dumps(snapshot, ensure_ascii=False, default=str) if snapshot is not None else "",
+                self.ttl
+            ]
+        )
+        if int(version) < 0:
+            raise WorkflowConflictError(f"Fluxo {workflow_id} alterado por outro processo")
+
+class PostgresWorkflowStateStore(WorkflowStateStore):
+    """
+    Estado de fluxos de trabalho no banco de dados da aplicação (PostgreSQL).
+    
+    Os eventos ficam na tabela workflow_events, que preserva o log completo;
+    a restrição de unicidade (agent_id, workflow_id, version) rejeita
+    gravações concorrentes da mesma versão. O snapshot mais recente de cada
+    fluxo fica em workflow_snapshots.
+    """
+    
+    def __init__(self, session_factory=None, **kwargs):
+        """
+        Inicializa o armazenamento.
+        
+        Args:
+            session_factory: Fábrica de sessões (por padrão, SessionLocal)
+        """
+        super().__init__(**kwargs)
+        if session_factory is None:
+            from src.config.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+    
+    def _read(self, agent_id, workflow_id):
+        from src.models.models import WorkflowEvent, WorkflowSnapshot
+        
+        db = self.session_factory()
+        try:
+            snapshot = db.query(WorkflowSnapshot.state, WorkflowSnapshot.version).filter(
+                WorkflowSnapshot.agent_id == agent_id,
+                WorkflowSnapshot.workflow_id == workflow_id
+            ).first()
+            snapshot_version = snapshot.version if snapshot else 0
+            
+            events = db.query(WorkflowEvent.event).filter(
+                WorkflowEvent.agent_id == agent_id,
+                WorkflowEvent.workflow_id == workflow_id,
+                WorkflowEvent.version > snapshot_version
+            ).order_by(WorkflowEvent.version).all()
+            
+            return (snapshot.state if snapshot else None), snapshot_version, [row.event for row in events]
+        finally:
+            db.close()
+    
+    def _write(self, agent_id, workflow_id, expected_version, event, snapshot):
+        from sqlalchemy.exc import IntegrityError
+        from src.models.models import WorkflowEvent, WorkflowSnapshot
+        
+        db = self.session_factory()
+        try:
+            db.add(WorkflowEvent(
+                agent_id=agent_id,
+                workflow_id=workflow_id,
+                version=expected_version + 1,
+                event=event
+            ))
+            db.flush()
+            
+            if snapshot is not None:
+                db.merge(WorkflowSnapshot(
+                    agent_id=agent_id,
+                    workflow_id=workflow_id,
+                    version=expected_version + 1,
+                    state=snapshot
+                ))
+            
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise WorkflowConflictError(f"Fluxo {workflow_id} alterado por outro processo")
+        finally:
+            db.close()
+
+# Armazenamentos disponíveis
+WORKFLOW_STATE_BACKENDS = {
+    "memory": InMemoryWorkflowStateStore,
+    "redis": RedisWorkflowStateStore,
+    "postgres": PostgresWorkflowStateStore
+}
+
+_workflow_state_store: Optional[WorkflowStateStore] = None
+_workflow_state_store_lock = threading.Lock()
+
+def get_workflow_state_store() -> WorkflowStateStore:
+    """
+    Retorna o armazenamento de estado compartilhado pelo processo.
+    
+    O tipo de armazenamento é definido por WORKFLOW_STATE_BACKEND.
+    
+    Returns:
+        Armazenamento de estado de fluxos de trabalho
+    """
+    global _workflow_state_store
+    
+    with _workflow_state_store_lock:
+        if _workflow_state_store is None:
+            if WORKFLOW_STATE_BACKEND not in WORKFLOW_STATE_BACKENDS:
+                raise ValueError(f"Armazenamento de estado não suportado: {WORKFLOW_STATE_BACKEND}")
+            _workflow_state_store = WORKFLOW_STATE_BACKENDS[WORKFLOW_STATE_BACKEND]()
+        return _workflow_state_store
@@ -0,0 +1,251 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Pool de Workers para Geração Assíncrona de Agentes                          │
+│                                                                             │
+│ Este serviço consome a fila de AgentGenerationJob, executando a geração de  │
+│ agentes fora do event loop e registrando o progresso a cada agente gerado.  │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional
+import asyncio
+import logging
+import os
+import threading
+
+from sqlalchemy import and_, or_
+from sqlalchemy.sql import func
+
+from src.config.database import SessionLocal
+from src.models.models import AgentGenerationJob
+from src.services.agent_generator import AgentGenerator
+
+logger = logging.getLogger(__name__)
+
+# Número de workers de geração por processo
+AGENT_GENERATION_WORKERS = int(os.getenv("AGENT_GENERATION_WORKERS", "4"))
+
+# Duração da reivindicação de um job em execução; renovada periodicamente
+# pelo worker e, se expirar, o job volta a ser executado na inicialização
+AGENT_GENERATION_LEASE_SECONDS = float(os.getenv("AGENT_GENERATION_LEASE_SECONDS", "300"))
+
+def _lease_expiration(lease_seconds: float) -> datetime:
+    """Data de expiração de uma reivindicação feita ou renovada agora."""
+    return datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+
+class AgentGenerationWorkerPool:
+    """
+    Pool de workers que processa jobs de geração de agentes.
+    
+    Esta classe implementa:
+    1. Uma fila em memória com os IDs dos jobs pendentes
+    2. Workers assíncronos que executam a geração em threads dedicadas
+    3. Reivindicação atômica de jobs com prazo (lease), renovado enquanto o job executa
+    4. Registro do progresso no job a cada agente gerado
+    5. Recuperação, na inicialização, de jobs pendentes e de jobs em execução
+       cuja reivindicação expirou (processo interrompido durante o job)
+    6. Retomada idempotente: agentes já persistidos não são inseridos de novo
+    """
+    
+    def __init__(self,
+                 session_factory=SessionLocal,
+                 workers: int = AGENT_GENERATION_WORKERS,
+                 lease_seconds: float = AGENT_GENERATION_LEASE_SECONDS):
+        """
+        Inicializa o pool de workers.
+        
+        Args:
+            session_factory: Fábrica de sessões do banco de dados
+            workers: Número de workers concorrentes
+            lease_seconds: Duração da reivindicação de um job em execução
+        """
+        self.session_factory = session_factory
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    async def start(self) -> None:
+        """Inicia os workers e reenfileira jobs pendentes ou abandonados."""
+        if self._tasks:
+            return
+        
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="agent-generation"
+        )
+        self._tasks = [
+            asyncio.create_task(self._worker(index))
+            for index in range(self.workers)
+        ]
+        
+        for job_id in await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._recoverable_job_ids
+        ):
+            self._queue.put_nowait(job_id)
+        
+        logger.info(f"Pool de geração de agentes iniciado com {self.workers} workers")
+    
+    async def stop(self) -> None:
+        """
+        Interrompe os workers.
+        
+        Jobs em execução são concluídos antes do retorno; jobs não iniciados
+        permanecem pendentes no banco.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def enqueue(self, job_id: int) -> None:
+        """
+        Enfileira um job para processamento.
+        
+        Se o pool não estiver em execução, o job permanece pendente no banco
+        e será recuperado na próxima inicialização.
+        
+        Args:
+            job_id: ID do AgentGenerationJob
+        """
+        if self._queue is None:
+            logger.warning(f"Pool de geração não iniciado; job {job_id} permanece pendente")
+            return
+        self._queue.put_nowait(job_id)
+    
+    async def _worker(self, index: int) -> None:
+        """Consome a fila, executando cada job em uma thread do pool."""
+        loop = asyncio.get_running_loop()
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await loop.run_in_executor(self._executor, self.run_job, job_id)
+            except Exception as e:
+                logger.error(f"Erro no worker {index} ao processar job {job_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+    
+    @staticmethod
+    def _claimable(now: datetime):
+        """Condição dos jobs que podem ser reivindicados: pendentes ou com a reivindicação expirada."""
+        return or_(
+            AgentGenerationJob.status == "pending",
+            and_(
+                AgentGenerationJob.status == "running",
+                or_(AgentGenerationJob.lease_expires_at.is_(None), AgentGenerationJob.lease_expires_at < now)
+            )
+        )
+    
+    def _recoverable_job_ids(self) -> List[int]:
+        """Retorna os IDs dos jobs pendentes ou abandonados, do mais antigo ao mais recente."""
+        db = self.session_factory()
+        try:
+            rows = db.query(AgentGenerationJob.id).filter(
+                self._claimable(datetime.now(timezone.utc))
+            ).order_by(AgentGenerationJob.id).all()
+            return [row.id for row in rows]
+        finally:
+            db.close()
+    
+    def _renew_lease(self, job_id: int, stop: threading.Event) -> None:
+        """Renova a reivindicação de um job até que `stop` seja sinalizado."""
+        while not stop.wait(self.lease_seconds / 3):
+            db = self.session_factory()
+            try:
+                db.query(AgentGenerationJob).filter(
+                    AgentGenerationJob.id == job_id,
+                    AgentGenerationJob.status == "running"
+                ).update(
+                    {"lease_expires_at": _lease_expiration(self.lease_seconds)},
+                    synchronize_session=False
+                )
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Erro ao renovar a reivindicação do job {job_id}: {str(e)}")
+            finally:
+                db.close()
+    
+    def run_job(self, job_id: int) -> None:
+        """
+        Executa um job de geração de agentes.
+        
+        O job é reivindicado com um UPDATE condicional (pending, ou running com
+        a reivindicação expirada → running), de modo que apenas um worker o
+        executa; a reivindicação é renovada em segundo plano enquanto o job
+        executa. Cada agente gerado é persistido junto com o progresso do job
+        em um commit próprio, de modo que um job retomado continua a partir
+        dos agentes registrados em `generated_agents`.
+        
+        Args:
+            job_id: ID do AgentGenerationJob
+        """
+        db = self.session_factory()
+        stop_renewal = threading.Event()
+        try:
+            claimed = db.query(AgentGenerationJob).filter(
+                AgentGenerationJob.id == job_id,
+                self._claimable(datetime.now(timezone.utc))
+            ).update(
+                {"status": "running", "lease_expires_at": _lease_expiration(self.lease_seconds)},
+                synchronize_session=False
+            )
+            db.commit()
+            
+            if not claimed:
+                return
+            
+            threading.Thread(
+                target=self._renew_lease,
+                args=(job_id, stop_renewal),
+                name=f"agent-generation-lease-{job_id}",
+                daemon=True
+            ).start()
+            
+            job = db.query(AgentGenerationJob).filter(AgentGenerationJob.id == job_id).first()
+            already_generated = len(job.generated_agents or [])
+            if already_generated:
+                logger.info(f"Retomando o job de geração {job_id} após {already_generated} agentes")
+            
+            def record_progress(generated_agent: Dict[str, Any]) -> None:
+                job.generated_agents = list(job.generated_agents or []) + [generated_agent]
+                db.commit()
+            
+            generator = AgentGenerator(db_session=db)
+            generator.generate_agents_from_analysis(
+                analysis_id=job.analysis_id,
+                tenant_id=job.tenant_id,
+                user_id=job.user_id,
+                on_agent_generated=record_progress,
+                already_generated=already_generated
+            )
+            
+            job.status = "completed"
+            job.completed_at = func.now()
+            job.lease_expires_at = None
+            db.commit()
+            
+            logger.info(f"Job de geração {job_id} concluído")
+        
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Erro no job de geração {job_id}: {str(e)}")
+            db.query(AgentGenerationJob).filter(AgentGenerationJob.id == job_id).update(
+                {"status": "failed", "error_message": str(e), "completed_at": func.now(), "lease_expires_at": None},
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            stop_renewal.set()
+            db.close()
+
+# Pool compartilhado pelo processo
+generation_workers = AgentGenerationWorkerPool()
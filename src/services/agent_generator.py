@@ -7,17 +7,29 @@
 └─────────────────────────────────────────────────────────────────────────────┘
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 import json
 from datetime import datetime
 import uuid
 
+from sqlalchemy import insert
+
 from src.models.models import Agent, AgentConfiguration, Organization, OrganizationAnalysis
 from src.models.organization_analyzer import OrganizationAnalyzer
 from src.services.adk.agent_builder import AgentBuilder
+from src.services.prompt_templates import prompt_registry
 from src.services.adk.custom_agents.llm_agent import LLMAgent
 from src.services.adk.custom_agents.workflow_agent import WorkflowAgent
 
+# Mapeamento de tipos de agentes para classes de implementação
+AGENT_TYPE_CLASSES = {
+    "customer_support": LLMAgent,
+    "sales": LLMAgent,
+    "marketing": LLMAgent,
+    "finance": LLMAgent,
+    "hr": LLMAgent
+}
+
 class AgentGenerator:
     """
     Gerador automático de agentes personalizados com base em análise organizacional.
@@ -39,116 +51,18 @@ class AgentGenerator:
         self.db_session = db_session
         self.agent_builder = AgentBuilder()
         
-        # Templates de prompts para diferentes tipos de agentes
-        self.prompt_templates = {
-            "customer_support": """
-            Você é Virginia, uma assistente virtual de atendimento ao cliente da {organization_name}.
-            
-            Seu objetivo é fornecer suporte excepcional aos clientes, respondendo dúvidas, 
-            resolvendo problemas e garantindo uma experiência positiva.
-            
-            Informações sobre a empresa:
-            - Nome: {organization_name}
-            - Setor: {industry}
-            - Descrição: {description}
-            
-            Diretrizes de comunicação:
-            - Seja sempre cordial e profissional
-            - Responda de forma clara e objetiva
-            - Demonstre empatia com os problemas dos clientes
-            - Ofereça soluções práticas e eficientes
-            - Escale para um humano quando necessário
-            
-            Idiomas suportados: {languages}
-            """,
-            
-            "sales": """
-            Você é Guilherme, um assistente virtual de vendas e prospecção da {organization_name}.
-            
-            Seu objetivo é identificar oportunidades de negócio, qualificar leads e agendar 
-            reuniões com a equipe comercial, sempre de forma amigável e persuasiva, mas leve.
-            
-            Informações sobre a empresa:
-            - Nome: {organization_name}
-            - Setor: {industry}
-            - Descrição: {description}
-            
-            Diretrizes de comunicação:
-            - Seja amigável e construa rapport rapidamente
-            - Identifique necessidades e dores do cliente
-            - Apresente soluções de forma persuasiva
-            - Destaque benefícios e não apenas características
-            - Conduza o cliente para o próximo passo do funil
-            - Agende reuniões com a equipe comercial quando apropriado
-            
-            Idiomas suportados: {languages}
-            """,
-            
-            "marketing": """
-            Você é Amanda, uma assistente virtual de marketing da {organization_name}.
-            
-            Seu objetivo é engajar leads, nutrir relacionamentos e converter prospects 
-            em clientes através de comunicação personalizada e relevante.
-            
-            Informações sobre a empresa:
-            - Nome: {organization_name}
-            - Setor: {industry}
-            - Descrição: {description}
-            
-            Diretrizes de comunicação:
-            - Personalize mensagens com base no perfil do contato
-            - Forneça conteúdo relevante e de valor
-            - Mantenha tom consistente com a marca
-            - Identifique sinais de interesse para qualificação
-            - Encaminhe leads qualificados para a equipe de vendas
-            
-            Idiomas suportados: {languages}
-            """,
-            
-            "finance": """
-            Você é Ricardo, um assistente virtual financeiro da {organization_name}.
-            
-            Seu objetivo é fornecer análises financeiras, relatórios e insights 
-            para apoiar decisões estratégicas da empresa.
-            
-            Informações sobre a empresa:
-            - Nome: {organization_name}
-            - Setor: {industry}
-            - Descrição: {description}
-            
-            Diretrizes de comunicação:
-            - Seja preciso e objetivo nas análises
-            - Apresente dados de forma clara e estruturada
-            - Destaque tendências e anomalias relevantes
-            - Sugira ações baseadas em dados
-            - Mantenha confidencialidade das informações
-            
-            Idiomas suportados: {languages}
-            """,
-            
-            "hr": """
-            Você é Helena, uma assistente virtual de recursos humanos da {organization_name}.
-            
-            Seu objetivo é otimizar processos de recrutamento, seleção e onboarding,
-            além de fornecer suporte aos colaboradores em questões de RH.
-            
-            Informações sobre a empresa:
-            - Nome: {organization_name}
-            - Setor: {industry}
-            - Descrição: {description}
-            
-            Diretrizes de comunicação:
-            - Seja acolhedora e empática
-            - Forneça informações precisas sobre políticas e benefícios
-            - Conduza triagens iniciais de candidatos
-            - Agende entrevistas e acompanhe processos seletivos
-            - Apoie novos colaboradores no processo de onboarding
-            
-            Idiomas suportados: {languages}
-            """
-        }
+        # Templates de prompts compilados, compartilhados entre instâncias
+        self.prompt_registry = prompt_registry
     
-    def generate_agents_from_analysis(self, analysis_id: int, tenant_id: int, user_id: int) -> List[Dict[str, Any]]:
+    def generate_agents_from_analysis(
+        self,
+        analysis_id: int,
+        tenant_id: int,
+        user_id: int,
+        on_agent_generated: Optional[Callable[[Dict[str, Any]], None]] = None,
+        bulk: bool = False,
+        already_generated: int = 0
+    ) -> List[Dict[str, Any]]:
         """
         Gera agentes personalizados com base nos resultados de uma análise organizacional.
         
@@ -156,10 +70,81 @@ class AgentGenerator:
             analysis_id: ID da análise organizacional
             tenant_id: ID do tenant para isolamento multi-tenant
             user_id: ID do usuário que solicitou a geração
+            on_agent_generated: Função chamada após cada agente gerado, com os dados
+                do agente; pode persistir o progresso (por exemplo, com commit)
+            bulk: Se True, insere todos os agentes e configurações com duas
+                instruções multi-linha em vez de uma ida ao banco por agente
+            already_generated: Número de agentes recomendados já persistidos por
+                uma execução anterior (interrompida), que não são inseridos de novo
             
         Returns:
             Lista de agentes gerados com seus IDs e configurações
         """
+        agent_specs = self._build_agent_specs(analysis_id, tenant_id, user_id)[already_generated:]
+        
+        if bulk:
+            generated_agents = self._insert_agents_bulk(agent_specs)
+            for generated_agent in generated_agents:
+                if on_agent_generated:
+                    on_agent_generated(generated_agent)
+        else:
+            generated_agents = []
+            for agent_spec in agent_specs:
+                generated_agent = self._insert_agent(agent_spec)
+                generated_agents.append(generated_agent)
+                
+                # Notificar o progresso da geração
+                if on_agent_generated:
+                    on_agent_generated(generated_agent)
+        
+        # Persistir mudanças no banco de dados
+        self.db_session.commit()
+        
+        return generated_agents
+    
+    def provision_agents_bulk(self, provisioning_requests: List[Dict[str, int]]) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Provisiona agentes para várias análises (e tenants) de uma só vez.
+        
+        Todos os agentes de todas as análises são inseridos com um único
+        INSERT multi-linha com RETURNING, e todas as configurações com mais uma
+        instrução, em uma única transação.
+        
+        Args:
+            provisioning_requests: Lista de dicionários com analysis_id, tenant_id e user_id
+            
+        Returns:
+            Agentes gerados agrupados pelo ID da análise
+        """
+        agent_specs = []
+        for request in provisioning_requests:
+            agent_specs.extend(self._build_agent_specs(
+                analysis_id=request["analysis_id"],
+                tenant_id=request["tenant_id"],
+                user_id=request["user_id"]
+            ))
+        
+        generated_agents = self._insert_agents_bulk(agent_specs)
+        self.db_session.commit()
+        
+        result = {request["analysis_id"]: [] for request in provisioning_requests}
+        for agent_spec, generated_agent in zip(agent_specs, generated_agents):
+            result[agent_spec["analysis_id"]].append(generated_agent)
+        
+        return result
+    
+    def _build_agent_specs(self, analysis_id: int, tenant_id: int, user_id: int) -> List[Dict[str, Any]]:
+        """
+        Prepara os dados dos agentes recomendados em uma análise, sem persisti-los.
+        
+        Args:
+            analysis_id: ID da análise organizacional
+            tenant_id: ID do tenant para isolamento multi-tenant
+            user_id: ID do usuário que solicitou a geração
+            
+        Returns:
+            Lista com as colunas do agente, sua configuração e a recomendação de origem
+        """
         # Buscar análise no banco de dados
         analysis = self.db_session.query(OrganizationAnalysis).filter(
             OrganizationAnalysis.id == analysis_id,
@@ -183,7 +168,7 @@ class AgentGenerator:
             raise ValueError(f"Nenhum agente recomendado encontrado na análise {analysis_id}")
         
         # Gerar agentes com base nas recomendações
-        generated_agents = []
+        agent_specs = []
         
         for agent_rec in recommended_agents:
             agent_id = agent_rec.get("id")
@@ -201,14 +186,14 @@ class AgentGenerator:
                 ])
             }
             
-            # Obter template de prompt para o tipo de agente
-            prompt_template = self.prompt_templates.get(agent_type)
-            if not prompt_template:
-                # Usar template genérico se não houver específico
-                prompt_template = f"Você é {agent_name}, um assistente virtual da {organization.name}."
-            
-            # Formatar prompt com dados da organização
-            prompt = prompt_template.format(**prompt_data)
+            # Renderizar o prompt compilado para o tipo de agente
+            # (tipos sem template específico usam o template genérico)
+            prompt_type, prompt_version = self.prompt_registry.resolve(agent_type)
+            prompt = self.prompt_registry.render(
+                prompt_type,
+                {**prompt_data, "agent_name": agent_name},
+                version=prompt_version
+            )
             
             # Configurar canais de comunicação
             channels = {}
@@ -240,47 +225,123 @@ class AgentGenerator:
                 "metadata": {
                     "generated_from_analysis": analysis_id,
                     "confidence_score": agent_rec.get("confidence", 0),
+                    "prompt_template": f"{prompt_type}:v{prompt_version}",
                     "generation_date": datetime.now().isoformat()
                 }
             }
             
-            # Criar agente no banco de dados
-            agent = Agent(
-                name=agent_name,
-                description=agent_rec.get("description", ""),
-                type=agent_type,
-                tenant_id=tenant_id,
-                created_by=user_id,
-                folder_id=None  # Pasta padrão
-            )
-            self.db_session.add(agent)
-            self.db_session.flush()  # Obter ID do agente
-            
-            # Criar configuração do agente no banco de dados
-            agent_configuration = AgentConfiguration(
-                agent_id=agent.id,
-                configuration=agent_config,
-                version=1,
-                is_active=True
-            )
-            self.db_session.add(agent_configuration)
-            
-            # Criar instância do agente usando o AgentBuilder
-            agent_instance = self._create_agent_instance(agent.id, agent_type, agent_config)
-            
-            # Adicionar à lista de agentes gerados
-            generated_agents.append({
-                "id": agent.id,
-                "name": agent_name,
-                "type": agent_type,
-                "description": agent_rec.get("description", ""),
+            agent_specs.append({
+                "analysis_id": analysis_id,
+                "agent": {
+                    "name": agent_name,
+                    "description": agent_rec.get("description", ""),
+                    "type": agent_type,
+                    "tenant_id": tenant_id,
+                    "created_by": user_id,
+                    "folder_id": None  # Pasta padrão
+                },
                 "configuration": agent_config
             })
         
-        # Persistir mudanças no banco de dados
-        self.db_session.commit()
+        return agent_specs
+    
+    def _insert_agent(self, agent_spec: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Insere um agente e sua configuração (uma ida ao banco por agente).
         
-        return generated_agents
+        Args:
+            agent_spec: Dados preparados por `_build_agent_specs`
+            
+        Returns:
+            Dados do agente gerado
+        """
+        # Criar agente no banco de dados
+        agent = Agent(**agent_spec["agent"])
+        self.db_session.add(agent)
+        self.db_session.flush()  # Obter ID do agente
+        
+        # Criar configuração do agente no banco de dados
+        agent_configuration = AgentConfiguration(
+            agent_id=agent.id,
+            configuration=agent_spec["configuration"],
+            version=1,
+            is_active=True
+        )
+        self.db_session.add(agent_configuration)
+        
+        # Criar instância do agente usando o AgentBuilder
+        self._create_agent_instance(agent.id, agent_spec["agent"]["type"], agent_spec["configuration"])
+        
+        return self._generated_agent(agent.id, agent_spec)
+    
+    def _insert_agents_bulk(self, agent_specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insere agentes e configurações com duas instruções multi-linha.
+        
+        Os agentes são inseridos com INSERT ... RETURNING, com os IDs retornados
+        na ordem dos parâmetros; as configurações são inseridas em seguida
+        com um único INSERT de várias linhas.
+        
+        Args:
+            agent_specs: Dados preparados por `_build_agent_specs`
+            
+        Returns:
+            Dados dos agentes gerados, na mesma ordem de `agent_specs`
+        """
+        if not agent_specs:
+            return []
+        
+        agent_ids = self.db_session.execute(
+            insert(Agent).returning(Agent.id, sort_by_parameter_order=True),
+            [agent_spec["agent"] for agent_spec in agent_specs]
+        ).scalars().all()
+        
+        self.db_session.execute(
+            insert(AgentConfiguration),
+            [
+                {
+                    "agent_id": agent_id,
+                    "configuration": agent_spec["configuration"],
+                    "version": 1,
+                    "is_active": True
+                }
+                for agent_id, agent_spec in zip(agent_ids, agent_specs)
+            ]
+        )
+        
+        # Criar as instâncias dos agentes em lote usando o AgentBuilder
+        self.agent_builder.build_many(
+            (
+                str(agent_id),
+                AGENT_TYPE_CLASSES.get(agent_spec["agent"]["type"], LLMAgent),
+                agent_spec["configuration"]
+            )
+            for agent_id, agent_spec in zip(agent_ids, agent_specs)
+        )
+        
+        return [
+            self._generated_agent(agent_id, agent_spec)
+            for agent_id, agent_spec in zip(agent_ids, agent_specs)
+        ]
+    
+    def _generated_agent(self, agent_id: int, agent_spec: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Monta os dados de retorno de um agente gerado.
+        
+        Args:
+            agent_id: ID do agente persistido
+            agent_spec: Dados preparados por `_build_agent_specs`
+            
+        Returns:
+            Dados do agente gerado
+        """
+        return {
+            "id": agent_id,
+            "name": agent_spec["agent"]["name"],
+            "type": agent_spec["agent"]["type"],
+            "description": agent_spec["agent"]["description"],
+            "configuration": agent_spec["configuration"]
+        }
     
     def _create_agent_instance(self, agent_id: int, agent_type: str, config: Dict[str, Any]) -> Any:
         """
@@ -294,26 +355,11 @@ class AgentGenerator:
         Returns:
             Instância do agente criado
         """
-        # Mapear tipos de agentes para classes de implementação
-        agent_type_mapping = {
-            "customer_support": LLMAgent,
-            "sales": LLMAgent,
-            "marketing": LLMAgent,
-            "finance": LLMAgent,
-            "hr": LLMAgent
-        }
-        
-        # Obter classe de implementação para o tipo de agente
-        agent_class = agent_type_mapping.get(agent_type, LLMAgent)
-        
-        # Criar instância do agente
-        agent_instance = self.agent_builder.build_agent(
+        return self.agent_builder.build_agent(
             agent_id=str(agent_id),
-            agent_type=agent_class.__name__,
+            agent_type=AGENT_TYPE_CLASSES.get(agent_type, LLMAgent),
             config=config
         )
-        
-        return agent_instance
     
     def _get_default_channel_config(self, channel: str) -> Dict[str, Any]:
         """
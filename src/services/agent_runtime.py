@@ -0,0 +1,321 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Pool de Instâncias de Agentes em Execução                                   │
+│                                                                             │
+│ Este serviço mantém em memória as instâncias de agentes que atendem         │
+│ mensagens, indexadas por (agent_id, versão da configuração), com remoção    │
+│ LRU limitada por número de instâncias e por memória estimada.               │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Type, Union
+import logging
+import os
+import sys
+import threading
+
+from src.services.adk.agent_builder import AgentBuilder
+
+logger = logging.getLogger(__name__)
+
+# Limites do pool
+AGENT_RUNTIME_MAX_AGENTS = int(os.getenv("AGENT_RUNTIME_MAX_AGENTS", "512"))
+AGENT_RUNTIME_MAX_MEMORY_MB = int(os.getenv("AGENT_RUNTIME_MAX_MEMORY_MB", "256"))
+
+def estimate_size(value: Any) -> int:
+    """
+    Estima a memória ocupada por um objeto e tudo o que ele referencia.
+    
+    Percorre dicionários, sequências, conjuntos e os atributos do objeto
+    medido, contando cada objeto uma única vez. Outras instâncias referenciadas
+    (serviços e armazenamentos compartilhados, como o histórico de conversas)
+    são contadas apenas pelo seu tamanho raso.
+    
+    Args:
+        value: Objeto a ser medido
+    
+    Returns:
+        Tamanho estimado em bytes
+    """
+    seen = set()
+    pending = [value]
+    total = 0
+    
+    while pending:
+        current = pending.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        
+        if isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            pending.extend(current)
+        elif current is value and hasattr(current, "__dict__"):
+            pending.append(vars(current))
+    
+    return total
+
+class AgentRuntimeCache:
+    """
+    Pool de instâncias de agentes em execução, compartilhado pelo processo.
+    
+    Esta classe implementa:
+    1. Instâncias indexadas por (agent_id, versão da configuração)
+    2. Remoção LRU limitada por número de instâncias e por memória estimada
+    3. Invalidação das versões antigas quando uma nova configuração é criada
+    4. Contadores de acertos, falhas e remoções
+    
+    Como a versão faz parte da chave, uma consulta pela versão ativa nunca
+    retorna uma instância desatualizada; a invalidação apenas libera a memória
+    das versões substituídas.
+    """
+    
+    def __init__(
+        self,
+        builder: Optional[AgentBuilder] = None,
+        max_agents: int = AGENT_RUNTIME_MAX_AGENTS,
+        max_memory_bytes: int = AGENT_RUNTIME_MAX_MEMORY_MB * 1024 * 1024
+    ):
+        """
+        Inicializa o pool.
+        
+        Args:
+            builder: Construtor de agentes (por padrão, um novo AgentBuilder)
+            max_agents: Número máximo de instâncias mantidas
+            max_memory_bytes: Memória estimada máxima ocupada pelas instâncias
+        """
+        self._builder = builder
+        self.max_agents = max_agents
+        self.max_memory_bytes = max_memory_bytes
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[Any, int]]" = OrderedDict()
+        self._memory = 0
+        self._lock = threading.RLock()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0
+        }
+    
+    @property
+    def builder(self) -> AgentBuilder:
+        """Construtor usado para criar as instâncias ausentes do pool."""
+        if self._builder is None:
+            self._builder = AgentBuilder()
+        return self._builder
+    
+    def get(self, agent_id: int, version: int) -> Optional[Any]:
+        """
+        Obtém uma instância do pool.
+        
+        Args:
+            agent_id: ID do agente
+            version: Versão da configuração do agente
+        
+        Returns:
+            Instância do agente ou None se não estiver no pool
+        """
+        key = (agent_id, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry[0]
+    
+    def get_or_build(
+        self,
+        agent_id: int,
+        version: int,
+        agent_type: Union[str, Type],
+        config: Dict[str, Any]
+    ) -> Any:
+        """
+        Obtém uma instância do pool, construindo-a se necessário.
+        
+        Args:
+            agent_id: ID do agente
+            version: Versão da configuração do agente
+            agent_type: Tipo do agente (nome ou classe)
+            config: Configuração usada caso a instância precise ser construída
+        
+        Returns:
+            Instância do agente
+        """
+        agent_instance = self.get(agent_id, version)
+        if agent_instance is not None:
+            return agent_instance
+        
+        # Construir fora da trava; se outra thread chegar antes, usar a instância dela
+        agent_instance = self.builder.build_agent(
+            agent_id=str(agent_id),
+            agent_type=agent_type,
+            config=config
+        )
+        size = estimate_size(agent_instance)
+        
+        with self._lock:
+            self._counters["misses"] += 1
+            entry = self._entries.get((agent_id, version))
+            if entry is not None:
+                self._entries.move_to_end((agent_id, version))
+                return entry[0]
+            
+            self._discard_older_versions(agent_id, version)
+            self._entries[(agent_id, version)] = (agent_instance, size)
+            self._memory += size
+            self._evict(keep=(agent_id, version))
+        
+        return agent_instance
+    
+    def load(self, db, agent_id: int, tenant_id: Optional[int] = None) -> Optional[Any]:
+        """
+        Obtém a instância da configuração ativa de um agente.
+        
+        Args:
+            db: Sessão do banco de dados
+            agent_id: ID do agente
+            tenant_id: ID do tenant, para restringir a consulta
+        
+        Returns:
+            Instância do agente ou None se o agente não tiver configuração ativa
+        """
+        from src.models.models import Agent, AgentConfiguration
+        from src.services.agent_generator import AGENT_TYPE_CLASSES
+        from src.services.adk.custom_agents.llm_agent import LLMAgent
+        
+        query = db.query(Agent.type, AgentConfiguration.version, AgentConfiguration.configuration).join(
+            AgentConfiguration, AgentConfiguration.agent_id == Agent.id
+        ).filter(
+            Agent.id == agent_id,
+            AgentConfiguration.is_active == True
+        )
+        if tenant_id is not None:
+            query = query.filter(Agent.tenant_id == tenant_id)
+        
+        row = query.first()
+        if row is None:
+            return None
+        
+        return self.get_or_build(
+            agent_id,
+            row.version,
+            AGENT_TYPE_CLASSES.get(row.type, LLMAgent),
+            row.configuration
+        )
+    
+    def invalidate(self, agent_id: int, keep_version: Optional[int] = None) -> int:
+        """
+        Remove as instâncias de um agente.
+        
+        Args:
+            agent_id: ID do agente
+            keep_version: Versão que deve ser mantida, se houver
+        
+        Returns:
+            Número de instâncias removidas
+        """
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if key[0] == agent_id and key[1] != keep_version
+            ]
+            for key in keys:
+                self._remove(key)
+            self._counters["invalidations"] += len(keys)
+        
+        return len(keys)
+    
+    def clear(self) -> None:
+        """Remove todas as instâncias do pool."""
+        with self._lock:
+            self._entries.clear()
+            self._memory = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores do pool.
+        
+        Returns:
+            Dicionário com acertos, falhas, remoções e ocupação do pool
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+            memory = self._memory
+        
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_ratio": counters["hits"] / lookups if lookups else 0.0,
+            "agents": entries,
+            "max_agents": self.max_agents,
+            "memory_bytes": memory,
+            "max_memory_bytes": self.max_memory_bytes
+        }
+    
+    def _discard_older_versions(self, agent_id: int, version: int) -> None:
+        """Remove versões anteriores do mesmo agente (requer a trava)."""
+        for key in [key for key in self._entries if key[0] == agent_id and key[1] < version]:
+            self._remove(key)
+            self._counters["invalidations"] += 1
+    
+    def _evict(self, keep: Tuple[int, int]) -> None:
+        """Remove as instâncias menos usadas até respeitar os limites (requer a trava)."""
+        while len(self._entries) > self.max_agents or self._memory > self.max_memory_bytes:
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            self._remove(key)
+            self._counters["evictions"] += 1
+    
+    def _remove(self, key: Tuple[int, int]) -> None:
+        """Remove uma entrada e desconta sua memória (requer a trava)."""
+        _, size = self._entries.pop(key)
+        self._memory -= size
+
+def watch_configuration_changes(session_factory, cache: Optional[AgentRuntimeCache] = None) -> None:
+    """
+    Invalida o pool automaticamente após commits que criem configurações de agentes.
+    
+    Os eventos de sessão do SQLAlchemy registram as novas AgentConfiguration
+    inseridas (por exemplo, em `validate_agent`); após o commit, as versões
+    anteriores desses agentes são removidas do pool.
+    
+    Args:
+        session_factory: Fábrica de sessões (por exemplo, SessionLocal)
+        cache: Pool a ser invalidado (por padrão, o pool do processo)
+    """
+    from sqlalchemy import event
+    from src.models.models import AgentConfiguration
+    
+    cache = cache or agent_runtime
+    
+    @event.listens_for(session_factory, "after_flush")
+    def mark_configuration_changes(session, flush_context):
+        versions = [
+            (instance.agent_id, instance.version)
+            for instance in session.new
+            if isinstance(instance, AgentConfiguration)
+        ]
+        if versions:
+            session.info.setdefault("agent_configurations_created", []).extend(versions)
+    
+    @event.listens_for(session_factory, "after_commit")
+    def invalidate_agents(session):
+        for agent_id, version in session.info.pop("agent_configurations_created", []):
+            removed = cache.invalidate(agent_id, keep_version=version)
+            if removed:
+                logger.info(f"{removed} instância(s) do agente {agent_id} invalidada(s) pela versão {version}")
+    
+    @event.listens_for(session_factory, "after_rollback")
+    def discard_configuration_changes(session):
+        session.info.pop("agent_configurations_created", None)
+
+# Pool compartilhado pelo processo
+agent_runtime = AgentRuntimeCache()
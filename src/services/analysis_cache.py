@@ -0,0 +1,189 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Cache de Resultados de Análise Organizacional                               │
+│                                                                             │
+│ Este serviço implementa um cache endereçado por conteúdo para análises      │
+│ organizacionais: um LRU em memória à frente do Redis, indexado pelo hash    │
+│ canônico dos dados de entrada e pela versão do registro de templates.       │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from src.config.redis_config import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Configuração do cache
+ANALYSIS_CACHE_PREFIX = "nowgo:analysis:"
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", "86400"))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1024"))
+
+class AnalysisCache:
+    """
+    Cache de dois níveis para resultados de análise organizacional.
+    
+    Esta classe implementa:
+    1. Chaves derivadas do hash canônico dos dados de entrada
+    2. Um LRU em memória limitado por número de entradas
+    3. Um segundo nível no Redis, compartilhado entre processos, com TTL
+    4. Contadores de acertos e falhas
+    """
+    
+    def __init__(
+        self,
+        redis_client=None,
+        max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES,
+        ttl: int = ANALYSIS_CACHE_TTL
+    ):
+        """
+        Inicializa o cache.
+        
+        Args:
+            redis_client: Cliente Redis (por padrão, o cliente configurado em redis_config)
+            max_entries: Número máximo de entradas no LRU em memória
+            ttl: Tempo de expiração das entradas no Redis, em segundos
+        """
+        self._redis_client = redis_client
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "redis_errors": 0
+        }
+    
+    @property
+    def redis_client(self):
+        """Cliente Redis usado como segundo nível do cache."""
+        if self._redis_client is None:
+            self._redis_client = get_redis_client()
+        return self._redis_client
+    
+    @staticmethod
+    def make_key(tenant_id: int, payload: Dict[str, Any], registry_version: str) -> str:
+        """
+        Calcula a chave do cache para uma análise.
+        
+        O payload é serializado de forma canônica (chaves ordenadas, sem espaços),
+        de modo que dados idênticos sempre produzem a mesma chave.
+        
+        Args:
+            tenant_id: ID do tenant (as entradas nunca são compartilhadas entre tenants)
+            payload: Dados de entrada do analisador
+            registry_version: Versão do registro de templates usado na análise
+        
+        Returns:
+            Hash SHA-256 hexadecimal
+        """
+        canonical = json.dumps(
+            {"tenant_id": tenant_id, "registry": registry_version, "payload": payload},
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém um resultado do cache.
+        
+        Args:
+            key: Chave calculada por `make_key`
+        
+        Returns:
+            Resultado armazenado ou None se não houver entrada
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._counters["local_hits"] += 1
+                return value
+        
+        try:
+            raw = self.redis_client.get(ANALYSIS_CACHE_PREFIX + key)
+        except Exception as e:
+            logger.error(f"Erro ao consultar cache de análises no Redis: {str(e)}")
+            raw = None
+            with self._lock:
+                self._counters["redis_errors"] += 1
+        
+        if raw is None:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+        
+        value = json.loads(raw)
+        with self._lock:
+            self._counters["redis_hits"] += 1
+            self._store_local(key, value)
+        return value
+    
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Armazena um resultado no cache.
+        
+        Args:
+            key: Chave calculada por `make_key`
+            value: Resultado serializável em JSON
+        """
+        with self._lock:
+            self._store_local(key, value)
+        
+        try:
+            self.redis_client.setex(
+                ANALYSIS_CACHE_PREFIX + key,
+                self.ttl,
+                json.dumps(value, ensure_ascii=False, default=str)
+            )
+        except Exception as e:
+            logger.error(f"Erro ao gravar cache de análises no Redis: {str(e)}")
+            with self._lock:
+                self._counters["redis_errors"] += 1
+    
+    def clear(self) -> None:
+        """Limpa o LRU em memória (as entradas no Redis expiram pelo TTL)."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores do cache.
+        
+        Returns:
+            Dicionário com acertos, falhas, erros e ocupação do LRU
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+        
+        hits = counters["local_hits"] + counters["redis_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "hits": hits,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "local_entries": entries,
+            "max_entries": self.max_entries
+        }
+    
+    def _store_local(self, key: str, value: Dict[str, Any]) -> None:
+        """Insere no LRU, removendo as entradas menos usadas (requer a trava)."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+# Cache compartilhado pelo processo
+analysis_cache = AnalysisCache()
@@ -12,15 +12,58 @@
 """
 
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Tuple, Union, AsyncIterator, AsyncIterable, Callable, Iterable, Mapping
+from email.header import Header
+from email.mime.text import MIMEText
+from email.utils import formataddr
+import asyncio
+import os
 import uuid
 import logging
 import httpx
 import json
 from datetime import datetime
 
+from jinja2 import Environment, StrictUndefined, TemplateError
+
+from src.services.http_client_pool import http_clients
+from src.services.outbound_queue import get_outbound_queue
+from src.services.rate_limiter import bucket_for
+from src.services.smtp_pool import envelope_address, smtp_connections
+from src.services.channel_routing import channel_routes
+
 logger = logging.getLogger(__name__)
 
+# Channels with an outbound sender
+SUPPORTED_CHANNELS = ("whatsapp", "email", "linkedin", "phone")
+
+# Channels whose provider accepts many messages per call (pooled, pipelined SMTP sessions)
+BATCHED_CHANNELS = ("email",)
+
+# Recipients rendered and queued per round trip in bulk sends
+BULK_SEND_CHUNK_SIZE = int(os.getenv("BULK_SEND_CHUNK_SIZE", "100"))
+
+# Bulk message templates are compiled once per campaign; missing variables are errors
+_bulk_templates = Environment(undefined=StrictUndefined, autoescape=False)
+
+async def _chunked(items: Union[Iterable[Any], AsyncIterable[Any]], size: int) -> AsyncIterator[List[Any]]:
+    """Yield lists of up to `size` items from a sync or async iterable, consuming it lazily"""
+    chunk = []
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            chunk.append(item)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    else:
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
 class ChannelIntegration:
     """
     Manages integrations with various communication channels like WhatsApp, Email, 
@@ -232,6 +275,166 @@ class ChannelIntegration:
             }
     
     async def send_message(
+        self, 
+        client_id: uuid.UUID, 
+        channel: str, 
+        recipient: str, 
+        message: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue a message for delivery through a specific channel
+        
+        The message is stored in the durable outbound queue and delivered by
+        the outbound workers, so the caller does not wait for the provider.
+        
+        Args:
+            client_id: UUID of the client
+            channel: Channel to send the message through (whatsapp, email, linkedin, phone)
+            recipient: Recipient identifier (phone number, email, etc.)
+            message: Message content
+            metadata: Additional metadata for the message
+            idempotency_key: Key that identifies retries of the same message; a
+                repeated key returns the original message id without queueing again
+            
+        Returns:
+            Status of the message queueing, with the message id
+        """
+        if channel not in SUPPORTED_CHANNELS:
+            return {
+                "success": False,
+                "error": f"Unsupported channel: {channel}"
+            }
+        
+        try:
+            message_id, created = await asyncio.to_thread(get_outbound_queue().enqueue, {
+                "client_id": str(client_id),
+                "channel": channel,
+                "recipient": recipient,
+                "message": message,
+                "metadata": metadata or {},
+                "idempotency_key": idempotency_key
+            })
+            
+            return {
+                "success": True,
+                "status": "queued",
+                "channel": channel,
+                "recipient": recipient,
+                "message_id": message_id,
+                "duplicate": not created,
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error queueing message via {channel}: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    async def send_bulk(
+        self,
+        client_id: uuid.UUID,
+        channel: str,
+        recipients: Union[Iterable[Any], AsyncIterable[Any]],
+        template: str,
+        per_recipient_vars: Optional[Union[Mapping[str, Dict[str, Any]], Callable[[str], Dict[str, Any]]]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        campaign_id: Optional[str] = None,
+        chunk_size: int = BULK_SEND_CHUNK_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Queue one message template for many recipients
+        
+        Recipients are consumed lazily, in chunks of `chunk_size`: each chunk is
+        rendered and queued in a single round trip, and its results are yielded
+        before the next chunk is read, so the recipient list is never held in
+        memory. Each recipient gets the idempotency key "bulk:<campaign_id>:<recipient>",
+        so resending a campaign with the same id skips recipients already queued.
+        
+        Args:
+            client_id: UUID of the client
+            channel: Channel to send the messages through (whatsapp, email, linkedin, phone)
+            recipients: Sync or async iterable of recipient identifiers, or of
+                dicts with "recipient" and optional "vars"
+            template: Jinja2 template of the message; "recipient" and the
+                recipient's variables are available to it
+            per_recipient_vars: Variables per recipient, as a mapping or a function
+            metadata: Metadata shared by all messages (e.g. the email subject)
+            campaign_id: Campaign identifier (generated if omitted)
+            chunk_size: Recipients rendered and queued per round trip
+            
+        Yields:
+            A "result" event per recipient (status "queued", "duplicate" or
+            "failed"), a "progress" event per chunk and a final "done" event
+            with the totals
+        """
+        if channel not in SUPPORTED_CHANNELS:
+            yield {"type": "error", "error": f"Unsupported channel: {channel}"}
+            return
+        try:
+            compiled = _bulk_templates.from_string(template)
+        except TemplateError as e:
+            yield {"type": "error", "error": f"Invalid template: {str(e)}"}
+            return
+        
+        campaign_id = campaign_id or str(uuid.uuid4())
+        metadata = {**(metadata or {}), "campaign_id": campaign_id}
+        queue = get_outbound_queue()
+        totals = {"processed": 0, "queued": 0, "duplicate": 0, "failed": 0}
+        
+        async for chunk in _chunked(recipients, chunk_size):
+            results, messages, positions = [], [], []
+            for item in chunk:
+                recipient, variables = item, {}
+                if isinstance(item, Mapping):
+                    recipient, variables = item.get("recipient"), item.get("vars") or {}
+                if callable(per_recipient_vars):
+                    variables = {**per_recipient_vars(recipient), **variables}
+                elif per_recipient_vars:
+                    variables = {**per_recipient_vars.get(recipient, {}), **variables}
+                
+                try:
+                    if not recipient:
+                        raise ValueError("Missing recipient")
+                    body = compiled.render(recipient=recipient, **variables)
+                except Exception as e:
+                    results.append({"type": "result", "recipient": recipient, "status": "failed", "error": str(e)})
+                    continue
+                
+                positions.append(len(results))
+                results.append({"type": "result", "recipient": recipient})
+                messages.append({
+                    "client_id": str(client_id),
+                    "channel": channel,
+                    "recipient": recipient,
+                    "message": body,
+                    "metadata": metadata,
+                    "idempotency_key": f"bulk:{campaign_id}:{recipient}"
+                })
+            
+            if messages:
+                try:
+                    queued = await asyncio.to_thread(queue.enqueue_many, messages)
+                    for position, (message_id, created) in zip(positions, queued):
+                        results[position].update(status="queued" if created else "duplicate", message_id=message_id)
+                except Exception as e:
+                    logger.error(f"Error queueing bulk messages for campaign {campaign_id}: {str(e)}")
+                    for position in positions:
+                        results[position].update(status="failed", error=str(e))
+            
+            for result in results:
+                totals["processed"] += 1
+                totals[result["status"]] += 1
+                yield result
+            yield {"type": "progress", "campaign_id": campaign_id, **totals}
+        
+        logger.info(f"Bulk send {campaign_id} via {channel}: {totals}")
+        yield {"type": "done", "campaign_id": campaign_id, **totals}
+    
+    async def deliver_message(
         self, 
         client_id: uuid.UUID, 
         channel: str, 
@@ -240,7 +443,9 @@ class ChannelIntegration:
         metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
-        Send a message through a specific channel
+        Send a message through a specific channel, inline
+        
+        Used by the outbound queue workers; API callers should use send_message.
         
         Args:
             client_id: UUID of the client
@@ -281,6 +486,78 @@ class ChannelIntegration:
                 "error": str(e)
             }
     
+    async def deliver_many(
+        self,
+        client_id: uuid.UUID,
+        channel: str,
+        messages: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Send several messages of one client through a channel, inline
+        
+        Channels in BATCHED_CHANNELS send the whole batch in one provider call
+        (pipelined over pooled SMTP connections for email); the others send
+        the messages concurrently.
+        
+        Args:
+            client_id: UUID of the client
+            channel: Channel to send the messages through
+            messages: Messages, as dicts with "recipient", "message" and "metadata"
+            
+        Returns:
+            Status of each message sending, in the same order
+        """
+        if channel == "email":
+            logger.info(f"Sending {len(messages)} messages via email over pooled SMTP connections")
+            try:
+                return await self._send_email_batch(client_id, messages)
+            except Exception as e:
+                logger.error(f"Error sending messages via email: {str(e)}")
+                return [{"success": False, "error": str(e)} for _ in messages]
+        
+        return await asyncio.gather(*(
+            self.deliver_message(client_id, channel, message["recipient"], message["message"], message.get("metadata"))
+            for message in messages
+        ))
+    
+    def _get_channel_config(self, client_id: uuid.UUID, channel: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the active configuration of a client's channel integration
+        
+        Args:
+            client_id: UUID of the client
+            channel: Channel type
+            
+        Returns:
+            Channel configuration, or None if the channel is not configured
+        """
+        # The routing index is kept current on every change, so senders skip the database
+        if channel_routes.loaded:
+            return channel_routes.channel_config(client_id, channel)
+        
+        from src.models.models import ChannelIntegration as ChannelIntegrationModel
+        
+        row = self.db.query(ChannelIntegrationModel.configuration).filter(
+            ChannelIntegrationModel.client_id == client_id,
+            ChannelIntegrationModel.channel_type == channel,
+            ChannelIntegrationModel.active == True
+        ).first()
+        return row.configuration if row else None
+    
+    def rate_limit_bucket(self, client_id: uuid.UUID, channel: str) -> Tuple[str, float, int]:
+        """
+        Get the rate limit bucket for a client's channel
+        
+        Args:
+            client_id: UUID of the client
+            channel: Channel type
+            
+        Returns:
+            Tuple (bucket key, messages per second, burst) for the sender
+            identity configured for the channel
+        """
+        return bucket_for(client_id, channel, self._get_channel_config(client_id, channel))
+    
     async def _send_whatsapp_message(
         self, 
         client_id: uuid.UUID, 
@@ -288,13 +565,35 @@ class ChannelIntegration:
         message: str,
         metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Send a WhatsApp message"""
-        # In a real implementation, this would use the WhatsApp Business API
+        """Send a WhatsApp message through the WhatsApp Business Cloud API"""
+        config = self._get_channel_config(client_id, "whatsapp")
+        if not config:
+            return {"success": False, "error": "WhatsApp integration not configured"}
+        
+        # The pooled client keeps connections to the API open between messages
+        async with http_clients.client(
+            "whatsapp",
+            client_id,
+            headers={"Authorization": f"Bearer {config['api_key']}"},
+            base_url=config.get("base_url")
+        ) as client:
+            response = await client.post(
+                f"/{config['phone_number_id']}/messages",
+                json={
+                    "messaging_product": "whatsapp",
+                    "to": recipient,
+                    "type": "text",
+                    "text": {"body": message}
+                }
+            )
+            response.raise_for_status()
+            body = response.json()
+        
         return {
             "success": True,
             "channel": "whatsapp",
             "recipient": recipient,
-            "message_id": str(uuid.uuid4()),
+            "message_id": (body.get("messages") or [{}])[0].get("id") or str(uuid.uuid4()),
             "timestamp": datetime.now().isoformat()
         }
     
@@ -306,14 +605,61 @@ class ChannelIntegration:
         metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Send an Email message"""
-        # In a real implementation, this would use SMTP or an email service API
-        return {
-            "success": True,
-            "channel": "email",
-            "recipient": recipient,
-            "message_id": str(uuid.uuid4()),
-            "timestamp": datetime.now().isoformat()
-        }
+        results = await self._send_email_batch(
+            client_id,
+            [{"recipient": recipient, "message": message, "metadata": metadata}]
+        )
+        return results[0]
+    
+    async def _send_email_batch(
+        self,
+        client_id: uuid.UUID,
+        messages: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Send Email messages through the client's SMTP server, over pooled connections"""
+        config = self._get_channel_config(client_id, "email")
+        if not config:
+            return [{"success": False, "error": "Email integration not configured"} for _ in messages]
+        
+        try:
+            sender = envelope_address(config["from_email"])
+        except ValueError as e:
+            return [{"success": False, "error": str(e)} for _ in messages]
+        
+        # MIMEText (compat32) builds a message several times faster than EmailMessage
+        domain = sender.split("@")[-1]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(messages)
+        emails = []
+        for index, message in enumerate(messages):
+            # Addresses with line breaks or brackets would inject SMTP commands or headers
+            try:
+                recipient = envelope_address(message["recipient"])
+            except ValueError as e:
+                results[index] = {"success": False, "error": str(e)}
+                continue
+            
+            metadata = message.get("metadata") or {}
+            email = MIMEText(message["message"], "plain", "utf-8")
+            email["From"] = formataddr(("", sender))
+            email["To"] = formataddr(("", recipient))
+            email["Subject"] = Header(metadata.get("subject", ""), "utf-8")
+            email["Message-ID"] = f"<{metadata.get('message_id') or uuid.uuid4()}@{domain}>"
+            emails.append((index, recipient, email))
+        
+        # Pooled connections stay authenticated between batches; sends are pipelined
+        errors = await smtp_connections.send_many(
+            config,
+            [(sender, recipient, email.as_bytes()) for _, recipient, email in emails]
+        )
+        for (index, recipient, email), error in zip(emails, errors):
+            results[index] = {"success": False, "error": error} if error else {
+                "success": True,
+                "channel": "email",
+                "recipient": recipient,
+                "message_id": email["Message-ID"],
+                "timestamp": datetime.now().isoformat()
+            }
+        return results
     
     async def _send_linkedin_message(
         self, 
@@ -322,13 +668,35 @@ class ChannelIntegration:
         message: str,
         metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Send a LinkedIn message"""
-        # In a real implementation, this would use the LinkedIn API
+        """Send a LinkedIn message through the LinkedIn Messages API"""
+        config = self._get_channel_config(client_id, "linkedin")
+        if not config:
+            return {"success": False, "error": "LinkedIn integration not configured"}
+        
+        async with http_clients.client(
+            "linkedin",
+            client_id,
+            headers={
+                "Authorization": f"Bearer {config['access_token']}",
+                "X-Restli-Protocol-Version": "2.0.0"
+            },
+            base_url=config.get("base_url")
+        ) as client:
+            response = await client.post(
+                "/messages",
+                json={
+                    "recipients": [recipient],
+                    "subject": (metadata or {}).get("subject", ""),
+                    "body": message
+                }
+            )
+            response.raise_for_status()
+        
         return {
             "success": True,
             "channel": "linkedin",
             "recipient": recipient,
-            "message_id": str(uuid.uuid4()),
+            "message_id": response.headers.get("x-restli-id") or str(uuid.uuid4()),
             "timestamp": datetime.now().isoformat()
         }
     
@@ -0,0 +1,561 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Índice de Roteamento dos Canais                                             │
+│                                                                             │
+│ Este módulo mantém em memória as integrações ativas dos canais e os         │
+│ agentes vinculados a elas, indexados por (cliente, canal, identidade),      │
+│ carregados na inicialização e atualizados por notificações de alteração     │
+│ (LISTEN/NOTIFY do PostgreSQL ou pub/sub do Redis).                          │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+import json
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+
+from src.config.redis_config import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Configuração das notificações de alteração
+CHANNEL_ROUTING_NOTIFY_BACKEND = os.getenv("CHANNEL_ROUTING_NOTIFY_BACKEND", "postgres")
+CHANNEL_ROUTING_NOTIFY_CHANNEL = os.getenv("CHANNEL_ROUTING_NOTIFY_CHANNEL", "nowgo_channel_routes")
+CHANNEL_ROUTING_RELOAD_SECONDS = float(os.getenv("CHANNEL_ROUTING_RELOAD_SECONDS", "300"))
+
+# Acima deste número de IDs, a notificação pede a recarga completa (limite de 8000 bytes do NOTIFY)
+_MAX_NOTIFY_IDS = 500
+
+def channel_identities(channel: str, config: Optional[Dict[str, Any]]) -> List[str]:
+    """
+    Identidades de um cliente em um canal, usadas como destinatário nos webhooks.
+    
+    Args:
+        channel: Canal
+        config: Configuração da integração do canal
+    
+    Returns:
+        Identidades (ID do número no WhatsApp, organização no LinkedIn,
+        e-mail de origem, números de telefone)
+    """
+    config = config or {}
+    if channel == "whatsapp":
+        identities = [config.get("phone_number_id")]
+    elif channel == "linkedin":
+        identities = [config.get("organization_urn"), config.get("client_id")]
+    elif channel == "email":
+        identities = [config.get("from_email")]
+    elif channel == "phone":
+        identities = list(config.get("phone_numbers") or [])
+    else:
+        identities = []
+    return [str(identity) for identity in identities if identity]
+
+class _RoutingState:
+    """Instantâneo imutável do índice; substituído por inteiro a cada atualização."""
+    
+    __slots__ = ("integrations", "routes", "identities")
+    
+    def __init__(
+        self,
+        integrations: Dict[Tuple[str, str], Dict[str, Any]],
+        routes: Dict[Tuple[str, str, str], Dict[str, Any]]
+    ):
+        self.integrations = integrations
+        self.routes = routes
+        # Com vários agentes na mesma identidade, o vínculo mais antigo atende
+        self.identities: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for (_, channel, identity), route in sorted(routes.items(), key=lambda item: item[1]["link_id"]):
+            self.identities.setdefault((channel, identity), route)
+
+class RouteChangeNotifier:
+    """
+    Interface da publicação e recepção das alterações de rotas entre instâncias.
+    
+    As notificações contêm os IDs de clientes e de integrações alterados (ou
+    "reload" para recarga completa) e a origem, para que a instância que fez
+    a alteração não a aplique duas vezes.
+    """
+    
+    def publish_in_transaction(self, session, payload: Dict[str, Any]) -> bool:
+        """
+        Publica a notificação dentro da transação da sessão, se o mecanismo permitir.
+        
+        Returns:
+            True se a notificação foi publicada (e será entregue no commit)
+        """
+        return False
+    
+    def publish(self, payload: Dict[str, Any]) -> None:
+        """Publica a notificação após o commit."""
+    
+    def listen(self, on_change, stop: threading.Event, timeout: float) -> None:
+        """
+        Recebe notificações até `stop` ser sinalizado.
+        
+        Args:
+            on_change: Função chamada com cada notificação recebida
+            stop: Evento que encerra a recepção
+            timeout: Intervalo máximo entre verificações de `stop`, em segundos
+        """
+        while not stop.wait(timeout):
+            on_change({"timeout": True})
+
+class PostgresRouteNotifier(RouteChangeNotifier):
+    """
+    Notificações pelo LISTEN/NOTIFY do PostgreSQL.
+    
+    O NOTIFY é emitido na própria transação que altera as integrações, e só é
+    entregue se ela for confirmada; notificações iguais em uma transação são
+    entregues uma única vez.
+    """
+    
+    def __init__(self, engine=None, channel: str = CHANNEL_ROUTING_NOTIFY_CHANNEL):
+        """
+        Args:
+            engine: Engine do SQLAlchemy (por padrão, a engine da aplicação)
+            channel: Nome do canal do LISTEN/NOTIFY
+        """
+        self._engine = engine
+        self.channel = channel
+    
+    @property
+    def engine(self):
+        if self._engine is None:
+            from src.config.database import engine
+            self._engine = engine
+        return self._engine
+    
+    def publish_in_transaction(self, session, payload):
+        from sqlalchemy import text
+        
+        session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": self.channel, "payload": json.dumps(payload)}
+        )
+        return True
+    
+    def listen(self, on_change, stop, timeout):
+        raw_connection = self.engine.raw_connection()
+        try:
+            connection = raw_connection.driver_connection
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            
+            while not stop.is_set():
+                if select.select([connection], [], [], timeout) == ([], [], []):
+                    on_change({"timeout": True})
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notification = connection.notifies.pop(0)
+                    on_change(json.loads(notification.payload))
+        finally:
+            raw_connection.invalidate()
+
+class RedisRouteNotifier(RouteChangeNotifier):
+    """Notificações pelo pub/sub do Redis, publicadas após o commit."""
+    
+    def __init__(self, redis_client=None, channel: str = CHANNEL_ROUTING_NOTIFY_CHANNEL):
+        """
+        Args:
+            redis_client: Cliente Redis (por padrão, o cliente configurado em redis_config)
+            channel: Nome do canal do pub/sub
+        """
+        self._redis_client = redis_client
+        self.channel = channel
+    
+    @property
+    def redis_client(self):
+        if self._redis_client is None:
+            self._redis_client = get_redis_client()
+        return self._redis_client
+    
+    def publish(self, payload):
+        try:
+            self.redis_client.publish(self.channel, json.dumps(payload))
+        except Exception as e:
+            # As outras instâncias corrigem o índice na próxima recarga completa
+            logger.error(f"Erro ao publicar alteração de rotas dos canais: {str(e)}")
+    
+    def listen(self, on_change, stop, timeout):
+        pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(self.channel)
+            while not stop.is_set():
+                message = pubsub.get_message(timeout=timeout)
+                if message is None:
+                    on_change({"timeout": True})
+                    continue
+                on_change(json.loads(message["data"]))
+        finally:
+            pubsub.close()
+
+# Mecanismos de notificação disponíveis ("local": apenas recargas periódicas)
+ROUTE_NOTIFIER_BACKENDS = {
+    "postgres": PostgresRouteNotifier,
+    "redis": RedisRouteNotifier,
+    "local": RouteChangeNotifier
+}
+
+class ChannelRoutingIndex:
+    """
+    Índice em memória das rotas dos canais, compartilhado pelo processo.
+    
+    Esta classe implementa:
+    1. Configuração ativa de cada (cliente, canal)
+    2. Rotas (cliente, canal, identidade) -> agente e configuração mesclada
+       (a do canal sobreposta pela do vínculo do agente)
+    3. Rotas por (canal, identidade), para os webhooks, que não informam o cliente
+    4. Atualização por cliente a partir de notificações de alteração, com
+       recarga completa periódica e após falhas da recepção
+    
+    As consultas leem um instantâneo imutável, sem travas nem acesso ao banco.
+    """
+    
+    def __init__(
+        self,
+        notifier: Optional[RouteChangeNotifier] = None,
+        reload_seconds: float = CHANNEL_ROUTING_RELOAD_SECONDS
+    ):
+        """
+        Inicializa o índice (vazio até `load` ou `start`).
+        
+        Args:
+            notifier: Mecanismo de notificação (por padrão, CHANNEL_ROUTING_NOTIFY_BACKEND)
+            reload_seconds: Intervalo das recargas completas, em segundos
+        """
+        self._notifier = notifier
+        self.reload_seconds = reload_seconds
+        self.origin = uuid.uuid4().hex
+        self.session_factory = None
+        
+        self._state: Optional[_RoutingState] = None
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+        self._loaded_at = 0.0
+        self._counters = {"reloads": 0, "refreshes": 0, "notifications": 0}
+    
+    @property
+    def notifier(self) -> RouteChangeNotifier:
+        if self._notifier is None:
+            if CHANNEL_ROUTING_NOTIFY_BACKEND not in ROUTE_NOTIFIER_BACKENDS:
+                raise ValueError(f"Mecanismo de notificação não suportado: {CHANNEL_ROUTING_NOTIFY_BACKEND}")
+            self._notifier = ROUTE_NOTIFIER_BACKENDS[CHANNEL_ROUTING_NOTIFY_BACKEND]()
+        return self._notifier
+    
+    @property
+    def loaded(self) -> bool:
+        """Indica se o índice já foi carregado."""
+        return self._state is not None
+    
+    # Consultas
+    
+    def resolve(self, channel: str, identity: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Encontra o agente que atende uma identidade em um canal.
+        
+        Args:
+            channel: Canal
+            identity: Identidade do cliente no canal (destinatário da mensagem)
+        
+        Returns:
+            Rota com client_id, channel_integration_id, link_id, agent_id e
+            configuration, ou None
+        """
+        state = self._state
+        if state is None or not identity:
+            return None
+        return state.identities.get((channel, str(identity)))
+    
+    def get(self, client_id: Any, channel: str, identity: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém a rota de uma identidade de um cliente em um canal.
+        
+        Args:
+            client_id: ID do cliente
+            channel: Canal
+            identity: Identidade do cliente no canal
+        
+        Returns:
+            Rota ou None
+        """
+        state = self._state
+        if state is None:
+            return None
+        return state.routes.get((str(client_id), channel, str(identity)))
+    
+    def channel_config(self, client_id: Any, channel: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém a configuração da integração ativa de um cliente em um canal.
+        
+        Args:
+            client_id: ID do cliente
+            channel: Canal
+        
+        Returns:
+            Configuração do canal ou None se não houver integração ativa
+        """
+        state = self._state
+        if state is None:
+            return None
+        integration = state.integrations.get((str(client_id), channel))
+        return integration["configuration"] if integration else None
+    
+    # Carga e atualização
+    
+    @staticmethod
+    def _query(db, client_ids: Optional[Set[str]] = None):
+        """Consulta as integrações ativas e os vínculos ativos (de todos os clientes ou dos informados)."""
+        from src.models.models import Agent, AgentChannelIntegration, ChannelIntegration
+        
+        integrations = db.query(
+            ChannelIntegration.id, ChannelIntegration.client_id,
+            ChannelIntegration.channel_type, ChannelIntegration.configuration
+        ).filter(ChannelIntegration.active == True)
+        
+        links = db.query(
+            AgentChannelIntegration.id, AgentChannelIntegration.agent_id,
+            AgentChannelIntegration.channel_integration_id, AgentChannelIntegration.configuration
+        ).join(
+            ChannelIntegration, ChannelIntegration.id == AgentChannelIntegration.channel_integration_id
+        ).join(
+            Agent, Agent.id == AgentChannelIntegration.agent_id
+        ).filter(
+            AgentChannelIntegration.active == True,
+            ChannelIntegration.active == True,
+            Agent.active == True
+        )
+        
+        if client_ids is not None:
+            ids = [int(client_id) for client_id in client_ids]
+            integrations = integrations.filter(ChannelIntegration.client_id.in_(ids))
+            links = links.filter(ChannelIntegration.client_id.in_(ids))
+        
+        return integrations.order_by(ChannelIntegration.id).all(), links.all()
+    
+    @staticmethod
+    def _build(integration_rows, link_rows) -> Tuple[Dict, Dict]:
+        """Monta as entradas do índice a partir das linhas consultadas."""
+        integrations = {}
+        by_id = {}
+        for row in integration_rows:
+            entry = {"id": row.id, "client_id": row.client_id, "channel": row.channel_type, "configuration": row.configuration or {}}
+            # Com mais de uma integração ativa no mesmo canal, vale a mais antiga (como na consulta por cliente)
+            integrations.setdefault((str(row.client_id), row.channel_type), entry)
+            by_id[row.id] = entry
+        
+        routes = {}
+        for link in link_rows:
+            integration = by_id.get(link.channel_integration_id)
+            if integration is None:
+                continue
+            route = {
+                "client_id": integration["client_id"],
+                "channel_integration_id": integration["id"],
+                "link_id": link.id,
+                "agent_id": link.agent_id,
+                "configuration": {**integration["configuration"], **(link.configuration or {})}
+            }
+            for identity in channel_identities(integration["channel"], integration["configuration"]):
+                key = (str(integration["client_id"]), integration["channel"], identity)
+                if key not in routes or routes[key]["link_id"] > link.id:
+                    routes[key] = route
+        return integrations, routes
+    
+    def load(self, db) -> None:
+        """
+        Carrega o índice completo.
+        
+        Args:
+            db: Sessão do banco de dados
+        """
+        integrations, routes = self._build(*self._query(db))
+        with self._write_lock:
+            self._state = _RoutingState(integrations, routes)
+            self._loaded_at = time.monotonic()
+            self._counters["reloads"] += 1
+        logger.info(f"Índice de rotas dos canais carregado: {len(integrations)} integrações, {len(routes)} rotas")
+    
+    def refresh(self, db, client_ids: Iterable[Any] = (), integration_ids: Iterable[int] = ()) -> None:
+        """
+        Recarrega as entradas de alguns clientes.
+        
+        Args:
+            db: Sessão do banco de dados
+            client_ids: IDs dos clientes alterados
+            integration_ids: IDs de integrações alteradas (seus clientes são recarregados)
+        """
+        from src.models.models import ChannelIntegration
+        
+        client_ids = {str(client_id) for client_id in client_ids if client_id is not None}
+        integration_ids = [int(integration_id) for integration_id in integration_ids if integration_id is not None]
+        if integration_ids:
+            client_ids.update(
+                str(row.client_id) for row in db.query(ChannelIntegration.client_id).filter(
+                    ChannelIntegration.id.in_(integration_ids)
+                ).all()
+            )
+        if not client_ids:
+            return
+        
+        integrations, routes = self._build(*self._query(db, client_ids))
+        with self._write_lock:
+            state = self._state
+            if state is None:
+                return
+            # Cópia com as entradas dos clientes substituídas; leitores continuam no instantâneo anterior
+            merged_integrations = {key: value for key, value in state.integrations.items() if key[0] not in client_ids}
+            merged_integrations.update(integrations)
+            merged_routes = {key: value for key, value in state.routes.items() if key[0] not in client_ids}
+            merged_routes.update(routes)
+            self._state = _RoutingState(merged_integrations, merged_routes)
+            self._counters["refreshes"] += 1
+    
+    def _on_notification(self, payload: Dict[str, Any]) -> None:
+        """Aplica uma notificação recebida de outra instância (ou a recarga periódica)."""
+        if payload.get("origin") == self.origin:
+            return
+        
+        reload = payload.get("reload") or time.monotonic() - self._loaded_at > self.reload_seconds
+        if payload.get("timeout") and not reload:
+            return
+        if not payload.get("timeout"):
+            self._counters["notifications"] += 1
+        
+        db = self.session_factory()
+        try:
+            if reload:
+                self.load(db)
+            else:
+                self.refresh(db, payload.get("client_ids", []), payload.get("channel_integration_ids", []))
+        except Exception as e:
+            logger.error(f"Erro ao atualizar o índice de rotas dos canais: {str(e)}")
+        finally:
+            db.close()
+    
+    def _listen(self) -> None:
+        """Recebe notificações; após uma falha, reconecta e recarrega o índice completo."""
+        timeout = min(self.reload_seconds, 5.0)
+        while not self._stop.is_set():
+            try:
+                self.notifier.listen(self._on_notification, self._stop, timeout)
+            except Exception as e:
+                logger.error(f"Erro na recepção de alterações de rotas dos canais: {str(e)}")
+                if self._stop.wait(1):
+                    break
+                self._on_notification({"reload": True})
+    
+    # Ciclo de vida
+    
+    def watch_changes(self, session_factory) -> None:
+        """
+        Publica e aplica as alterações de integrações, vínculos e agentes feitas por sessões.
+        
+        Os eventos de sessão do SQLAlchemy registram os clientes e integrações
+        afetados; a notificação é emitida na transação (PostgreSQL) ou após o
+        commit (Redis), e o índice desta instância é atualizado após o commit.
+        
+        Args:
+            session_factory: Fábrica de sessões (por exemplo, SessionLocal)
+        """
+        from sqlalchemy import event
+        from src.models.models import Agent, AgentChannelIntegration, ChannelIntegration
+        
+        @event.listens_for(session_factory, "after_flush")
+        def mark_route_changes(session, flush_context):
+            client_ids, integration_ids = set(), set()
+            for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+                if isinstance(instance, ChannelIntegration):
+                    client_ids.add(instance.client_id)
+                elif isinstance(instance, AgentChannelIntegration):
+                    integration_ids.add(instance.channel_integration_id)
+                elif isinstance(instance, Agent):
+                    client_ids.add(instance.client_id)
+            client_ids.discard(None)
+            integration_ids.discard(None)
+            if not client_ids and not integration_ids:
+                return
+            
+            changes = session.info.setdefault("channel_route_changes", {"client_ids": set(), "channel_integration_ids": set()})
+            changes["client_ids"].update(client_ids)
+            changes["channel_integration_ids"].update(integration_ids)
+            changes["published"] = self.notifier.publish_in_transaction(session, self._payload(client_ids, integration_ids))
+        
+        @event.listens_for(session_factory, "after_commit")
+        def apply_route_changes(session):
+            changes = session.info.pop("channel_route_changes", None)
+            if not changes:
+                return
+            db = session_factory()
+            try:
+                self.refresh(db, changes["client_ids"], changes["channel_integration_ids"])
+            except Exception as e:
+                logger.error(f"Erro ao atualizar o índice de rotas dos canais: {str(e)}")
+            finally:
+                db.close()
+            if not changes.get("published"):
+                self.notifier.publish(self._payload(changes["client_ids"], changes["channel_integration_ids"]))
+        
+        @event.listens_for(session_factory, "after_rollback")
+        def discard_route_changes(session):
+            session.info.pop("channel_route_changes", None)
+    
+    def _payload(self, client_ids: Set[Any], integration_ids: Set[Any]) -> Dict[str, Any]:
+        if len(client_ids) + len(integration_ids) > _MAX_NOTIFY_IDS:
+            return {"origin": self.origin, "reload": True}
+        return {
+            "origin": self.origin,
+            "client_ids": sorted(str(client_id) for client_id in client_ids),
+            "channel_integration_ids": sorted(int(integration_id) for integration_id in integration_ids)
+        }
+    
+    def start(self, session_factory) -> None:
+        """
+        Carrega o índice, passa a acompanhar as alterações e inicia a recepção de notificações.
+        
+        Args:
+            session_factory: Fábrica de sessões (por exemplo, SessionLocal)
+        """
+        self.session_factory = session_factory
+        db = session_factory()
+        try:
+            self.load(db)
+        finally:
+            db.close()
+        
+        self.watch_changes(session_factory)
+        self._stop.clear()
+        self._listener = threading.Thread(target=self._listen, name="channel-routing-listener", daemon=True)
+        self._listener.start()
+    
+    def stop(self) -> None:
+        """Interrompe a recepção de notificações."""
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=10)
+            self._listener = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna o tamanho do índice e os contadores de atualizações.
+        
+        Returns:
+            Dicionário com integrações, rotas, recargas, atualizações e notificações recebidas
+        """
+        state = self._state
+        return {
+            "loaded": state is not None,
+            "integrations": len(state.integrations) if state else 0,
+            "routes": len(state.routes) if state else 0,
+            **self._counters
+        }
+
+# Índice compartilhado pelo processo
+channel_routes = ChannelRoutingIndex()
@@ -0,0 +1,227 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Pool de Clientes HTTP dos Canais                                            │
+│                                                                             │
+│ Este módulo mantém um httpx.AsyncClient por canal e cliente, reutilizando   │
+│ conexões (keep-alive e, quando disponível, HTTP/2) entre mensagens, com     │
+│ limites de conexões e encerramento junto com a aplicação.                   │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, Optional, Tuple
+import asyncio
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+
+import httpx
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Endereços base das APIs dos canais (podem ser substituídos por "base_url" na configuração do cliente)
+CHANNEL_BASE_URLS = {
+    "whatsapp": os.getenv("WHATSAPP_API_BASE_URL", "https://graph.facebook.com/v18.0"),
+    "linkedin": os.getenv("LINKEDIN_API_BASE_URL", "https://api.linkedin.com/v2"),
+    "phone": os.getenv("PHONE_API_BASE_URL", "https://api.twilio.com/2010-04-01")
+}
+
+# Limites do pool
+HTTP_CLIENT_POOL_MAX_CLIENTS = int(os.getenv("HTTP_CLIENT_POOL_MAX_CLIENTS", "256"))
+HTTP_CLIENT_MAX_CONNECTIONS = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", "20"))
+HTTP_CLIENT_MAX_KEEPALIVE = int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE", "10"))
+HTTP_CLIENT_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY", "30"))
+HTTP_CLIENT_TIMEOUT = float(os.getenv("HTTP_CLIENT_TIMEOUT", "10"))
+
+# HTTP/2 depende do pacote h2, instalado com httpx[http2] (requirements.txt);
+# sem ele, os clientes usam HTTP/1.1
+HTTP_CLIENT_HTTP2 = os.getenv("HTTP_CLIENT_HTTP2", "true").lower() == "true"
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+if HTTP_CLIENT_HTTP2 and not HTTP2_AVAILABLE:
+    logger.warning("Pacote h2 não instalado; clientes HTTP dos canais usarão HTTP/1.1")
+
+class _PooledClient:
+    """Cliente HTTP do pool, com o número de usos em andamento."""
+    
+    __slots__ = ("client", "fingerprint", "leases", "evicted")
+    
+    def __init__(self, client: httpx.AsyncClient, fingerprint: str):
+        self.client = client
+        self.fingerprint = fingerprint
+        self.leases = 0
+        self.evicted = False
+
+class HttpClientPool:
+    """
+    Pool de clientes HTTP assíncronos por (canal, cliente).
+    
+    Cada cliente tem seu próprio httpx.AsyncClient, com endereço base e
+    cabeçalhos de autenticação do canal, e reutiliza as conexões abertas
+    entre mensagens. Clientes cuja configuração muda são recriados; acima de
+    `max_clients`, os menos usados são removidos. Clientes removidos são
+    fechados assim que deixam de estar em uso.
+    """
+    
+    def __init__(
+        self,
+        max_clients: int = HTTP_CLIENT_POOL_MAX_CLIENTS,
+        max_connections: int = HTTP_CLIENT_MAX_CONNECTIONS,
+        max_keepalive: int = HTTP_CLIENT_MAX_KEEPALIVE,
+        keepalive_expiry: float = HTTP_CLIENT_KEEPALIVE_EXPIRY,
+        timeout: float = HTTP_CLIENT_TIMEOUT,
+        http2: bool = HTTP_CLIENT_HTTP2
+    ):
+        """
+        Inicializa o pool.
+        
+        Args:
+            max_clients: Número máximo de clientes HTTP mantidos
+            max_connections: Conexões simultâneas por cliente
+            max_keepalive: Conexões ociosas mantidas por cliente
+            keepalive_expiry: Tempo até fechar uma conexão ociosa, em segundos
+            timeout: Tempo limite das requisições, em segundos
+            http2: Usar HTTP/2 quando o pacote h2 estiver instalado
+        """
+        self.max_clients = max_clients
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        
+        self._clients: "OrderedDict[Tuple[str, str], _PooledClient]" = OrderedDict()
+        self._closing = set()
+        self._closed = False
+        self.created = 0
+        self.reused = 0
+    
+    @staticmethod
+    def _fingerprint(base_url: str, headers: Dict[str, str]) -> str:
+        payload = json.dumps({"base_url": base_url, "headers": headers}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    @asynccontextmanager
+    async def client(
+        self,
+        channel: str,
+        client_id: Any,
+        headers: Optional[Dict[str, str]] = None,
+        base_url: Optional[str] = None
+    ) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        Obtém o cliente HTTP de um canal e cliente.
+        
+        Uso:
+            async with http_clients.client("whatsapp", client_id, headers) as client:
+                response = await client.post("/messages", json=payload)
+        
+        Args:
+            channel: Canal (whatsapp, linkedin, phone)
+            client_id: ID do cliente
+            headers: Cabeçalhos enviados em todas as requisições (por exemplo, autenticação)
+            base_url: Endereço base da API (por padrão, o do canal)
+        
+        Returns:
+            Cliente HTTP, válido dentro do bloco
+        """
+        if self._closed:
+            raise RuntimeError("O pool de clientes HTTP foi encerrado")
+        
+        key = (channel, str(client_id))
+        base_url = base_url or CHANNEL_BASE_URLS.get(channel, "")
+        headers = headers or {}
+        fingerprint = self._fingerprint(base_url, headers)
+        
+        # Sem await entre a consulta e o registro do uso: seguro no event loop
+        entry = self._clients.get(key)
+        if entry is not None and entry.fingerprint != fingerprint:
+            # Configuração alterada (por exemplo, token renovado)
+            self._evict(key)
+            entry = None
+        
+        if entry is None:
+            entry = _PooledClient(
+                httpx.AsyncClient(
+                    base_url=base_url,
+                    headers=headers,
+                    http2=self.http2,
+                    limits=self.limits,
+                    timeout=self.timeout
+                ),
+                fingerprint
+            )
+            self._clients[key] = entry
+            self.created += 1
+            while len(self._clients) > self.max_clients:
+                self._evict(next(iter(self._clients)))
+        else:
+            self._clients.move_to_end(key)
+            self.reused += 1
+        
+        entry.leases += 1
+        try:
+            yield entry.client
+        finally:
+            entry.leases -= 1
+            if entry.evicted and entry.leases == 0:
+                await entry.client.aclose()
+    
+    def _evict(self, key: Tuple[str, str]) -> None:
+        """Remove um cliente do pool, fechando-o quando não estiver em uso."""
+        entry = self._clients.pop(key)
+        entry.evicted = True
+        if entry.leases == 0:
+            task = asyncio.get_running_loop().create_task(entry.client.aclose())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+    
+    async def invalidate(self, channel: str, client_id: Any) -> bool:
+        """
+        Remove o cliente HTTP de um canal e cliente (por exemplo, ao desativar a integração).
+        
+        Args:
+            channel: Canal
+            client_id: ID do cliente
+        
+        Returns:
+            True se havia um cliente no pool
+        """
+        key = (channel, str(client_id))
+        if key not in self._clients:
+            return False
+        self._evict(key)
+        return True
+    
+    async def aclose(self) -> None:
+        """Fecha todos os clientes HTTP; chamado no encerramento da aplicação."""
+        self._closed = True
+        entries = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*(entry.client.aclose() for entry in entries), return_exceptions=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores do pool.
+        
+        Returns:
+            Dicionário com clientes abertos, criados e reutilizados
+        """
+        return {
+            "clients": len(self._clients),
+            "created": self.created,
+            "reused": self.reused,
+            "max_clients": self.max_clients,
+            "http2": self.http2
+        }
+
+# Pool compartilhado pelo processo
+http_clients = HttpClientPool()
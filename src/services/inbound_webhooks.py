@@ -0,0 +1,652 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Recebimento de Webhooks dos Canais                                          │
+│                                                                             │
+│ Este módulo verifica as assinaturas dos webhooks do WhatsApp, do LinkedIn   │
+│ e da telefonia, enfileira os eventos brutos para responder ao provedor      │
+│ imediatamente e os processa com workers: extrai as mensagens, descarta      │
+│ reenvios do provedor, encontra o agente do canal e envia a resposta.        │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import parse_qsl
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+from src.config.redis_config import get_redis_client
+from src.services.channel_routing import ChannelRoutingIndex, channel_routes
+
+logger = logging.getLogger(__name__)
+
+# Configuração da fila de eventos recebidos
+INBOUND_QUEUE_BACKEND = os.getenv("INBOUND_QUEUE_BACKEND", "redis")
+INBOUND_QUEUE_PREFIX = "nowgo:{inbound}:"
+INBOUND_QUEUE_GROUP = os.getenv("INBOUND_QUEUE_GROUP", "receivers")
+INBOUND_QUEUE_MAXLEN = int(os.getenv("INBOUND_QUEUE_MAXLEN", "1000000"))
+INBOUND_QUEUE_WORKERS = int(os.getenv("INBOUND_QUEUE_WORKERS", "4"))
+INBOUND_QUEUE_BATCH_SIZE = int(os.getenv("INBOUND_QUEUE_BATCH_SIZE", "100"))
+INBOUND_QUEUE_BLOCK_MS = int(os.getenv("INBOUND_QUEUE_BLOCK_MS", "1000"))
+INBOUND_QUEUE_VISIBILITY_SECONDS = int(os.getenv("INBOUND_QUEUE_VISIBILITY_SECONDS", "60"))
+INBOUND_DEDUPE_TTL = int(os.getenv("INBOUND_DEDUPE_TTL", "86400"))
+INBOUND_RETRY_SECONDS = float(os.getenv("INBOUND_RETRY_SECONDS", "30"))
+
+# Segredos dos aplicativos usados para assinar os webhooks de cada canal
+WEBHOOK_SECRETS = {
+    "whatsapp": os.getenv("WHATSAPP_APP_SECRET"),
+    "linkedin": os.getenv("LINKEDIN_CLIENT_SECRET"),
+    "phone": os.getenv("PHONE_AUTH_TOKEN")
+}
+WHATSAPP_VERIFY_TOKEN = os.getenv("WHATSAPP_VERIFY_TOKEN")
+
+WEBHOOK_CHANNELS = tuple(WEBHOOK_SECRETS)
+
+def verify_signature(channel: str, body: bytes, headers: Dict[str, str], url: str) -> bool:
+    """
+    Verifica a assinatura de um webhook.
+    
+    - WhatsApp: X-Hub-Signature-256, HMAC-SHA256 do corpo com o segredo do aplicativo
+    - LinkedIn: X-LI-Signature, HMAC-SHA256 do corpo com o segredo do cliente
+    - Telefonia (Twilio): X-Twilio-Signature, HMAC-SHA1 em base64 da URL
+      seguida dos parâmetros do formulário em ordem alfabética
+    
+    Sem segredo configurado para o canal, os webhooks são recusados.
+    
+    Args:
+        channel: Canal do webhook
+        body: Corpo bruto da requisição
+        headers: Cabeçalhos da requisição (nomes em minúsculas)
+        url: URL completa da requisição
+    
+    Returns:
+        True se a assinatura é válida
+    """
+    secret = WEBHOOK_SECRETS.get(channel)
+    if not secret:
+        return False
+    key = secret.encode("utf-8")
+    
+    if channel == "whatsapp":
+        signature = headers.get("x-hub-signature-256", "")
+        expected = "sha256=" + hmac.new(key, body, hashlib.sha256).hexdigest()
+    elif channel == "linkedin":
+        signature = headers.get("x-li-signature", "")
+        expected = hmac.new(key, body, hashlib.sha256).hexdigest()
+    elif channel == "phone":
+        signature = headers.get("x-twilio-signature", "")
+        params = sorted(parse_qsl(body.decode("utf-8"), keep_blank_values=True))
+        payload = url + "".join(f"{name}{value}" for name, value in params)
+        expected = base64.b64encode(hmac.new(key, payload.encode("utf-8"), hashlib.sha1).digest()).decode("ascii")
+    else:
+        return False
+    
+    return hmac.compare_digest(signature, expected)
+
+def parse_webhook(channel: str, body: bytes) -> List[Dict[str, Any]]:
+    """
+    Extrai as mensagens de um webhook.
+    
+    Args:
+        channel: Canal do webhook
+        body: Corpo bruto do webhook
+    
+    Returns:
+        Mensagens com message_id, sender (quem enviou), recipient (a
+        identidade do cliente no canal), content e timestamp
+    """
+    messages = []
+    
+    if channel == "whatsapp":
+        payload = json.loads(body)
+        for entry in payload.get("entry", []):
+            for change in entry.get("changes", []):
+                value = change.get("value", {})
+                recipient = value.get("metadata", {}).get("phone_number_id")
+                for message in value.get("messages", []):
+                    messages.append({
+                        "message_id": message.get("id"),
+                        "sender": message.get("from"),
+                        "recipient": recipient,
+                        "content": (message.get("text") or {}).get("body", ""),
+                        "timestamp": message.get("timestamp")
+                    })
+    
+    elif channel == "linkedin":
+        payload = json.loads(body)
+        for element in payload.get("elements", [payload]):
+            messages.append({
+                "message_id": element.get("id"),
+                "sender": element.get("from"),
+                "recipient": element.get("to"),
+                "content": element.get("body") or element.get("text", ""),
+                "timestamp": element.get("createdAt")
+            })
+    
+    elif channel == "phone":
+        form = dict(parse_qsl(body.decode("utf-8"), keep_blank_values=True))
+        messages.append({
+            "message_id": form.get("MessageSid") or form.get("CallSid"),
+            "sender": form.get("From"),
+            "recipient": form.get("To"),
+            "content": form.get("Body", ""),
+            "timestamp": None
+        })
+    
+    return [message for message in messages if message["message_id"] and message["sender"]]
+
+class InboundEventQueue(ABC):
+    """
+    Interface das filas de eventos brutos recebidos pelos webhooks.
+    
+    Os eventos retornados por `claim` ficam reservados para o consumidor até
+    serem concluídos (`complete`) ou devolvidos para nova tentativa
+    (`abandon`). Cada mensagem passa por `begin` (reserva temporária do ID),
+    e só depois da resposta enfileirada por `finish` (ID registrado como
+    recebido, para descartar os reenvios dos provedores); em caso de falha,
+    `release` libera o ID para a nova tentativa.
+    """
+    
+    # Indica se as operações fazem E/S bloqueante (e devem sair do event loop)
+    performs_io = False
+    
+    @abstractmethod
+    def push(self, event: Dict[str, Any]) -> None:
+        """Enfileira um evento bruto (channel, body e received_at)."""
+    
+    @abstractmethod
+    def claim(self, consumer: str, count: int, block_ms: int) -> List[Dict[str, Any]]:
+        """
+        Reserva eventos para um consumidor.
+        
+        Args:
+            consumer: Nome do consumidor
+            count: Número máximo de eventos
+            block_ms: Tempo máximo de espera por eventos, em milissegundos
+        
+        Returns:
+            Eventos reservados, com "receipt"
+        """
+    
+    @abstractmethod
+    def complete(self, entry: Dict[str, Any]) -> None:
+        """Registra o processamento de um evento reservado."""
+    
+    @abstractmethod
+    def abandon(self, entry: Dict[str, Any]) -> None:
+        """Devolve um evento reservado que falhou, para ser processado novamente mais tarde."""
+    
+    @abstractmethod
+    def begin(self, channel: str, message_id: str) -> str:
+        """
+        Reserva o ID de uma mensagem para atendimento.
+        
+        Returns:
+            "new" se a mensagem deve ser atendida, "seen" se já foi atendida
+            ou "busy" se outro worker a está atendendo
+        """
+    
+    @abstractmethod
+    def finish(self, channel: str, message_id: str) -> None:
+        """Registra a mensagem como atendida (os reenvios passam a ser descartados)."""
+    
+    @abstractmethod
+    def release(self, channel: str, message_id: str) -> None:
+        """Libera o ID de uma mensagem cujo atendimento falhou."""
+
+class InMemoryInboundQueue(InboundEventQueue):
+    """
+    Fila de eventos na memória do processo, para uma única instância.
+    
+    Eventos ainda não processados são perdidos se o processo terminar.
+    """
+    
+    def __init__(
+        self,
+        maxlen: int = INBOUND_QUEUE_MAXLEN,
+        dedupe_ttl: int = INBOUND_DEDUPE_TTL,
+        max_seen: int = 1000000,
+        retry_seconds: float = INBOUND_RETRY_SECONDS,
+        processing_ttl: float = INBOUND_QUEUE_VISIBILITY_SECONDS
+    ):
+        """
+        Inicializa a fila.
+        
+        Args:
+            maxlen: Número máximo de eventos pendentes
+            dedupe_ttl: Tempo durante o qual reenvios são descartados, em segundos
+            max_seen: Número máximo de IDs de mensagens lembrados
+            retry_seconds: Atraso até devolver à fila um evento que falhou
+            processing_ttl: Validade da reserva do ID de uma mensagem em atendimento
+        """
+        self.maxlen = maxlen
+        self.dedupe_ttl = dedupe_ttl
+        self.max_seen = max_seen
+        self.retry_seconds = retry_seconds
+        self.processing_ttl = processing_ttl
+        self._events: deque = deque()
+        self._condition = threading.Condition()
+        # ID da mensagem -> (estado, expiração)
+        self._seen: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._seen_lock = threading.Lock()
+    
+    def push(self, event):
+        with self._condition:
+            if len(self._events) >= self.maxlen:
+                raise OverflowError("Fila de eventos recebidos cheia")
+            self._events.append(event)
+            self._condition.notify()
+    
+    def claim(self, consumer, count, block_ms):
+        with self._condition:
+            if not self._events:
+                self._condition.wait(block_ms / 1000)
+            claimed = []
+            while self._events and len(claimed) < count:
+                claimed.append({**self._events.popleft(), "receipt": None})
+            return claimed
+    
+    def complete(self, entry):
+        pass
+    
+    def abandon(self, entry):
+        event = {key: value for key, value in entry.items() if key != "receipt"}
+        timer = threading.Timer(self.retry_seconds, self.push, args=(event,))
+        timer.daemon = True
+        timer.start()
+    
+    def _set_state(self, key: str, state: str, ttl: float) -> None:
+        self._seen[key] = (state, time.monotonic() + ttl)
+        self._seen.move_to_end(key)
+        while len(self._seen) > self.max_seen:
+            self._seen.popitem(last=False)
+    
+    def begin(self, channel, message_id):
+        key = f"{channel}:{message_id}"
+        with self._seen_lock:
+            current = self._seen.get(key)
+            if current is not None and current[1] > time.monotonic():
+                return "seen" if current[0] == "seen" else "busy"
+            self._set_state(key, "processing", self.processing_ttl)
+            return "new"
+    
+    def finish(self, channel, message_id):
+        with self._seen_lock:
+            self._set_state(f"{channel}:{message_id}", "seen", self.dedupe_ttl)
+    
+    def release(self, channel, message_id):
+        with self._seen_lock:
+            self._seen.pop(f"{channel}:{message_id}", None)
+
+class RedisInboundQueue(InboundEventQueue):
+    """
+    Fila de eventos em um Redis Stream, compartilhada entre instâncias.
+    
+    Os workers consomem o stream com um grupo de consumidores e confirmam
+    cada evento após o processamento; eventos de consumidores inativos são
+    retomados com XAUTOCLAIM, assim como os eventos devolvidos após uma
+    falha. O stream é limitado (MAXLEN aproximado), e os IDs de mensagens
+    ficam em chaves com TTL: "processing" durante o atendimento (com a
+    validade da reserva dos eventos) e "seen" depois dele.
+    """
+    
+    performs_io = True
+    
+    def __init__(
+        self,
+        redis_client=None,
+        group: str = INBOUND_QUEUE_GROUP,
+        maxlen: int = INBOUND_QUEUE_MAXLEN,
+        visibility_seconds: int = INBOUND_QUEUE_VISIBILITY_SECONDS,
+        dedupe_ttl: int = INBOUND_DEDUPE_TTL
+    ):
+        """
+        Inicializa a fila.
+        
+        Args:
+            redis_client: Cliente Redis (por padrão, o cliente configurado em redis_config)
+            group: Nome do grupo de consumidores
+            maxlen: Tamanho aproximado máximo do stream
+            visibility_seconds: Tempo até retomar eventos de consumidores inativos
+            dedupe_ttl: Tempo durante o qual reenvios são descartados, em segundos
+        """
+        self._redis_client = redis_client
+        self.group = group
+        self.maxlen = maxlen
+        self.visibility_seconds = visibility_seconds
+        self.dedupe_ttl = dedupe_ttl
+        self.stream_key = f"{INBOUND_QUEUE_PREFIX}stream"
+        self._group_ready = False
+    
+    @property
+    def redis_client(self):
+        """Cliente Redis usado pela fila."""
+        if self._redis_client is None:
+            self._redis_client = get_redis_client()
+        return self._redis_client
+    
+    def _ensure_group(self) -> None:
+        if self._group_ready:
+            return
+        try:
+            self.redis_client.xgroup_create(self.stream_key, self.group, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+    
+    def push(self, event):
+        self.redis_client.xadd(
+            self.stream_key,
+            {"payload": json.dumps(event, ensure_ascii=False)},
+            maxlen=self.maxlen,
+            approximate=True
+        )
+    
+    def claim(self, consumer, count, block_ms):
+        self._ensure_group()
+        
+        _, entries, *_ = self.redis_client.xautoclaim(
+            self.stream_key, self.group, consumer,
+            min_idle_time=self.visibility_seconds * 1000, start_id="0-0", count=count
+        )
+        if not entries:
+            response = self.redis_client.xreadgroup(
+                self.group, consumer, {self.stream_key: ">"}, count=count, block=block_ms
+            )
+            entries = response[0][1] if response else []
+        
+        claimed = []
+        for receipt, fields in entries:
+            if not fields:
+                self.redis_client.xack(self.stream_key, self.group, receipt)
+                continue
+            claimed.append({**json.loads(fields["payload"]), "receipt": receipt})
+        return claimed
+    
+    def complete(self, entry):
+        pipeline = self.redis_client.pipeline(transaction=True)
+        pipeline.xack(self.stream_key, self.group, entry["receipt"])
+        pipeline.xdel(self.stream_key, entry["receipt"])
+        pipeline.execute()
+    
+    def abandon(self, entry):
+        # O evento continua pendente no grupo e é retomado por XAUTOCLAIM após `visibility_seconds`
+        pass
+    
+    def _seen_key(self, channel: str, message_id: str) -> str:
+        return f"{INBOUND_QUEUE_PREFIX}seen:{channel}:{message_id}"
+    
+    def begin(self, channel, message_id):
+        key = self._seen_key(channel, message_id)
+        if self.redis_client.set(key, "processing", nx=True, ex=self.visibility_seconds):
+            return "new"
+        return "seen" if self.redis_client.get(key) == "seen" else "busy"
+    
+    def finish(self, channel, message_id):
+        self.redis_client.set(self._seen_key(channel, message_id), "seen", ex=self.dedupe_ttl)
+    
+    def release(self, channel, message_id):
+        self.redis_client.delete(self._seen_key(channel, message_id))
+
+# Filas disponíveis
+INBOUND_QUEUE_BACKENDS = {
+    "redis": RedisInboundQueue,
+    "memory": InMemoryInboundQueue
+}
+
+_inbound_queue: Optional[InboundEventQueue] = None
+
+def get_inbound_queue() -> InboundEventQueue:
+    """
+    Retorna a fila de eventos recebidos compartilhada pelo processo.
+    
+    O tipo de fila é definido por INBOUND_QUEUE_BACKEND.
+    
+    Returns:
+        Fila de eventos recebidos
+    """
+    global _inbound_queue
+    
+    if _inbound_queue is None:
+        if INBOUND_QUEUE_BACKEND not in INBOUND_QUEUE_BACKENDS:
+            raise ValueError(f"Fila de eventos recebidos não suportada: {INBOUND_QUEUE_BACKEND}")
+        _inbound_queue = INBOUND_QUEUE_BACKENDS[INBOUND_QUEUE_BACKEND]()
+    return _inbound_queue
+
+async def _queue_call(queue: InboundEventQueue, method, *args):
+    """Chama um método da fila, fora do event loop se ela fizer E/S bloqueante."""
+    if queue.performs_io:
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+async def accept_webhook(channel: str, body: bytes) -> None:
+    """
+    Enfileira o corpo bruto de um webhook já verificado.
+    
+    É o único trabalho feito antes de responder ao provedor; a extração das
+    mensagens e o atendimento ficam com os workers.
+    
+    Args:
+        channel: Canal do webhook
+        body: Corpo bruto da requisição
+    """
+    queue = get_inbound_queue()
+    await _queue_call(queue, queue.push, {"channel": channel, "body": body.decode("utf-8"), "received_at": time.time()})
+
+class InboundWorkerPool:
+    """
+    Pool de workers que processa os eventos recebidos pelos webhooks.
+    
+    Cada worker reserva um lote de eventos, extrai as mensagens, descarta
+    reenvios já recebidos, encontra o agente pela rota do canal, gera a
+    resposta e a enfileira para envio pelo mesmo canal. As mensagens de um
+    lote são atendidas em paralelo; as de uma mesma conversa são
+    serializadas pelo próprio agente.
+    """
+    
+    def __init__(
+        self,
+        queue: Optional[InboundEventQueue] = None,
+        session_factory=None,
+        routes: Optional[ChannelRoutingIndex] = None,
+        workers: int = INBOUND_QUEUE_WORKERS,
+        batch_size: int = INBOUND_QUEUE_BATCH_SIZE,
+        block_ms: int = INBOUND_QUEUE_BLOCK_MS
+    ):
+        """
+        Inicializa o pool de workers.
+        
+        Args:
+            queue: Fila de eventos recebidos (por padrão, a do processo)
+            session_factory: Fábrica de sessões (por padrão, SessionLocal)
+            routes: Índice de rotas dos canais (por padrão, o do processo)
+            workers: Número de workers concorrentes
+            batch_size: Número máximo de eventos reservados por vez
+            block_ms: Tempo máximo de espera por eventos, em milissegundos
+        """
+        self._queue = queue
+        self.session_factory = session_factory
+        self.routes = routes or channel_routes
+        self.workers = workers
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self._tasks: List[asyncio.Task] = []
+        self.counters = {"events": 0, "messages": 0, "duplicates": 0, "unrouted": 0, "errors": 0, "retried": 0}
+    
+    @property
+    def queue(self) -> InboundEventQueue:
+        if self._queue is None:
+            self._queue = get_inbound_queue()
+        return self._queue
+    
+    async def start(self) -> None:
+        """Inicia os workers."""
+        if self._tasks:
+            return
+        if self.session_factory is None:
+            from src.config.database import SessionLocal
+            self.session_factory = SessionLocal
+        
+        consumer_prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self._tasks = [
+            asyncio.create_task(self._worker(f"{consumer_prefix}-{index}"))
+            for index in range(self.workers)
+        ]
+        logger.info(f"Pool de recebimento de webhooks iniciado com {self.workers} workers")
+    
+    async def stop(self) -> None:
+        """Interrompe os workers; eventos reservados e não concluídos serão reentregues (Redis)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    async def _worker(self, consumer: str) -> None:
+        """Reserva e processa lotes de eventos."""
+        while True:
+            try:
+                entries = await asyncio.to_thread(self.queue.claim, consumer, self.batch_size, self.block_ms)
+                if entries:
+                    await self.process_batch(entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro no consumidor {consumer} da fila de webhooks: {str(e)}")
+                await asyncio.sleep(1)
+    
+    async def process_batch(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Processa um lote de eventos reservados.
+        
+        Args:
+            entries: Eventos reservados
+        """
+        db = self.session_factory()
+        try:
+            messages = []
+            for index, entry in enumerate(entries):
+                self.counters["events"] += 1
+                try:
+                    parsed = parse_webhook(entry["channel"], entry["body"].encode("utf-8"))
+                    messages.extend((index, entry["channel"], message) for message in parsed)
+                except (ValueError, KeyError, AttributeError) as e:
+                    self.counters["errors"] += 1
+                    logger.warning(f"Webhook inválido do canal {entry['channel']} descartado: {str(e)}")
+            
+            # Eventos com mensagens não atendidas são devolvidos em vez de concluídos
+            failed_events = set()
+            outcomes = await asyncio.gather(*(self._process(db, channel, message) for _, channel, message in messages))
+            for (index, _, _), handled in zip(messages, outcomes):
+                if not handled:
+                    failed_events.add(index)
+            
+            for index, entry in enumerate(entries):
+                if index in failed_events:
+                    self.counters["retried"] += 1
+                    await _queue_call(self.queue, self.queue.abandon, entry)
+                else:
+                    await _queue_call(self.queue, self.queue.complete, entry)
+        finally:
+            db.close()
+    
+    async def _process(self, db, channel: str, message: Dict[str, Any]) -> bool:
+        """
+        Atende uma mensagem recebida.
+        
+        O ID só é registrado como recebido depois de a resposta ser
+        enfileirada; a chave de idempotência da resposta impede envio
+        duplicado se a mensagem for atendida novamente.
+        
+        Returns:
+            False se a mensagem deve ser atendida novamente (falha ou em
+            atendimento por outro worker)
+        """
+        message_id = message["message_id"]
+        state = await _queue_call(self.queue, self.queue.begin, channel, message_id)
+        if state == "seen":
+            self.counters["duplicates"] += 1
+            return True
+        if state == "busy":
+            return False
+        self.counters["messages"] += 1
+        
+        route = self.routes.resolve(channel, message["recipient"])
+        if route is None:
+            self.counters["unrouted"] += 1
+            logger.warning(f"Nenhum agente atende {message['recipient']} no canal {channel}")
+            await _queue_call(self.queue, self.queue.finish, channel, message_id)
+            return True
+        
+        try:
+            await self.handle_message(db, channel, message, route)
+        except Exception as e:
+            self.counters["errors"] += 1
+            logger.error(f"Erro ao atender a mensagem {message_id} do canal {channel}: {str(e)}")
+            await _queue_call(self.queue, self.queue.release, channel, message_id)
+            return False
+        
+        await _queue_call(self.queue, self.queue.finish, channel, message_id)
+        return True
+    
+    async def handle_message(self, db, channel: str, message: Dict[str, Any], route: Dict[str, Any]) -> None:
+        """
+        Gera a resposta do agente da rota e a enfileira para envio.
+        
+        Args:
+            db: Sessão do banco de dados
+            channel: Canal da mensagem
+            message: Mensagem extraída do webhook
+            route: Rota do canal (client_id, agent_id e configuration), de `channel_routes`
+        
+        Raises:
+            RuntimeError: Se a resposta não puder ser enfileirada (a mensagem
+                deve ser atendida novamente)
+        """
+        from src.services.agent_runtime import agent_runtime
+        from src.services.channel_integration import ChannelIntegration
+        
+        agent = agent_runtime.load(db, route["agent_id"])
+        if agent is None:
+            logger.warning(f"Agente {route['agent_id']} do canal {channel} sem configuração ativa")
+            return
+        
+        agent_message = {
+            "user_id": message["sender"],
+            "content": message["content"],
+            "channel": channel,
+            "timestamp": message.get("timestamp")
+        }
+        context = {"tenant_id": route["client_id"], "channel_configuration": route["configuration"]}
+        if hasattr(agent, "aprocess_message"):
+            response = await agent.aprocess_message(agent_message, context)
+        else:
+            response = await asyncio.to_thread(agent.process_message, agent_message, context)
+        
+        # send_message informa falhas ao enfileirar no resultado, sem exceção
+        result = await ChannelIntegration(db).send_message(
+            route["client_id"],
+            channel,
+            message["sender"],
+            response.get("content", ""),
+            {"in_reply_to": message["message_id"]},
+            idempotency_key=f"reply:{channel}:{message['message_id']}"
+        )
+        if not result.get("success"):
+            raise RuntimeError(f"Resposta não enfileirada: {result.get('error', 'erro desconhecido')}")
+    
+    def stats(self) -> Dict[str, int]:
+        """Retorna os contadores de eventos, mensagens, reenvios, mensagens sem rota, erros e eventos devolvidos."""
+        return dict(self.counters)
+
+# Pool compartilhado pelo processo
+inbound_workers = InboundWorkerPool()
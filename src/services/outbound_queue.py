@@ -0,0 +1,800 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Fila Durável de Mensagens de Saída                                          │
+│                                                                             │
+│ Este módulo enfileira as mensagens enviadas pelos canais em um Redis Stream │
+│ (ou em uma tabela do PostgreSQL, sem Redis) e as entrega com workers de um  │
+│ grupo de consumidores, em lotes por canal, com entrega pelo menos uma vez,  │
+│ chaves de idempotência, novas tentativas e fila de mensagens mortas.        │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+
+from src.config.redis_config import get_redis_client
+from src.services.rate_limiter import (
+    RATE_LIMIT_MAX_WAIT, TokenBucketLimiter, outbound_metrics, outbound_rate_limiter
+)
+
+logger = logging.getLogger(__name__)
+
+# Configuração da fila
+OUTBOUND_QUEUE_BACKEND = os.getenv("OUTBOUND_QUEUE_BACKEND", "redis")
+OUTBOUND_QUEUE_PREFIX = "nowgo:{outbound}:"
+OUTBOUND_QUEUE_GROUP = os.getenv("OUTBOUND_QUEUE_GROUP", "senders")
+OUTBOUND_QUEUE_WORKERS = int(os.getenv("OUTBOUND_QUEUE_WORKERS", "4"))
+OUTBOUND_QUEUE_BATCH_SIZE = int(os.getenv("OUTBOUND_QUEUE_BATCH_SIZE", "50"))
+OUTBOUND_QUEUE_BLOCK_MS = int(os.getenv("OUTBOUND_QUEUE_BLOCK_MS", "1000"))
+OUTBOUND_QUEUE_MAX_ATTEMPTS = int(os.getenv("OUTBOUND_QUEUE_MAX_ATTEMPTS", "5"))
+OUTBOUND_QUEUE_RETRY_SECONDS = float(os.getenv("OUTBOUND_QUEUE_RETRY_SECONDS", "5"))
+OUTBOUND_QUEUE_VISIBILITY_SECONDS = int(os.getenv("OUTBOUND_QUEUE_VISIBILITY_SECONDS", "60"))
+OUTBOUND_QUEUE_IDEMPOTENCY_TTL = int(os.getenv("OUTBOUND_QUEUE_IDEMPOTENCY_TTL", "86400"))
+
+def retry_delay(attempts: int, base: float = OUTBOUND_QUEUE_RETRY_SECONDS) -> float:
+    """Intervalo até a próxima tentativa: exponencial, limitado a 5 minutos."""
+    return min(base * 2 ** (attempts - 1), 300.0)
+
+class OutboundQueue(ABC):
+    """
+    Interface das filas de mensagens de saída.
+    
+    As mensagens retornadas por `claim` ficam reservadas para o consumidor até
+    serem concluídas (`complete`) ou falharem (`fail`); mensagens reservadas
+    por um consumidor que deixa de responder voltam a ser entregues após
+    OUTBOUND_QUEUE_VISIBILITY_SECONDS. A entrega é, portanto, pelo menos uma
+    vez; `is_delivered` permite descartar reentregas de mensagens já enviadas.
+    """
+    
+    @abstractmethod
+    def enqueue(self, message: Dict[str, Any]) -> Tuple[str, bool]:
+        """
+        Enfileira uma mensagem.
+        
+        Args:
+            message: Mensagem (client_id, channel, recipient, message, metadata
+                e, opcionalmente, idempotency_key)
+        
+        Returns:
+            Tupla (ID da mensagem, True se foi enfileirada agora ou False se a
+            chave de idempotência já havia sido usada)
+        """
+    
+    def enqueue_many(self, messages: List[Dict[str, Any]]) -> List[Tuple[str, bool]]:
+        """
+        Enfileira um lote de mensagens (por exemplo, um trecho de uma campanha).
+        
+        Args:
+            messages: Mensagens, no formato de `enqueue`
+        
+        Returns:
+            Um resultado de `enqueue` por mensagem, na mesma ordem
+        """
+        return [self.enqueue(message) for message in messages]
+    
+    @abstractmethod
+    def claim(self, consumer: str, count: int, block_ms: int) -> List[Dict[str, Any]]:
+        """
+        Reserva mensagens para um consumidor.
+        
+        Args:
+            consumer: Nome do consumidor
+            count: Número máximo de mensagens
+            block_ms: Tempo máximo de espera por mensagens, em milissegundos
+        
+        Returns:
+            Mensagens reservadas, com "message_id", "attempts" e "receipt"
+        """
+    
+    @abstractmethod
+    def complete(self, entry: Dict[str, Any]) -> None:
+        """Registra a entrega de uma mensagem reservada."""
+    
+    @abstractmethod
+    def fail(self, entry: Dict[str, Any], error: str, max_attempts: int = OUTBOUND_QUEUE_MAX_ATTEMPTS) -> bool:
+        """
+        Registra uma falha de entrega.
+        
+        A mensagem é reagendada com espera exponencial ou, após
+        `max_attempts` tentativas, movida para a fila de mensagens mortas.
+        
+        Args:
+            entry: Mensagem reservada
+            error: Descrição da falha
+            max_attempts: Número máximo de tentativas
+        
+        Returns:
+            True se a mensagem foi movida para a fila de mensagens mortas
+        """
+    
+    @abstractmethod
+    def defer(self, entry: Dict[str, Any], delay: float) -> None:
+        """
+        Devolve uma mensagem reservada à fila, para entrega após `delay` segundos.
+        
+        Usado quando o limite de taxa do remetente não permite a entrega
+        agora; não conta como tentativa.
+        
+        Args:
+            entry: Mensagem reservada
+            delay: Espera até a nova entrega, em segundos
+        """
+    
+    @abstractmethod
+    def is_delivered(self, message_id: str) -> bool:
+        """Indica se uma mensagem já foi entregue."""
+    
+    @abstractmethod
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Lista as mensagens mortas mais recentes.
+        
+        Args:
+            limit: Número máximo de mensagens
+        
+        Returns:
+            Mensagens, com o último erro em "error"
+        """
+
+class RedisOutboundQueue(OutboundQueue):
+    """
+    Fila de mensagens de saída em um Redis Stream.
+    
+    Os workers consomem o stream com um grupo de consumidores (XREADGROUP) e
+    confirmam cada mensagem após a entrega (XACK); mensagens pendentes de
+    consumidores inativos são retomadas com XAUTOCLAIM. Novas tentativas
+    aguardam em um sorted set até o horário agendado, e mensagens mortas vão
+    para um stream próprio. Todas as chaves compartilham a mesma hash tag.
+    """
+    
+    # Enfileira a mensagem e registra a chave de idempotência atomicamente
+    ENQUEUE_SCRIPT = """
+    if KEYS[2] ~= '' then
+        local existing = redis.call('GET', KEYS[2])
+        if existing then
+            return existing
+        end
+        redis.call('SET', KEYS[2], ARGV[1], 'EX', ARGV[3])
+    end
+    redis.call('XADD', KEYS[1], '*', 'payload', ARGV[2])
+    return ARGV[1]
+    """
+    
+    # Move para o stream as novas tentativas cujo horário chegou
+    PROMOTE_SCRIPT = """
+    local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+    for _, payload in ipairs(due) do
+        redis.call('ZREM', KEYS[1], payload)
+        redis.call('XADD', KEYS[2], '*', 'payload', payload)
+    end
+    return #due
+    """
+    
+    def __init__(
+        self,
+        redis_client=None,
+        group: str = OUTBOUND_QUEUE_GROUP,
+        visibility_seconds: int = OUTBOUND_QUEUE_VISIBILITY_SECONDS,
+        idempotency_ttl: int = OUTBOUND_QUEUE_IDEMPOTENCY_TTL
+    ):
+        """
+        Inicializa a fila.
+        
+        Args:
+            redis_client: Cliente Redis (por padrão, o cliente configurado em redis_config)
+            group: Nome do grupo de consumidores
+            visibility_seconds: Tempo até retomar mensagens de consumidores inativos
+            idempotency_ttl: Validade das chaves de idempotência e das marcas de entrega, em segundos
+        """
+        self._redis_client = redis_client
+        self.group = group
+        self.visibility_seconds = visibility_seconds
+        self.idempotency_ttl = idempotency_ttl
+        self.stream_key = f"{OUTBOUND_QUEUE_PREFIX}stream"
+        self.delayed_key = f"{OUTBOUND_QUEUE_PREFIX}delayed"
+        self.dead_key = f"{OUTBOUND_QUEUE_PREFIX}dead"
+        self._enqueue_script = None
+        self._promote_script = None
+        self._group_ready = False
+    
+    @property
+    def redis_client(self):
+        """Cliente Redis usado pela fila."""
+        if self._redis_client is None:
+            self._redis_client = get_redis_client()
+        return self._redis_client
+    
+    def _ensure_group(self) -> None:
+        if self._group_ready:
+            return
+        try:
+            self.redis_client.xgroup_create(self.stream_key, self.group, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+    
+    def _enqueue_args(self, message: Dict[str, Any]) -> Tuple[str, List[str], List[Any]]:
+        """Gera o ID de uma mensagem e as chaves e argumentos do script de enfileiramento."""
+        if self._enqueue_script is None:
+            self._enqueue_script = self.redis_client.register_script(self.ENQUEUE_SCRIPT)
+        
+        message_id = str(uuid.uuid4())
+        idempotency_key = message.get("idempotency_key")
+        payload = {**message, "message_id": message_id, "attempts": 0, "enqueued_at": time.time()}
+        keys = [
+            self.stream_key,
+            f"{OUTBOUND_QUEUE_PREFIX}idem:{idempotency_key}" if idempotency_key else ""
+        ]
+        args = [message_id, json.dumps(payload, ensure_ascii=False, default=str), self.idempotency_ttl]
+        return message_id, keys, args
+    
+    def enqueue(self, message):
+        message_id, keys, args = self._enqueue_args(message)
+        stored_id = self._enqueue_script(keys=keys, args=args)
+        return stored_id, stored_id == message_id
+    
+    def enqueue_many(self, messages):
+        # Um único round trip: os scripts do lote seguem em um pipeline
+        pipeline = self.redis_client.pipeline(transaction=False)
+        message_ids = []
+        for message in messages:
+            message_id, keys, args = self._enqueue_args(message)
+            self._enqueue_script(keys=keys, args=args, client=pipeline)
+            message_ids.append(message_id)
+        return [
+            (stored_id, stored_id == message_id)
+            for message_id, stored_id in zip(message_ids, pipeline.execute())
+        ]
+    
+    def claim(self, consumer, count, block_ms):
+        self._ensure_group()
+        
+        if self._promote_script is None:
+            self._promote_script = self.redis_client.register_script(self.PROMOTE_SCRIPT)
+        self._promote_script(keys=[self.delayed_key, self.stream_key], args=[datetime.utcnow().timestamp(), count])
+        
+        # Mensagens reservadas por consumidores inativos
+        _, entries, *_ = self.redis_client.xautoclaim(
+            self.stream_key, self.group, consumer,
+            min_idle_time=self.visibility_seconds * 1000, start_id="0-0", count=count
+        )
+        if not entries:
+            response = self.redis_client.xreadgroup(
+                self.group, consumer, {self.stream_key: ">"}, count=count, block=block_ms
+            )
+            entries = response[0][1] if response else []
+        
+        claimed = []
+        for receipt, fields in entries:
+            if not fields:
+                # Entrada removida do stream após a reserva
+                self.redis_client.xack(self.stream_key, self.group, receipt)
+                continue
+            entry = json.loads(fields["payload"])
+            entry["receipt"] = receipt
+            claimed.append(entry)
+        return claimed
+    
+    def complete(self, entry):
+        pipeline = self.redis_client.pipeline(transaction=True)
+        pipeline.set(f"{OUTBOUND_QUEUE_PREFIX}sent:{entry['message_id']}", 1, ex=self.idempotency_ttl)
+        pipeline.xack(self.stream_key, self.group, entry["receipt"])
+        pipeline.xdel(self.stream_key, entry["receipt"])
+        pipeline.execute()
+    
+    def fail(self, entry, error, max_attempts=OUTBOUND_QUEUE_MAX_ATTEMPTS):
+        payload = {key: value for key, value in entry.items() if key != "receipt"}
+        payload["attempts"] = entry.get("attempts", 0) + 1
+        payload["error"] = error
+        dead = payload["attempts"] >= max_attempts
+        
+        if dead:
+            pipeline = self.redis_client.pipeline(transaction=True)
+            pipeline.xadd(self.dead_key, {"payload": json.dumps(payload, ensure_ascii=False, default=str)})
+            pipeline.xack(self.stream_key, self.group, entry["receipt"])
+            pipeline.xdel(self.stream_key, entry["receipt"])
+            pipeline.execute()
+        else:
+            self._reschedule(entry["receipt"], payload, retry_delay(payload["attempts"]))
+        return dead
+    
+    def defer(self, entry, delay):
+        payload = {key: value for key, value in entry.items() if key != "receipt"}
+        self._reschedule(entry["receipt"], payload, delay)
+    
+    def _reschedule(self, receipt: str, payload: Dict[str, Any], delay: float) -> None:
+        """Move uma mensagem reservada para o conjunto de entregas agendadas."""
+        pipeline = self.redis_client.pipeline(transaction=True)
+        pipeline.zadd(
+            self.delayed_key,
+            {json.dumps(payload, ensure_ascii=False, default=str): datetime.utcnow().timestamp() + delay}
+        )
+        pipeline.xack(self.stream_key, self.group, receipt)
+        pipeline.xdel(self.stream_key, receipt)
+        pipeline.execute()
+    
+    def is_delivered(self, message_id):
+        return bool(self.redis_client.exists(f"{OUTBOUND_QUEUE_PREFIX}sent:{message_id}"))
+    
+    def dead_letters(self, limit=100):
+        return [
+            json.loads(fields["payload"])
+            for _, fields in self.redis_client.xrevrange(self.dead_key, count=limit)
+        ]
+
+class PostgresOutboundQueue(OutboundQueue):
+    """
+    Fila de mensagens de saída em uma tabela do banco de dados da aplicação.
+    
+    Alternativa para implantações sem Redis. Os workers reservam mensagens com
+    SELECT ... FOR UPDATE SKIP LOCKED, marcando-as como em processamento até
+    `locked_until`; a chave de idempotência tem restrição de unicidade, e as
+    mensagens mortas permanecem na tabela com status "dead".
+    """
+    
+    def __init__(self, session_factory=None, visibility_seconds: int = OUTBOUND_QUEUE_VISIBILITY_SECONDS):
+        """
+        Inicializa a fila.
+        
+        Args:
+            session_factory: Fábrica de sessões (por padrão, SessionLocal)
+            visibility_seconds: Tempo até retomar mensagens de consumidores inativos
+        """
+        if session_factory is None:
+            from src.config.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.visibility_seconds = visibility_seconds
+    
+    @staticmethod
+    def _entry(row) -> Dict[str, Any]:
+        return {
+            "message_id": row.id,
+            "client_id": row.client_id,
+            "channel": row.channel,
+            "recipient": row.recipient,
+            "message": row.message,
+            "metadata": row.message_metadata or {},
+            "idempotency_key": row.idempotency_key,
+            "attempts": row.attempts,
+            "error": row.last_error,
+            "enqueued_at": row.created_at.replace(tzinfo=row.created_at.tzinfo or timezone.utc).timestamp() if row.created_at else None,
+            "receipt": row.id
+        }
+    
+    @staticmethod
+    def _row(message: Dict[str, Any], message_id: str):
+        from src.models.models import OutboundMessage
+        
+        return OutboundMessage(
+            id=message_id,
+            idempotency_key=message.get("idempotency_key"),
+            client_id=str(message["client_id"]),
+            channel=message["channel"],
+            recipient=message["recipient"],
+            message=message["message"],
+            message_metadata=message.get("metadata") or {},
+            status="pending",
+            attempts=0,
+            available_at=datetime.utcnow()
+        )
+    
+    def enqueue(self, message):
+        from sqlalchemy.exc import IntegrityError
+        from src.models.models import OutboundMessage
+        
+        message_id = str(uuid.uuid4())
+        db = self.session_factory()
+        try:
+            db.add(self._row(message, message_id))
+            db.commit()
+            return message_id, True
+        except IntegrityError:
+            db.rollback()
+            existing = db.query(OutboundMessage.id).filter(
+                OutboundMessage.idempotency_key == message.get("idempotency_key")
+            ).first()
+            if existing is None:
+                raise
+            return existing.id, False
+        finally:
+            db.close()
+    
+    def enqueue_many(self, messages):
+        from sqlalchemy.exc import IntegrityError
+        from src.models.models import OutboundMessage
+        
+        keys = [message.get("idempotency_key") for message in messages if message.get("idempotency_key")]
+        db = self.session_factory()
+        try:
+            # Chaves já usadas (por exemplo, uma campanha retomada) não são inseridas de novo
+            existing = dict(db.query(OutboundMessage.idempotency_key, OutboundMessage.id).filter(
+                OutboundMessage.idempotency_key.in_(keys)
+            ).all()) if keys else {}
+            
+            results, seen = [], {}
+            for message in messages:
+                key = message.get("idempotency_key")
+                if key in existing:
+                    results.append((existing[key], False))
+                elif key and key in seen:
+                    results.append((seen[key], False))
+                else:
+                    message_id = str(uuid.uuid4())
+                    db.add(self._row(message, message_id))
+                    results.append((message_id, True))
+                    if key:
+                        seen[key] = message_id
+            db.commit()
+            return results
+        except IntegrityError:
+            # Chave inserida por outro processo após a consulta
+            db.rollback()
+            return [self.enqueue(message) for message in messages]
+        finally:
+            db.close()
+    
+    def claim(self, consumer, count, block_ms):
+        from sqlalchemy import and_, or_
+        from src.models.models import OutboundMessage
+        
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            rows = db.query(OutboundMessage).filter(or_(
+                and_(OutboundMessage.status == "pending", OutboundMessage.available_at <= now),
+                and_(OutboundMessage.status == "processing", OutboundMessage.locked_until < now)
+            )).order_by(OutboundMessage.available_at).limit(count).with_for_update(skip_locked=True).all()
+            
+            for row in rows:
+                row.status = "processing"
+                row.locked_until = now + timedelta(seconds=self.visibility_seconds)
+            entries = [self._entry(row) for row in rows]
+            db.commit()
+            return entries
+        finally:
+            db.close()
+    
+    def complete(self, entry):
+        from src.models.models import OutboundMessage
+        
+        db = self.session_factory()
+        try:
+            db.query(OutboundMessage).filter(OutboundMessage.id == entry["receipt"]).update(
+                {"status": "sent", "sent_at": datetime.utcnow(), "locked_until": None},
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+    
+    def fail(self, entry, error, max_attempts=OUTBOUND_QUEUE_MAX_ATTEMPTS):
+        from src.models.models import OutboundMessage
+        
+        attempts = entry.get("attempts", 0) + 1
+        dead = attempts >= max_attempts
+        db = self.session_factory()
+        try:
+            db.query(OutboundMessage).filter(OutboundMessage.id == entry["receipt"]).update(
+                {
+                    "status": "dead" if dead else "pending",
+                    "attempts": attempts,
+                    "last_error": error,
+                    "available_at": datetime.utcnow() + timedelta(seconds=retry_delay(attempts)),
+                    "locked_until": None
+                },
+                synchronize_session=False
+            )
+            db.commit()
+            return dead
+        finally:
+            db.close()
+    
+    def defer(self, entry, delay):
+        from src.models.models import OutboundMessage
+        
+        db = self.session_factory()
+        try:
+            db.query(OutboundMessage).filter(OutboundMessage.id == entry["receipt"]).update(
+                {
+                    "status": "pending",
+                    "available_at": datetime.utcnow() + timedelta(seconds=delay),
+                    "locked_until": None
+                },
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+    
+    def is_delivered(self, message_id):
+        from src.models.models import OutboundMessage
+        
+        db = self.session_factory()
+        try:
+            return db.query(OutboundMessage.id).filter(
+                OutboundMessage.id == message_id,
+                OutboundMessage.status == "sent"
+            ).first() is not None
+        finally:
+            db.close()
+    
+    def dead_letters(self, limit=100):
+        from src.models.models import OutboundMessage
+        
+        db = self.session_factory()
+        try:
+            rows = db.query(OutboundMessage).filter(
+                OutboundMessage.status == "dead"
+            ).order_by(OutboundMessage.available_at.desc()).limit(limit).all()
+            return [self._entry(row) for row in rows]
+        finally:
+            db.close()
+
+# Filas disponíveis
+OUTBOUND_QUEUE_BACKENDS = {
+    "redis": RedisOutboundQueue,
+    "postgres": PostgresOutboundQueue
+}
+
+_outbound_queue: Optional[OutboundQueue] = None
+
+def get_outbound_queue() -> OutboundQueue:
+    """
+    Retorna a fila de mensagens de saída compartilhada pelo processo.
+    
+    O tipo de fila é definido por OUTBOUND_QUEUE_BACKEND.
+    
+    Returns:
+        Fila de mensagens de saída
+    """
+    global _outbound_queue
+    
+    if _outbound_queue is None:
+        if OUTBOUND_QUEUE_BACKEND not in OUTBOUND_QUEUE_BACKENDS:
+            raise ValueError(f"Fila de mensagens de saída não suportada: {OUTBOUND_QUEUE_BACKEND}")
+        _outbound_queue = OUTBOUND_QUEUE_BACKENDS[OUTBOUND_QUEUE_BACKEND]()
+    return _outbound_queue
+
+class OutboundWorkerPool:
+    """
+    Pool de workers que entrega as mensagens da fila de saída.
+    
+    Cada worker é um consumidor da fila: reserva um lote de mensagens,
+    agrupa-as por canal e entrega cada grupo em paralelo, reutilizando os
+    clientes HTTP do canal. Mensagens já entregues (reentregas após uma
+    falha do worker) são apenas confirmadas.
+    
+    O tráfego é moldado por baldes de tokens por (cliente, canal, remetente):
+    mensagens acima da taxa aguardam até `max_wait` segundos pelo token e,
+    além disso, voltam para a fila agendadas para quando houver token. Assim,
+    a campanha de um tenant não ocupa os workers, e as mensagens de um lote
+    são intercaladas entre tenants.
+    """
+    
+    def __init__(
+        self,
+        queue: Optional[OutboundQueue] = None,
+        session_factory=None,
+        workers: int = OUTBOUND_QUEUE_WORKERS,
+        batch_size: int = OUTBOUND_QUEUE_BATCH_SIZE,
+        block_ms: int = OUTBOUND_QUEUE_BLOCK_MS,
+        max_attempts: int = OUTBOUND_QUEUE_MAX_ATTEMPTS,
+        limiter: TokenBucketLimiter = outbound_rate_limiter,
+        max_wait: float = RATE_LIMIT_MAX_WAIT
+    ):
+        """
+        Inicializa o pool de workers.
+        
+        Args:
+            queue: Fila de mensagens de saída (por padrão, a do processo)
+            session_factory: Fábrica de sessões usada na entrega (por padrão, SessionLocal)
+            workers: Número de workers concorrentes
+            batch_size: Número máximo de mensagens reservadas por vez
+            block_ms: Tempo máximo de espera por mensagens, em milissegundos
+            max_attempts: Número máximo de tentativas por mensagem
+            limiter: Limitador de taxa por remetente
+            max_wait: Espera máxima por um token antes de reagendar a mensagem, em segundos
+        """
+        self._queue = queue
+        self.session_factory = session_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.max_attempts = max_attempts
+        self.limiter = limiter
+        self.max_wait = max_wait
+        self._tasks: List[asyncio.Task] = []
+    
+    @property
+    def queue(self) -> OutboundQueue:
+        if self._queue is None:
+            self._queue = get_outbound_queue()
+        return self._queue
+    
+    async def start(self) -> None:
+        """Inicia os workers."""
+        if self._tasks:
+            return
+        if self.session_factory is None:
+            from src.config.database import SessionLocal
+            self.session_factory = SessionLocal
+        
+        consumer_prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self._tasks = [
+            asyncio.create_task(self._worker(f"{consumer_prefix}-{index}"))
+            for index in range(self.workers)
+        ]
+        logger.info(f"Pool de envio de mensagens iniciado com {self.workers} workers")
+    
+    async def stop(self) -> None:
+        """Interrompe os workers; mensagens reservadas e não concluídas serão reentregues."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    async def _worker(self, consumer: str) -> None:
+        """Reserva e entrega lotes de mensagens."""
+        while True:
+            try:
+                entries = await asyncio.to_thread(self.queue.claim, consumer, self.batch_size, self.block_ms)
+                if not entries:
+                    # A fila no banco não bloqueia à espera de mensagens
+                    if isinstance(self.queue, PostgresOutboundQueue):
+                        await asyncio.sleep(self.block_ms / 1000)
+                    continue
+                await self.deliver_batch(entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro no consumidor {consumer} da fila de saída: {str(e)}")
+                await asyncio.sleep(1)
+    
+    @staticmethod
+    def _interleave_by_client(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Ordena as mensagens alternando entre clientes, preservando a ordem de cada um."""
+        by_client: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for entry in entries:
+            by_client[str(entry["client_id"])].append(entry)
+        
+        interleaved = []
+        for position in range(max(len(client_entries) for client_entries in by_client.values())):
+            interleaved.extend(
+                client_entries[position]
+                for client_entries in by_client.values()
+                if position < len(client_entries)
+            )
+        return interleaved
+    
+    async def deliver_batch(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Entrega um lote de mensagens reservadas, agrupadas por canal.
+        
+        Nos canais com envio em lote (BATCHED_CHANNELS), as mensagens de cada
+        cliente são entregues em uma única chamada ao provedor, por exemplo
+        uma sessão SMTP para todos os e-mails do lote.
+        
+        Args:
+            entries: Mensagens reservadas
+        """
+        from src.services.channel_integration import BATCHED_CHANNELS, ChannelIntegration
+        
+        by_channel: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for entry in entries:
+            by_channel[entry["channel"]].append(entry)
+        
+        db = self.session_factory()
+        try:
+            integration = ChannelIntegration(db)
+            for channel, channel_entries in by_channel.items():
+                # Um balde por remetente, consultado uma vez por lote
+                buckets = {}
+                for entry in channel_entries:
+                    if entry["client_id"] not in buckets:
+                        buckets[entry["client_id"]] = integration.rate_limit_bucket(entry["client_id"], channel)
+                
+                if channel in BATCHED_CHANNELS:
+                    by_client: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+                    for entry in channel_entries:
+                        by_client[entry["client_id"]].append(entry)
+                    await asyncio.gather(*(
+                        self._deliver_group(integration, channel, client_entries, buckets[client_id])
+                        for client_id, client_entries in by_client.items()
+                    ))
+                else:
+                    await asyncio.gather(*(
+                        self._deliver(integration, entry, buckets[entry["client_id"]])
+                        for entry in self._interleave_by_client(channel_entries)
+                    ))
+        finally:
+            db.close()
+    
+    async def _admit(self, entry: Dict[str, Any], bucket) -> bool:
+        """
+        Verifica se uma mensagem deve ser entregue agora.
+        
+        Confirma reentregas de mensagens já enviadas, reagenda mensagens acima
+        do limite de taxa e aguarda o token reservado.
+        
+        Returns:
+            True se a mensagem pode ser entregue
+        """
+        if await asyncio.to_thread(self.queue.is_delivered, entry["message_id"]):
+            await asyncio.to_thread(self.queue.complete, entry)
+            return False
+        
+        reserved, wait = await asyncio.to_thread(self.limiter.reserve, *bucket, self.max_wait)
+        outbound_metrics.record_reservation(entry["channel"], reserved, wait)
+        if not reserved:
+            # Variação de até um intervalo entre tokens, para que mensagens com
+            # horários vizinhos (inclusive de outras instâncias) não coincidam
+            await asyncio.to_thread(self.queue.defer, entry, wait + random.uniform(0, 1 / bucket[1]))
+            return False
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+    
+    async def _record(self, entry: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Registra na fila o resultado da entrega de uma mensagem."""
+        if result.get("success"):
+            await asyncio.to_thread(self.queue.complete, entry)
+            if entry.get("enqueued_at"):
+                outbound_metrics.record_delivery(entry["channel"], time.time() - entry["enqueued_at"])
+            return
+        
+        dead = await asyncio.to_thread(self.queue.fail, entry, result.get("error", "erro desconhecido"), self.max_attempts)
+        if dead:
+            logger.error(f"Mensagem {entry['message_id']} movida para a fila de mensagens mortas: {result.get('error')}")
+    
+    @staticmethod
+    def _outgoing(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Mensagem no formato de `ChannelIntegration.deliver_many`."""
+        return {
+            "recipient": entry["recipient"],
+            "message": entry["message"],
+            "metadata": {**(entry.get("metadata") or {}), "message_id": entry["message_id"]}
+        }
+    
+    async def _deliver(self, integration, entry: Dict[str, Any], bucket) -> None:
+        """Entrega uma mensagem, respeitando o limite de taxa, e registra o resultado na fila."""
+        if not await self._admit(entry, bucket):
+            return
+        
+        outgoing = self._outgoing(entry)
+        result = await integration.deliver_message(
+            entry["client_id"],
+            entry["channel"],
+            outgoing["recipient"],
+            outgoing["message"],
+            outgoing["metadata"]
+        )
+        await self._record(entry, result)
+    
+    async def _deliver_group(self, integration, channel: str, entries: List[Dict[str, Any]], bucket) -> None:
+        """Entrega as mensagens de um cliente em uma única chamada ao provedor."""
+        admitted = await asyncio.gather(*(self._admit(entry, bucket) for entry in entries))
+        entries = [entry for entry, ok in zip(entries, admitted) if ok]
+        if not entries:
+            return
+        
+        results = await integration.deliver_many(
+            entries[0]["client_id"],
+            channel,
+            [self._outgoing(entry) for entry in entries]
+        )
+        await asyncio.gather(*(self._record(entry, result) for entry, result in zip(entries, results)))
+
+# Pool compartilhado pelo processo
+outbound_workers = OutboundWorkerPool()
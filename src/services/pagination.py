@@ -0,0 +1,148 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Paginação por Cursor e Projeção de Campos                                   │
+│                                                                             │
+│ Este módulo implementa a paginação por chave (keyset) em (created_at, id)   │
+│ e a seleção de campos (`fields=`) dos endpoints de listagem, com o LIMIT    │
+│ e as colunas aplicados na própria consulta SQL.                             │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from datetime import datetime
+import base64
+import json
+import os
+
+from sqlalchemy import literal, tuple_
+
+# Tamanho padrão e máximo das páginas das listagens
+LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "50"))
+LIST_MAX_PAGE_SIZE = int(os.getenv("LIST_MAX_PAGE_SIZE", "500"))
+
+# Cabeçalho da resposta com o cursor da próxima página (ausente na última)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Codifica a posição de uma linha em um cursor opaco.
+    
+    Args:
+        created_at: Data de criação da linha
+        row_id: ID da linha
+    
+    Returns:
+        Cursor em base64 (seguro para URLs)
+    """
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decodifica um cursor gerado por `encode_cursor`.
+    
+    Args:
+        cursor: Cursor recebido na requisição
+    
+    Returns:
+        Data de criação e ID da última linha da página anterior
+    
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
+
+def select_fields(fields: Optional[str], available: Sequence[str]) -> List[str]:
+    """
+    Interpreta o parâmetro `fields` de uma listagem.
+    
+    Args:
+        fields: Campos separados por vírgula, ou None para todos
+        available: Campos disponíveis, na ordem da resposta
+    
+    Returns:
+        Campos solicitados, na ordem de `available`
+    
+    Raises:
+        ValueError: Se algum campo não existir
+    """
+    if not fields:
+        return list(available)
+    
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(available)
+    if unknown:
+        raise ValueError(f"Campos desconhecidos: {', '.join(sorted(unknown))}. Disponíveis: {', '.join(available)}")
+    return [field for field in available if field in requested]
+
+def keyset_page(
+    query,
+    created_at_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Lê uma página de uma consulta ordenada por (created_at, id).
+    
+    A posição é filtrada por comparação de tuplas, que o banco resolve com
+    um índice em (..., created_at, id) sem percorrer as páginas anteriores;
+    uma linha além do limite indica se há próxima página. Linhas sem
+    created_at não têm posição no cursor e não são listadas.
+    
+    Args:
+        query: Consulta do SQLAlchemy com os filtros e colunas da listagem
+        created_at_column: Coluna created_at da entidade paginada
+        id_column: Coluna id da entidade paginada
+        cursor: Cursor da página anterior, ou None para a primeira página
+        limit: Número máximo de linhas
+        descending: Ordenar das linhas mais recentes para as mais antigas
+    
+    Returns:
+        Linhas da página e cursor da próxima página (None na última)
+    
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    key = tuple_(created_at_column, id_column)
+    query = query.filter(created_at_column.isnot(None))
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # Parâmetros com os tipos das colunas, para comparar no mesmo formato armazenado
+        position = tuple_(literal(created_at, created_at_column.type), literal(row_id, id_column.type))
+        query = query.filter(key < position if descending else key > position)
+    
+    if descending:
+        query = query.order_by(created_at_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(created_at_column, id_column)
+    
+    rows = query.add_columns(
+        created_at_column.label("cursor_created_at"),
+        id_column.label("cursor_id")
+    ).limit(limit + 1).all()
+    
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].cursor_created_at, rows[-1].cursor_id)
+
+def project(row, fields: Sequence[str]) -> Dict[str, Any]:
+    """
+    Monta o item da resposta com os campos selecionados de uma linha.
+    
+    Args:
+        row: Linha retornada por `keyset_page` (colunas rotuladas com os nomes dos campos)
+        fields: Campos selecionados
+    
+    Returns:
+        Dicionário com os campos selecionados
+    """
+    mapping = row._mapping
+    return {field: mapping[field] for field in fields}
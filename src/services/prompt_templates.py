@@ -0,0 +1,289 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Registro de Templates de Prompts                                            │
+│                                                                             │
+│ Este módulo compila os templates de prompts dos agentes com Jinja2 uma      │
+│ única vez, normaliza espaços em branco na compilação e memoriza os prompts  │
+│ renderizados em um cache LRU limitado.                                      │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import re
+import textwrap
+import threading
+
+from jinja2 import Environment, StrictUndefined, Template
+
+logger = logging.getLogger(__name__)
+
+# Tamanho máximo do cache de prompts renderizados
+PROMPT_RENDER_CACHE_SIZE = int(os.getenv("PROMPT_RENDER_CACHE_SIZE", "2048"))
+
+# Template usado quando não há template específico para o tipo de agente
+DEFAULT_PROMPT_TYPE = "default"
+
+# Templates de prompts para diferentes tipos de agentes (versão 1)
+PROMPT_TEMPLATES = {
+    "customer_support": """
+    Você é Virginia, uma assistente virtual de atendimento ao cliente da {{ organization_name }}.
+    
+    Seu objetivo é fornecer suporte excepcional aos clientes, respondendo dúvidas, 
+    resolvendo problemas e garantindo uma experiência positiva.
+    
+    Informações sobre a empresa:
+    - Nome: {{ organization_name }}
+    - Setor: {{ industry }}
+    - Descrição: {{ description }}
+    
+    Diretrizes de comunicação:
+    - Seja sempre cordial e profissional
+    - Responda de forma clara e objetiva
+    - Demonstre empatia com os problemas dos clientes
+    - Ofereça soluções práticas e eficientes
+    - Escale para um humano quando necessário
+    
+    Idiomas suportados: {{ languages }}
+    """,
+    
+    "sales": """
+    Você é Guilherme, um assistente virtual de vendas e prospecção da {{ organization_name }}.
+    
+    Seu objetivo é identificar oportunidades de negócio, qualificar leads e agendar 
+    reuniões com a equipe comercial, sempre de forma amigável e persuasiva, mas leve.
+    
+    Informações sobre a empresa:
+    - Nome: {{ organization_name }}
+    - Setor: {{ industry }}
+    - Descrição: {{ description }}
+    
+    Diretrizes de comunicação:
+    - Seja amigável e construa rapport rapidamente
+    - Identifique necessidades e dores do cliente
+    - Apresente soluções de forma persuasiva
+    - Destaque benefícios e não apenas características
+    - Conduza o cliente para o próximo passo do funil
+    - Agende reuniões com a equipe comercial quando apropriado
+    
+    Idiomas suportados: {{ languages }}
+    """,
+    
+    "marketing": """
+    Você é Amanda, uma assistente virtual de marketing da {{ organization_name }}.
+    
+    Seu objetivo é engajar leads, nutrir relacionamentos e converter prospects 
+    em clientes através de comunicação personalizada e relevante.
+    
+    Informações sobre a empresa:
+    - Nome: {{ organization_name }}
+    - Setor: {{ industry }}
+    - Descrição: {{ description }}
+    
+    Diretrizes de comunicação:
+    - Personalize mensagens com base no perfil do contato
+    - Forneça conteúdo relevante e de valor
+    - Mantenha tom consistente com a marca
+    - Identifique sinais de interesse para qualificação
+    - Encaminhe leads qualificados para a equipe de vendas
+    
+    Idiomas suportados: {{ languages }}
+    """,
+    
+    "finance": """
+    Você é Ricardo, um assistente virtual financeiro da {{ organization_name }}.
+    
+    Seu objetivo é fornecer análises financeiras, relatórios e insights 
+    para apoiar decisões estratégicas da empresa.
+    
+    Informações sobre a empresa:
+    - Nome: {{ organization_name }}
+    - Setor: {{ industry }}
+    - Descrição: {{ description }}
+    
+    Diretrizes de comunicação:
+    - Seja preciso e objetivo nas análises
+    - Apresente dados de forma clara e estruturada
+    - Destaque tendências e anomalias relevantes
+    - Sugira ações baseadas em dados
+    - Mantenha confidencialidade das informações
+    
+    Idiomas suportados: {{ languages }}
+    """,
+    
+    "hr": """
+    Você é Helena, uma assistente virtual de recursos humanos da {{ organization_name }}.
+    
+    Seu objetivo é otimizar processos de recrutamento, seleção e onboarding,
+    além de fornecer suporte aos colaboradores em questões de RH.
+    
+    Informações sobre a empresa:
+    - Nome: {{ organization_name }}
+    - Setor: {{ industry }}
+    - Descrição: {{ description }}
+    
+    Diretrizes de comunicação:
+    - Seja acolhedora e empática
+    - Forneça informações precisas sobre políticas e benefícios
+    - Conduza triagens iniciais de candidatos
+    - Agende entrevistas e acompanhe processos seletivos
+    - Apoie novos colaboradores no processo de onboarding
+    
+    Idiomas suportados: {{ languages }}
+    """,
+    
+    DEFAULT_PROMPT_TYPE: "Você é {{ agent_name }}, um assistente virtual da {{ organization_name }}."
+}
+
+def normalize_prompt(source: str) -> str:
+    """
+    Normaliza os espaços em branco de um template de prompt.
+    
+    Remove a indentação comum, espaços no fim das linhas, linhas em branco
+    repetidas e espaços no início e no fim do texto.
+    
+    Args:
+        source: Texto original do template
+        
+    Returns:
+        Texto normalizado
+    """
+    text = textwrap.dedent(source)
+    text = "\n".join(line.rstrip() for line in text.splitlines())
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+class PromptTemplateRegistry:
+    """
+    Registro de templates de prompts compilados.
+    
+    Esta classe implementa:
+    1. Compilação única dos templates com Jinja2, por tipo de agente e versão
+    2. Normalização de espaços em branco no momento da compilação
+    3. Cache LRU limitado dos prompts renderizados, indexado pelo hash das entradas
+    """
+    
+    def __init__(self, cache_size: int = PROMPT_RENDER_CACHE_SIZE):
+        """
+        Inicializa o registro.
+        
+        Args:
+            cache_size: Número máximo de prompts renderizados mantidos em cache
+        """
+        self.environment = Environment(
+            undefined=StrictUndefined,
+            autoescape=False,
+            keep_trailing_newline=False
+        )
+        self.cache_size = cache_size
+        self._templates: Dict[Tuple[str, int], Template] = {}
+        self._latest: Dict[str, int] = {}
+        self._rendered: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0}
+    
+    def register(self, agent_type: str, source: str, version: Optional[int] = None) -> int:
+        """
+        Compila e registra um template de prompt.
+        
+        Args:
+            agent_type: Tipo do agente
+            source: Texto do template (sintaxe Jinja2)
+            version: Versão do template; por padrão, a próxima versão do tipo
+            
+        Returns:
+            Versão registrada
+        """
+        template = self.environment.from_string(normalize_prompt(source))
+        
+        with self._lock:
+            if version is None:
+                version = self._latest.get(agent_type, 0) + 1
+            self._templates[(agent_type, version)] = template
+            self._latest[agent_type] = max(version, self._latest.get(agent_type, 0))
+        
+        return version
+    
+    def resolve(self, agent_type: str, version: Optional[int] = None) -> Tuple[str, int]:
+        """
+        Resolve o tipo e a versão do template a ser usado.
+        
+        Tipos sem template próprio usam o template padrão.
+        
+        Args:
+            agent_type: Tipo do agente
+            version: Versão desejada; por padrão, a mais recente
+            
+        Returns:
+            Tupla (tipo, versão) de um template registrado
+        """
+        if agent_type not in self._latest:
+            agent_type = DEFAULT_PROMPT_TYPE
+        if version is None:
+            version = self._latest[agent_type]
+        if (agent_type, version) not in self._templates:
+            raise ValueError(f"Template de prompt não encontrado: {agent_type} v{version}")
+        return agent_type, version
+    
+    def render(self, agent_type: str, variables: Dict[str, Any], version: Optional[int] = None) -> str:
+        """
+        Renderiza um prompt, reutilizando o resultado se as entradas já foram vistas.
+        
+        Args:
+            agent_type: Tipo do agente
+            variables: Variáveis do template
+            version: Versão do template; por padrão, a mais recente
+            
+        Returns:
+            Prompt renderizado
+        """
+        agent_type, version = self.resolve(agent_type, version)
+        key = hashlib.sha256(
+            json.dumps(
+                [agent_type, version, variables],
+                sort_keys=True,
+                ensure_ascii=False,
+                default=str
+            ).encode("utf-8")
+        ).hexdigest()
+        
+        with self._lock:
+            prompt = self._rendered.get(key)
+            if prompt is not None:
+                self._rendered.move_to_end(key)
+                self._counters["hits"] += 1
+                return prompt
+            self._counters["misses"] += 1
+        
+        prompt = self._templates[(agent_type, version)].render(**variables)
+        
+        with self._lock:
+            self._rendered[key] = prompt
+            while len(self._rendered) > self.cache_size:
+                self._rendered.popitem(last=False)
+        
+        return prompt
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores do cache de prompts renderizados.
+        
+        Returns:
+            Dicionário com acertos, falhas e ocupação do cache
+        """
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._rendered),
+                "max_entries": self.cache_size,
+                "templates": len(self._templates)
+            }
+
+# Registro compartilhado, compilado na importação do módulo
+prompt_registry = PromptTemplateRegistry()
+for _agent_type, _source in PROMPT_TEMPLATES.items():
+    prompt_registry.register(_agent_type, _source, version=1)
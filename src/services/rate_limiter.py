@@ -0,0 +1,275 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Limitador de Taxa das Mensagens de Saída                                    │
+│                                                                             │
+│ Este módulo implementa baldes de tokens por (cliente, canal, remetente),    │
+│ distribuídos no Redis por um script Lua e com um limitador em memória como  │
+│ alternativa, e registra as métricas de espera das mensagens.                │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, Tuple
+import logging
+import os
+import threading
+import time
+
+from src.config.redis_config import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Taxas padrão por canal: mensagens por segundo e rajada máxima por remetente
+# (podem ser substituídas por "rate_limit" na configuração do canal do cliente)
+CHANNEL_RATE_LIMITS = {
+    "whatsapp": (
+        float(os.getenv("RATE_LIMIT_WHATSAPP_PER_SECOND", "20")),
+        int(os.getenv("RATE_LIMIT_WHATSAPP_BURST", "40"))
+    ),
+    "linkedin": (
+        float(os.getenv("RATE_LIMIT_LINKEDIN_PER_SECOND", "2")),
+        int(os.getenv("RATE_LIMIT_LINKEDIN_BURST", "5"))
+    ),
+    "email": (
+        float(os.getenv("RATE_LIMIT_EMAIL_PER_SECOND", "10")),
+        int(os.getenv("RATE_LIMIT_EMAIL_BURST", "50"))
+    ),
+    "phone": (
+        float(os.getenv("RATE_LIMIT_PHONE_PER_SECOND", "1")),
+        int(os.getenv("RATE_LIMIT_PHONE_BURST", "5"))
+    )
+}
+
+# Espera máxima reservada no balde; acima dela a mensagem volta para a fila
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "2"))
+RATE_LIMIT_PREFIX = "nowgo:ratelimit:"
+
+class TokenBucketLimiter(ABC):
+    """
+    Interface dos limitadores por balde de tokens.
+    
+    `reserve` não rejeita mensagens: se não houver tokens, informa quanto
+    tempo falta para haver. Esperas de até `max_wait` são reservadas (o
+    token já fica comprometido e o chamador apenas aguarda), o que distribui
+    uma rajada ao longo do tempo na taxa do balde; esperas maiores não são
+    reservadas, e o chamador deve reagendar a mensagem.
+    
+    Cada mensagem reagendada recebe um horário próprio: o balde guarda o
+    próximo horário livre para reagendamentos, que avança 1/rate a cada
+    mensagem recusada. Assim, N mensagens acima do limite voltam espaçadas
+    na taxa do balde, em vez de todas juntas após a mesma espera (quando
+    apenas algumas obteriam tokens e as demais seriam reagendadas de novo).
+    """
+    
+    @abstractmethod
+    def reserve(self, key: str, rate: float, burst: int, max_wait: float = RATE_LIMIT_MAX_WAIT) -> Tuple[bool, float]:
+        """
+        Reserva um token de um balde.
+        
+        Args:
+            key: Identificação do balde
+            rate: Tokens repostos por segundo
+            burst: Capacidade do balde
+            max_wait: Espera máxima aceita, em segundos
+        
+        Returns:
+            Tupla (reservado, espera em segundos); se não reservado, a espera
+            é o horário de reagendamento atribuído à mensagem
+        """
+
+class InMemoryTokenBucketLimiter(TokenBucketLimiter):
+    """Baldes de tokens na memória do processo (limite por instância)."""
+    
+    def __init__(self):
+        # Balde -> (tokens, última atualização, próximo horário livre para reagendamentos)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+    
+    def reserve(self, key, rate, burst, max_wait=RATE_LIMIT_MAX_WAIT):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at, deferred_until = self._buckets.get(key, (float(burst), now, now))
+            tokens = min(float(burst), tokens + (now - updated_at) * rate)
+            remaining = tokens - 1
+            wait = -remaining / rate if remaining < 0 else 0.0
+            if wait > max_wait:
+                slot = max(now + wait, deferred_until)
+                self._buckets[key] = (tokens, now, slot + 1 / rate)
+                return False, slot - now
+            self._buckets[key] = (remaining, now, deferred_until)
+            return True, wait
+
+class RedisTokenBucketLimiter(TokenBucketLimiter):
+    """
+    Baldes de tokens no Redis, compartilhados por todas as instâncias.
+    
+    O balde (tokens, horário da última atualização e próximo horário livre
+    para reagendamentos) é lido, reposto e debitado atomicamente por um
+    script Lua, com o relógio do próprio Redis.
+    Se o Redis estiver indisponível, usa o limitador em memória.
+    """
+    
+    RESERVE_SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local max_wait = tonumber(ARGV[3])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at', 'deferred_until')
+    local tokens = tonumber(bucket[1]) or burst
+    local updated_at = tonumber(bucket[2]) or now
+    local deferred_until = tonumber(bucket[3]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+    
+    local remaining = tokens - 1
+    local wait = 0
+    if remaining < 0 then
+        wait = -remaining / rate
+    end
+    local reserved = 1
+    if wait > max_wait then
+        reserved = 0
+        remaining = tokens
+        local slot = math.max(now + wait, deferred_until)
+        deferred_until = slot + 1 / rate
+        wait = slot - now
+    end
+    
+    redis.call('HSET', KEYS[1], 'tokens', tostring(remaining), 'updated_at', tostring(now),
+               'deferred_until', tostring(deferred_until))
+    redis.call('EXPIRE', KEYS[1], math.ceil(math.max(burst / rate + max_wait, deferred_until - now)) + 1)
+    return {reserved, tostring(wait)}
+    """
+    
+    def __init__(self, redis_client=None, fallback: Optional[TokenBucketLimiter] = None):
+        """
+        Inicializa o limitador.
+        
+        Args:
+            redis_client: Cliente Redis (por padrão, o cliente configurado em redis_config)
+            fallback: Limitador usado se o Redis estiver indisponível
+        """
+        self._redis_client = redis_client
+        self.fallback = fallback or InMemoryTokenBucketLimiter()
+        self._reserve_script = None
+        self._degraded = False
+    
+    @property
+    def redis_client(self):
+        """Cliente Redis usado pelos baldes."""
+        if self._redis_client is None:
+            self._redis_client = get_redis_client()
+        return self._redis_client
+    
+    def reserve(self, key, rate, burst, max_wait=RATE_LIMIT_MAX_WAIT):
+        try:
+            if self._reserve_script is None:
+                self._reserve_script = self.redis_client.register_script(self.RESERVE_SCRIPT)
+            reserved, wait = self._reserve_script(keys=[f"{RATE_LIMIT_PREFIX}{key}"], args=[rate, burst, max_wait])
+            if self._degraded:
+                logger.info("Redis disponível novamente; limitador de taxa distribuído restabelecido")
+                self._degraded = False
+            return bool(int(reserved)), float(wait)
+        except Exception as e:
+            if not self._degraded:
+                logger.warning(f"Redis indisponível para o limitador de taxa, usando limites por instância: {str(e)}")
+                self._degraded = True
+            return self.fallback.reserve(key, rate, burst, max_wait)
+
+def bucket_for(client_id: Any, channel: str, config: Optional[Dict[str, Any]]) -> Tuple[str, float, int]:
+    """
+    Identifica o balde de uma mensagem.
+    
+    O remetente é a identidade limitada pelo provedor: o número do WhatsApp,
+    o aplicativo do LinkedIn, o e-mail de origem ou o número de telefone.
+    
+    Args:
+        client_id: ID do cliente
+        channel: Canal da mensagem
+        config: Configuração do canal do cliente
+    
+    Returns:
+        Tupla (chave do balde, tokens por segundo, capacidade)
+    """
+    config = config or {}
+    sender = (
+        config.get("sender_id")
+        or config.get("phone_number_id")
+        or config.get("client_id")
+        or config.get("from_email")
+        or next(iter(config.get("phone_numbers") or []), None)
+        or "default"
+    )
+    rate, burst = CHANNEL_RATE_LIMITS.get(channel, (1.0, 1))
+    override = config.get("rate_limit") or {}
+    return (
+        f"{client_id}:{channel}:{sender}",
+        float(override.get("per_second", rate)),
+        int(override.get("burst", burst))
+    )
+
+class OutboundTrafficMetrics:
+    """
+    Métricas de espera das mensagens de saída, por canal.
+    
+    Registra o atraso na fila (do enfileiramento à entrega), a espera imposta
+    pelo limitador e as mensagens reagendadas por excederem a espera máxima.
+    """
+    
+    def __init__(self):
+        self._channels: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+    
+    def _channel(self, channel: str) -> Dict[str, float]:
+        if channel not in self._channels:
+            self._channels[channel] = {
+                "delivered": 0, "shaped": 0, "deferred": 0,
+                "queue_delay_total": 0.0, "queue_delay_max": 0.0,
+                "shaping_wait_total": 0.0, "shaping_wait_max": 0.0
+            }
+        return self._channels[channel]
+    
+    def record_reservation(self, channel: str, reserved: bool, wait: float) -> None:
+        """Registra o resultado de uma reserva no limitador."""
+        with self._lock:
+            metrics = self._channel(channel)
+            if not reserved:
+                metrics["deferred"] += 1
+            elif wait > 0:
+                metrics["shaped"] += 1
+                metrics["shaping_wait_total"] += wait
+                metrics["shaping_wait_max"] = max(metrics["shaping_wait_max"], wait)
+    
+    def record_delivery(self, channel: str, queue_delay: float) -> None:
+        """Registra uma entrega e o tempo total que a mensagem aguardou."""
+        with self._lock:
+            metrics = self._channel(channel)
+            metrics["delivered"] += 1
+            metrics["queue_delay_total"] += queue_delay
+            metrics["queue_delay_max"] = max(metrics["queue_delay_max"], queue_delay)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna as métricas por canal.
+        
+        Returns:
+            Dicionário canal -> contadores, médias e máximos (em segundos)
+        """
+        with self._lock:
+            return {
+                channel: {
+                    "delivered": int(metrics["delivered"]),
+                    "shaped": int(metrics["shaped"]),
+                    "deferred": int(metrics["deferred"]),
+                    "queue_delay_avg": metrics["queue_delay_total"] / metrics["delivered"] if metrics["delivered"] else 0.0,
+                    "queue_delay_max": metrics["queue_delay_max"],
+                    "shaping_wait_avg": metrics["shaping_wait_total"] / metrics["shaped"] if metrics["shaped"] else 0.0,
+                    "shaping_wait_max": metrics["shaping_wait_max"]
+                }
+                for channel, metrics in self._channels.items()
+            }
+
+# Limitador e métricas compartilhados pelo processo
+outbound_rate_limiter = RedisTokenBucketLimiter()
+outbound_metrics = OutboundTrafficMetrics()
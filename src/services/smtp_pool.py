@@ -0,0 +1,479 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Pool de Conexões SMTP do Canal de E-mail                                    │
+│                                                                             │
+│ Este módulo mantém conexões SMTP assíncronas já autenticadas por            │
+│ configuração de integração, com verificação de saúde antes do reuso,        │
+│ remoção de conexões ociosas e envio em pipeline (RFC 2920).                 │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parseaddr
+from typing import Dict, Any, AsyncIterator, Deque, List, Optional, Tuple
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import ssl
+import time
+
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Limites do pool
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "10"))
+SMTP_POOL_MAX_CONNECTIONS = int(os.getenv("SMTP_POOL_MAX_CONNECTIONS", "5"))
+SMTP_POOL_IDLE_SECONDS = float(os.getenv("SMTP_POOL_IDLE_SECONDS", "60"))
+SMTP_POOL_HEALTH_CHECK_SECONDS = float(os.getenv("SMTP_POOL_HEALTH_CHECK_SECONDS", "15"))
+SMTP_POOL_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_POOL_MAX_MESSAGES_PER_CONNECTION", "1000"))
+SMTP_POOL_PIPELINING = os.getenv("SMTP_POOL_PIPELINING", "true").lower() == "true"
+
+# Endereço simples (local@domínio), sem espaços, delimitadores ou quebras de linha
+_ADDRESS_PATTERN = re.compile(r"[^\s<>()\[\],;:\\\"@]+@[^\s<>()\[\],;:\\\"@]+")
+
+def envelope_address(address: str) -> str:
+    """
+    Valida um endereço usado no envelope (MAIL FROM/RCPT TO) e nos cabeçalhos.
+    
+    Quebras de linha ou "<"/">" permitiriam injetar comandos SMTP ou
+    cabeçalhos; endereços assim são recusados.
+    
+    Args:
+        address: Endereço de e-mail
+    
+    Returns:
+        Endereço validado
+    
+    Raises:
+        ValueError: Se o endereço não for um endereço simples válido
+    """
+    if not isinstance(address, str) or any(char in address for char in "\r\n<>"):
+        raise ValueError(f"Endereço de e-mail inválido: {address!r}")
+    name, parsed = parseaddr(address)
+    if name or parsed != address or not _ADDRESS_PATTERN.fullmatch(parsed):
+        raise ValueError(f"Endereço de e-mail inválido: {address!r}")
+    return parsed
+
+class SmtpError(Exception):
+    """Resposta de erro do servidor SMTP."""
+    
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+        self.message = message
+
+class SmtpConnection:
+    """
+    Conexão SMTP assíncrona (asyncio), autenticada uma única vez.
+    
+    Com a extensão PIPELINING anunciada pelo servidor, cada mensagem é enviada
+    em um único round trip: o conteúdo de uma mensagem segue no mesmo pacote
+    que MAIL FROM, RCPT TO e DATA da mensagem seguinte.
+    """
+    
+    def __init__(self, config: Dict[str, Any], timeout: float = SMTP_TIMEOUT, pipelining: bool = SMTP_POOL_PIPELINING):
+        """
+        Inicializa a conexão (sem conectar).
+        
+        Args:
+            config: Configuração da integração de e-mail (smtp_server, smtp_port,
+                username, password e, opcionalmente, use_tls e use_ssl)
+            timeout: Tempo limite de cada resposta, em segundos
+            pipelining: Usar PIPELINING quando o servidor anunciar a extensão
+        """
+        self.host = config["smtp_server"]
+        self.port = int(config["smtp_port"])
+        self.use_ssl = config.get("use_ssl", self.port == 465)
+        self.use_tls = not self.use_ssl and config.get("use_tls", self.port == 587)
+        self.username = config.get("username")
+        self.password = config.get("password")
+        self.timeout = timeout
+        self.pipelining = pipelining
+        
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.extensions: Dict[str, str] = {}
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+        self.broken = False
+    
+    async def connect(self) -> None:
+        """Conecta, negocia TLS e autentica."""
+        context = ssl.create_default_context() if self.use_ssl or self.use_tls else None
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=context if self.use_ssl else None),
+            self.timeout
+        )
+        await self._expect(220)
+        await self._ehlo()
+        
+        if self.use_tls:
+            if "starttls" not in self.extensions:
+                raise SmtpError(502, "Servidor não suporta STARTTLS")
+            await self._command("STARTTLS", 220)
+            await self.writer.start_tls(context, server_hostname=self.host)
+            await self._ehlo()
+        
+        if self.username:
+            credentials = base64.b64encode(f"\0{self.username}\0{self.password}".encode("utf-8")).decode("ascii")
+            await self._command(f"AUTH PLAIN {credentials}", 235)
+    
+    async def _ehlo(self) -> None:
+        _, lines = await self._command("EHLO nowgo.local", 250)
+        self.extensions = {}
+        for line in lines[1:]:
+            name, _, params = line.partition(" ")
+            self.extensions[name.lower()] = params
+    
+    async def _read_reply(self) -> Tuple[int, List[str]]:
+        """Lê uma resposta, possivelmente com várias linhas ("250-...")."""
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            if not line:
+                raise ConnectionError("Conexão SMTP encerrada pelo servidor")
+            text = line.decode("utf-8", "replace").rstrip("\r\n")
+            lines.append(text[4:])
+            if len(text) < 4 or text[3] != "-":
+                return int(text[:3]), lines
+    
+    async def _expect(self, code: int) -> Tuple[int, List[str]]:
+        reply_code, lines = await self._read_reply()
+        if reply_code != code:
+            raise SmtpError(reply_code, " ".join(lines))
+        return reply_code, lines
+    
+    async def _command(self, command: str, code: int) -> Tuple[int, List[str]]:
+        self.writer.write(f"{command}\r\n".encode("utf-8"))
+        await self.writer.drain()
+        return await self._expect(code)
+    
+    @staticmethod
+    def _data(content: bytes) -> bytes:
+        """Normaliza as quebras de linha, duplica pontos iniciais e termina com "."."""
+        lines = content.replace(b"\r\n", b"\n").split(b"\n")
+        if lines and lines[-1] == b"":
+            lines.pop()
+        return b"".join((b"." + line if line.startswith(b".") else line) + b"\r\n" for line in lines) + b".\r\n"
+    
+    @staticmethod
+    def _envelope(sender: str, recipient: str) -> bytes:
+        return f"MAIL FROM:<{sender}>\r\nRCPT TO:<{recipient}>\r\nDATA\r\n".encode("utf-8")
+    
+    async def send_many(self, messages: List[Tuple[str, str, bytes]]) -> List[Optional[str]]:
+        """
+        Envia mensagens pela conexão.
+        
+        Um destinatário recusado ou um endereço inválido falha apenas a
+        própria mensagem. Se a conexão cair, as mensagens já aceitas pelo
+        servidor mantêm o resultado, apenas as ainda não confirmadas falham
+        (inclusive a que aguardava a resposta ao conteúdo, que pode ter sido
+        entregue) e a conexão é marcada como quebrada.
+        
+        Args:
+            messages: Tuplas (remetente, destinatário, mensagem em bytes)
+        
+        Returns:
+            Erro de cada mensagem, ou None se foi aceita, na mesma ordem
+        """
+        results: List[Optional[str]] = [None] * len(messages)
+        valid = []
+        for index, (sender, recipient, content) in enumerate(messages):
+            try:
+                valid.append((index, (envelope_address(sender), envelope_address(recipient), content)))
+            except ValueError as e:
+                results[index] = str(e)
+        if not valid:
+            return results
+        
+        self.last_used = time.monotonic()
+        # Resultados confirmados pelo servidor, na ordem das mensagens
+        errors: List[Optional[str]] = []
+        try:
+            if self.pipelining and "pipelining" in self.extensions:
+                await self._send_pipelined([message for _, message in valid], errors)
+            else:
+                for _, message in valid:
+                    errors.append(await self._send_one(*message))
+        except (SmtpError, ConnectionError, asyncio.TimeoutError, OSError) as e:
+            self.broken = True
+            lost = f"Conexão SMTP perdida: {str(e) or type(e).__name__}"
+            errors.extend([lost] * (len(valid) - len(errors)))
+        
+        for (index, _), error in zip(valid, errors):
+            results[index] = error
+        return results
+    
+    async def _send_one(self, sender: str, recipient: str, content: bytes) -> Optional[str]:
+        try:
+            await self._command(f"MAIL FROM:<{sender}>", 250)
+            await self._command(f"RCPT TO:<{recipient}>", 250)
+            await self._command("DATA", 354)
+        except SmtpError as e:
+            await self._command("RSET", 250)
+            return str(e)
+        
+        self.writer.write(self._data(content))
+        await self.writer.drain()
+        code, lines = await self._read_reply()
+        self.messages_sent += 1
+        return None if code == 250 else f"{code} {' '.join(lines)}"
+    
+    async def _send_pipelined(self, messages: List[Tuple[str, str, bytes]], results: List[Optional[str]]) -> None:
+        """Envia as mensagens, acrescentando a `results` o resultado de cada uma assim que confirmado."""
+        pending = b""
+        awaiting_data: Optional[int] = None
+        
+        for index in range(len(messages) + 1):
+            # O conteúdo da mensagem anterior e o envelope da próxima seguem juntos
+            if index < len(messages):
+                sender, recipient, _ = messages[index]
+                pending += self._envelope(sender, recipient)
+            self.writer.write(pending)
+            await self.writer.drain()
+            pending = b""
+            
+            if awaiting_data is not None:
+                code, lines = await self._read_reply()
+                self.messages_sent += 1
+                results.append(None if code == 250 else f"{code} {' '.join(lines)}")
+                awaiting_data = None
+            if index == len(messages):
+                break
+            
+            replies = [await self._read_reply() for _ in range(3)]
+            error = next((f"{code} {' '.join(lines)}" for code, lines in replies[:2] if code != 250), None)
+            data_code, data_lines = replies[2]
+            
+            if error is None and data_code == 354:
+                pending = self._data(messages[index][2])
+                awaiting_data = index
+                continue
+            
+            results.append(error or f"{data_code} {' '.join(data_lines)}")
+            if data_code == 354:
+                # DATA aceito apesar da falha: encerra a mensagem vazia e descarta a transação
+                self.writer.write(b".\r\n")
+                await self.writer.drain()
+                await self._read_reply()
+            self.writer.write(b"RSET\r\n")
+            await self.writer.drain()
+            await self._read_reply()
+    
+    async def noop(self) -> bool:
+        """Verifica se a conexão continua utilizável."""
+        try:
+            await self._command("NOOP", 250)
+            return True
+        except Exception:
+            self.broken = True
+            return False
+    
+    async def close(self) -> None:
+        """Encerra a sessão (QUIT) e fecha a conexão."""
+        if self.writer is None:
+            return
+        try:
+            if not self.broken:
+                self.writer.write(b"QUIT\r\n")
+                await self.writer.drain()
+                await asyncio.wait_for(self._read_reply(), 1)
+        except Exception:
+            pass
+        finally:
+            self.writer.close()
+            self.writer = None
+
+class _SmtpServerPool:
+    """Conexões ociosas e limite de conexões de uma configuração."""
+    
+    __slots__ = ("idle", "semaphore")
+    
+    def __init__(self, max_connections: int):
+        self.idle: Deque[SmtpConnection] = deque()
+        self.semaphore = asyncio.Semaphore(max_connections)
+
+class SmtpConnectionPool:
+    """
+    Pool de conexões SMTP por configuração de integração.
+    
+    Cada configuração (servidor, porta, usuário, senha e TLS) tem até
+    `max_connections` conexões abertas. Conexões ociosas há mais de
+    `health_check_seconds` recebem um NOOP antes do reuso e são recriadas se
+    não responderem; as ociosas há mais de `idle_seconds` são fechadas, e as
+    que atingem `max_messages` mensagens são renovadas, pois muitos servidores
+    limitam as mensagens por sessão.
+    """
+    
+    def __init__(
+        self,
+        max_connections: int = SMTP_POOL_MAX_CONNECTIONS,
+        idle_seconds: float = SMTP_POOL_IDLE_SECONDS,
+        health_check_seconds: float = SMTP_POOL_HEALTH_CHECK_SECONDS,
+        max_messages: int = SMTP_POOL_MAX_MESSAGES_PER_CONNECTION,
+        timeout: float = SMTP_TIMEOUT,
+        pipelining: bool = SMTP_POOL_PIPELINING
+    ):
+        """
+        Inicializa o pool.
+        
+        Args:
+            max_connections: Conexões simultâneas por configuração
+            idle_seconds: Tempo até fechar uma conexão ociosa, em segundos
+            health_check_seconds: Ociosidade a partir da qual a conexão é verificada antes do reuso
+            max_messages: Mensagens por conexão antes de renová-la
+            timeout: Tempo limite das respostas do servidor, em segundos
+            pipelining: Enviar em pipeline quando o servidor suportar
+        """
+        self.max_connections = max_connections
+        self.idle_seconds = idle_seconds
+        self.health_check_seconds = health_check_seconds
+        self.max_messages = max_messages
+        self.timeout = timeout
+        self.pipelining = pipelining
+        
+        self._servers: Dict[str, _SmtpServerPool] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        self._closed = False
+        self.created = 0
+        self.reused = 0
+        self.health_check_failures = 0
+    
+    @staticmethod
+    def _fingerprint(config: Dict[str, Any]) -> str:
+        fields = ("smtp_server", "smtp_port", "username", "password", "use_tls", "use_ssl")
+        payload = json.dumps({field: config.get(field) for field in fields}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    @asynccontextmanager
+    async def connection(self, config: Dict[str, Any]) -> AsyncIterator[SmtpConnection]:
+        """
+        Obtém uma conexão autenticada para a configuração.
+        
+        Uso:
+            async with smtp_connections.connection(config) as connection:
+                errors = await connection.send_many(messages)
+        
+        Args:
+            config: Configuração da integração de e-mail
+        
+        Returns:
+            Conexão SMTP, válida dentro do bloco
+        """
+        if self._closed:
+            raise RuntimeError("O pool de conexões SMTP foi encerrado")
+        if self._reaper is None:
+            self._reaper = asyncio.get_running_loop().create_task(self._reap())
+        
+        server = self._servers.setdefault(self._fingerprint(config), _SmtpServerPool(self.max_connections))
+        async with server.semaphore:
+            connection = await self._checkout(server, config)
+            try:
+                yield connection
+            finally:
+                connection.last_used = time.monotonic()
+                if connection.broken or connection.messages_sent >= self.max_messages or self._closed:
+                    await connection.close()
+                else:
+                    server.idle.append(connection)
+    
+    async def _checkout(self, server: _SmtpServerPool, config: Dict[str, Any]) -> SmtpConnection:
+        """Reutiliza uma conexão ociosa saudável ou abre uma nova."""
+        while server.idle:
+            # A mais recente primeiro: as antigas ficam ociosas e são removidas
+            connection = server.idle.pop()
+            idle_for = time.monotonic() - connection.last_used
+            if idle_for > self.idle_seconds:
+                await connection.close()
+                continue
+            if idle_for > self.health_check_seconds and not await connection.noop():
+                self.health_check_failures += 1
+                await connection.close()
+                continue
+            self.reused += 1
+            return connection
+        
+        connection = SmtpConnection(config, self.timeout, self.pipelining)
+        try:
+            await connection.connect()
+        except BaseException:
+            connection.broken = True
+            await connection.close()
+            raise
+        self.created += 1
+        return connection
+    
+    async def _reap(self) -> None:
+        """Fecha periodicamente as conexões ociosas há mais de `idle_seconds`."""
+        while True:
+            await asyncio.sleep(max(self.idle_seconds / 2, 1))
+            now = time.monotonic()
+            for server in list(self._servers.values()):
+                while server.idle and now - server.idle[0].last_used > self.idle_seconds:
+                    await server.idle.popleft().close()
+    
+    async def send_many(self, config: Dict[str, Any], messages: List[Tuple[str, str, bytes]]) -> List[Optional[str]]:
+        """
+        Envia mensagens distribuindo-as entre as conexões da configuração.
+        
+        Args:
+            config: Configuração da integração de e-mail
+            messages: Tuplas (remetente, destinatário, mensagem em bytes)
+        
+        Returns:
+            Erro de cada mensagem, ou None se foi aceita, na mesma ordem
+        """
+        parts = min(self.max_connections, len(messages))
+        if parts == 0:
+            return []
+        size = -(-len(messages) // parts)
+        
+        async def send_part(part: List[Tuple[str, str, bytes]]) -> List[Optional[str]]:
+            try:
+                async with self.connection(config) as connection:
+                    return await connection.send_many(part)
+            except Exception as e:
+                return [str(e)] * len(part)
+        
+        results = await asyncio.gather(*(
+            send_part(messages[start:start + size]) for start in range(0, len(messages), size)
+        ))
+        return [error for part in results for error in part]
+    
+    async def aclose(self) -> None:
+        """Fecha todas as conexões; chamado no encerramento da aplicação."""
+        self._closed = True
+        if self._reaper is not None:
+            self._reaper.cancel()
+        connections = [connection for server in self._servers.values() for connection in server.idle]
+        self._servers.clear()
+        await asyncio.gather(*(connection.close() for connection in connections), return_exceptions=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores do pool.
+        
+        Returns:
+            Dicionário com conexões ociosas, criadas, reutilizadas e falhas de verificação
+        """
+        return {
+            "servers": len(self._servers),
+            "idle": sum(len(server.idle) for server in self._servers.values()),
+            "created": self.created,
+            "reused": self.reused,
+            "health_check_failures": self.health_check_failures,
+            "max_connections": self.max_connections,
+            "pipelining": self.pipelining
+        }
+
+# Pool compartilhado pelo processo
+smtp_connections = SmtpConnectionPool()
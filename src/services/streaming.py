@@ -0,0 +1,112 @@
+"""
+┌─────────────────────────────────────────────────────────────────────────────┐
+│ Streaming de Eventos para Clientes HTTP                                     │
+│                                                                             │
+│ Este módulo converte os eventos produzidos por agentes e grafos (tokens,    │
+│ passos, conclusão) em Server-Sent Events, com uma fila limitada entre o     │
+│ produtor e a conexão para que clientes lentos contenham a geração.          │
+└─────────────────────────────────────────────────────────────────────────────┘
+"""
+
+from typing import Dict, Any, AsyncIterator, Optional
+import asyncio
+import json
+import logging
+import os
+
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Eventos aguardando envio por conexão; com a fila cheia, a geração é pausada
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "64"))
+
+# Intervalo sem eventos após o qual um comentário é enviado para manter a conexão
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
+# Marca o fim da produção de eventos na fila
+_END_OF_STREAM = object()
+
+def format_sse(event: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """
+    Formata um evento no protocolo Server-Sent Events.
+    
+    O tipo do evento (`event["type"]`) é usado como nome do evento SSE e o
+    evento completo é enviado como JSON no campo de dados.
+    
+    Args:
+        event: Evento com ao menos a chave "type"
+        event_id: Identificador sequencial do evento
+    
+    Returns:
+        Texto do evento, terminado por uma linha em branco
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event.get('type', 'message')}")
+    lines.append(f"data: {json.dumps(event, ensure_ascii=False, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+async def sse_stream(
+    events: AsyncIterator[Dict[str, Any]],
+    queue_size: int = SSE_QUEUE_SIZE,
+    keepalive: float = SSE_KEEPALIVE_SECONDS
+) -> AsyncIterator[str]:
+    """
+    Envia eventos de um iterador assíncrono como Server-Sent Events.
+    
+    Os eventos são consumidos por uma tarefa produtora e passam por uma fila
+    limitada: quando o cliente lê mais devagar do que os eventos são gerados,
+    a fila enche e a produção (e, com ela, a leitura do modelo) é pausada.
+    Sem eventos por `keepalive` segundos, um comentário SSE é enviado. Se a
+    conexão for encerrada, a produção é cancelada, liberando travas e vagas
+    obtidas pelo agente.
+    
+    Args:
+        events: Iterador assíncrono de eventos
+        queue_size: Número máximo de eventos aguardando envio
+        keepalive: Intervalo máximo sem envio, em segundos
+    
+    Returns:
+        Iterador assíncrono de textos no formato SSE
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    
+    async def produce():
+        try:
+            async for event in events:
+                await queue.put(event)
+        except Exception as e:
+            logger.error(f"Erro durante o streaming de eventos: {str(e)}")
+            await queue.put({"type": "error", "detail": str(e)})
+        finally:
+            # Encerrar o iterador mesmo se a produção for cancelada com ele
+            # suspenso, para que suas travas sejam liberadas imediatamente
+            if hasattr(events, "aclose"):
+                await events.aclose()
+        await queue.put(_END_OF_STREAM)
+    
+    producer = asyncio.create_task(produce())
+    event_id = 0
+    
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            
+            if event is _END_OF_STREAM:
+                break
+            
+            event_id += 1
+            yield format_sse(event, event_id)
+    finally:
+        # Cliente desconectado ou fim normal: interromper a produção
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
@@ -0,0 +1,107 @@
+"""
+Testes do envio em massa (POST /channels/bulk).
+
+O endpoint é chamado com um token JWT de um usuário real do banco (SQLite em
+memória) e enfileira as mensagens na fila de saída em banco de dados.
+"""
+
+import os
+
+# Os endpoints importam a engine da aplicação; sem DATABASE_URL, usar SQLite
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.api.integration_routes import router
+from src.config.database import get_db
+from src.models.models import OutboundMessage, User
+from src.services.auth_service import create_access_token
+from src.services import outbound_queue
+from src.services.outbound_queue import PostgresOutboundQueue
+
+CLIENT_ID = 1
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    for model in (User, OutboundMessage):
+        model.__table__.create(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    # Fila de saída no mesmo banco de teste
+    monkeypatch.setattr(outbound_queue, "_outbound_queue", PostgresOutboundQueue(session_factory=session_factory))
+    
+    app = FastAPI()
+    app.include_router(router)
+    
+    def test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    app.dependency_overrides[get_db] = test_db
+    return TestClient(app)
+
+@pytest.fixture
+def token(session_factory):
+    db = session_factory()
+    user = User(email="operador@example.com", hashed_password="x", client_id=CLIENT_ID)
+    db.add(user)
+    db.commit()
+    token = create_access_token({"sub": str(user.id)})
+    db.close()
+    return token
+
+def ndjson(*lines):
+    return "".join(json.dumps(line) + "\n" for line in lines)
+
+def test_bulk_send_queues_messages_for_the_users_client(client, token, session_factory):
+    body = ndjson(
+        {"client_id": CLIENT_ID, "channel": "whatsapp", "template": "Olá {{ name }}", "campaign_id": "c1"},
+        {"recipient": "+5511900000001", "vars": {"name": "Ana"}},
+        {"recipient": "+5511900000002", "vars": {"name": "Bruno"}}
+    )
+    
+    response = client.post(
+        "/channels/bulk",
+        content=body,
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"}
+    )
+    
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    results = [event for event in events if event["type"] == "result"]
+    assert [result["status"] for result in results] == ["queued", "queued"]
+    assert events[-1]["type"] == "done"
+    
+    db = session_factory()
+    try:
+        assert sorted(row.message for row in db.query(OutboundMessage)) == ["Olá Ana", "Olá Bruno"]
+    finally:
+        db.close()
+
+def test_bulk_send_rejects_another_client(client, token):
+    body = ndjson({"client_id": CLIENT_ID + 1, "channel": "whatsapp", "template": "Olá"}, "+5511900000001")
+    
+    response = client.post("/channels/bulk", content=body, headers={"Authorization": f"Bearer {token}"})
+    
+    assert response.status_code == 403
+
+def test_bulk_send_requires_authentication(client):
+    body = ndjson({"client_id": CLIENT_ID, "channel": "whatsapp", "template": "Olá"}, "+5511900000001")
+    
+    response = client.post("/channels/bulk", content=body)
+    
+    assert response.status_code == 401
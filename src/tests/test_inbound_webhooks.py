@@ -0,0 +1,79 @@
+"""
+Testes do atendimento das mensagens recebidas pelos webhooks.
+
+O pool de workers processa eventos de uma fila em memória e enfileira as
+respostas na fila de saída em banco de dados (SQLite em memória).
+"""
+
+import os
+
+# Os serviços importam a engine da aplicação; sem DATABASE_URL, usar SQLite
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.models.models import OutboundMessage
+from src.services import outbound_queue
+from src.services.agent_runtime import agent_runtime
+from src.services.inbound_webhooks import InboundWorkerPool, InMemoryInboundQueue
+from src.services.outbound_queue import PostgresOutboundQueue
+
+ROUTE = {"client_id": 1, "agent_id": 10, "configuration": {}}
+
+class StaticRoutes:
+    """Rotas fixas: todo destinatário é atendido pelo agente de ROUTE."""
+    
+    def resolve(self, channel, recipient):
+        return ROUTE
+
+class EchoAgent:
+    async def aprocess_message(self, message, context):
+        return {"content": f"Recebido: {message['content']}"}
+
+def whatsapp_event(message_id):
+    body = {
+        "entry": [{"changes": [{"value": {
+            "metadata": {"phone_number_id": "123"},
+            "messages": [{"id": message_id, "from": "5511900000001", "text": {"body": "Olá"}}]
+        }}]}]
+    }
+    return {"channel": "whatsapp", "body": json.dumps(body)}
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    monkeypatch.setattr(outbound_queue, "_outbound_queue", PostgresOutboundQueue(session_factory=sessionmaker(bind=engine)))
+    monkeypatch.setattr(agent_runtime, "load", lambda db, agent_id: EchoAgent())
+    yield engine
+    engine.dispose()
+
+def test_reply_that_cannot_be_queued_is_retried(engine):
+    queue = InMemoryInboundQueue(retry_seconds=3600)
+    workers = InboundWorkerPool(queue=queue, session_factory=sessionmaker(bind=engine), routes=StaticRoutes())
+    event = whatsapp_event("wamid.1")
+    
+    # Fila de saída indisponível: a tabela ainda não existe
+    asyncio.run(workers.process_batch([event]))
+    
+    assert workers.counters["errors"] == 1
+    assert workers.counters["retried"] == 1
+    assert queue.begin("whatsapp", "wamid.1") == "new"
+    queue.release("whatsapp", "wamid.1")
+    
+    # Fila de saída restabelecida: o evento devolvido é atendido
+    OutboundMessage.__table__.create(engine)
+    asyncio.run(workers.process_batch([event]))
+    
+    assert workers.counters["retried"] == 1
+    assert queue.begin("whatsapp", "wamid.1") == "seen"
+    db = sessionmaker(bind=engine)()
+    try:
+        assert [row.message for row in db.query(OutboundMessage)] == ["Recebido: Olá"]
+    finally:
+        db.close()
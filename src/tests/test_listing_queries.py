@@ -0,0 +1,105 @@
+"""
+Testes do número de consultas SQL dos endpoints de listagem.
+
+Cada endpoint é executado com poucos e com muitos registros, e o número de
+instruções SQL emitidas deve ser o mesmo: um endpoint que volte a fazer uma
+consulta por registro (N+1) falha o teste.
+
+Os testes usam um banco SQLite em memória com as tabelas dos modelos
+envolvidos. Executar com `cd src && pytest -v` (run_tests.sh).
+"""
+
+import os
+
+# Os endpoints importam a engine da aplicação; sem DATABASE_URL, usar SQLite
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from fastapi import Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.models.models import Agent, AgentChannelIntegration, ChannelIntegration
+from src.api.integration_routes import get_agent_channels, get_client_integrations
+from src.services.pagination import LIST_MAX_PAGE_SIZE
+
+CLIENT_ID = 987654321
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    for model in (Agent, ChannelIntegration, AgentChannelIntegration):
+        model.__table__.create(engine)
+    yield engine
+    engine.dispose()
+
+def seed_agent_channels(db, count):
+    agent = Agent(
+        name="Agente de teste",
+        description="Agente de verificação",
+        agent_type="customer_support",
+        client_id=CLIENT_ID,
+        configuration={},
+        instructions=""
+    )
+    channels = [
+        ChannelIntegration(client_id=CLIENT_ID, channel_type="whatsapp", configuration={"phone_number_id": str(i)})
+        for i in range(count)
+    ]
+    db.add(agent)
+    db.add_all(channels)
+    db.flush()
+    db.add_all([
+        AgentChannelIntegration(agent_id=agent.id, channel_integration_id=channel.id, configuration={})
+        for channel in channels
+    ])
+    db.commit()
+    return lambda: get_agent_channels(agent_id=agent.id, db=db)
+
+def seed_client_integrations(db, count):
+    db.add_all([
+        ChannelIntegration(client_id=CLIENT_ID, channel_type="whatsapp", configuration={"phone_number_id": str(i)})
+        for i in range(count)
+    ])
+    db.commit()
+    return lambda: get_client_integrations(
+        CLIENT_ID, Response(), cursor=None, limit=LIST_MAX_PAGE_SIZE, fields=None, db=db
+    )
+
+def count_queries(engine, seed, count):
+    """Cria `count` registros e conta as instruções SQL emitidas pelo endpoint."""
+    statements = []
+    
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    db = sessionmaker(bind=engine)()
+    try:
+        call = seed(db, count)
+        # Os registros criados não devem estar no mapa de identidade da sessão
+        db.expire_all()
+        
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            rows = call()
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+    finally:
+        db.close()
+    
+    return len(statements), len(rows)
+
+@pytest.mark.parametrize("seed", [seed_agent_channels, seed_client_integrations])
+def test_listing_query_count_is_constant(engine, seed):
+    small_queries, small_rows = count_queries(engine, seed, 1)
+    
+    # Tabelas vazias de novo para a segunda execução
+    with engine.begin() as connection:
+        for model in (AgentChannelIntegration, ChannelIntegration, Agent):
+            connection.execute(model.__table__.delete())
+    
+    large_queries, large_rows = count_queries(engine, seed, 50)
+    
+    assert (small_rows, large_rows) == (1, 50)
+    assert small_queries == large_queries
@@ -0,0 +1,14 @@
+"""
+Testes do registro de templates usado pelo analisador organizacional.
+"""
+
+from src.models.agent_template_registry import CompiledTemplateRegistry
+from src.models.organization_analyzer import OrganizationAnalyzer
+
+def test_empty_registry_is_not_replaced_by_shared_registry():
+    registry = CompiledTemplateRegistry({})
+    
+    analyzer = OrganizationAnalyzer(registry)
+    
+    assert analyzer.registry is registry
+    assert len(analyzer.agent_templates) == 0
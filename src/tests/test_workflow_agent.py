@@ -0,0 +1,38 @@
+"""
+Testes do agente de fluxo de trabalho.
+
+O estado dos fluxos fica em um armazenamento em memória compartilhado entre
+instâncias do agente, como ocorre entre processos com o Redis.
+"""
+
+from src.services.adk.custom_agents.workflow_agent import WorkflowAgent
+from src.services.adk.workflow_state import InMemoryWorkflowStateStore
+
+# Nova versão da configuração: os passos "process" e "validate" foram substituídos
+REVIEW_WORKFLOW = {
+    "initial": "start",
+    "final": ["end"],
+    "transitions": [
+        {"from": "start", "event": "*", "to": "review"},
+        {"from": "review", "event": "approve", "to": "end"}
+    ]
+}
+
+def test_step_removed_from_workflow_restarts_at_initial():
+    store = InMemoryWorkflowStateStore()
+    
+    # Fluxo padrão: start -> process
+    first = WorkflowAgent("agent-1", {}, state_store=store).process_event({"workflow_id": "w1", "type": "submit"})
+    assert first["current_step"] == "process"
+    
+    # Configuração alterada: o passo persistido não existe mais
+    agent = WorkflowAgent("agent-1", {"workflow": REVIEW_WORKFLOW}, state_store=store)
+    result = agent.process_event({"workflow_id": "w1", "type": "submit", "payload": {"email": "a@example.com"}})
+    
+    assert result["previous_step"] == "process"
+    assert result["current_step"] == "review"
+    assert result["status"] == "in_progress"
+    assert result["data"] == {"email": "a@example.com"}
+    
+    result = agent.process_event({"workflow_id": "w1", "type": "approve"})
+    assert (result["current_step"], result["status"]) == ("end", "completed")